@@ -1,3 +1,3 @@
-from . import songs, ban_rules, public_submissions, auth
+from . import songs, ban_rules, public_submissions, auth, metrics
 
-__all__ = ["songs", "ban_rules", "public_submissions", "auth"]
+__all__ = ["songs", "ban_rules", "public_submissions", "auth", "metrics"]
@@ -7,7 +7,7 @@ from sqlalchemy.orm import Session
 
 from app.config import GOOGLE_CLIENT_ID, PASSWORD_LOGIN_ENABLED, TWITCH_CLIENT_ID
 from app.crud import admin_user as crud_admin_user
-from app.database.connection import get_db
+from app.database.connection import get_db, get_read_db
 from app.schemas.auth import EmailPasswordLogin, TwitchCodePayload
 from app.services.auth import (
     authenticate_email_password,
@@ -55,7 +55,7 @@ def login_twitch(payload: TwitchCodePayload) -> dict:
 
 
 @router.get("/config")
-def auth_config(db: Session = Depends(get_db)) -> dict:
+def auth_config(db: Session = Depends(get_read_db)) -> dict:
     """Expose les identifiants publics nécessaires aux clients front."""
 
     password_enabled = False
@@ -1,20 +1,122 @@
-from fastapi import APIRouter, Depends, HTTPException, Response, status
+import csv
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from app.schemas.ban_rule import BanRuleCreate, BanRuleOut, BanRuleUpdate
+from app.schemas.ban_rule import (
+    BanRuleCreate,
+    BanRuleImportReport,
+    BanRuleOut,
+    BanRulePreview,
+    BanRuleUpdate,
+)
 from app.crud import ban_rule as crud_ban
-from app.database.connection import get_db
+from app.database.connection import get_db, get_read_db, open_read_session
 from app.services.auth import require_admin
+from app.utils.fast_json import rows_response
+from app.services.channels import current_channel
+from app.services.ban_rule_io import (
+    CSV_MEDIA_TYPE,
+    NDJSON_MEDIA_TYPE,
+    BanRuleListParser,
+    BulkImportTooLarge,
+    iter_csv,
+    iter_lines,
+    iter_ndjson,
+)
 
 router = APIRouter()
 
+# Colonnes dans l'ordre de BanRuleOut : même corps JSON que la sérialisation Pydantic.
+_BAN_RULE_OUT_FIELDS = tuple(BanRuleOut.model_fields)
+
 @router.get("/", response_model=list[BanRuleOut])
-def list_ban_rules(db: Session = Depends(get_db)):
-    return crud_ban.list_ban_rules(db)
+def list_ban_rules(
+    db: Session = Depends(get_read_db), channel_id: int = Depends(current_channel)
+):
+    rows = crud_ban.list_ban_rule_rows(db, _BAN_RULE_OUT_FIELDS, channel_id=channel_id)
+    return rows_response(_BAN_RULE_OUT_FIELDS, rows)
 
 
 @router.post("/", response_model=BanRuleOut, dependencies=[Depends(require_admin)])
-def add_ban_rule(rule: BanRuleCreate, db: Session = Depends(get_db)):
-    return crud_ban.add_ban_rule(db, rule)
+def add_ban_rule(
+    rule: BanRuleCreate,
+    db: Session = Depends(get_db),
+    channel_id: int = Depends(current_channel),
+):
+    return crud_ban.add_ban_rule(db, rule, channel_id=channel_id)
+
+
+@router.post(
+    "/preview",
+    response_model=BanRulePreview,
+    dependencies=[Depends(require_admin)],
+)
+def preview_ban_rule(
+    rule: BanRuleCreate,
+    sample_size: int = Query(20, ge=0, le=100),
+    db: Session = Depends(get_read_db),
+    channel_id: int = Depends(current_channel),
+):
+    return crud_ban.preview_ban_rule(db, rule, sample_size=sample_size, channel_id=channel_id)
+
+
+@router.post(
+    "/bulk",
+    response_model=BanRuleImportReport,
+    dependencies=[Depends(require_admin)],
+)
+async def import_ban_rules(
+    request: Request,
+    db: Session = Depends(get_db),
+    channel_id: int = Depends(current_channel),
+):
+    """Importe une liste NDJSON (par défaut) ou CSV (``Content-Type: text/csv``)."""
+
+    parser = BanRuleListParser()
+    is_csv = request.headers.get("content-type", "").startswith(CSV_MEDIA_TYPE)
+    lines = iter_lines(request.stream(), keepends=is_csv)
+    try:
+        if is_csv:
+            await parser.feed_csv(lines)
+        else:
+            await parser.feed_ndjson(lines)
+    except BulkImportTooLarge as exc:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(exc))
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Le fichier doit être encodé en UTF-8.",
+        )
+    except csv.Error as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"CSV invalide ({exc})")
+
+    report = await run_in_threadpool(crud_ban.import_ban_rules, db, parser.rules, channel_id)
+    return {**report, "rejected": parser.rejected, "errors": parser.errors}
+
+
+@router.get("/export", dependencies=[Depends(require_admin)])
+def export_ban_rules(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    channel_id: int = Depends(current_channel),
+):
+    def body():
+        # La session vit aussi longtemps que le flux, pas que la dépendance.
+        db = open_read_session()
+        try:
+            rows = crud_ban.iter_ban_rule_rows(db, channel_id=channel_id)
+            yield from iter_csv(rows) if format == "csv" else iter_ndjson(rows)
+        finally:
+            db.close()
+
+    media_type = CSV_MEDIA_TYPE if format == "csv" else NDJSON_MEDIA_TYPE
+    return StreamingResponse(
+        body(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="ban_rules.{format}"'},
+    )
 
 
 @router.put(
@@ -22,8 +124,13 @@ def add_ban_rule(rule: BanRuleCreate, db: Session = Depends(get_db)):
     response_model=BanRuleOut,
     dependencies=[Depends(require_admin)],
 )
-def update_ban_rule(rule_id: int, payload: BanRuleUpdate, db: Session = Depends(get_db)):
-    updated = crud_ban.update_ban_rule(db, rule_id, payload)
+def update_ban_rule(
+    rule_id: int,
+    payload: BanRuleUpdate,
+    db: Session = Depends(get_db),
+    channel_id: int = Depends(current_channel),
+):
+    updated = crud_ban.update_ban_rule(db, rule_id, payload, channel_id=channel_id)
     if updated is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Règle introuvable")
     return updated
@@ -34,8 +141,12 @@ def update_ban_rule(rule_id: int, payload: BanRuleUpdate, db: Session = Depends(
     status_code=status.HTTP_204_NO_CONTENT,
     dependencies=[Depends(require_admin)],
 )
-def delete_ban_rule(rule_id: int, db: Session = Depends(get_db)):
-    deleted = crud_ban.delete_ban_rule(db, rule_id)
+def delete_ban_rule(
+    rule_id: int,
+    db: Session = Depends(get_db),
+    channel_id: int = Depends(current_channel),
+):
+    deleted = crud_ban.delete_ban_rule(db, rule_id, channel_id=channel_id)
     if not deleted:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Règle introuvable")
     return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.crud import channel as crud_channel
+from app.database.connection import get_db, get_read_db
+from app.schemas.channel import ChannelCreate, ChannelOut
+from app.services.auth import require_admin
+
+router = APIRouter()
+
+
+@router.get("/", response_model=list[ChannelOut])
+def list_channels(db: Session = Depends(get_read_db)):
+    return crud_channel.list_channels(db)
+
+
+@router.post(
+    "/",
+    response_model=ChannelOut,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(require_admin)],
+)
+def create_channel(payload: ChannelCreate, db: Session = Depends(get_db)):
+    if crud_channel.get_by_login(db, payload.login) is not None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Chaîne déjà existante")
+    try:
+        return crud_channel.create_channel(
+            db, login=payload.login, display_name=payload.display_name
+        )
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Chaîne déjà existante")
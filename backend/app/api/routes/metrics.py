@@ -0,0 +1,57 @@
+"""Exposition Prometheus des métriques de performance du processus."""
+
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, Response
+
+from app.database import connection
+from app.services.auth import require_admin
+from app.utils.metrics import REGISTRY
+
+router = APIRouter()
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_POOL_GAUGES = {
+    "checked_out": "Connexions actuellement empruntées au pool.",
+    "peak_checked_out": "Maximum de connexions empruntées simultanément.",
+    "pool_size": "Taille configurée du pool.",
+    "pool_overflow": "Connexions ouvertes au-delà de la taille du pool.",
+    "pool_checked_in": "Connexions disponibles dans le pool.",
+}
+_POOL_COUNTERS = {
+    "connects": "Connexions ouvertes par le pool.",
+    "closes": "Connexions fermées par le pool.",
+    "invalidations": "Connexions invalidées.",
+    "checkouts": "Emprunts de connexions.",
+    "liveness_pings": "Vérifications de connexions inactives.",
+    "liveness_failures": "Vérifications de connexions inactives en échec.",
+    "checkout_wait_count": "Attentes mesurées lors des emprunts.",
+    "checkout_wait_total_seconds": "Temps cumulé d'attente d'une connexion.",
+}
+
+
+def _pool_collector():
+    pools = [("primary", connection.get_pool_stats())]
+    if connection.has_read_replica():
+        pools.append(("replica", connection.read_pool_stats.snapshot()))
+
+    families = []
+    for key, documentation in _POOL_GAUGES.items():
+        samples = [({"pool": name}, stats[key]) for name, stats in pools if key in stats]
+        families.append((f"db_pool_{key}", "gauge", documentation, samples))
+    for key, documentation in _POOL_COUNTERS.items():
+        name = key if key.endswith("_seconds") else f"{key}_total"
+        samples = [({"pool": pool}, stats[key]) for pool, stats in pools]
+        families.append((f"db_pool_{name}", "counter", documentation, samples))
+    return families
+
+
+REGISTRY.register_collector(_pool_collector)
+
+
+@router.get("/metrics", include_in_schema=False, dependencies=[Depends(require_admin)])
+def export_metrics() -> Response:
+    """Expose les métriques au format texte Prometheus (jeton administrateur requis)."""
+
+    return Response(content=REGISTRY.render(), media_type=PROMETHEUS_CONTENT_TYPE)
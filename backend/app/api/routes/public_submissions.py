@@ -5,19 +5,39 @@ from __future__ import annotations
 import re
 
 from fastapi import APIRouter, Depends, HTTPException, Request, status
-from slowapi import Limiter
-from slowapi.util import get_remote_address
 from sqlalchemy.orm import Session
 
-from app.crud import song as crud_song
+from app.config import (
+    PUBLIC_CHANNEL_SUBMISSION_RATE,
+    RATE_LIMIT_STORAGE,
+    RATE_LIMIT_SYNC_INTERVAL_MS,
+)
 from app.database.connection import get_db
 from app.schemas.public_submission import PublicSubmissionPayload
 from app.schemas.song import SongOut
-from app.services.song_metadata import MetadataError, fetch_song_metadata
+from app.services import submissions
+from app.services.channels import channel_key, current_channel
+from app.services.rate_limit import RateLimiter, client_address, create_storage
+from app.services.song_metadata import fetch_song_metadata
 
 router = APIRouter()
 
-limiter = Limiter(key_func=get_remote_address)
+_storage = create_storage(RATE_LIMIT_STORAGE, flush_interval=RATE_LIMIT_SYNC_INTERVAL_MS / 1000)
+
+
+def _viewer_key(request: Request) -> str:
+    # Un spectateur a son propre quota sur chaque chaîne.
+    return f"{channel_key(request)}:{client_address(request)}"
+
+
+limiter = RateLimiter("10/minute", storage=_storage, key_func=_viewer_key, name="public_submissions")
+# Plafond global par chaîne : un raid sur une chaîne n'épuise pas les autres.
+channel_limiter = RateLimiter(
+    PUBLIC_CHANNEL_SUBMISSION_RATE,
+    storage=_storage,
+    key_func=channel_key,
+    name="public_submissions_channel",
+)
 
 YOUTUBE_REGEX = re.compile(r"^(https?://)?(www\.)?(youtube\.com|youtu\.be)/", re.IGNORECASE)
 SPOTIFY_REGEX = re.compile(r"^(https?://)?(open\.)?spotify\.com/", re.IGNORECASE)
@@ -36,26 +56,36 @@ def _validate_link(link: str) -> str:
     return cleaned
 
 
-@router.post("/", response_model=SongOut, status_code=status.HTTP_201_CREATED)
-@limiter.limit("10/minute")
+@router.post(
+    "/",
+    response_model=SongOut,
+    status_code=status.HTTP_201_CREATED,
+    # Chaîne résolue d'abord : un login inconnu ne crée pas de compteurs.
+    dependencies=[Depends(current_channel), Depends(limiter), Depends(channel_limiter)],
+)
 def submit_song(
-    request: Request, payload: PublicSubmissionPayload, db: Session = Depends(get_db)
+    request: Request,
+    payload: PublicSubmissionPayload,
+    db: Session = Depends(get_db),
+    channel_id: int = Depends(current_channel),
 ) -> SongOut:
     link = _validate_link(payload.link)
 
-    try:
-        metadata = fetch_song_metadata(link)
-    except MetadataError as exc:  # pragma: no cover - dépend des APIs externes
+    result = submissions.submit_link(
+        db,
+        link,
+        comment=payload.comment,
+        fetch_metadata=fetch_song_metadata,
+        channel_id=channel_id,
+    )
+    if result.status == submissions.INVALID:
         raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY,
-            detail=str(exc),
-        ) from exc
-
-    if payload.comment:
-        metadata.comment = payload.comment
-
-    song = crud_song.add_or_increment_song(db, metadata)
-    if song is None:
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Lien YouTube ou Spotify non reconnu.",
+        )
+    if result.status == submissions.METADATA_ERROR:  # pragma: no cover - dépend des APIs externes
+        raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=result.detail)
+    if result.status == submissions.BANNED:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Chanson bannie")
 
-    return song
+    return result.song
@@ -1,29 +1,124 @@
 import re
+from typing import Literal
 
-from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from app.schemas.song import SongCreate, SongOut
+from app.config import VOTE_DEDUP_ENABLED
+from app.schemas.song import SongBatchCreate, SongBatchItemOut, SongBatchOut, SongCreate, SongOut
 from app.crud import song as crud_song
-from app.database.connection import get_db
+from app.crud.song_voter import DuplicateVoteError, voter_fingerprint
+from app.database.connection import get_db, get_read_db, open_read_session
+from app.services import leaderboard, submissions
 from app.services.auth import require_admin
+from app.services.channels import current_channel
+from app.services.rate_limit import client_address
+from app.services.song_io import (
+    CSV_MEDIA_TYPE,
+    GZIP_MEDIA_TYPE,
+    NDJSON_MEDIA_TYPE,
+    iter_csv,
+    iter_gzip,
+    iter_ndjson,
+)
+from app.services.song_metadata import fetch_song_metadata
+from app.utils.fast_json import rows_response
 
 router = APIRouter()
 
 _SAFE_LINK_RE = re.compile(r"^https?://", re.IGNORECASE)
+# Colonnes dans l'ordre de SongOut : même corps JSON que la sérialisation Pydantic.
+_SONG_OUT_FIELDS = tuple(SongOut.model_fields)
 
 
 @router.post("/", response_model=SongOut, dependencies=[Depends(require_admin)])
-def add_song(song: SongCreate, db: Session = Depends(get_db)):
+def add_song(
+    song: SongCreate,
+    db: Session = Depends(get_db),
+    channel_id: int = Depends(current_channel),
+):
     if song.link and not _SAFE_LINK_RE.match(song.link):
         raise HTTPException(status_code=400, detail="Le lien doit être une URL http(s).")
-    result = crud_song.add_or_increment_song(db, song)
+    result = crud_song.add_or_increment_song(db, song, channel_id=channel_id)
     if result is None:
         raise HTTPException(status_code=400, detail="Chanson bannie")
     return result
 
+@router.post("/batch", response_model=SongBatchOut, dependencies=[Depends(require_admin)])
+def add_songs_batch(
+    payload: SongBatchCreate,
+    db: Session = Depends(get_db),
+    channel_id: int = Depends(current_channel),
+):
+    """Ajoute un lot de liens ou de morceaux en une transaction, un résultat par élément."""
+
+    results = submissions.submit_batch(
+        db, payload.items, fetch_metadata=fetch_song_metadata, channel_id=channel_id
+    )
+    items = [
+        SongBatchItemOut(
+            index=index,
+            status=result.status,
+            link=result.link,
+            song=SongOut.model_validate(result.song) if result.song is not None else None,
+            detail=result.detail,
+        )
+        for index, result in enumerate(results)
+    ]
+    counts: dict[str, int] = {}
+    for item in items:
+        counts[item.status] = counts.get(item.status, 0) + 1
+    return SongBatchOut(results=items, counts=counts)
+
+
 @router.get("/", response_model=list[SongOut])
-def list_songs(db: Session = Depends(get_db)):
-    return crud_song.get_all_songs(db)
+def list_songs(
+    sort: Literal["votes", "trending"] = Query("votes"),
+    db: Session = Depends(get_read_db),
+    channel_id: int = Depends(current_channel),
+):
+    rows = crud_song.list_song_rows(db, _SONG_OUT_FIELDS, sort=sort, channel_id=channel_id)
+    return rows_response(_SONG_OUT_FIELDS, rows)
+
+
+@router.get("/top", response_model=list[SongOut])
+def top_songs(
+    k: int = Query(50, ge=1, le=leaderboard.MAX_K),
+    db: Session = Depends(get_db),
+    channel_id: int = Depends(current_channel),
+):
+    # Servi par le classement en mémoire ; la session ne sert qu'à le recharger.
+    return [entry._asdict() for entry in leaderboard.top_songs(db, k, channel_id)]
+
+
+@router.get("/export", dependencies=[Depends(require_admin)])
+def export_songs(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    gzip: bool = False,
+    channel_id: int = Depends(current_channel),
+):
+    """Exporte la file en flux, par voix décroissantes, à mémoire constante."""
+
+    def body():
+        # La session vit aussi longtemps que le flux, pas que la dépendance.
+        db = open_read_session()
+        try:
+            rows = crud_song.iter_song_rows(db, channel_id=channel_id)
+            chunks = iter_csv(rows) if format == "csv" else iter_ndjson(rows)
+            yield from iter_gzip(chunks) if gzip else chunks
+        finally:
+            db.close()
+
+    filename = f"songs.{format}.gz" if gzip else f"songs.{format}"
+    if gzip:
+        media_type = GZIP_MEDIA_TYPE
+    else:
+        media_type = CSV_MEDIA_TYPE if format == "csv" else NDJSON_MEDIA_TYPE
+    return StreamingResponse(
+        body(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 
 @router.delete(
@@ -31,16 +126,31 @@ def list_songs(db: Session = Depends(get_db)):
     status_code=status.HTTP_204_NO_CONTENT,
     dependencies=[Depends(require_admin)],
 )
-def delete_song(song_id: int, db: Session = Depends(get_db)):
-    deleted = crud_song.delete_song(db, song_id)
+def delete_song(
+    song_id: int,
+    db: Session = Depends(get_db),
+    channel_id: int = Depends(current_channel),
+):
+    deleted = crud_song.delete_song(db, song_id, channel_id=channel_id)
     if not deleted:
         raise HTTPException(status_code=404, detail="Chanson introuvable")
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
 @router.post("/{song_id}/vote", response_model=SongOut)
-def vote_for_song(song_id: int, db: Session = Depends(get_db)):
-    song = crud_song.increment_vote(db, song_id)
+def vote_for_song(
+    song_id: int,
+    request: Request,
+    db: Session = Depends(get_db),
+    channel_id: int = Depends(current_channel),
+):
+    voter = None
+    if VOTE_DEDUP_ENABLED:
+        voter = voter_fingerprint(client_address(request), request.headers.get("user-agent", ""))
+    try:
+        song = crud_song.increment_vote(db, song_id, voter=voter, channel_id=channel_id)
+    except DuplicateVoteError:
+        raise HTTPException(status_code=409, detail="Tu as déjà voté pour cette chanson.")
     if song is None:
         raise HTTPException(status_code=404, detail="Chanson introuvable")
     return song
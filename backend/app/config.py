@@ -91,6 +91,15 @@ TWITCH_CLIENT_SECRET = os.getenv("TWITCH_CLIENT_SECRET")
 _raw_allowed_twitch = os.getenv("ALLOWED_TWITCH_LOGINS", "")
 ALLOWED_TWITCH_LOGINS = {v.lower() for v in _split_env(_raw_allowed_twitch)}
 
+# Lecture du chat Twitch (désactivée tant qu'aucun salon n'est configuré)
+_raw_twitch_chat_channel = os.getenv("TWITCH_CHAT_CHANNEL")
+TWITCH_CHAT_CHANNEL = (_raw_twitch_chat_channel or "").strip().lstrip("#").lower() or None
+TWITCH_CHAT_NICK = (os.getenv("TWITCH_CHAT_NICK") or "").strip().lower() or None
+TWITCH_CHAT_OAUTH_TOKEN = os.getenv("TWITCH_CHAT_OAUTH_TOKEN") or None
+
+_raw_twitch_chat_user_rate = os.getenv("TWITCH_CHAT_USER_RATE")
+TWITCH_CHAT_USER_RATE = (_raw_twitch_chat_user_rate or "3/30 seconds").strip()
+
 _raw_password_login_enabled = os.getenv("ADMIN_PASSWORD_LOGIN_ENABLED")
 PASSWORD_LOGIN_ENABLED = _parse_bool(_raw_password_login_enabled, True)
 
@@ -141,6 +150,65 @@ FRONTEND_SUBMIT_REDIRECT_URL = (
 )
 
 
+# Profilage SQL (développement / tests uniquement)
+_raw_query_profiler = os.getenv("QUERY_PROFILER_ENABLED")
+QUERY_PROFILER_ENABLED = _parse_bool(_raw_query_profiler, False)
+
+_raw_query_profiler_slow_ms = os.getenv("QUERY_PROFILER_SLOW_MS")
+QUERY_PROFILER_SLOW_MS = float(_raw_query_profiler_slow_ms or "100")
+
+
+# Limitation de débit des soumissions publiques
+_raw_rate_limit_storage = os.getenv("RATE_LIMIT_STORAGE")
+RATE_LIMIT_STORAGE = (_raw_rate_limit_storage or "memory").strip() or "memory"
+
+_raw_rate_limit_sync_ms = os.getenv("RATE_LIMIT_SYNC_INTERVAL_MS")
+RATE_LIMIT_SYNC_INTERVAL_MS = float(_raw_rate_limit_sync_ms or "250")
+
+_raw_public_channel_rate = os.getenv("PUBLIC_CHANNEL_SUBMISSION_RATE")
+PUBLIC_CHANNEL_SUBMISSION_RATE = (_raw_public_channel_rate or "300/minute").strip()
+
+# Instantané en mémoire des règles de bannissement (resynchronisation entre workers)
+_raw_ban_snapshot_ttl = os.getenv("BAN_SNAPSHOT_TTL_SECONDS")
+BAN_SNAPSHOT_TTL_SECONDS = float(_raw_ban_snapshot_ttl or "30")
+
+# Bus d'invalidation des caches entre workers
+_raw_cache_bus_enabled = os.getenv("CACHE_BUS_ENABLED")
+CACHE_BUS_ENABLED = _parse_bool(_raw_cache_bus_enabled, True)
+
+_raw_cache_bus_poll = os.getenv("CACHE_BUS_POLL_SECONDS")
+CACHE_BUS_POLL_SECONDS = float(_raw_cache_bus_poll or "1")
+
+# Proxys de confiance devant l'application (1 sur Render) : l'adresse du client
+# est lue dans X-Forwarded-For, à cette distance de la fin de la chaîne.
+_raw_trusted_proxy_hops = os.getenv("TRUSTED_PROXY_HOPS")
+TRUSTED_PROXY_HOPS = max(0, int(_raw_trusted_proxy_hops or "0"))
+
+# Déduplication des votes côté serveur (empreintes des votants par morceau)
+_raw_vote_dedup_enabled = os.getenv("VOTE_DEDUP_ENABLED")
+VOTE_DEDUP_ENABLED = _parse_bool(_raw_vote_dedup_enabled, True)
+
+_raw_voter_secret = os.getenv("VOTER_FINGERPRINT_SECRET")
+VOTER_FINGERPRINT_SECRET = _raw_voter_secret or ADMIN_JWT_SECRET
+
+_raw_voter_cache_max = os.getenv("VOTER_CACHE_MAX_SONGS")
+VOTER_CACHE_MAX_SONGS = int(_raw_voter_cache_max or "10000")
+
+# Compression des réponses (gzip, brotli si le paquet est installé)
+_raw_compression_enabled = os.getenv("COMPRESSION_ENABLED")
+COMPRESSION_ENABLED = _parse_bool(_raw_compression_enabled, True)
+
+_raw_compression_min_bytes = os.getenv("COMPRESSION_MIN_BYTES")
+COMPRESSION_MIN_BYTES = int(_raw_compression_min_bytes or "1024")
+
+# Classement « tendance » (demi-vie d'un vote, en minutes)
+_raw_trend_half_life = os.getenv("TREND_HALF_LIFE_MINUTES")
+TREND_HALF_LIFE_MINUTES = float(_raw_trend_half_life or "60")
+
+# Conservation du journal vote_events (heures, 0 = jamais purgé)
+_raw_vote_events_retention = os.getenv("VOTE_EVENTS_RETENTION_HOURS")
+VOTE_EVENTS_RETENTION_HOURS = max(0.0, float(_raw_vote_events_retention or "168"))
+
 
 def log_environment_configuration() -> None:
     """Journalise les valeurs brutes et interprétées des variables d'environnement."""
@@ -174,6 +242,13 @@ def log_environment_configuration() -> None:
     _log_env_value("ALLOWED_TWITCH_LOGINS", _raw_allowed_twitch)
     _log_collection("ALLOWED_TWITCH_LOGINS", sorted(ALLOWED_TWITCH_LOGINS))
 
+    _log_env_value("TWITCH_CHAT_CHANNEL", _raw_twitch_chat_channel)
+    if TWITCH_CHAT_CHANNEL:
+        _log_env_value("TWITCH_CHAT_NICK", TWITCH_CHAT_NICK)
+        _log_env_value("TWITCH_CHAT_OAUTH_TOKEN", TWITCH_CHAT_OAUTH_TOKEN, mask=True)
+        _log_env_value("TWITCH_CHAT_USER_RATE", _raw_twitch_chat_user_rate)
+        logger.info("TWITCH_CHAT_USER_RATE interprétée: %s", TWITCH_CHAT_USER_RATE)
+
     _log_env_value("ADMIN_PASSWORD_LOGIN_ENABLED", _raw_password_login_enabled)
     logger.info(
         "ADMIN_PASSWORD_LOGIN_ENABLED interprétée: %s",
@@ -208,3 +283,49 @@ def log_environment_configuration() -> None:
             FRONTEND_SUBMIT_REDIRECT_URL,
         )
 
+    _log_env_value("QUERY_PROFILER_ENABLED", _raw_query_profiler)
+    logger.info("QUERY_PROFILER_ENABLED interprétée: %s", QUERY_PROFILER_ENABLED)
+    if QUERY_PROFILER_ENABLED:
+        logger.info("QUERY_PROFILER_SLOW_MS interprétée: %s", QUERY_PROFILER_SLOW_MS)
+
+    _log_env_value("BAN_SNAPSHOT_TTL_SECONDS", _raw_ban_snapshot_ttl)
+    logger.info("BAN_SNAPSHOT_TTL_SECONDS interprétée: %s", BAN_SNAPSHOT_TTL_SECONDS)
+
+    _log_env_value("CACHE_BUS_ENABLED", _raw_cache_bus_enabled)
+    logger.info("CACHE_BUS_ENABLED interprétée: %s", CACHE_BUS_ENABLED)
+    if CACHE_BUS_ENABLED:
+        _log_env_value("CACHE_BUS_POLL_SECONDS", _raw_cache_bus_poll)
+        logger.info("CACHE_BUS_POLL_SECONDS interprétée: %s", CACHE_BUS_POLL_SECONDS)
+
+    _log_env_value("TRUSTED_PROXY_HOPS", _raw_trusted_proxy_hops)
+    logger.info("TRUSTED_PROXY_HOPS interprétée: %s", TRUSTED_PROXY_HOPS)
+
+    _log_env_value("VOTE_DEDUP_ENABLED", _raw_vote_dedup_enabled)
+    logger.info("VOTE_DEDUP_ENABLED interprétée: %s", VOTE_DEDUP_ENABLED)
+    if VOTE_DEDUP_ENABLED:
+        _log_env_value("VOTER_FINGERPRINT_SECRET", _raw_voter_secret, mask=True)
+        if _raw_voter_secret is None:
+            logger.info("VOTER_FINGERPRINT_SECRET non définie, ADMIN_JWT_SECRET utilisé")
+        _log_env_value("VOTER_CACHE_MAX_SONGS", _raw_voter_cache_max)
+        logger.info("VOTER_CACHE_MAX_SONGS interprétée: %s", VOTER_CACHE_MAX_SONGS)
+
+    _log_env_value("COMPRESSION_ENABLED", _raw_compression_enabled)
+    logger.info("COMPRESSION_ENABLED interprétée: %s", COMPRESSION_ENABLED)
+    if COMPRESSION_ENABLED:
+        _log_env_value("COMPRESSION_MIN_BYTES", _raw_compression_min_bytes)
+        logger.info("COMPRESSION_MIN_BYTES interprétée: %s", COMPRESSION_MIN_BYTES)
+
+    _log_env_value("TREND_HALF_LIFE_MINUTES", _raw_trend_half_life)
+    logger.info("TREND_HALF_LIFE_MINUTES interprétée: %s", TREND_HALF_LIFE_MINUTES)
+    _log_env_value("VOTE_EVENTS_RETENTION_HOURS", _raw_vote_events_retention)
+    logger.info("VOTE_EVENTS_RETENTION_HOURS interprétée: %s", VOTE_EVENTS_RETENTION_HOURS)
+
+    _log_env_value("RATE_LIMIT_STORAGE", _raw_rate_limit_storage)
+    logger.info("RATE_LIMIT_STORAGE interprétée: %s", RATE_LIMIT_STORAGE)
+    if RATE_LIMIT_STORAGE != "memory":
+        logger.info(
+            "RATE_LIMIT_SYNC_INTERVAL_MS interprétée: %s", RATE_LIMIT_SYNC_INTERVAL_MS
+        )
+    _log_env_value("PUBLIC_CHANNEL_SUBMISSION_RATE", _raw_public_channel_rate)
+    logger.info("PUBLIC_CHANNEL_SUBMISSION_RATE interprétée: %s", PUBLIC_CHANNEL_SUBMISSION_RATE)
+
@@ -0,0 +1,27 @@
+"""CRUD helpers for persistent application settings."""
+
+from sqlalchemy.orm import Session
+
+from app.models.app_setting import AppSetting
+
+
+def get_setting(db: Session, key: str) -> str | None:
+    return db.query(AppSetting.value).filter(AppSetting.key == key).scalar()
+
+
+def set_setting(db: Session, key: str, value: str) -> None:
+    """Écrit ``value`` dans la transaction courante ; plusieurs workers peuvent le faire en même temps."""
+
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    statement = insert(AppSetting).values(key=key, value=value)
+    db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[AppSetting.key], set_={"value": statement.excluded.value}
+        )
+    )
+
+
+__all__ = ["get_setting", "set_setting"]
@@ -1,16 +1,54 @@
+import threading
+import time
+from dataclasses import dataclass
+from itertools import islice
+from typing import Iterable, Sequence
+from weakref import WeakKeyDictionary
+
+from sqlalchemy import event, insert
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
+
+from app.config import BAN_SNAPSHOT_TTL_SECONDS
 
 from app.models.ban_rule import BanRule
+from app.models.channel import DEFAULT_CHANNEL_ID
 from app.models.song import Song
 
 from app.schemas.ban_rule import BanRuleCreate, BanRuleUpdate
+from app.services import cache_bus, leaderboard
 
-from app.utils.text import normalize
+from app.utils.links import comparable_link
+from app.utils.matching import OverlapIndex
+from app.utils.metrics import record_cache_access
+from app.utils.text import normalize, normalize_many
 
 
 _UNKNOWN_ARTIST_NORMALIZED = normalize("Artiste inconnu")
 
+# Taille des lots de chansons lus et évalués lors des bannissements rétroactifs.
+SCAN_CHUNK_SIZE = 5000
+# Nombre maximal d'identifiants par instruction DELETE ... IN (...).
+DELETE_CHUNK_SIZE = 900
+
+# Taille des lots d'insertion lors d'un import de règles.
+INSERT_CHUNK_SIZE = 1000
+
+# Budget d'une prévisualisation : au-delà, le résultat est partiel.
+PREVIEW_MAX_ROWS = 100_000
+PREVIEW_MAX_SECONDS = 0.5
+PREVIEW_CHUNK_SIZE = 2000
+
+# Chaînes dont les règles ont changé dans la transaction (clé de `session.info`).
+_CHANGED_CHANNELS_INFO = "tchatrecosong_ban_rule_channels"
+
+
+def _rule_values(rule: BanRuleCreate | BanRuleUpdate) -> dict:
+    # Les chansons sont stockées sous leur lien canonique : la règle aussi.
+    values = rule.model_dump()
+    if values.get("link"):
+        values["link"] = comparable_link(values["link"])
+    return values
+
 
 def _normalized_overlap(value_a: str, value_b: str) -> bool:
     if not value_a or not value_b:
@@ -45,31 +83,211 @@ def _matches_rule(song: Song, rule: BanRule) -> bool:
     return _matches_rule_values(song.title, song.artist, rule)
 
 
-def _apply_rule_to_existing_songs(db: Session, rule: BanRule) -> None:
-    if rule.link:
+class BanRuleMatcher:
+    """Évalue un ensemble de règles titre/artiste sur des chansons en lot.
+
+    Équivaut à appeler ``_matches_rule_values`` pour chaque couple
+    (chanson, règle), mais chaque champ de chanson est comparé à toutes les
+    règles en une passe grâce à :class:`OverlapIndex`. Les règles sans titre
+    ni artiste (règles de lien) sont ignorées : les liens se comparent à part.
+    """
+
+    def __init__(self, rules: Iterable[BanRule]) -> None:
+        titles: list[str] = []
+        artists: list[str] = []
+        self._needs_title: list[bool] = []
+        self._needs_artist: list[bool] = []
+
+        for rule in rules:
+            if not rule.title and not rule.artist:
+                continue
+            titles.append(normalize(rule.title) if rule.title else "")
+            artists.append(normalize(rule.artist) if rule.artist else "")
+            self._needs_title.append(bool(rule.title))
+            self._needs_artist.append(bool(rule.artist))
+
+        self._titles = OverlapIndex(titles)
+        self._artists = OverlapIndex(artists)
+        self._title_only = {
+            index
+            for index, (title, artist) in enumerate(zip(self._needs_title, self._needs_artist))
+            if title and not artist
+        }
+        self._artist_only = {
+            index
+            for index, (title, artist) in enumerate(zip(self._needs_title, self._needs_artist))
+            if artist and not title
+        }
+
+    def __len__(self) -> int:
+        return len(self._needs_title)
+
+    def matches_normalized(self, title_norm: str, artist_norm: str) -> bool:
+        title_hits = self._titles.overlaps(title_norm) if title_norm else set()
+        if title_hits & self._title_only:
+            return True
+
+        if not artist_norm or artist_norm == _UNKNOWN_ARTIST_NORMALIZED:
+            return False
+        artist_hits = self._artists.overlaps(artist_norm)
+        if artist_hits & self._artist_only:
+            return True
+        # Règles titre + artiste : les deux champs doivent correspondre.
+        return bool(title_hits & artist_hits)
+
+    def matches(self, title: str | None, artist: str | None) -> bool:
+        return self.matches_normalized(normalize(title or ""), normalize(artist or ""))
+
+
+def match_many(
+    songs: Iterable[tuple[int, str | None, str | None]],
+    rules: Sequence[BanRule] | BanRuleMatcher,
+    chunk_size: int = SCAN_CHUNK_SIZE,
+) -> list[int]:
+    """Identifiants des chansons ``(id, titre, artiste)`` visées par au moins une règle."""
+
+    matcher = rules if isinstance(rules, BanRuleMatcher) else BanRuleMatcher(rules)
+    if not len(matcher):
+        return []
+
+    matched: list[int] = []
+    iterator = iter(songs)
+    while chunk := list(islice(iterator, chunk_size)):
+        ids, titles, artists = zip(*chunk)
+        for song_id, title_norm, artist_norm in zip(
+            ids, normalize_many(titles), normalize_many(artists)
+        ):
+            if matcher.matches_normalized(title_norm, artist_norm):
+                matched.append(song_id)
+    return matched
+
+
+def _songs_deleted(db: Session, channel_id: int) -> None:
+    # Suppressions en masse : invisibles pour after_flush et pour le classement.
+    cache_bus.mark_changed(db, cache_bus.SONGS)
+    leaderboard.mark_removed(db, channel_id)
+
+
+def _channel_songs(db: Session, channel_id: int, *columns):  # noqa: ANN002, ANN202
+    return db.query(*(columns or (Song,))).filter(Song.channel_id == channel_id)
+
+
+def _delete_songs(db: Session, song_ids: Sequence[int], channel_id: int) -> None:
+    for start in range(0, len(song_ids), DELETE_CHUNK_SIZE):
         (
             db.query(Song)
-            .filter(Song.link == rule.link)
+            .filter(Song.id.in_(song_ids[start : start + DELETE_CHUNK_SIZE]))
             .delete(synchronize_session=False)
         )
-        return
+    if song_ids:
+        _songs_deleted(db, channel_id)
 
-    candidates = db.query(Song).all()
-    ids_to_delete: list[int] = []
-    for song in candidates:
-        if _matches_rule(song, rule):
-            ids_to_delete.append(song.id)
 
-    if ids_to_delete:
-        (
-            db.query(Song)
-            .filter(Song.id.in_(ids_to_delete))
+def _apply_rule_to_existing_songs(db: Session, rule: BanRule) -> None:
+    if rule.link:
+        deleted = (
+            _channel_songs(db, rule.channel_id)
+            .filter(Song.link == rule.link)
             .delete(synchronize_session=False)
         )
+        if deleted:
+            _songs_deleted(db, rule.channel_id)
+        return
 
-
-def add_ban_rule(db: Session, rule: BanRuleCreate):
-    db_rule = BanRule(**rule.model_dump())
+    rows = _channel_songs(db, rule.channel_id, Song.id, Song.title, Song.artist).yield_per(
+        SCAN_CHUNK_SIZE
+    )
+    ids_to_delete = match_many(rows, [rule])
+    if ids_to_delete:
+        _delete_songs(db, ids_to_delete, rule.channel_id)
+
+
+def preview_ban_rule(
+    db: Session,
+    rule: BanRuleCreate,
+    sample_size: int = 20,
+    max_rows: int = PREVIEW_MAX_ROWS,
+    max_seconds: float = PREVIEW_MAX_SECONDS,
+    channel_id: int = DEFAULT_CHANNEL_ID,
+) -> dict:
+    """Simule ``add_ban_rule`` sans rien modifier et résume les chansons visées.
+
+    Les règles de lien passent par l'index ``(channel_id, link)``. Les règles
+    titre/artiste parcourent les chansons de la chaîne par lots selon la clé
+    primaire, jusqu'à ``max_rows`` lignes ou ``max_seconds`` secondes.
+    """
+
+    started = time.perf_counter()
+    candidate = BanRule(**_rule_values(rule), channel_id=channel_id)
+
+    if candidate.link:
+        sample_query = _channel_songs(db, channel_id).filter(Song.link == candidate.link)
+        sample = sample_query.limit(sample_size).all()
+        matched = sample_query.count() if len(sample) >= sample_size else len(sample)
+        return {
+            "matched": matched,
+            "scanned": matched,
+            "complete": True,
+            "stopped_by": None,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+            "sample": sample,
+        }
+
+    matcher = BanRuleMatcher([candidate])
+    matched = 0
+    scanned = 0
+    sample_ids: list[int] = []
+    stopped_by: str | None = None
+    last_id = 0
+
+    while True:
+        batch_size = min(PREVIEW_CHUNK_SIZE, max_rows - scanned)
+        if batch_size <= 0:
+            # Budget épuisé : le résultat n'est partiel que s'il reste des chansons.
+            remaining = (
+                _channel_songs(db, channel_id, Song.id).filter(Song.id > last_id).limit(1).first()
+            )
+            if remaining is not None:
+                stopped_by = "rows"
+            break
+        if time.perf_counter() - started >= max_seconds:
+            stopped_by = "time"
+            break
+
+        rows = (
+            _channel_songs(db, channel_id, Song.id, Song.title, Song.artist)
+            .filter(Song.id > last_id)
+            .order_by(Song.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            break
+
+        scanned += len(rows)
+        last_id = rows[-1][0]
+        hits = match_many(rows, matcher)
+        matched += len(hits)
+        if len(sample_ids) < sample_size:
+            sample_ids.extend(hits[: sample_size - len(sample_ids)])
+        if len(rows) < batch_size:
+            break
+
+    sample = (
+        db.query(Song).filter(Song.id.in_(sample_ids)).order_by(Song.id).all() if sample_ids else []
+    )
+    return {
+        "matched": matched,
+        "scanned": scanned,
+        "complete": stopped_by is None,
+        "stopped_by": stopped_by,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+        "sample": sample,
+    }
+
+
+def add_ban_rule(db: Session, rule: BanRuleCreate, channel_id: int = DEFAULT_CHANNEL_ID):
+    db_rule = BanRule(**_rule_values(rule), channel_id=channel_id)
     db.add(db_rule)
     db.flush()
 
@@ -80,12 +298,111 @@ def add_ban_rule(db: Session, rule: BanRuleCreate):
     return db_rule
 
 
-def update_ban_rule(db: Session, rule_id: int, payload: BanRuleUpdate):
+def _rule_key(title: str | None, artist: str | None, link: str | None) -> tuple:
+    # Deux règles de même forme normalisée bannissent exactement les mêmes chansons.
+    return (
+        normalize(title) if title else None,
+        normalize(artist) if artist else None,
+        link,
+    )
+
+
+def import_ban_rules(
+    db: Session, rules: Sequence[BanRuleCreate], channel_id: int = DEFAULT_CHANNEL_ID
+) -> dict:
+    """Insère une liste de règles et l'applique en un seul balayage des chansons.
+
+    Les doublons (dans la liste ou avec les règles existantes de la chaîne)
+    sont ignorés. Tout est validé dans une seule transaction.
+    """
+
+    started = time.perf_counter()
+    known = {
+        _rule_key(title, artist, link)
+        for title, artist, link in db.query(BanRule.title, BanRule.artist, BanRule.link).filter(
+            BanRule.channel_id == channel_id
+        )
+    }
+
+    new_rules: list[dict] = []
+    duplicates = 0
+    for rule in rules:
+        values = {**_rule_values(rule), "channel_id": channel_id}
+        key = _rule_key(values["title"], values["artist"], values["link"])
+        if key in known:
+            duplicates += 1
+            continue
+        known.add(key)
+        new_rules.append(values)
+
+    for start in range(0, len(new_rules), INSERT_CHUNK_SIZE):
+        db.execute(insert(BanRule), new_rules[start : start + INSERT_CHUNK_SIZE])
+    if new_rules:
+        # Insertion Core : invisible pour after_flush, on marque la session à la main.
+        cache_bus.mark_changed(db, cache_bus.BAN_RULES)
+        _mark_rules_changed(db, channel_id)
+
+    # Même logique que _apply_rule_to_existing_songs : une règle avec lien ne
+    # s'applique qu'à ce lien.
+    links = sorted({values["link"] for values in new_rules if values["link"]})
+    text_rules = [BanRule(**values) for values in new_rules if not values["link"]]
+
+    deleted = 0
+    for start in range(0, len(links), DELETE_CHUNK_SIZE):
+        deleted += (
+            _channel_songs(db, channel_id)
+            .filter(Song.link.in_(links[start : start + DELETE_CHUNK_SIZE]))
+            .delete(synchronize_session=False)
+        )
+    if deleted:
+        _songs_deleted(db, channel_id)
+
+    if text_rules:
+        rows = _channel_songs(db, channel_id, Song.id, Song.title, Song.artist).yield_per(
+            SCAN_CHUNK_SIZE
+        )
+        ids_to_delete = match_many(rows, text_rules)
+        _delete_songs(db, ids_to_delete, channel_id)
+        deleted += len(ids_to_delete)
+
+    db.commit()
+    return {
+        "received": len(rules),
+        "created": len(new_rules),
+        "duplicates": duplicates,
+        "deleted_songs": deleted,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+    }
+
+
+def iter_ban_rule_rows(
+    db: Session, chunk_size: int = SCAN_CHUNK_SIZE, channel_id: int = DEFAULT_CHANNEL_ID
+):
+    """Parcourt ``(titre, artiste, lien)`` des règles de la chaîne, par lots."""
+
+    return (
+        db.query(BanRule.title, BanRule.artist, BanRule.link)
+        .filter(BanRule.channel_id == channel_id)
+        .order_by(BanRule.id)
+        .yield_per(chunk_size)
+    )
+
+
+def _get_rule(db: Session, rule_id: int, channel_id: int) -> BanRule | None:
     db_rule = db.get(BanRule, rule_id)
+    if db_rule is None or db_rule.channel_id != channel_id:
+        return None
+    return db_rule
+
+
+def update_ban_rule(
+    db: Session, rule_id: int, payload: BanRuleUpdate, channel_id: int = DEFAULT_CHANNEL_ID
+):
+    db_rule = _get_rule(db, rule_id, channel_id)
     if db_rule is None:
         return None
 
-    for field, value in payload.model_dump().items():
+    for field, value in _rule_values(payload).items():
         setattr(db_rule, field, value)
 
     db.flush()
@@ -96,8 +413,8 @@ def update_ban_rule(db: Session, rule_id: int, payload: BanRuleUpdate):
     return db_rule
 
 
-def delete_ban_rule(db: Session, rule_id: int) -> bool:
-    db_rule = db.get(BanRule, rule_id)
+def delete_ban_rule(db: Session, rule_id: int, channel_id: int = DEFAULT_CHANNEL_ID) -> bool:
+    db_rule = _get_rule(db, rule_id, channel_id)
     if db_rule is None:
         return False
 
@@ -106,24 +423,196 @@ def delete_ban_rule(db: Session, rule_id: int) -> bool:
     return True
 
 
-def list_ban_rules(db: Session):
-    return db.query(BanRule).order_by(BanRule.id.desc()).all()
+def list_ban_rules(db: Session, channel_id: int = DEFAULT_CHANNEL_ID):
+    return (
+        db.query(BanRule)
+        .filter(BanRule.channel_id == channel_id)
+        .order_by(BanRule.id.desc())
+        .all()
+    )
+
+
+def _clean(value):  # noqa: ANN001, ANN202
+    # Même nettoyage que le validateur de BanRuleOut.
+    if isinstance(value, str):
+        return value.strip() or None
+    return value
+
 
-def is_banned(db: Session, title: str | None, artist: str | None, link: str | None):
-    if link:
-        normalized_link = link.strip()
-        if normalized_link:
-            if db.query(BanRule).filter(BanRule.link == normalized_link).first():
+def list_ban_rule_rows(
+    db: Session, fields: Sequence[str], channel_id: int = DEFAULT_CHANNEL_ID
+) -> list[tuple]:
+    """Comme :func:`list_ban_rules`, en tuples des colonnes ``fields`` (sans objets ORM)."""
+
+    columns = [getattr(BanRule, field) for field in fields]
+    rows = (
+        db.query(*columns)
+        .filter(BanRule.channel_id == channel_id)
+        .order_by(BanRule.id.desc())
+    )
+    return [tuple(_clean(value) for value in row) for row in rows]
+
+
+@dataclass(frozen=True)
+class BanSnapshot:
+    """Copie en mémoire des règles : liens bannis et matcher titre/artiste."""
+
+    version: int
+    links: frozenset[str]
+    matcher: BanRuleMatcher
+    loaded_at: float
+
+    def is_banned(self, title: str | None, artist: str | None, link: str | None) -> bool:
+        if link:
+            normalized_link = comparable_link(link)
+            if normalized_link and normalized_link in self.links:
                 return True
+        return self.matcher.matches(title, artist)
 
-    candidate_rules = (
-        db.query(BanRule)
-        .filter(or_(BanRule.title.isnot(None), BanRule.artist.isnot(None)))
+
+class _SnapshotSlot:
+    __slots__ = ("version", "snapshot")
+
+    def __init__(self) -> None:
+        self.version = 0
+        self.snapshot: BanSnapshot | None = None
+
+
+# Un instantané par (moteur, chaîne) : les tests et le réplica ont chacun le
+# leur, et modifier les règles d'une chaîne ne recharge pas celles des autres.
+_snapshots: "WeakKeyDictionary[object, dict[int, _SnapshotSlot]]" = WeakKeyDictionary()
+_snapshots_lock = threading.Lock()
+
+
+def _engine_of(db: Session):  # noqa: ANN202
+    bind = db.get_bind()
+    return getattr(bind, "engine", bind)
+
+
+def _slot_for(engine, channel_id: int) -> _SnapshotSlot:  # noqa: ANN001
+    with _snapshots_lock:
+        slots = _snapshots.get(engine)
+        if slots is None:
+            slots = _snapshots[engine] = {}
+        slot = slots.get(channel_id)
+        if slot is None:
+            slot = slots[channel_id] = _SnapshotSlot()
+        return slot
+
+
+def _load_snapshot(db: Session, version: int, channel_id: int) -> BanSnapshot:
+    rows = (
+        db.query(BanRule.title, BanRule.artist, BanRule.link)
+        .filter(BanRule.channel_id == channel_id)
         .all()
     )
+    return BanSnapshot(
+        version=version,
+        links=frozenset(filter(None, (comparable_link(link) for _, _, link in rows if link))),
+        matcher=BanRuleMatcher(
+            BanRule(title=title, artist=artist) for title, artist, _ in rows
+        ),
+        loaded_at=time.monotonic(),
+    )
+
+
+def get_ban_snapshot(db: Session, channel_id: int = DEFAULT_CHANNEL_ID) -> BanSnapshot:
+    """Instantané courant des règles de la chaîne, rechargé après modification
+    ou expiration.
+
+    Les modifications faites par ce processus l'invalident au commit, celles
+    des autres workers via le bus d'invalidation. ``BAN_SNAPSHOT_TTL_SECONDS``
+    borne la fraîcheur si le bus est arrêté.
+    """
+
+    slot = _slot_for(_engine_of(db), channel_id)
+    if cache_bus.has_pending_changes(db, cache_bus.BAN_RULES):
+        # Règles modifiées dans cette transaction : on lit son propre état,
+        # sans le publier aux autres sessions.
+        return _load_snapshot(db, slot.version, channel_id)
+
+    snapshot = slot.snapshot
+    if (
+        snapshot is not None
+        and snapshot.version == slot.version
+        and time.monotonic() - snapshot.loaded_at < BAN_SNAPSHOT_TTL_SECONDS
+    ):
+        record_cache_access("ban_snapshot", hit=True)
+        return snapshot
+
+    record_cache_access("ban_snapshot", hit=False)
+    version = slot.version
+    snapshot = _load_snapshot(db, version, channel_id)
+    # Une invalidation survenue pendant le chargement l'emporte.
+    if slot.version == version:
+        slot.snapshot = snapshot
+    return snapshot
+
+
+def _invalidate_slots(slots: Iterable[_SnapshotSlot]) -> None:
+    with _snapshots_lock:
+        for slot in slots:
+            slot.version += 1
+            slot.snapshot = None
+
+
+def invalidate_ban_snapshot(db: Session, channel_id: int | None = None) -> None:
+    """Invalide l'instantané de ``channel_id``, ou de toutes les chaînes du moteur."""
+
+    engine = _engine_of(db)
+    if channel_id is not None:
+        _invalidate_slots([_slot_for(engine, channel_id)])
+        return
+    with _snapshots_lock:
+        slots = list(_snapshots.get(engine, {}).values())
+    _invalidate_slots(slots)
+
+
+def _mark_rules_changed(db: Session, channel_id: int | None) -> None:
+    db.info.setdefault(_CHANGED_CHANNELS_INFO, set()).add(channel_id)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_channels(session: Session, flush_context) -> None:  # noqa: ANN001
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(instance, BanRule):
+            # Valeur absente (instance expirée) : toutes les chaînes sont invalidées.
+            _mark_rules_changed(session, instance.__dict__.get("channel_id"))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_channels(session: Session) -> None:
+    channels = session.info.pop(_CHANGED_CHANNELS_INFO, None)
+    if not channels:
+        return
+    if None in channels:
+        invalidate_ban_snapshot(session)
+        return
+    engine = _engine_of(session)
+    _invalidate_slots([_slot_for(engine, channel_id) for channel_id in channels])
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_channels(session: Session) -> None:
+    session.info.pop(_CHANGED_CHANNELS_INFO, None)
+
+
+def _invalidate_all_snapshots(topic: str) -> None:
+    # Les événements distants ne disent ni le moteur ni la chaîne concernés.
+    with _snapshots_lock:
+        slots = [slot for per_channel in _snapshots.values() for slot in per_channel.values()]
+    _invalidate_slots(slots)
+
+
+# Les modifications locales invalident déjà leur chaîne au commit.
+cache_bus.subscribe(cache_bus.BAN_RULES, _invalidate_all_snapshots, remote_only=True)
 
-    for rule in candidate_rules:
-        if _matches_rule_values(title, artist, rule):
-            return True
 
-    return False
+def is_banned(
+    db: Session,
+    title: str | None,
+    artist: str | None,
+    link: str | None,
+    channel_id: int = DEFAULT_CHANNEL_ID,
+):
+    return get_ban_snapshot(db, channel_id).is_banned(title, artist, link)
@@ -0,0 +1,37 @@
+"""CRUD helpers for hosted Twitch channels."""
+
+from sqlalchemy.orm import Session
+
+from app.models.channel import Channel
+
+
+def normalize_login(login: str) -> str:
+    return login.strip().lstrip("#").lower()
+
+
+def get_by_login(db: Session, login: str) -> Channel | None:
+    normalized = normalize_login(login)
+    if not normalized:
+        return None
+    return db.query(Channel).filter(Channel.login == normalized).first()
+
+
+def list_channels(db: Session) -> list[Channel]:
+    return db.query(Channel).order_by(Channel.login).all()
+
+
+def create_channel(
+    db: Session,
+    *,
+    login: str,
+    display_name: str | None = None,
+    channel_id: int | None = None,
+) -> Channel:
+    channel = Channel(id=channel_id, login=normalize_login(login), display_name=display_name)
+    db.add(channel)
+    db.commit()
+    db.refresh(channel)
+    return channel
+
+
+__all__ = ["create_channel", "get_by_login", "list_channels", "normalize_login"]
@@ -1,12 +1,36 @@
-from sqlalchemy import func
+import time
+from collections import defaultdict
+from typing import Mapping, Sequence
+
+from sqlalchemy import func, update
 from sqlalchemy.orm import Session
+from app.models.channel import DEFAULT_CHANNEL_ID
 from app.models.song import Song
 from app.schemas.song import SongCreate
-from app.crud import ban_rule
+from app.crud import ban_rule, song_voter
+from app.services import cache_bus, leaderboard, trending
 from app.utils.text import normalize
 
-def add_or_increment_song(db: Session, song_data: SongCreate):
-    if ban_rule.is_banned(db, song_data.title, song_data.artist, song_data.link):
+# Taille maximale des listes `IN (...)` des mises à jour groupées.
+VOTE_CHUNK_SIZE = 900
+# Lignes lues par aller-retour lors d'un export (curseur serveur sur PostgreSQL).
+EXPORT_CHUNK_SIZE = 2000
+
+def add_or_increment_song(
+    db: Session,
+    song_data: SongCreate,
+    votes: int = 1,
+    commit: bool = True,
+    channel_id: int = DEFAULT_CHANNEL_ID,
+):
+    """Ajoute le morceau à la file de ``channel_id`` ou lui compte ``votes`` voix de plus.
+
+    Avec ``commit=False`` la session est seulement flushée : l'appelant valide
+    un lot entier en une transaction.
+    """
+    if ban_rule.is_banned(
+        db, song_data.title, song_data.artist, song_data.link, channel_id=channel_id
+    ):
         return None
 
     title_norm = normalize(song_data.title)
@@ -15,10 +39,15 @@ def add_or_increment_song(db: Session, song_data: SongCreate):
     song = None
 
     if song_data.link:
-        song = db.query(Song).filter(Song.link == song_data.link).first()
+        song = (
+            db.query(Song)
+            .filter(Song.channel_id == channel_id, Song.link == song_data.link)
+            .first()
+        )
 
     if song is None:
         candidates = db.query(Song).filter(
+            Song.channel_id == channel_id,
             func.lower(Song.title) == song_data.title.strip().lower(),
             func.lower(Song.artist) == song_data.artist.strip().lower(),
         ).all()
@@ -30,36 +59,170 @@ def add_or_increment_song(db: Session, song_data: SongCreate):
                 song = candidate
                 break
 
+    now = time.time()
     if song is not None:
-        song.votes += 1
+        song.votes += votes
+        song.trend_score = trending.bumped_score(votes, now)
     else:
-        song = Song(**song_data.model_dump())
+        song = Song(
+            **song_data.model_dump(),
+            channel_id=channel_id,
+            votes=votes,
+            trend_score=trending.initial_score(votes, now),
+        )
         db.add(song)
+    song.trend_updated_at = trending.vote_timestamp(now)
+    db.flush()
+    trending.record_votes(db, [(song.id, votes)], now)
+    leaderboard.track(db, leaderboard.entry_of(song), channel_id=channel_id)
+
+    if not commit:
+        return song
 
     db.commit()
     db.refresh(song)
     return song
 
-def get_all_songs(db: Session):
-    return db.query(Song).order_by(Song.votes.desc()).all()
+def vote_loaded_songs(
+    db: Session, votes: Sequence[tuple[Song, int]], channel_id: int = DEFAULT_CHANNEL_ID
+) -> None:
+    """Compte ``voix`` à chaque morceau déjà chargé, sans valider la transaction.
+
+    Même effet qu'``add_or_increment_song`` sur un morceau existant (score
+    tendance, journal des votes, classement), pour un lot entier.
+    """
+
+    if not votes:
+        return
+    now = time.time()
+    for song, delta in votes:
+        song.votes += delta
+        song.trend_score = trending.bumped_score(delta, now)
+        song.trend_updated_at = trending.vote_timestamp(now)
+    db.flush()
+    trending.record_votes(db, [(song.id, delta) for song, delta in votes], now)
+    for song, _ in votes:
+        leaderboard.track(db, leaderboard.entry_of(song), channel_id=channel_id)
+
+
+def _ordered(query, sort: str):  # noqa: ANN001, ANN202
+    if sort == "trending":
+        # Servi par l'index (channel_id, trend_score), sans tri.
+        return query.order_by(Song.trend_score.desc())
+    return query.order_by(Song.votes.desc())
+
+
+def get_all_songs(db: Session, sort: str = "votes", channel_id: int = DEFAULT_CHANNEL_ID):
+    """Morceaux de la chaîne par voix (``votes``) ou par score décroissant (``trending``)."""
+
+    return _ordered(db.query(Song).filter(Song.channel_id == channel_id), sort).all()
+
+
+def list_song_rows(
+    db: Session,
+    fields: Sequence[str],
+    sort: str = "votes",
+    channel_id: int = DEFAULT_CHANNEL_ID,
+):
+    """Comme :func:`get_all_songs`, en tuples des colonnes ``fields`` (sans objets ORM)."""
 
+    columns = [getattr(Song, field) for field in fields]
+    return _ordered(db.query(*columns).filter(Song.channel_id == channel_id), sort).all()
 
-def delete_song(db: Session, song_id: int) -> bool:
-    song = db.query(Song).filter(Song.id == song_id).first()
+
+def iter_song_rows(
+    db: Session, channel_id: int = DEFAULT_CHANNEL_ID, chunk_size: int = EXPORT_CHUNK_SIZE
+):
+    """Parcourt les morceaux de la chaîne par voix décroissantes, par lots.
+
+    Lignes ``(id, titre, artiste, lien, miniature, commentaire, voix)`` sans
+    objets ORM : la mémoire reste bornée à ``chunk_size`` lignes.
+    """
+
+    return (
+        db.query(Song.id, Song.title, Song.artist, Song.link, Song.thumbnail, Song.comment, Song.votes)
+        .filter(Song.channel_id == channel_id)
+        .order_by(Song.votes.desc(), Song.id)
+        .yield_per(chunk_size)
+    )
+
+
+def delete_song(db: Session, song_id: int, channel_id: int = DEFAULT_CHANNEL_ID) -> bool:
+    song = db.query(Song).filter(Song.id == song_id, Song.channel_id == channel_id).first()
     if not song:
         return False
 
     db.delete(song)
+    leaderboard.mark_removed(db, channel_id)
     db.commit()
+    song_voter.forget_song(db, song_id)
     return True
 
 
-def increment_vote(db: Session, song_id: int):
-    song = db.query(Song).filter(Song.id == song_id).first()
+def increment_vote(
+    db: Session, song_id: int, voter: int | None = None, channel_id: int = DEFAULT_CHANNEL_ID
+):
+    """Compte une voix ; avec l'empreinte ``voter``, lève
+    :class:`~app.crud.song_voter.DuplicateVoteError` si elle a déjà voté."""
+
+    song = db.query(Song).filter(Song.id == song_id, Song.channel_id == channel_id).first()
     if not song:
         return None
 
+    if voter is not None:
+        song_voter.record_voter(db, song_id, voter)
+    now = time.time()
     song.votes += 1
+    song.trend_score = trending.bumped_score(1, now)
+    song.trend_updated_at = trending.vote_timestamp(now)
+    trending.record_votes(db, [(song_id, 1)], now)
+    leaderboard.track(db, leaderboard.entry_of(song), channel_id=channel_id)
     db.commit()
     db.refresh(song)
     return song
+
+
+def add_votes(
+    db: Session, counts: Mapping[int, int], channel_id: int = DEFAULT_CHANNEL_ID
+) -> int:
+    """Ajoute ``counts[id]`` voix à chaque morceau de la chaîne, en une transaction.
+
+    Les morceaux qui reçoivent le même nombre de voix partagent une instruction
+    ``UPDATE ... WHERE id IN (...)`` : un lot de votes du chat coûte quelques
+    requêtes au lieu d'une transaction par vote. Retourne le nombre de
+    morceaux mis à jour (les identifiants inconnus ou d'une autre chaîne
+    sont ignorés).
+    """
+
+    by_delta: dict[int, list[int]] = defaultdict(list)
+    for song_id, delta in counts.items():
+        if delta > 0:
+            by_delta[delta].append(song_id)
+
+    now = time.time()
+    updated: list[tuple[int, int]] = []
+    for delta, song_ids in by_delta.items():
+        song_ids.sort()
+        for start in range(0, len(song_ids), VOTE_CHUNK_SIZE):
+            result = db.execute(
+                update(Song)
+                .where(
+                    Song.channel_id == channel_id,
+                    Song.id.in_(song_ids[start : start + VOTE_CHUNK_SIZE]),
+                )
+                .values(
+                    votes=Song.votes + delta,
+                    trend_score=trending.bumped_score(delta, now),
+                    trend_updated_at=trending.vote_timestamp(now),
+                )
+                .returning(*leaderboard.ENTRY_COLUMNS)
+                .execution_options(synchronize_session=False)
+            )
+            for row in result:
+                updated.append((row.id, delta))
+                leaderboard.track(db, leaderboard.LeaderboardEntry(*row), channel_id=channel_id)
+    if updated:
+        trending.record_votes(db, updated, now)
+        cache_bus.mark_changed(db, cache_bus.SONGS)
+    db.commit()
+    return len(updated)
@@ -0,0 +1,195 @@
+"""Déduplication des votes côté serveur, sans table (song_id, votant).
+
+Chaque morceau garde l'ensemble compact des empreintes de ses votants
+(:mod:`app.utils.sketches`), sérialisé dans ``song_voters.voters``. Les
+ensembles récemment utilisés restent en mémoire : un vote répété est refusé
+sans requête. Les écritures sont protégées par ``song_voters.version`` : si
+un autre worker a voté entre-temps, l'ensemble est relu puis revérifié.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import logging
+import threading
+from collections import OrderedDict
+from weakref import WeakKeyDictionary
+
+from sqlalchemy import event, update
+from sqlalchemy.orm import Session
+
+from app.config import VOTER_CACHE_MAX_SONGS, VOTER_FINGERPRINT_SECRET
+from app.models.song_voter import SongVoters
+from app.utils.metrics import REGISTRY, record_cache_access
+from app.utils.sketches import VoterSet, add_voter, load_voter_set
+
+logger = logging.getLogger(__name__)
+
+# Tentatives d'écriture quand la version a changé sous nos pieds.
+MAX_WRITE_ATTEMPTS = 3
+
+_TOUCHED_SONGS_INFO = "tchatrecosong_voter_songs"
+
+VOTE_DEDUP_DECISIONS = REGISTRY.counter(
+    "vote_dedup_decisions_total",
+    "Votes examinés par la déduplication, par résultat.",
+    ("outcome",),
+)
+
+
+class DuplicateVoteError(ValueError):
+    """Le votant a déjà voté pour ce morceau."""
+
+
+def voter_fingerprint(*parts: str, secret: str | None = None) -> int:
+    """Empreinte 64 bits (HMAC-SHA256 tronqué) d'un votant : l'adresse IP
+    n'est jamais stockée en clair."""
+
+    key = (secret if secret is not None else VOTER_FINGERPRINT_SECRET).encode()
+    digest = hmac.new(key, "\x1f".join(parts).encode(), hashlib.sha256).digest()
+    return int.from_bytes(digest[:8], "little")
+
+
+class _VoterCache:
+    """LRU ``song_id -> (version, ensemble)`` propre à un moteur."""
+
+    def __init__(self, max_songs: int) -> None:
+        self.max_songs = max_songs
+        self._entries: OrderedDict[int, tuple[int, VoterSet]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, song_id: int) -> tuple[int, VoterSet] | None:
+        with self._lock:
+            entry = self._entries.get(song_id)
+            if entry is not None:
+                self._entries.move_to_end(song_id)
+            return entry
+
+    def put(self, song_id: int, version: int, voters: VoterSet) -> None:
+        if self.max_songs <= 0:
+            return
+        with self._lock:
+            self._entries[song_id] = (version, voters)
+            self._entries.move_to_end(song_id)
+            while len(self._entries) > self.max_songs:
+                self._entries.popitem(last=False)
+
+    def discard(self, song_id: int) -> None:
+        with self._lock:
+            self._entries.pop(song_id, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_caches: "WeakKeyDictionary[object, _VoterCache]" = WeakKeyDictionary()
+_caches_lock = threading.Lock()
+
+
+def _cache_for(db: Session) -> _VoterCache:
+    bind = db.get_bind()
+    engine = getattr(bind, "engine", bind)
+    with _caches_lock:
+        cache = _caches.get(engine)
+        if cache is None:
+            cache = _caches[engine] = _VoterCache(VOTER_CACHE_MAX_SONGS)
+        return cache
+
+
+def _load(db: Session, song_id: int) -> tuple[int, VoterSet]:
+    row = (
+        db.query(SongVoters.version, SongVoters.voters)
+        .filter(SongVoters.song_id == song_id)
+        .first()
+    )
+    if row is None:
+        return 0, load_voter_set(None)
+    return row.version, load_voter_set(row.voters)
+
+
+def _insert_first(db: Session, song_id: int, payload: bytes) -> bool:
+    """Crée la ligne du premier votant ; ``False`` si un autre worker l'a devancé."""
+
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    result = db.execute(
+        insert(SongVoters)
+        .values(song_id=song_id, voters=payload, version=1)
+        .on_conflict_do_nothing(index_elements=[SongVoters.song_id])
+    )
+    return result.rowcount == 1
+
+
+def record_voter(db: Session, song_id: int, fingerprint: int) -> None:
+    """Ajoute le votant à l'ensemble du morceau, dans la transaction courante.
+
+    Lève :class:`DuplicateVoteError` s'il y figure déjà (ou, pour un filtre
+    de Bloom, s'il semble y figurer). Rien n'est validé : l'appelant commit
+    avec son propre vote ; un rollback retire l'ensemble du cache.
+    """
+
+    cache = _cache_for(db)
+    entry = cache.get(song_id)
+    record_cache_access("song_voters", hit=entry is not None)
+    if entry is not None and fingerprint in entry[1]:
+        VOTE_DEDUP_DECISIONS.inc(("duplicate_cached",))
+        raise DuplicateVoteError(song_id)
+
+    for _ in range(MAX_WRITE_ATTEMPTS):
+        if entry is None:
+            entry = _load(db, song_id)
+            if fingerprint in entry[1]:
+                cache.put(song_id, *entry)
+                VOTE_DEDUP_DECISIONS.inc(("duplicate",))
+                raise DuplicateVoteError(song_id)
+
+        version, voters = entry
+        # On travaille sur une copie : l'ensemble en cache ne change qu'après écriture.
+        voters, _ = add_voter(load_voter_set(voters.to_bytes()), fingerprint)
+        payload = voters.to_bytes()
+        if version == 0:
+            written = _insert_first(db, song_id, payload)
+        else:
+            result = db.execute(
+                update(SongVoters)
+                .where(SongVoters.song_id == song_id, SongVoters.version == version)
+                .values(voters=payload, version=version + 1)
+            )
+            written = result.rowcount == 1
+        if written:
+            cache.put(song_id, version + 1, voters)
+            db.info.setdefault(_TOUCHED_SONGS_INFO, set()).add(song_id)
+            VOTE_DEDUP_DECISIONS.inc(("accepted",))
+            return
+        # Un autre worker a écrit entre la lecture et l'écriture : on relit.
+        VOTE_DEDUP_DECISIONS.inc(("conflict",))
+        cache.discard(song_id)
+        entry = None
+
+    # Contention persistante : le vote passe plutôt que d'échouer.
+    logger.warning("Ensemble des votants du morceau %s non mis à jour (conflits répétés)", song_id)
+
+
+def forget_song(db: Session, song_id: int) -> None:
+    _cache_for(db).discard(song_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _keep_cached_sets(session: Session) -> None:
+    session.info.pop(_TOUCHED_SONGS_INFO, None)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_uncommitted_sets(session: Session) -> None:
+    song_ids = session.info.pop(_TOUCHED_SONGS_INFO, None)
+    if song_ids:
+        cache = _cache_for(session)
+        for song_id in song_ids:
+            cache.discard(song_id)
+
+
+__all__ = ["DuplicateVoteError", "forget_song", "record_voter", "voter_fingerprint"]
@@ -1,5 +1,25 @@
 """Database helpers (SQLAlchemy engine, session and metadata)."""
 
-from .connection import Base, SessionLocal, engine, get_db
+from .connection import (
+    Base,
+    ReadSessionLocal,
+    SessionLocal,
+    engine,
+    get_db,
+    get_pool_stats,
+    get_read_db,
+    open_read_session,
+    read_engine,
+)
 
-__all__ = ["Base", "SessionLocal", "engine", "get_db"]
+__all__ = [
+    "Base",
+    "ReadSessionLocal",
+    "SessionLocal",
+    "engine",
+    "get_db",
+    "get_pool_stats",
+    "get_read_db",
+    "open_read_session",
+    "read_engine",
+]
@@ -1,11 +1,17 @@
 import logging
 import os
-from typing import Dict, Optional
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, Optional
 from dotenv import load_dotenv
-from sqlalchemy import create_engine, text
-from sqlalchemy.engine import URL, make_url
-from sqlalchemy.exc import ArgumentError, OperationalError
-from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import URL, Engine, make_url
+from sqlalchemy.exc import ArgumentError, DisconnectionError, OperationalError
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from sqlalchemy.pool import QueuePool
 
 # Charger .env en local
 load_dotenv()
@@ -329,13 +335,391 @@ logger.info(
 )
 
 
-engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+PRE_PING_STRATEGIES = ("idle", "always", "never")
+
+# Clé stockée dans `connection_record.info` pour dater le dernier retour au pool.
+_LAST_CHECKIN_KEY = "tchatrecosong_last_checkin"
+
+
+def _env_int(name: str, default: int) -> int:
+    raw = os.getenv(name)
+    if raw is None or not raw.strip():
+        return default
+    try:
+        return int(raw.strip())
+    except ValueError:
+        logger.warning(
+            "La valeur '%s' de %s n'est pas un entier : valeur par défaut %s utilisée.",
+            raw,
+            name,
+            default,
+        )
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    raw = os.getenv(name)
+    if raw is None or not raw.strip():
+        return default
+    try:
+        return float(raw.strip())
+    except ValueError:
+        logger.warning(
+            "La valeur '%s' de %s n'est pas un nombre : valeur par défaut %s utilisée.",
+            raw,
+            name,
+            default,
+        )
+        return default
+
+
+def _env_bool(name: str) -> Optional[bool]:
+    raw = os.getenv(name)
+    if raw is None or not raw.strip():
+        return None
+    return raw.strip().lower() not in {"0", "false", "no", "off"}
+
+
+@dataclass(frozen=True)
+class PoolSettings:
+    """Paramètres du pool de connexions, pilotés par l'environnement."""
+
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_recycle: int = 300
+    pool_timeout: float = 30.0
+    pre_ping: str = "idle"
+    pre_ping_idle_seconds: float = 60.0
+    pgbouncer: bool = False
+
+    @classmethod
+    def from_env(cls, url: str) -> "PoolSettings":
+        pre_ping = (os.getenv("DATABASE_PRE_PING") or "idle").strip().lower()
+        if pre_ping not in PRE_PING_STRATEGIES:
+            logger.warning(
+                "DATABASE_PRE_PING='%s' inconnu (attendu : %s) : stratégie 'idle' utilisée.",
+                pre_ping,
+                ", ".join(PRE_PING_STRATEGIES),
+            )
+            pre_ping = "idle"
+
+        pgbouncer = _env_bool("DATABASE_PGBOUNCER")
+        if pgbouncer is None:
+            # Les hôtes Neon « -pooler » passent par PgBouncer en mode transaction.
+            try:
+                host = make_url(url).host or ""
+            except (ArgumentError, ValueError):
+                host = ""
+            pgbouncer = "-pooler" in host
+
+        return cls(
+            pool_size=_env_int("DATABASE_POOL_SIZE", cls.pool_size),
+            max_overflow=_env_int("DATABASE_MAX_OVERFLOW", cls.max_overflow),
+            pool_recycle=_env_int("DATABASE_POOL_RECYCLE", cls.pool_recycle),
+            pool_timeout=_env_float("DATABASE_POOL_TIMEOUT", cls.pool_timeout),
+            pre_ping=pre_ping,
+            pre_ping_idle_seconds=_env_float(
+                "DATABASE_PRE_PING_IDLE_SECONDS", cls.pre_ping_idle_seconds
+            ),
+            pgbouncer=pgbouncer,
+        )
+
+
+class PoolStats:
+    """Compteurs alimentés par les événements du pool SQLAlchemy."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.connects = 0
+            self.closes = 0
+            self.invalidations = 0
+            self.checkouts = 0
+            self.checkins = 0
+            self.checked_out = 0
+            self.peak_checked_out = 0
+            self.liveness_pings = 0
+            self.liveness_failures = 0
+            self.checkout_wait_count = 0
+            self.checkout_wait_total = 0.0
+            self.checkout_wait_max = 0.0
+
+    def record_wait(self, elapsed: float) -> None:
+        with self._lock:
+            self.checkout_wait_count += 1
+            self.checkout_wait_total += elapsed
+            if elapsed > self.checkout_wait_max:
+                self.checkout_wait_max = elapsed
+
+    def record_checkout(self) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            if self.checked_out > self.peak_checked_out:
+                self.peak_checked_out = self.checked_out
+
+    def record_checkin(self) -> None:
+        with self._lock:
+            self.checkins += 1
+            self.checked_out = max(0, self.checked_out - 1)
+
+    def increment(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            average_wait = (
+                self.checkout_wait_total / self.checkout_wait_count
+                if self.checkout_wait_count
+                else 0.0
+            )
+            return {
+                "connects": self.connects,
+                "closes": self.closes,
+                "invalidations": self.invalidations,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "checked_out": self.checked_out,
+                "peak_checked_out": self.peak_checked_out,
+                "liveness_pings": self.liveness_pings,
+                "liveness_failures": self.liveness_failures,
+                "checkout_wait_count": self.checkout_wait_count,
+                "checkout_wait_total_seconds": self.checkout_wait_total,
+                "checkout_wait_max_seconds": self.checkout_wait_max,
+                "checkout_wait_avg_seconds": average_wait,
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool mesurant le temps passé à obtenir une connexion."""
+
+    def __init__(self, *args: Any, stats: Optional[PoolStats] = None, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.stats = stats
+
+    def connect(self):  # type: ignore[override]
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            if self.stats is not None:
+                self.stats.record_wait(time.perf_counter() - start)
+
+    def recreate(self) -> "InstrumentedQueuePool":
+        recreated = super().recreate()
+        recreated.stats = self.stats
+        return recreated
+
+
+def _ping_dbapi_connection(dbapi_connection: Any) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("SELECT 1")
+    finally:
+        cursor.close()
+
+
+def _install_pool_events(engine_: Engine, settings: PoolSettings, stats: PoolStats) -> None:
+    @event.listens_for(engine_, "connect")
+    def _on_connect(dbapi_connection, connection_record):  # noqa: ANN001
+        stats.increment("connects")
+
+    @event.listens_for(engine_, "close")
+    def _on_close(dbapi_connection, connection_record):  # noqa: ANN001
+        stats.increment("closes")
+
+    @event.listens_for(engine_, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):  # noqa: ANN001
+        stats.increment("invalidations")
+
+    @event.listens_for(engine_, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):  # noqa: ANN001
+        connection_record.info[_LAST_CHECKIN_KEY] = time.monotonic()
+        stats.record_checkin()
+
+    @event.listens_for(engine_, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):  # noqa: ANN001
+        if settings.pre_ping == "idle":
+            last_checkin = connection_record.info.get(_LAST_CHECKIN_KEY)
+            idle_for = time.monotonic() - last_checkin if last_checkin is not None else 0.0
+            if idle_for > settings.pre_ping_idle_seconds:
+                stats.increment("liveness_pings")
+                try:
+                    _ping_dbapi_connection(dbapi_connection)
+                except Exception as exc:
+                    stats.increment("liveness_failures")
+                    logger.warning(
+                        "Connexion inactive depuis %.0fs injoignable : reconnexion.", idle_for
+                    )
+                    # Le pool invalide la connexion et en ouvre une nouvelle.
+                    raise DisconnectionError() from exc
+        stats.record_checkout()
+
+
+def _is_memory_sqlite(url_obj: URL) -> bool:
+    return url_obj.get_backend_name() == "sqlite" and url_obj.database in {
+        None,
+        "",
+        ":memory:",
+    }
+
+
+def create_instrumented_engine(
+    url: str, settings: PoolSettings, stats: Optional[PoolStats] = None
+) -> Engine:
+    """Crée un moteur SQLAlchemy avec pool configuré et événements d'observation."""
+
+    stats = stats if stats is not None else PoolStats()
+    url_obj = make_url(url)
+    kwargs: Dict[str, Any] = {"pool_pre_ping": settings.pre_ping == "always"}
+
+    if not _is_memory_sqlite(url_obj):
+        kwargs.update(
+            poolclass=InstrumentedQueuePool,
+            pool_size=settings.pool_size,
+            max_overflow=settings.max_overflow,
+            pool_recycle=settings.pool_recycle,
+            pool_timeout=settings.pool_timeout,
+        )
+
+    if settings.pgbouncer and url_obj.get_backend_name() == "postgresql":
+        # PgBouncer en mode transaction ne conserve pas les instructions préparées
+        # côté serveur entre deux transactions.
+        if url_obj.get_driver_name() == "psycopg":
+            kwargs["connect_args"] = {"prepare_threshold": None}
+        elif url_obj.get_driver_name() == "asyncpg":
+            kwargs["connect_args"] = {"statement_cache_size": 0}
+
+    created = create_engine(url, **kwargs)
+    if isinstance(created.pool, InstrumentedQueuePool):
+        created.pool.stats = stats
+    _install_pool_events(created, settings, stats)
+    return created
+
+
+POOL_SETTINGS = PoolSettings.from_env(DATABASE_URL)
+pool_stats = PoolStats()
+
+logger.info(
+    "Pool de connexions : taille=%s, overflow=%s, recycle=%ss, timeout=%ss, "
+    "pre-ping=%s (inactivité > %ss), mode PgBouncer=%s",
+    POOL_SETTINGS.pool_size,
+    POOL_SETTINGS.max_overflow,
+    POOL_SETTINGS.pool_recycle,
+    POOL_SETTINGS.pool_timeout,
+    POOL_SETTINGS.pre_ping,
+    POOL_SETTINGS.pre_ping_idle_seconds,
+    POOL_SETTINGS.pgbouncer,
+)
+
+engine = create_instrumented_engine(DATABASE_URL, POOL_SETTINGS, pool_stats)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+
+def _determine_read_database_url() -> Optional[str]:
+    raw_read_url = os.getenv("DATABASE_READ_URL")
+    if not raw_read_url or not raw_read_url.strip():
+        return None
+
+    normalized = _normalize_url(raw_read_url)
+    if not normalized:
+        raise RuntimeError(
+            "La variable `DATABASE_READ_URL` est définie mais invalide. Vérifie l'URL "
+            "du réplica en lecture seule."
+        )
+    return normalized
+
+
+READ_DATABASE_URL = _determine_read_database_url()
+
+# Durée pendant laquelle un client qui vient d'écrire lit sur le primaire :
+# elle doit couvrir le retard de réplication toléré.
+READ_REPLICA_MAX_LAG_SECONDS = _env_float("DATABASE_READ_MAX_LAG_SECONDS", 2.0)
+
+read_pool_stats = pool_stats
+if READ_DATABASE_URL:
+    logger.info(
+        "Réplica en lecture seule configuré vers %s (retard toléré %ss)",
+        _format_url_for_log(READ_DATABASE_URL),
+        READ_REPLICA_MAX_LAG_SECONDS,
+    )
+    read_pool_stats = PoolStats()
+    read_engine = create_instrumented_engine(
+        READ_DATABASE_URL, PoolSettings.from_env(READ_DATABASE_URL), read_pool_stats
+    )
+    ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+else:
+    read_engine = engine
+    ReadSessionLocal = SessionLocal
+
+
+# Lecture de ses propres écritures : l'état vit le temps d'une requête HTTP
+# (posé par ReadYourWritesMiddleware), la base ne connaît pas la requête.
+_TRACK_WRITES_INFO = "tchatrecosong_track_writes"
+
+
+@dataclass
+class ReadYourWrites:
+    pinned: bool = False  # le client a écrit il y a moins du retard toléré
+    wrote: bool = False  # une transaction de cette requête a été validée
+
+
+_read_your_writes: ContextVar[Optional[ReadYourWrites]] = ContextVar("read_your_writes", default=None)
+
+
+@contextmanager
+def read_your_writes_scope(pinned: bool = False) -> Iterator[ReadYourWrites]:
+    """Délimite une requête : ``pinned`` envoie ses lectures au primaire."""
+
+    state = ReadYourWrites(pinned=pinned)
+    token = _read_your_writes.set(state)
+    try:
+        yield state
+    finally:
+        _read_your_writes.reset(token)
+
+
+@event.listens_for(Session, "after_commit")
+def _mark_write_after_commit(session: Session) -> None:
+    if not session.info.get(_TRACK_WRITES_INFO):
+        return
+    # Les dépendances synchrones tournent dans une copie du contexte : l'objet
+    # est partagé, sa mutation est visible du middleware.
+    state = _read_your_writes.get()
+    if state is not None:
+        state.wrote = True
+
+
+def has_read_replica() -> bool:
+    return ReadSessionLocal is not SessionLocal
+
+
 # Générateur de sessions DB
 def get_db():
     db = SessionLocal()
+    db.info[_TRACK_WRITES_INFO] = True
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def open_read_session() -> Session:
+    """Session de lecture : réplica si configuré, primaire juste après une écriture."""
+
+    state = _read_your_writes.get()
+    if not has_read_replica() or (state is not None and (state.pinned or state.wrote)):
+        return SessionLocal()
+    return ReadSessionLocal()
+
+
+def get_read_db():
+    db = open_read_session()
     try:
         yield db
     finally:
@@ -350,6 +734,19 @@ def describe_active_database() -> Dict[str, Optional[str]]:
     return snapshot
 
 
+def get_pool_stats() -> Dict[str, float]:
+    """Expose l'occupation du pool et les compteurs de connexions."""
+
+    snapshot = pool_stats.snapshot()
+    pool = engine.pool
+    if isinstance(pool, QueuePool):
+        snapshot["pool_size"] = pool.size()
+        snapshot["pool_checked_out"] = pool.checkedout()
+        snapshot["pool_overflow"] = pool.overflow()
+        snapshot["pool_checked_in"] = pool.checkedin()
+    return snapshot
+
+
 def check_connection() -> None:
     """Déclenche une requête simple pour vérifier la connexion PostgreSQL."""
 
@@ -0,0 +1,372 @@
+"""Migrations versionnées du schéma.
+
+La table ``schema_version`` garde une ligne par migration appliquée. Au
+démarrage, :func:`ensure_schema` lit la version courante en une requête, sans
+réflexion des tables, et s'arrête là si elle est à jour. Sinon les
+migrations manquantes sont appliquées dans l'ordre, sous un verrou
+consultatif PostgreSQL pour que deux workers ne migrent pas en même temps.
+
+Chaque étape est idempotente : la migration 1 crée les tables absentes
+d'après les modèles actuels, les suivantes ajoutent colonnes et index s'ils
+manquent. Une base créée par ``neon_schema.sql`` ou par un ancien
+``create_all`` converge ainsi vers le même schéma. Sur PostgreSQL, les index
+sont créés en ligne (``CREATE INDEX CONCURRENTLY``, hors transaction) ; sur
+SQLite, un ``CREATE INDEX IF NOT EXISTS`` ordinaire en tient lieu.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Iterator, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION_TABLE = "schema_version"
+# Clé du verrou consultatif PostgreSQL (``pg_advisory_xact_lock``) des migrations.
+MIGRATION_LOCK_KEY = 0x74636873
+
+Step = Callable[[Connection], None]
+
+_local_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    steps: tuple[Step, ...]
+    # CREATE/DROP INDEX CONCURRENTLY est interdit dans une transaction : ces
+    # migrations s'exécutent en autocommit, une instruction à la fois.
+    transactional: bool = True
+
+
+@dataclass
+class MigrationResult:
+    from_version: int
+    to_version: int
+    applied: list[str] = field(default_factory=list)
+
+
+def _is_postgresql(connection: Connection) -> bool:
+    return connection.dialect.name == "postgresql"
+
+
+def _quote(connection: Connection, name: str) -> str:
+    return connection.dialect.identifier_preparer.quote(name)
+
+
+def run_sql(*, postgresql: str | None = None, sqlite: str | None = None) -> Step:
+    """Étape SQL brute ; un dialecte sans variante est ignoré."""
+
+    def step(connection: Connection) -> None:
+        statement = postgresql if _is_postgresql(connection) else sqlite
+        if statement:
+            connection.execute(text(statement))
+
+    return step
+
+
+def _column_names(connection: Connection, table: str) -> set[str]:
+    rows = connection.execute(text(f"PRAGMA table_info({_quote(connection, table)})"))
+    return {row[1] for row in rows}
+
+
+def add_column(table: str, column: str, *, postgresql: str, sqlite: str) -> Step:
+    """Ajoute ``column`` à ``table`` si elle manque (définition par dialecte)."""
+
+    def step(connection: Connection) -> None:
+        quoted_table = _quote(connection, table)
+        quoted_column = _quote(connection, column)
+        if _is_postgresql(connection):
+            connection.execute(
+                text(f"ALTER TABLE {quoted_table} ADD COLUMN IF NOT EXISTS {quoted_column} {postgresql}")
+            )
+        elif column not in _column_names(connection, table):
+            connection.execute(text(f"ALTER TABLE {quoted_table} ADD COLUMN {quoted_column} {sqlite}"))
+
+    return step
+
+
+def create_index_sql(
+    dialect: str, name: str, table: str, columns: Sequence[str], *, unique: bool = False
+) -> str:
+    kind = "UNIQUE INDEX" if unique else "INDEX"
+    online = " CONCURRENTLY" if dialect == "postgresql" else ""
+    return f"CREATE {kind}{online} IF NOT EXISTS {name} ON {table} ({', '.join(columns)})"
+
+
+def _sqlite_has_equivalent_index(
+    connection: Connection, table: str, columns: Sequence[str], unique: bool
+) -> bool:
+    # Une contrainte UNIQUE crée déjà un index « sqlite_autoindex_* » sur les
+    # mêmes colonnes : inutile d'en ajouter un second.
+    quoted_table = _quote(connection, table)
+    for index in connection.execute(text(f"PRAGMA index_list({quoted_table})")).mappings():
+        if unique and not index["unique"]:
+            continue
+        info = connection.execute(text(f"PRAGMA index_info({_quote(connection, index['name'])})"))
+        if [row[2] for row in info] == list(columns):
+            return True
+    return False
+
+
+def create_index(name: str, table: str, columns: Sequence[str], *, unique: bool = False) -> Step:
+    """Crée l'index s'il manque, en ligne sur PostgreSQL."""
+
+    def step(connection: Connection) -> None:
+        dialect = connection.dialect.name
+        if dialect == "postgresql":
+            # Un CREATE INDEX CONCURRENTLY interrompu laisse un index invalide
+            # que IF NOT EXISTS ne reconstruirait jamais.
+            invalid = connection.execute(
+                text(
+                    "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                    "WHERE c.relname = :name AND NOT i.indisvalid"
+                ),
+                {"name": name},
+            ).first()
+            if invalid is not None:
+                logger.warning("Index %s invalide (création interrompue) : reconstruction", name)
+                connection.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+        elif dialect == "sqlite" and _sqlite_has_equivalent_index(connection, table, columns, unique):
+            return
+        connection.execute(text(create_index_sql(dialect, name, table, columns, unique=unique)))
+
+    return step
+
+
+def drop_index(name: str) -> Step:
+    return run_sql(
+        postgresql=f"DROP INDEX CONCURRENTLY IF EXISTS {name}",
+        sqlite=f"DROP INDEX IF EXISTS {name}",
+    )
+
+
+def _create_missing_tables(connection: Connection) -> None:
+    from app import models  # noqa: F401 - enregistre les tables dans Base.metadata
+    from app.database.connection import Base
+
+    Base.metadata.create_all(bind=connection)
+
+
+def _ensure_default_channel_row(connection: Connection) -> None:
+    from app.models.channel import DEFAULT_CHANNEL_ID, DEFAULT_CHANNEL_LOGIN
+
+    # Les colonnes channel_id ajoutées ensuite référencent la chaîne 1.
+    connection.execute(
+        text("INSERT INTO channels (id, login) VALUES (:id, :login) ON CONFLICT DO NOTHING"),
+        {"id": DEFAULT_CHANNEL_ID, "login": DEFAULT_CHANNEL_LOGIN},
+    )
+    if _is_postgresql(connection):
+        connection.execute(
+            text(
+                "SELECT setval(pg_get_serial_sequence('channels', 'id'), "
+                "GREATEST((SELECT MAX(id) FROM channels), 1))"
+            )
+        )
+
+
+def _canonicalize_ban_rule_links(connection: Connection) -> None:
+    from app.utils.links import comparable_link
+
+    # Les chansons sont stockées sous leur lien canonique ; une règle saisie
+    # sous une autre forme (youtu.be/ID...) ne les visait plus.
+    rows = connection.execute(text("SELECT id, link FROM ban_rules WHERE link IS NOT NULL")).all()
+    changed = [
+        {"id": rule_id, "link": comparable_link(link)}
+        for rule_id, link in rows
+        if comparable_link(link) != link
+    ]
+    if changed:
+        connection.execute(text("UPDATE ban_rules SET link = :link WHERE id = :id"), changed)
+
+
+MIGRATIONS: tuple[Migration, ...] = (
+    Migration(1, "create_missing_tables", (_create_missing_tables,)),
+    Migration(
+        2,
+        "songs_comment",
+        (add_column("songs", "comment", postgresql="TEXT", sqlite="VARCHAR"),),
+    ),
+    Migration(
+        3,
+        "songs_trend_columns",
+        (
+            add_column(
+                "songs",
+                "trend_score",
+                postgresql="DOUBLE PRECISION NOT NULL DEFAULT 0",
+                sqlite="FLOAT NOT NULL DEFAULT 0",
+            ),
+            add_column("songs", "trend_updated_at", postgresql="TIMESTAMPTZ", sqlite="DATETIME"),
+        ),
+    ),
+    Migration(
+        4,
+        "channel_columns",
+        (
+            _ensure_default_channel_row,
+            add_column(
+                "songs",
+                "channel_id",
+                postgresql="INTEGER NOT NULL DEFAULT 1 REFERENCES channels (id) ON DELETE CASCADE",
+                sqlite="INTEGER NOT NULL DEFAULT 1",
+            ),
+            add_column(
+                "ban_rules",
+                "channel_id",
+                postgresql="INTEGER NOT NULL DEFAULT 1 REFERENCES channels (id) ON DELETE CASCADE",
+                sqlite="INTEGER NOT NULL DEFAULT 1",
+            ),
+        ),
+    ),
+    Migration(
+        5,
+        "channel_indexes",
+        (
+            create_index("uq_songs_channel_link", "songs", ("channel_id", "link"), unique=True),
+            # L'unicité globale du lien est remplacée par (channel_id, link).
+            run_sql(postgresql="ALTER TABLE songs DROP CONSTRAINT IF EXISTS songs_link_key"),
+            create_index("ix_songs_channel_id", "songs", ("channel_id", "id")),
+            create_index("ix_songs_channel_votes", "songs", ("channel_id", "votes")),
+            create_index("ix_songs_channel_trend_score", "songs", ("channel_id", "trend_score")),
+            create_index("ix_ban_rules_channel_id", "ban_rules", ("channel_id",)),
+            drop_index("ix_songs_trend_score"),
+        ),
+        transactional=False,
+    ),
+    # Table app_settings (demi-vie de la tendance appliquée aux scores).
+    Migration(6, "app_settings", (_create_missing_tables,)),
+    Migration(7, "ban_rule_canonical_links", (_canonicalize_ban_rule_links,)),
+)
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def current_version(connection: Connection) -> int:
+    """Version appliquée, 0 si la table ``schema_version`` n'existe pas encore."""
+
+    try:
+        version = connection.execute(text(f"SELECT MAX(version) FROM {SCHEMA_VERSION_TABLE}")).scalar()
+    except (OperationalError, ProgrammingError):
+        connection.rollback()
+        return 0
+    connection.commit()
+    return version or 0
+
+
+def _create_version_table(connection: Connection) -> None:
+    connection.execute(
+        text(
+            f"CREATE TABLE IF NOT EXISTS {SCHEMA_VERSION_TABLE} ("
+            "version INTEGER PRIMARY KEY, "
+            "name VARCHAR(200) NOT NULL, "
+            "applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP)"
+        )
+    )
+    connection.commit()
+
+
+def _record(connection: Connection, migration: Migration) -> None:
+    connection.execute(
+        text(f"INSERT INTO {SCHEMA_VERSION_TABLE} (version, name) VALUES (:version, :name)"),
+        {"version": migration.version, "name": migration.name},
+    )
+
+
+@contextmanager
+def _migration_lock(engine: Engine) -> Iterator[None]:
+    """Verrou exclusif des migrations entre workers.
+
+    Verrou de transaction et non de session : à travers PgBouncer en mode
+    transaction, un ``pg_advisory_lock`` pris en autocommit resterait attaché à
+    une connexion serveur rendue au pool, et son ``unlock`` partirait ailleurs.
+    La transaction qui le porte garde sa connexion serveur jusqu'au ``COMMIT``.
+    """
+
+    with _local_lock:
+        if engine.dialect.name != "postgresql":
+            yield
+            return
+        with engine.connect() as connection, connection.begin():
+            connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+            yield
+
+
+def _apply(engine: Engine, migrations: Sequence[Migration]) -> MigrationResult:
+    with engine.connect() as connection:
+        # Relue sous le verrou : un autre worker a pu migrer entre-temps.
+        start = current_version(connection)
+        result = MigrationResult(start, start)
+        pending = [migration for migration in migrations if migration.version > start]
+        if not pending:
+            return result
+        _create_version_table(connection)
+
+        for migration in pending:
+            started = time.perf_counter()
+            if migration.transactional:
+                with connection.begin():
+                    for step in migration.steps:
+                        step(connection)
+                    _record(connection, migration)
+            else:
+                with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as online:
+                    for step in migration.steps:
+                        step(online)
+                    _record(online, migration)
+            logger.info(
+                "Migration %d (%s) appliquée en %.0f ms",
+                migration.version,
+                migration.name,
+                (time.perf_counter() - started) * 1000,
+            )
+            result.to_version = migration.version
+            result.applied.append(migration.name)
+    return result
+
+
+def ensure_schema(engine: Engine, migrations: Sequence[Migration] = MIGRATIONS) -> MigrationResult:
+    """Amène la base à la dernière version ; une seule requête si elle y est déjà."""
+
+    with engine.connect() as connection:
+        version = current_version(connection)
+    latest = migrations[-1].version if migrations else 0
+    if version >= latest:
+        logger.info("Schéma à jour (version %d)", version)
+        return MigrationResult(version, version)
+
+    logger.info("Schéma en version %d, migration vers %d", version, latest)
+    with _migration_lock(engine):
+        return _apply(engine, migrations)
+
+
+__all__ = [
+    "LATEST_VERSION",
+    "MIGRATIONS",
+    "Migration",
+    "MigrationResult",
+    "add_column",
+    "create_index",
+    "create_index_sql",
+    "current_version",
+    "drop_index",
+    "ensure_schema",
+    "run_sql",
+]
+
+
+if __name__ == "__main__":  # pragma: no cover - utilitaire manuel
+    from app.database.connection import engine
+
+    logging.basicConfig(level=logging.INFO)
+    outcome = ensure_schema(engine)
+    print(f"Schéma en version {outcome.to_version} (migrations appliquées : {outcome.applied or 'aucune'})")
@@ -1,5 +1,8 @@
 -- Schema initial pour l'instance Neon
 -- Cette requête peut être exécutée via le tableau de bord SQL ou psql.
+-- Le backend applique lui-même ces changements au démarrage (migrations
+-- versionnées de app/database/migrations.py, table schema_version) : ce
+-- fichier doit refléter la dernière version des migrations.
 
 CREATE TABLE IF NOT EXISTS songs (
     id SERIAL PRIMARY KEY,
@@ -7,9 +10,12 @@ CREATE TABLE IF NOT EXISTS songs (
     artist TEXT,
     link TEXT UNIQUE,
     thumbnail TEXT,
+    comment TEXT,
     votes INTEGER DEFAULT 1
 );
 
+ALTER TABLE songs ADD COLUMN IF NOT EXISTS comment TEXT;
+
 CREATE INDEX IF NOT EXISTS idx_songs_title ON songs (title);
 CREATE INDEX IF NOT EXISTS idx_songs_artist ON songs (artist);
 CREATE INDEX IF NOT EXISTS idx_songs_link ON songs (link);
@@ -37,3 +43,78 @@ CREATE TABLE IF NOT EXISTS admin_users (
 
 CREATE INDEX IF NOT EXISTS idx_admin_users_email ON admin_users (email);
 
+-- Versions des caches en mémoire, incrémentées à chaque modification pour
+-- invalider les autres workers (LISTEN/NOTIFY ou scrutation).
+CREATE TABLE IF NOT EXISTS cache_versions (
+    topic TEXT PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- Empreintes des votants par morceau (ensemble exact puis filtre de Bloom),
+-- pour refuser les votes répétés sans table (song_id, votant).
+CREATE TABLE IF NOT EXISTS song_voters (
+    song_id INTEGER PRIMARY KEY REFERENCES songs (id) ON DELETE CASCADE,
+    voters BYTEA NOT NULL,
+    version INTEGER NOT NULL DEFAULT 1
+);
+
+-- Classement « tendance » : log du score à décroissance exponentielle, ramené
+-- à une époque fixe (voir app/services/trending.py), et date du dernier vote.
+ALTER TABLE songs ADD COLUMN IF NOT EXISTS trend_score DOUBLE PRECISION NOT NULL DEFAULT 0;
+ALTER TABLE songs ADD COLUMN IF NOT EXISTS trend_updated_at TIMESTAMPTZ;
+CREATE INDEX IF NOT EXISTS ix_songs_trend_score ON songs (trend_score);
+
+-- Journal des votes (une ligne par vote, ou par lot de votes du chat).
+CREATE TABLE IF NOT EXISTS vote_events (
+    id BIGSERIAL PRIMARY KEY,
+    song_id INTEGER NOT NULL REFERENCES songs (id) ON DELETE CASCADE,
+    votes INTEGER NOT NULL DEFAULT 1,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS ix_vote_events_song_id ON vote_events (song_id);
+CREATE INDEX IF NOT EXISTS ix_vote_events_created_at ON vote_events (created_at);
+
+-- Réglages persistants partagés entre les workers (demi-vie appliquée aux
+-- scores de tendance, pour détecter un changement au démarrage).
+CREATE TABLE IF NOT EXISTS app_settings (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- Chaînes hébergées. La chaîne 1 (« default ») reçoit les données existantes
+-- et sert les routes historiques (/songs, /ban, /public/submissions).
+CREATE TABLE IF NOT EXISTS channels (
+    id SERIAL PRIMARY KEY,
+    login TEXT UNIQUE NOT NULL,
+    display_name TEXT,
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+INSERT INTO channels (id, login) VALUES (1, 'default') ON CONFLICT (id) DO NOTHING;
+SELECT setval(pg_get_serial_sequence('channels', 'id'), GREATEST((SELECT MAX(id) FROM channels), 1));
+
+ALTER TABLE songs ADD COLUMN IF NOT EXISTS channel_id INTEGER NOT NULL DEFAULT 1
+    REFERENCES channels (id) ON DELETE CASCADE;
+ALTER TABLE ban_rules ADD COLUMN IF NOT EXISTS channel_id INTEGER NOT NULL DEFAULT 1
+    REFERENCES channels (id) ON DELETE CASCADE;
+
+-- Un même lien peut être proposé sur plusieurs chaînes : l'unicité devient
+-- (channel_id, link). Les index des listes commencent par channel_id pour
+-- qu'une chaîne ne parcoure que ses propres lignes.
+ALTER TABLE songs DROP CONSTRAINT IF EXISTS songs_link_key;
+CREATE UNIQUE INDEX IF NOT EXISTS uq_songs_channel_link ON songs (channel_id, link);
+CREATE INDEX IF NOT EXISTS ix_songs_channel_id ON songs (channel_id, id);
+CREATE INDEX IF NOT EXISTS ix_songs_channel_votes ON songs (channel_id, votes);
+CREATE INDEX IF NOT EXISTS ix_songs_channel_trend_score ON songs (channel_id, trend_score);
+DROP INDEX IF EXISTS ix_songs_trend_score;
+CREATE INDEX IF NOT EXISTS ix_ban_rules_channel_id ON ban_rules (channel_id);
+
+-- Versions du schéma appliquées par le backend (une ligne par migration).
+CREATE TABLE IF NOT EXISTS schema_version (
+    version INTEGER PRIMARY KEY,
+    name VARCHAR(200) NOT NULL,
+    applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
@@ -1,46 +1,106 @@
+import asyncio
 import logging
+from contextlib import asynccontextmanager
+from datetime import timedelta
 from pathlib import Path
 from urllib.parse import urlparse, urlunparse
 
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse, RedirectResponse
-from slowapi.errors import RateLimitExceeded
+from fastapi.responses import JSONResponse, RedirectResponse
 
-from fastapi.staticfiles import StaticFiles
+from sqlalchemy import text
 from sqlalchemy.exc import OperationalError
 
 from app.config import (
+    ADMIN_JWT_SECRET,
+    CACHE_BUS_ENABLED,
+    CACHE_BUS_POLL_SECONDS,
+    COMPRESSION_ENABLED,
+    COMPRESSION_MIN_BYTES,
     CORS_ORIGINS,
     FRONTEND_DIST_PATH,
     FRONTEND_INDEX_PATH,
 
     FRONTEND_SUBMIT_REDIRECT_URL,
-
+    GOOGLE_CLIENT_ID,
+    QUERY_PROFILER_ENABLED,
+    QUERY_PROFILER_SLOW_MS,
+    TWITCH_CHAT_CHANNEL,
+    TWITCH_CHAT_NICK,
+    TWITCH_CHAT_OAUTH_TOKEN,
+    TWITCH_CHAT_USER_RATE,
+    VOTE_EVENTS_RETENTION_HOURS,
     log_environment_configuration,
 )
-from app.api.routes import songs, ban_rules, public_submissions, auth
-from app import models  # noqa: F401 - ensure models are imported before create_all
+from app.api.routes import songs, ban_rules, public_submissions, auth, metrics, channels
+from app import models  # noqa: F401 - ensure models are imported before migrations
+from app.crud import ban_rule as crud_ban
 from app.database.connection import (
-    Base,
+    POOL_SETTINGS,
     SessionLocal,
     check_connection,
-    describe_active_database,
     engine,
+    read_engine,
 )
+from app.database.migrations import ensure_schema
+from app.services import leaderboard, trending
+from app.services.channels import ensure_default_channel, get_or_create_channel
 from app.services.admin_user import ensure_default_admin_user
+from app.services.auth import fetch_google_keys
+from app.services.cache_bus import start_cache_bus, stop_cache_bus
+from app.services.http_client import close_http_client, get_http_client
+from app.services.startup import DatabaseProbe, StartupReport
+from app.services.twitch_chat import TwitchChatIngestor
+from app.utils.compression import CompressionMiddleware
+from app.utils.metrics import MetricsMiddleware, instrument_engine
+from app.utils.query_profiler import QueryProfilerMiddleware, install_query_profiler
+from app.utils.read_your_writes import READ_AFTER_HEADER, ReadYourWritesMiddleware
+from app.utils.spa_index import SpaIndex
+from app.utils.static_files import PrecompressedStaticFiles
 
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Twitch Song Recommender")
+# Vérification de la base par /ready : durée maximale et durée de validité du résultat.
+READY_DATABASE_TIMEOUT_SECONDS = 2.0
+READY_DATABASE_CACHE_SECONDS = 5.0
+# Intervalle de purge du journal vote_events.
+VOTE_EVENTS_PRUNE_INTERVAL_SECONDS = 3600
+
+_recovery_lock = asyncio.Lock()
+
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Démarre les services en phases parallèles, puis les arrête proprement."""
 
-@app.exception_handler(RateLimitExceeded)
-async def rate_limit_handler(request: Request, exc: RateLimitExceeded):
-    return JSONResponse(
-        status_code=429,
-        content={"detail": "Trop de requêtes. Réessaie dans quelques instants."},
+    log_environment_configuration()
+    report = StartupReport()
+    app.state.startup = report
+    app.state.database_probe = DatabaseProbe(
+        _ping_database,
+        timeout=READY_DATABASE_TIMEOUT_SECONDS,
+        ttl=READY_DATABASE_CACHE_SECONDS,
     )
+    chat_channel_id = await _initialize(report)
+    report.finish()
+
+    if report.ready:
+        _start_background_services(chat_channel_id)
+    else:
+        logger.warning(
+            "Le backend démarre sans base de données active : les routes dépendantes "
+            "échoueront tant que la connexion n'est pas rétablie (phases rejouées par /ready)."
+        )
+    try:
+        yield
+    finally:
+        await _stop_background_services()
+        close_http_client()
+
+
+app = FastAPI(title="Twitch Song Recommender", lifespan=lifespan)
+
 
 app.state.frontend_index_path = FRONTEND_INDEX_PATH
 app.state.frontend_dist_path = FRONTEND_DIST_PATH
@@ -49,33 +109,162 @@ app.state.frontend_submit_redirect = FRONTEND_SUBMIT_REDIRECT_URL
 app.state.frontend_cors_origins = CORS_ORIGINS
 
 
+def _seed_defaults() -> int | None:
+    session = SessionLocal()
+    try:
+        ensure_default_channel(session)
+        ensure_default_admin_user(session)
+        if TWITCH_CHAT_CHANNEL:
+            return get_or_create_channel(session, TWITCH_CHAT_CHANNEL)
+        return None
+    finally:
+        session.close()
 
-@app.on_event("startup")
-async def startup_checks() -> None:
-    """Vérifie la connexion PostgreSQL sans bloquer le démarrage du backend."""
 
-    log_environment_configuration()
+def _sync_trend_half_life() -> bool:
+    session = SessionLocal()
+    try:
+        return trending.sync_trend_half_life(session)
+    finally:
+        session.close()
 
+
+def _prune_vote_events() -> int:
+    session = SessionLocal()
     try:
-        check_connection()
-    except OperationalError as exc:  # pragma: no cover - dépend de l'env d'exécution
-        snapshot = describe_active_database()
-        logger.error(
-            "Échec de connexion à PostgreSQL avec les paramètres %s", snapshot, exc_info=exc
+        return trending.prune_vote_events(session, timedelta(hours=VOTE_EVENTS_RETENTION_HOURS))
+    finally:
+        session.close()
+
+
+async def _prune_vote_events_loop() -> None:
+    while True:
+        try:
+            deleted = await asyncio.to_thread(_prune_vote_events)
+        except Exception:
+            logger.warning("Purge du journal des votes en échec", exc_info=True)
+        else:
+            if deleted:
+                logger.info("%d évènements de vote purgés", deleted)
+        await asyncio.sleep(VOTE_EVENTS_PRUNE_INTERVAL_SECONDS)
+
+
+def _warm_caches() -> None:
+    session = SessionLocal()
+    try:
+        leaderboard.get_leaderboard(session).reload(session)
+        crud_ban.get_ban_snapshot(session)
+    finally:
+        session.close()
+
+
+def _ping_database() -> None:
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+
+def _warm_read_engine() -> None:
+    with read_engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+
+async def _initialize_database(report: StartupReport) -> int | None:
+    try:
+        await report.run("database", check_connection)
+    except OperationalError:
+        for name in ("schema", "trend_half_life", "seed", "cache_warmup"):
+            report.skip(name, critical=name in ("schema", "seed"))
+        return None
+    await report.run("schema", ensure_schema, engine)
+    # Avant le préchauffage : le classement chargé doit porter les scores recalculés.
+    await report.run("trend_half_life", _sync_trend_half_life, critical=False)
+    chat_channel_id, _ = await asyncio.gather(
+        report.run("seed", _seed_defaults),
+        report.run("cache_warmup", _warm_caches, critical=False),
+    )
+    return chat_channel_id
+
+
+async def _initialize(report: StartupReport) -> int | None:
+    """Phases de démarrage : la chaîne base → schéma → données tourne en
+    parallèle du client HTTP, de l'index frontend et des clés Google."""
+
+    phases = [
+        _initialize_database(report),
+        report.run("http_client", get_http_client, critical=False),
+        report.run("frontend", _prepare_frontend, critical=False),
+    ]
+    if read_engine is not engine:
+        phases.append(report.run("database_read", _warm_read_engine, critical=False))
+    if GOOGLE_CLIENT_ID:
+        phases.append(report.run("google_jwks", fetch_google_keys, critical=False))
+
+    results = await asyncio.gather(*phases, return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            logger.warning("Phase de démarrage en échec : %s", result, exc_info=result)
+    chat_channel_id = results[0]
+    return None if isinstance(chat_channel_id, BaseException) else chat_channel_id
+
+
+async def _recover_database(report: StartupReport) -> None:
+    """Rejoue base → schéma → données quand la base revient après un démarrage dégradé."""
+
+    async with _recovery_lock:
+        if report.ready:
+            return
+        try:
+            chat_channel_id = await _initialize_database(report)
+        except Exception:
+            logger.warning("Reprise des phases de base de données en échec", exc_info=True)
+            return
+        if report.ready:
+            logger.info("Base de données rétablie : démarrage des services d'arrière-plan")
+            _start_background_services(chat_channel_id)
+
+
+def _start_background_services(chat_channel_id: int | None) -> None:
+    if CACHE_BUS_ENABLED:
+        # LISTEN exige une connexion dédiée : impossible à travers PgBouncer.
+        start_cache_bus(
+            engine,
+            poll_interval=CACHE_BUS_POLL_SECONDS,
+            use_listen=False if POOL_SETTINGS.pgbouncer else None,
         )
-        logger.warning(
-            "Le backend démarre sans base de données active : les routes dépendantes "
-            "échoueront tant que la connexion n'est pas rétablie."
+
+    if TWITCH_CHAT_CHANNEL:
+        ingestor = TwitchChatIngestor(
+            TWITCH_CHAT_CHANNEL,
+            SessionLocal,
+            nick=TWITCH_CHAT_NICK,
+            token=TWITCH_CHAT_OAUTH_TOKEN,
+            user_rate=TWITCH_CHAT_USER_RATE,
+            channel_id=chat_channel_id,
         )
-    else:
-        Base.metadata.create_all(bind=engine)
-        session = SessionLocal()
-        try:
-            ensure_default_admin_user(session)
-        finally:
-            session.close()
+        app.state.twitch_chat = ingestor
+        app.state.twitch_chat_task = asyncio.create_task(ingestor.run())
 
-    log_environment_configuration()
+    if VOTE_EVENTS_RETENTION_HOURS:
+        app.state.vote_events_prune_task = asyncio.create_task(_prune_vote_events_loop())
+
+
+async def _stop_background_services() -> None:
+    ingestor = getattr(app.state, "twitch_chat", None)
+    if ingestor is not None:
+        ingestor.stop()
+        try:
+            await asyncio.wait_for(app.state.twitch_chat_task, timeout=5)
+        except asyncio.TimeoutError:  # pragma: no cover - lot en cours trop long
+            app.state.twitch_chat_task.cancel()
+        app.state.twitch_chat = None
+    prune_task = getattr(app.state, "vote_events_prune_task", None)
+    if prune_task is not None:
+        prune_task.cancel()
+        app.state.vote_events_prune_task = None
+    stop_cache_bus()
+
+# Lecture de ses propres écritures quand un réplica est configuré.
+app.add_middleware(ReadYourWritesMiddleware, secret=ADMIN_JWT_SECRET)
 
 # Middleware CORS
 app.add_middleware(
@@ -83,7 +272,8 @@ app.add_middleware(
     allow_origins=CORS_ORIGINS,
     allow_credentials=True,
     allow_methods=["GET", "POST", "DELETE", "OPTIONS"],
-    allow_headers=["Content-Type", "Authorization"],
+    allow_headers=["Content-Type", "Authorization", READ_AFTER_HEADER],
+    expose_headers=[READ_AFTER_HEADER],
 )
 
 
@@ -96,11 +286,35 @@ async def add_security_headers(request: Request, call_next):
     return response
 
 
-# Routes
+if QUERY_PROFILER_ENABLED:
+    app.add_middleware(QueryProfilerMiddleware, slow_threshold=QUERY_PROFILER_SLOW_MS / 1000)
+    install_query_profiler(engine)
+    install_query_profiler(read_engine)
+
+if COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware, minimum_size=COMPRESSION_MIN_BYTES)
+
+# Ajouté en dernier pour englober les autres middlewares dans la mesure.
+app.add_middleware(MetricsMiddleware)
+instrument_engine(engine)
+instrument_engine(read_engine)
+
+
+# Routes : les routes historiques servent la chaîne par défaut, les mêmes
+# routeurs sont montés sous /channels/{channel} pour les autres chaînes.
 app.include_router(songs.router, prefix="/songs", tags=["Songs"])
 app.include_router(ban_rules.router, prefix="/ban", tags=["BanRules"])
 app.include_router(public_submissions.router, prefix="/public/submissions", tags=["PublicSubmissions"])
+app.include_router(channels.router, prefix="/channels", tags=["Channels"])
+app.include_router(songs.router, prefix="/channels/{channel}/songs", tags=["Songs"])
+app.include_router(ban_rules.router, prefix="/channels/{channel}/ban", tags=["BanRules"])
+app.include_router(
+    public_submissions.router,
+    prefix="/channels/{channel}/public/submissions",
+    tags=["PublicSubmissions"],
+)
 app.include_router(auth.router, prefix="/auth", tags=["Auth"])
+app.include_router(metrics.router, tags=["Metrics"])
 
 
 @app.get("/health", include_in_schema=False)
@@ -110,10 +324,37 @@ def health_check() -> dict[str, str]:
     return {"status": "ok"}
 
 
+@app.get("/ready", include_in_schema=False)
+async def readiness_check() -> JSONResponse:
+    """Prêt à servir : démarrage terminé et base joignable, avec la durée de chaque phase.
+
+    La base est revérifiée (résultat gardé quelques secondes) ; si elle revient
+    après un démarrage sans elle, les phases schéma et données sont rejouées.
+    """
+
+    report: StartupReport | None = getattr(app.state, "startup", None)
+    if report is None:
+        return JSONResponse({"status": "starting", "startup_ms": None, "phases": {}}, status_code=503)
+    probe: DatabaseProbe = app.state.database_probe
+    database_ok = await probe.check()
+    if database_ok and not report.ready:
+        await _recover_database(report)
+    ready = database_ok and report.ready
+    payload = report.as_dict()
+    if not ready and payload["status"] == "ready":
+        payload["status"] = "degraded"
+    payload["database"] = probe.as_dict()
+    return JSONResponse(payload, status_code=200 if ready else 503)
+
+
 @app.get("/", include_in_schema=False)
 @app.get("/index.html", include_in_schema=False)
-def serve_root():
-    return _serve_frontend_index("/")
+def serve_root(request: Request):
+    return _serve_frontend_index("/", request)
+
+
+# Chemins servis par la SPA : leurs cibles de redirection sont calculées au démarrage.
+FRONTEND_ROUTE_PATHS = ("/", "/submit", "/admin", "/login")
 
 
 def _resolve_frontend_index_path() -> Path | None:
@@ -123,6 +364,16 @@ def _resolve_frontend_index_path() -> Path | None:
     return Path(candidate)
 
 
+def _prepare_frontend() -> None:
+    """Charge l'index en mémoire et précalcule les redirections de la SPA."""
+
+    index_path = _resolve_frontend_index_path()
+    app.state.frontend_index = SpaIndex(index_path) if index_path is not None else None
+    app.state.frontend_redirects = {
+        path: _build_redirect_target(path) for path in FRONTEND_ROUTE_PATHS
+    }
+
+
 
 def _build_redirect_target(target_path: str) -> str | None:
     submit_redirect = getattr(app.state, "frontend_submit_redirect", None)
@@ -155,14 +406,18 @@ def _build_redirect_target(target_path: str) -> str | None:
     return None
 
 
-def _serve_frontend_index(target_path: str):
-
-    index_path = _resolve_frontend_index_path()
+def _serve_frontend_index(target_path: str, request: Request):
+    if not hasattr(app.state, "frontend_redirects"):
+        # Application utilisée sans passer par le démarrage (tests, scripts).
+        _prepare_frontend()
 
-    if index_path is not None and index_path.exists():
-        return FileResponse(index_path)
+    index = app.state.frontend_index
+    if index is not None:
+        response = index.response(request.headers)
+        if response is not None:
+            return response
 
-    redirect_url = _build_redirect_target(target_path)
+    redirect_url = app.state.frontend_redirects[target_path]
     if redirect_url:
         return RedirectResponse(url=redirect_url, status_code=307)
 
@@ -177,25 +432,25 @@ def _serve_frontend_index(target_path: str):
 
 @app.get("/submit", include_in_schema=False)
 @app.get("/submit/", include_in_schema=False)
-def serve_submit():
+def serve_submit(request: Request):
 
-    return _serve_frontend_index("/submit")
+    return _serve_frontend_index("/submit", request)
 
 
 
 @app.get("/admin", include_in_schema=False)
 @app.get("/admin/", include_in_schema=False)
-def serve_admin():
+def serve_admin(request: Request):
 
-    return _serve_frontend_index("/admin")
+    return _serve_frontend_index("/admin", request)
 
 
 
 @app.get("/login", include_in_schema=False)
 @app.get("/login/", include_in_schema=False)
-def serve_login():
+def serve_login(request: Request):
 
-    return _serve_frontend_index("/login")
+    return _serve_frontend_index("/login", request)
 
 
 
@@ -211,7 +466,12 @@ def _mount_frontend_assets() -> None:
 
     assets_dir = dist_dir / "assets"
     if assets_dir.exists():
-        app.mount("/assets", StaticFiles(directory=assets_dir), name="frontend-assets")
+        # Noms hashés par Vite : cache immuable, variantes .br/.gz servies telles quelles.
+        app.mount(
+            "/assets",
+            PrecompressedStaticFiles(directory=assets_dir, immutable=True),
+            name="frontend-assets",
+        )
 
 
 _mount_frontend_assets()
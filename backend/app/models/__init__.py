@@ -1,5 +1,10 @@
+from .channel import Channel
 from .song import Song
 from .ban_rule import BanRule
 from .admin_user import AdminUser
+from .cache_version import CacheVersion
+from .song_voter import SongVoters
+from .vote_event import VoteEvent
+from .app_setting import AppSetting
 
-__all__ = ["Song", "BanRule", "AdminUser"]
+__all__ = ["Channel", "Song", "BanRule", "AdminUser", "CacheVersion", "SongVoters", "VoteEvent", "AppSetting"]
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, DateTime, String, func
+
+from app.database.connection import Base
+
+
+class AppSetting(Base):
+    """Réglage persistant partagé entre les workers (clé → valeur texte)."""
+
+    __tablename__ = "app_settings"
+
+    key = Column(String, primary_key=True)
+    value = Column(String, nullable=False)
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+
+__all__ = ["AppSetting"]
@@ -1,10 +1,19 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, ForeignKey, Integer, String
 from app.database.connection import Base
+from app.models.channel import DEFAULT_CHANNEL_ID
 
 class BanRule(Base):
     __tablename__ = "ban_rules"
 
     id = Column(Integer, primary_key=True, index=True)
+    channel_id = Column(
+        Integer,
+        ForeignKey("channels.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+        default=DEFAULT_CHANNEL_ID,
+        server_default=str(DEFAULT_CHANNEL_ID),
+    )
     title = Column(String, index=True, nullable=True)
     artist = Column(String, index=True, nullable=True)
     link = Column(String, index=True, nullable=True)
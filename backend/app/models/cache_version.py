@@ -0,0 +1,18 @@
+from sqlalchemy import BigInteger, Column, DateTime, String, func
+
+from app.database.connection import Base
+
+
+class CacheVersion(Base):
+    """Compteur de version par sujet de cache, partagé entre les workers."""
+
+    __tablename__ = "cache_versions"
+
+    topic = Column(String, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+
+__all__ = ["CacheVersion"]
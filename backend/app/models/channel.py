@@ -0,0 +1,21 @@
+from sqlalchemy import Column, DateTime, Integer, String, func
+
+from app.database.connection import Base
+
+# Chaîne des routes historiques (/songs, /ban, /public/submissions).
+DEFAULT_CHANNEL_ID = 1
+DEFAULT_CHANNEL_LOGIN = "default"
+
+
+class Channel(Base):
+    """Chaîne Twitch hébergée : ses morceaux et ses règles sont isolés des autres."""
+
+    __tablename__ = "channels"
+
+    id = Column(Integer, primary_key=True, index=True)
+    login = Column(String, unique=True, nullable=False, index=True)
+    display_name = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+__all__ = ["Channel", "DEFAULT_CHANNEL_ID", "DEFAULT_CHANNEL_LOGIN"]
@@ -1,13 +1,32 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer, String, UniqueConstraint
 from app.database.connection import Base
+from app.models.channel import DEFAULT_CHANNEL_ID
 
 class Song(Base):
     __tablename__ = "songs"
+    # Les index composites commencent par channel_id : chaque chaîne ne
+    # parcourt que ses propres lignes, quelle que soit la taille des autres.
+    __table_args__ = (
+        UniqueConstraint("channel_id", "link", name="uq_songs_channel_link"),
+        Index("ix_songs_channel_id", "channel_id", "id"),
+        Index("ix_songs_channel_votes", "channel_id", "votes"),
+        Index("ix_songs_channel_trend_score", "channel_id", "trend_score"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
+    channel_id = Column(
+        Integer,
+        ForeignKey("channels.id", ondelete="CASCADE"),
+        nullable=False,
+        default=DEFAULT_CHANNEL_ID,
+        server_default=str(DEFAULT_CHANNEL_ID),
+    )
     title = Column(String, index=True)
     artist = Column(String, index=True)
-    link = Column(String, unique=True, index=True)
+    link = Column(String, index=True)
     thumbnail = Column(String, nullable=True)
     comment = Column(String, nullable=True)
     votes = Column(Integer, default=1)
+    # Log du score « tendance » ramené à une époque fixe (voir app.services.trending).
+    trend_score = Column(Float, nullable=False, default=0.0, server_default="0")
+    trend_updated_at = Column(DateTime(timezone=True), nullable=True)
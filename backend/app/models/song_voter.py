@@ -0,0 +1,17 @@
+from sqlalchemy import Column, ForeignKey, Integer, LargeBinary
+
+from app.database.connection import Base
+
+
+class SongVoters(Base):
+    """Empreintes des votants d'un morceau (ensemble exact ou filtre de Bloom sérialisé)."""
+
+    __tablename__ = "song_voters"
+
+    song_id = Column(Integer, ForeignKey("songs.id", ondelete="CASCADE"), primary_key=True)
+    voters = Column(LargeBinary, nullable=False)
+    # Incrémentée à chaque écriture : détecte les mises à jour concurrentes d'autres workers.
+    version = Column(Integer, nullable=False, default=1)
+
+
+__all__ = ["SongVoters"]
@@ -0,0 +1,19 @@
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Integer, func
+
+from app.database.connection import Base
+
+
+class VoteEvent(Base):
+    """Journal des voix reçues (une ligne par vote ou par lot de votes du chat)."""
+
+    __tablename__ = "vote_events"
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    song_id = Column(
+        Integer, ForeignKey("songs.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    votes = Column(Integer, nullable=False, default=1)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), index=True)
+
+
+__all__ = ["VoteEvent"]
@@ -1,6 +1,10 @@
 
+from typing import Literal
+
 from pydantic import BaseModel, field_validator, model_validator
 
+from app.schemas.song import SongOut
+
 
 
 class BanRuleBase(BaseModel):
@@ -41,3 +45,27 @@ class BanRuleOut(BanRuleBase):
 
     class Config:
         from_attributes = True
+
+
+class BanRulePreview(BaseModel):
+    matched: int
+    scanned: int
+    complete: bool
+    stopped_by: Literal["rows", "time"] | None = None
+    elapsed_ms: float
+    sample: list[SongOut]
+
+
+class BanRuleImportError(BaseModel):
+    line: int
+    detail: str
+
+
+class BanRuleImportReport(BaseModel):
+    received: int
+    created: int
+    duplicates: int
+    rejected: int
+    deleted_songs: int
+    elapsed_ms: float
+    errors: list[BanRuleImportError]
@@ -0,0 +1,20 @@
+from pydantic import BaseModel, Field, field_validator
+
+
+class ChannelCreate(BaseModel):
+    login: str = Field(pattern=r"^#?[A-Za-z0-9_]{2,25}$")
+    display_name: str | None = Field(default=None, max_length=100)
+
+    @field_validator("login")
+    @classmethod
+    def _normalize_login(cls, value: str) -> str:
+        return value.lstrip("#").lower()
+
+
+class ChannelOut(BaseModel):
+    id: int
+    login: str
+    display_name: str | None = None
+
+    class Config:
+        from_attributes = True
@@ -1,3 +1,5 @@
+from typing import Annotated, Literal
+
 from pydantic import BaseModel, Field
 
 
@@ -14,3 +16,28 @@ class SongOut(SongCreate):
 
     class Config:
         from_attributes = True
+
+
+# Taille maximale d'un lot ``POST /songs/batch``.
+SONG_BATCH_MAX_ITEMS = 100
+
+
+class SongBatchCreate(BaseModel):
+    """Lot de liens seuls (métadonnées récupérées) ou de morceaux complets."""
+
+    items: list[Annotated[str, Field(max_length=2000)] | SongCreate] = Field(
+        min_length=1, max_length=SONG_BATCH_MAX_ITEMS
+    )
+
+
+class SongBatchItemOut(BaseModel):
+    index: int
+    status: Literal["added", "duplicate", "banned", "invalid", "metadata_error"]
+    link: str | None = None
+    song: SongOut | None = None
+    detail: str | None = None
+
+
+class SongBatchOut(BaseModel):
+    results: list[SongBatchItemOut]
+    counts: dict[str, int]
@@ -27,6 +27,8 @@ from app.config import (
     TWITCH_CLIENT_SECRET,
 )
 from app.crud import admin_user as crud_admin_user
+from app.services.http_client import get_http_client
+from app.utils.metrics import record_cache_access, track_outbound
 from app.utils.security import verify_password
 
 GOOGLE_JWKS_URL = "https://www.googleapis.com/oauth2/v3/certs"
@@ -48,7 +50,7 @@ class AdminAuthError(HTTPException):
         super().__init__(status_code=status_code, detail=detail)
 
 
-def _fetch_google_keys() -> list[dict]:
+def fetch_google_keys() -> list[dict]:
     global _GOOGLE_KEYS, _GOOGLE_KEYS_EXPIRATION
 
     now = time.time()
@@ -57,11 +59,13 @@ def _fetch_google_keys() -> list[dict]:
             "Utilisation du cache JWKS Google (expire dans %.0fs)",
             _GOOGLE_KEYS_EXPIRATION - now,
         )
+        record_cache_access("google_jwks", hit=True)
         return _GOOGLE_KEYS
 
+    record_cache_access("google_jwks", hit=False)
     try:
-        with httpx.Client(timeout=5.0) as client:
-            response = client.get(GOOGLE_JWKS_URL)
+        with track_outbound("google_jwks"):
+            response = get_http_client().get(GOOGLE_JWKS_URL)
             response.raise_for_status()
     except httpx.HTTPError as exc:  # pragma: no cover - dépend d'un service externe
         logger.exception("Échec lors de la récupération des clés Google")
@@ -91,7 +95,7 @@ def _fetch_google_keys() -> list[dict]:
 
 
 def _load_google_public_key(kid: str) -> Any:
-    keys = _fetch_google_keys()
+    keys = fetch_google_keys()
     for jwk_data in keys:
         if jwk_data.get("kid") == kid:
             logger.debug("Clé publique trouvée pour kid=%s", kid)
@@ -278,9 +282,10 @@ def authenticate_twitch(code: str, redirect_uri: str) -> tuple[str, str, str]:
 
     # 1. Exchange the authorization code for an access token
     try:
-        with httpx.Client(timeout=10.0) as client:
-            token_resp = client.post(
+        with track_outbound("twitch_token"):
+            token_resp = get_http_client().post(
                 TWITCH_TOKEN_URL,
+                timeout=10.0,
                 data={
                     "client_id": TWITCH_CLIENT_ID,
                     "client_secret": TWITCH_CLIENT_SECRET,
@@ -317,8 +322,8 @@ def authenticate_twitch(code: str, redirect_uri: str) -> tuple[str, str, str]:
 
     # 2. Fetch user info from Helix API
     try:
-        with httpx.Client(timeout=5.0) as client:
-            users_resp = client.get(
+        with track_outbound("twitch_users"):
+            users_resp = get_http_client().get(
                 TWITCH_USERS_URL,
                 headers={
                     "Authorization": f"Bearer {access_token}",
@@ -0,0 +1,169 @@
+"""Parsing and serialization of ban-rule lists (NDJSON and CSV)."""
+
+from __future__ import annotations
+
+import csv
+import json
+from collections import deque
+from typing import AsyncIterator, Iterable, Iterator
+
+from pydantic import ValidationError
+
+from app.schemas.ban_rule import BanRuleCreate
+from app.services.tabular_io import iter_csv_rows, iter_ndjson_rows
+
+CSV_FIELDS = ("title", "artist", "link")
+CSV_MEDIA_TYPE = "text/csv"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Limite d'un import : au-delà, la requête est refusée.
+MAX_BULK_RULES = 50_000
+# Nombre maximal d'erreurs détaillées renvoyées au client.
+MAX_REPORTED_ERRORS = 20
+
+
+class BulkImportTooLarge(ValueError):
+    """Raised when an import contains more rules than ``MAX_BULK_RULES``."""
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], keepends: bool = False) -> AsyncIterator[str]:
+    """Découpe un flux d'octets en lignes UTF-8 au fil de l'eau.
+
+    Avec ``keepends``, les fins de ligne sont conservées telles quelles : le
+    lecteur CSV en a besoin pour les champs entre guillemets sur plusieurs lignes.
+    """
+
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if keepends:
+                yield line.decode("utf-8-sig") + "\n"
+            else:
+                yield line.decode("utf-8-sig").rstrip("\r")
+    if buffer:
+        yield buffer.decode("utf-8-sig") if keepends else buffer.decode("utf-8-sig").rstrip("\r")
+
+
+class _CsvRecords:
+    """Source de ``csv.reader`` alimentée au fil de l'eau, enregistrement complet par enregistrement.
+
+    Une ligne dont les guillemets ne sont pas équilibrés ouvre un champ sur
+    plusieurs lignes : elle est retenue jusqu'à la ligne qui le ferme, pour que
+    le lecteur ne s'arrête jamais au milieu d'un enregistrement.
+    """
+
+    def __init__(self) -> None:
+        self._ready: deque[str] = deque()
+        self._partial: list[str] = []
+        self._partial_size = 0
+        self._quotes = 0
+
+    def push(self, line: str) -> None:
+        self._partial.append(line)
+        self._partial_size += len(line)
+        self._quotes += line.count('"')
+        # Un champ ouvert plus long que la limite du module csv sera refusé par le lecteur.
+        if self._quotes % 2 == 0 or self._partial_size > csv.field_size_limit():
+            self.close()
+
+    def close(self) -> None:
+        self._ready.extend(self._partial)
+        self._partial.clear()
+        self._partial_size = 0
+        self._quotes = 0
+
+    def __iter__(self) -> "_CsvRecords":
+        return self
+
+    def __next__(self) -> str:
+        if not self._ready:
+            raise StopIteration
+        return self._ready.popleft()
+
+
+def _format_error(exc: ValidationError) -> str:
+    return "; ".join(error["msg"] for error in exc.errors())
+
+
+class BanRuleListParser:
+    """Accumule les règles valides et les erreurs d'une liste importée."""
+
+    def __init__(self) -> None:
+        self.rules: list[BanRuleCreate] = []
+        self.rejected = 0
+        self.errors: list[dict] = []
+
+    def _reject(self, line_number: int, detail: str) -> None:
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line_number, "detail": detail})
+
+    def _add(self, line_number: int, data: object) -> None:
+        if not isinstance(data, dict):
+            self._reject(line_number, "Objet JSON attendu")
+            return
+        try:
+            rule = BanRuleCreate.model_validate(data)
+        except ValidationError as exc:
+            self._reject(line_number, _format_error(exc))
+            return
+        if not (rule.title or rule.artist or rule.link):
+            # Des champs composés d'espaces passent le validateur du schéma.
+            self._reject(line_number, "Au moins un champ doit être renseigné")
+            return
+
+        if len(self.rules) >= MAX_BULK_RULES:
+            raise BulkImportTooLarge(f"Import limité à {MAX_BULK_RULES} règles")
+        self.rules.append(rule)
+
+    async def feed_ndjson(self, lines: AsyncIterator[str]) -> None:
+        line_number = 0
+        async for line in lines:
+            line_number += 1
+            if not line.strip():
+                continue
+            try:
+                data = json.loads(line)
+            except json.JSONDecodeError as exc:
+                self._reject(line_number, f"JSON invalide ({exc.msg})")
+                continue
+            self._add(line_number, data)
+
+    async def feed_csv(self, lines: AsyncIterator[str]) -> None:
+        """Lit un CSV ligne à ligne ; ``lines`` doit conserver ses fins de ligne."""
+
+        records = _CsvRecords()
+        reader = csv.DictReader(records)
+        async for line in lines:
+            records.push(line)
+            self._read_csv_rows(reader)
+        records.close()
+        self._read_csv_rows(reader)
+
+    def _read_csv_rows(self, reader: csv.DictReader) -> None:
+        for row in reader:
+            if not any((value or "").strip() for value in row.values() if isinstance(value, str)):
+                continue
+            self._add(reader.line_num, {field: row.get(field) for field in CSV_FIELDS})
+
+
+def iter_ndjson(rows: Iterable[tuple[str | None, str | None, str | None]]) -> Iterator[bytes]:
+    return iter_ndjson_rows(CSV_FIELDS, rows)
+
+
+def iter_csv(rows: Iterable[tuple[str | None, str | None, str | None]]) -> Iterator[bytes]:
+    return iter_csv_rows(CSV_FIELDS, rows)
+
+
+__all__ = [
+    "BanRuleListParser",
+    "BulkImportTooLarge",
+    "CSV_MEDIA_TYPE",
+    "MAX_BULK_RULES",
+    "NDJSON_MEDIA_TYPE",
+    "iter_csv",
+    "iter_lines",
+    "iter_ndjson",
+]
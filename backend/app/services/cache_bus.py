@@ -0,0 +1,366 @@
+"""Cross-worker invalidation of in-process caches.
+
+Committed changes to songs, ban rules or admin users are turned into compact
+events (a topic name). Handlers of the committing worker run immediately after
+the commit. A background publisher then bumps the topic version in the
+``cache_versions`` table and, on PostgreSQL, sends a ``NOTIFY``. Other workers
+pick the change up through ``LISTEN`` or by polling the version table (SQLite,
+PgBouncer in transaction mode, or as a safety net).
+"""
+
+from __future__ import annotations
+
+import logging
+import queue
+import select
+import threading
+import time
+import uuid
+from collections import defaultdict
+from typing import Callable, Iterable
+
+from sqlalchemy import event, select as sql_select
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.models.admin_user import AdminUser
+from app.models.ban_rule import BanRule
+from app.models.cache_version import CacheVersion
+from app.models.song import Song
+from app.utils.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+SONGS = "songs"
+BAN_RULES = "ban_rules"
+ADMIN_USERS = "admin_users"
+
+_TOPICS_BY_MODEL: dict[type, str] = {
+    Song: SONGS,
+    BanRule: BAN_RULES,
+    AdminUser: ADMIN_USERS,
+}
+
+NOTIFY_CHANNEL = "tchatrecosong_cache"
+
+# Sujets modifiés par la transaction en cours (clé de `session.info`).
+_PENDING_TOPICS_INFO = "tchatrecosong_cache_topics"
+
+CACHE_INVALIDATIONS = REGISTRY.counter(
+    "cache_invalidations_total",
+    "Invalidations de cache reçues, par sujet et origine (local/remote).",
+    ("topic", "source"),
+)
+
+Handler = Callable[[str], None]
+_handlers: dict[str, list[Handler]] = defaultdict(list)
+_remote_handlers: dict[str, list[Handler]] = defaultdict(list)
+
+
+def subscribe(topic: str, handler: Handler, *, remote_only: bool = False) -> None:
+    """Appelle ``handler(topic)`` à chaque invalidation du sujet, locale ou distante.
+
+    Avec ``remote_only``, seules les modifications des autres workers sont
+    signalées (le cache suit déjà celles de ce processus).
+    """
+
+    handlers = _remote_handlers if remote_only else _handlers
+    if handler not in handlers[topic]:
+        handlers[topic].append(handler)
+
+
+def dispatch(topics: Iterable[str], source: str = "local") -> None:
+    for topic in topics:
+        CACHE_INVALIDATIONS.inc((topic, source))
+        handlers = list(_handlers.get(topic, ()))
+        if source != "local":
+            handlers += _remote_handlers.get(topic, ())
+        for handler in handlers:
+            try:
+                handler(topic)
+            except Exception:  # pragma: no cover - un handler défaillant ne bloque pas les autres
+                logger.exception("Échec du handler d'invalidation pour %s", topic)
+
+
+def mark_changed(session: Session, *topics: str) -> None:
+    """Signale des modifications invisibles pour l'ORM (insert/delete en masse)."""
+
+    session.info.setdefault(_PENDING_TOPICS_INFO, set()).update(topics)
+
+
+def has_pending_changes(session: Session, topic: str) -> bool:
+    """Vrai si la transaction en cours a modifié ``topic`` sans l'avoir validé."""
+
+    if topic in session.info.get(_PENDING_TOPICS_INFO, ()):
+        return True
+    return any(
+        _TOPICS_BY_MODEL.get(type(instance)) == topic
+        for instance in (*session.new, *session.dirty, *session.deleted)
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_topics(session: Session, flush_context) -> None:  # noqa: ANN001
+    topics = {
+        _TOPICS_BY_MODEL[type(instance)]
+        for instance in (*session.new, *session.dirty, *session.deleted)
+        if type(instance) in _TOPICS_BY_MODEL
+    }
+    if topics:
+        mark_changed(session, *topics)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_after_commit(session: Session) -> None:
+    topics = session.info.pop(_PENDING_TOPICS_INFO, None)
+    if not topics:
+        return
+    dispatch(sorted(topics))
+    bus = _bus
+    if bus is not None:
+        bus.publish(topics)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_topics(session: Session) -> None:
+    session.info.pop(_PENDING_TOPICS_INFO, None)
+
+
+class CacheBus:
+    """Publie les versions de cache et écoute celles des autres workers."""
+
+    def __init__(
+        self,
+        engine: Engine,
+        poll_interval: float = 1.0,
+        use_listen: bool | None = None,
+        coalesce_window: float = 0.05,
+    ) -> None:
+        self.engine = engine
+        self.origin = uuid.uuid4().hex[:12]
+        self.poll_interval = poll_interval
+        self.coalesce_window = coalesce_window
+        if use_listen is None:
+            use_listen = engine.url.get_backend_name() == "postgresql"
+        self.use_listen = use_listen and engine.dialect.driver == "psycopg2"
+        self._outbox: "queue.Queue[set[str]]" = queue.Queue()
+        self._seen: dict[str, int] = {}
+        # La première scrutation initialise l'état sans rien diffuser.
+        self._primed = False
+        self._seen_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+    # -- publication -----------------------------------------------------
+
+    def publish(self, topics: Iterable[str]) -> None:
+        self._outbox.put(set(topics))
+
+    def flush(self) -> None:
+        """Publie immédiatement les événements en attente (tests, arrêt)."""
+
+        topics: set[str] = set()
+        while True:
+            try:
+                topics |= self._outbox.get_nowait()
+            except queue.Empty:
+                break
+        if topics:
+            self._write_versions(topics)
+
+    def _publisher_loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                topics = self._outbox.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            # Regroupe les rafales (votes) en une seule écriture par sujet.
+            time.sleep(self.coalesce_window)
+            while True:
+                try:
+                    topics |= self._outbox.get_nowait()
+                except queue.Empty:
+                    break
+            try:
+                self._write_versions(topics)
+            except SQLAlchemyError:
+                logger.exception("Échec de publication des versions de cache %s", sorted(topics))
+
+    def _write_versions(self, topics: set[str]) -> None:
+        if self.engine.dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        published: dict[str, int] = {}
+        with self.engine.begin() as connection:
+            for topic in sorted(topics):
+                # Upsert atomique : deux workers qui créent le même sujet ne se gênent pas.
+                statement = insert(CacheVersion).values(topic=topic, version=1)
+                result = connection.execute(
+                    statement.on_conflict_do_update(
+                        index_elements=[CacheVersion.topic],
+                        set_={"version": CacheVersion.version + 1},
+                    ).returning(CacheVersion.version)
+                ).scalar_one()
+                published[topic] = int(result)
+
+            if self.engine.url.get_backend_name() == "postgresql":
+                payload = self.origin + ";" + ",".join(
+                    f"{topic}={version}" for topic, version in published.items()
+                )
+                connection.exec_driver_sql("SELECT pg_notify(%s, %s)", (NOTIFY_CHANNEL, payload))
+
+        with self._seen_lock:
+            for topic, version in published.items():
+                # Notre propre écriture ne doit pas être redistribuée par la scrutation,
+                # sauf si un autre worker a publié entre-temps.
+                if self._seen.get(topic, 0) == version - 1:
+                    self._seen[topic] = version
+
+    # -- réception -------------------------------------------------------
+
+    def poll_once(self) -> list[str]:
+        """Compare la table des versions à la dernière vue et diffuse les écarts."""
+
+        with self.engine.connect() as connection:
+            rows = connection.execute(sql_select(CacheVersion.topic, CacheVersion.version)).all()
+
+        changed: list[str] = []
+        with self._seen_lock:
+            for topic, version in rows:
+                if version > self._seen.get(topic, 0):
+                    if self._primed:
+                        changed.append(topic)
+                    self._seen[topic] = version
+            self._primed = True
+
+        if changed:
+            dispatch(changed, source="remote")
+        return changed
+
+    def _handle_notification(self, payload: str) -> None:
+        origin, _, body = payload.partition(";")
+        if origin == self.origin:
+            return
+        changed: list[str] = []
+        with self._seen_lock:
+            for item in body.split(","):
+                topic, _, raw_version = item.partition("=")
+                if not topic or not raw_version.isdigit():
+                    continue
+                version = int(raw_version)
+                if version > self._seen.get(topic, 0):
+                    self._seen[topic] = version
+                    changed.append(topic)
+        if changed:
+            dispatch(changed, source="remote")
+
+    def _poll_loop(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            try:
+                self.poll_once()
+            except SQLAlchemyError:
+                logger.warning("Scrutation des versions de cache impossible", exc_info=True)
+
+    def _listen_loop(self) -> None:  # pragma: no cover - nécessite PostgreSQL
+        backoff = 1.0
+        while not self._stop.is_set():
+            connection = None
+            try:
+                cargs, cparams = self.engine.dialect.create_connect_args(self.engine.url)
+                connection = self.engine.dialect.dbapi.connect(*cargs, **cparams)
+                connection.set_session(autocommit=True)
+                with connection.cursor() as cursor:
+                    cursor.execute(f"LISTEN {NOTIFY_CHANNEL}")
+                logger.info("Écoute des invalidations de cache sur %s", NOTIFY_CHANNEL)
+                backoff = 1.0
+                # Rattrape ce qui a pu être publié pendant la (re)connexion.
+                self.poll_once()
+                while not self._stop.is_set():
+                    ready, _, _ = select.select([connection], [], [], 1.0)
+                    if not ready:
+                        continue
+                    connection.poll()
+                    while connection.notifies:
+                        notification = connection.notifies.pop(0)
+                        self._handle_notification(notification.payload)
+            except Exception:
+                logger.warning(
+                    "Connexion LISTEN perdue, nouvelle tentative dans %.0fs", backoff, exc_info=True
+                )
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                if connection is not None:
+                    try:
+                        connection.close()
+                    except Exception:
+                        pass
+
+    # -- cycle de vie ----------------------------------------------------
+
+    def start(self) -> None:
+        try:
+            self.poll_once()
+        except SQLAlchemyError:
+            logger.warning("Table cache_versions indisponible au démarrage", exc_info=True)
+
+        targets: list[tuple[Callable, tuple]] = [(self._publisher_loop, ())]
+        if self.use_listen:
+            targets.append((self._listen_loop, ()))
+            # Filet de sécurité si une notification est perdue.
+            targets.append((self._poll_loop, (max(self.poll_interval, 30.0),)))
+        else:
+            targets.append((self._poll_loop, (self.poll_interval,)))
+
+        for target, args in targets:
+            thread = threading.Thread(
+                target=target, args=args, name=f"cache-bus-{target.__name__}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self) -> None:
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=5)
+        self._threads.clear()
+        try:
+            self.flush()
+        except SQLAlchemyError:
+            logger.warning("Versions de cache non publiées à l'arrêt", exc_info=True)
+
+
+_bus: CacheBus | None = None
+
+
+def start_cache_bus(engine: Engine, poll_interval: float = 1.0, use_listen: bool | None = None) -> CacheBus:
+    global _bus
+    stop_cache_bus()
+    _bus = CacheBus(engine, poll_interval=poll_interval, use_listen=use_listen)
+    _bus.start()
+    mode = "LISTEN/NOTIFY" if _bus.use_listen else f"scrutation toutes les {poll_interval:g}s"
+    logger.info("Bus d'invalidation de cache démarré (%s)", mode)
+    return _bus
+
+
+def stop_cache_bus() -> None:
+    global _bus
+    bus, _bus = _bus, None
+    if bus is not None:
+        bus.stop()
+
+
+__all__ = [
+    "ADMIN_USERS",
+    "BAN_RULES",
+    "CacheBus",
+    "SONGS",
+    "dispatch",
+    "has_pending_changes",
+    "mark_changed",
+    "start_cache_bus",
+    "stop_cache_bus",
+    "subscribe",
+]
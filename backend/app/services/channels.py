@@ -0,0 +1,117 @@
+"""Chaînes hébergées : résolution ``login → id`` et dépendance FastAPI.
+
+Les routes historiques (``/songs``, ``/ban``, ``/public/submissions``)
+servent la chaîne par défaut ; les mêmes routeurs sont montés sous
+``/channels/{channel}/...`` pour les autres chaînes. La correspondance
+login → identifiant ne change jamais une fois créée : elle est gardée en
+mémoire par moteur et ne coûte aucune requête après la première.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from weakref import WeakKeyDictionary
+
+from fastapi import Depends, HTTPException, Request, status
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.crud import channel as crud_channel
+from app.database.connection import get_read_db
+from app.models.channel import DEFAULT_CHANNEL_ID, DEFAULT_CHANNEL_LOGIN, Channel
+from app.utils.metrics import record_cache_access
+
+logger = logging.getLogger(__name__)
+
+# Nom du paramètre de chemin des routes ``/channels/{channel}/...``.
+CHANNEL_PATH_PARAM = "channel"
+
+_ids: "WeakKeyDictionary[object, dict[str, int]]" = WeakKeyDictionary()
+_ids_lock = threading.Lock()
+
+
+def _known_ids(db: Session) -> dict[str, int]:
+    bind = db.get_bind()
+    engine = getattr(bind, "engine", bind)
+    with _ids_lock:
+        known = _ids.get(engine)
+        if known is None:
+            known = _ids[engine] = {}
+        return known
+
+
+def resolve_channel(db: Session, login: str) -> int | None:
+    """Identifiant de la chaîne ``login``, ou ``None`` si elle n'existe pas."""
+
+    normalized = crud_channel.normalize_login(login)
+    if normalized == DEFAULT_CHANNEL_LOGIN:
+        return DEFAULT_CHANNEL_ID
+    known = _known_ids(db)
+    channel_id = known.get(normalized)
+    if channel_id is not None:
+        record_cache_access("channels", hit=True)
+        return channel_id
+
+    record_cache_access("channels", hit=False)
+    channel = crud_channel.get_by_login(db, normalized)
+    if channel is None:
+        return None
+    known[normalized] = channel.id
+    return channel.id
+
+
+def get_or_create_channel(db: Session, login: str, display_name: str | None = None) -> int:
+    channel_id = resolve_channel(db, login)
+    if channel_id is not None:
+        return channel_id
+    try:
+        channel = crud_channel.create_channel(db, login=login, display_name=display_name)
+    except IntegrityError:
+        # Créée entre-temps par un autre worker.
+        db.rollback()
+        channel_id = resolve_channel(db, login)
+        if channel_id is None:
+            raise
+        return channel_id
+    logger.info("Chaîne %s créée (id=%s)", channel.login, channel.id)
+    _known_ids(db)[channel.login] = channel.id
+    return channel.id
+
+
+def ensure_default_channel(db: Session) -> None:
+    """Crée la ligne de la chaîne par défaut, référencée par les données existantes."""
+
+    if db.get(Channel, DEFAULT_CHANNEL_ID) is not None:
+        return
+    crud_channel.create_channel(db, login=DEFAULT_CHANNEL_LOGIN, channel_id=DEFAULT_CHANNEL_ID)
+    logger.info("Chaîne par défaut créée (id=%s)", DEFAULT_CHANNEL_ID)
+
+
+def current_channel(request: Request, db: Session = Depends(get_read_db)) -> int:
+    """Chaîne visée par la requête : celle du chemin, sinon la chaîne par défaut."""
+
+    login = request.path_params.get(CHANNEL_PATH_PARAM)
+    if login is None:
+        return DEFAULT_CHANNEL_ID
+    channel_id = resolve_channel(db, login)
+    if channel_id is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Chaîne introuvable")
+    return channel_id
+
+
+def channel_key(request: Request) -> str:
+    """Clé de limitation de débit commune à toute une chaîne."""
+
+    login = request.path_params.get(CHANNEL_PATH_PARAM)
+    return crud_channel.normalize_login(login) if login else DEFAULT_CHANNEL_LOGIN
+
+
+__all__ = [
+    "CHANNEL_PATH_PARAM",
+    "channel_key",
+    "current_channel",
+    "ensure_default_channel",
+    "get_or_create_channel",
+    "resolve_channel",
+]
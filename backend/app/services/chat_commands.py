@@ -0,0 +1,232 @@
+"""Commandes du chat Twitch (``!vote 12``, ``!reco <lien>``) et agrégation des votes."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Callable, NamedTuple
+
+from sqlalchemy.orm import Session
+
+from app.crud import song as crud_song
+from app.models.channel import DEFAULT_CHANNEL_ID
+from app.utils.metrics import REGISTRY
+
+VOTE_COMMANDS = frozenset({"vote", "v", "+1"})
+RECO_COMMANDS = frozenset({"reco", "sr", "songrequest"})
+
+# Couples (spectateur, morceau) mémorisés pour refuser les votes répétés.
+MAX_REMEMBERED_VOTES = 200_000
+# Échecs d'écriture consécutifs avant d'abandonner les votes en attente.
+MAX_FLUSH_ATTEMPTS = 3
+
+CHAT_COMMANDS = REGISTRY.counter(
+    "chat_commands_total",
+    "Commandes du chat traitées, par commande et résultat.",
+    ("command", "outcome"),
+)
+CHAT_VOTE_FLUSHES = REGISTRY.counter(
+    "chat_vote_flushes_total", "Écritures groupées des votes du chat."
+)
+CHAT_VOTE_STATEMENTS = REGISTRY.counter(
+    "chat_vote_statements_total",
+    "Instructions SQL émises pour écrire les votes du chat (amplification d'écriture).",
+)
+CHAT_VOTES_WRITTEN = REGISTRY.counter(
+    "chat_votes_written_total", "Votes du chat écrits en base."
+)
+
+
+class VoteBatch(NamedTuple):
+    """Votes retirés de l'agrégateur : voix par morceau et votants concernés."""
+
+    counts: Counter[int]
+    voters: list[tuple[str, int]]
+
+    def __bool__(self) -> bool:
+        return bool(self.counts)
+
+
+class ChatCommand(NamedTuple):
+    name: str
+    argument: str
+
+
+def parse_command(text: str) -> ChatCommand | None:
+    """``"!Vote  12 merci"`` → ``ChatCommand("vote", "12 merci")``."""
+
+    if not text.startswith("!"):
+        return None
+    name, _, argument = text[1:].partition(" ")
+    if not name:
+        return None
+    return ChatCommand(name.lower(), argument.strip())
+
+
+def parse_song_id(argument: str) -> int | None:
+    token = argument.partition(" ")[0].lstrip("#")
+    if not token.isdigit() or len(token) > 12:
+        return None
+    song_id = int(token)
+    return song_id or None
+
+
+class VoteAggregator:
+    """Compte les votes du chat en mémoire et les écrit par lots.
+
+    Un spectateur ne vote qu'une fois par morceau (mémoire bornée aux
+    ``max_remembered`` derniers couples). Les votes acceptés sont cumulés par
+    morceau puis écrits par :func:`app.crud.song.add_votes`. Un lot dont
+    l'écriture échoue est remis en attente par :meth:`restore` ; après
+    ``MAX_FLUSH_ATTEMPTS`` échecs consécutifs il est abandonné et ses votants
+    oubliés, pour qu'ils puissent revoter.
+    """
+
+    def __init__(
+        self, max_remembered: int = MAX_REMEMBERED_VOTES, channel_id: int = DEFAULT_CHANNEL_ID
+    ) -> None:
+        self.max_remembered = max_remembered
+        self.channel_id = channel_id
+        self._voters: OrderedDict[tuple[str, int], None] = OrderedDict()
+        self._counts: Counter[int] = Counter()
+        # Votants dont la voix n'est pas encore écrite.
+        self._unwritten: list[tuple[str, int]] = []
+        self._failures = 0
+        self._lock = threading.Lock()
+        self.stats: Counter[str] = Counter()
+
+    def add(self, user: str, song_id: int) -> bool:
+        key = (user, song_id)
+        with self._lock:
+            if key in self._voters:
+                self.stats["duplicates"] += 1
+                return False
+            self._voters[key] = None
+            if len(self._voters) > self.max_remembered:
+                self._voters.popitem(last=False)
+            self._counts[song_id] += 1
+            self._unwritten.append(key)
+            self.stats["accepted"] += 1
+            return True
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def take(self) -> VoteBatch:
+        """Retire les votes en attente avec leurs votants, à rendre par :meth:`restore` en cas d'échec."""
+
+        with self._lock:
+            batch = VoteBatch(self._counts, self._unwritten)
+            self._counts, self._unwritten = Counter(), []
+        return batch
+
+    def drain(self) -> Counter[int]:
+        return self.take().counts
+
+    def restore(self, batch: VoteBatch) -> bool:
+        """Remet en attente un lot dont l'écriture a échoué ; retourne ``False`` s'il est abandonné."""
+
+        total = sum(batch.counts.values())
+        with self._lock:
+            self._failures += 1
+            if self._failures < MAX_FLUSH_ATTEMPTS:
+                self._counts.update(batch.counts)
+                self._unwritten.extend(batch.voters)
+                self.stats["requeued"] += total
+                return True
+            self._failures = 0
+            for key in batch.voters:
+                self._voters.pop(key, None)
+            self.stats["discarded"] += total
+            return False
+
+    def flush(self, db: Session, counts: Counter[int] | None = None) -> int:
+        """Écrit ``counts`` (par défaut tout ce qui est en attente) ; retourne les morceaux touchés."""
+
+        counts = self.drain() if counts is None else counts
+        if not counts:
+            return 0
+        # add_votes émet un UPDATE par nombre de voix et par tranche d'IN.
+        songs_per_delta = Counter(delta for delta in counts.values() if delta > 0)
+        statements = sum(
+            -(-songs // crud_song.VOTE_CHUNK_SIZE) for songs in songs_per_delta.values()
+        )
+        updated = crud_song.add_votes(db, counts, channel_id=self.channel_id)
+        with self._lock:
+            self._failures = 0
+        CHAT_VOTE_FLUSHES.inc()
+        CHAT_VOTE_STATEMENTS.inc(amount=statements)
+        CHAT_VOTES_WRITTEN.inc(amount=sum(counts.values()))
+        self.stats["flushes"] += 1
+        self.stats["statements"] += statements
+        self.stats["written"] += sum(counts.values())
+        self.stats["unknown_songs"] += len(counts) - updated
+        return updated
+
+    @property
+    def write_amplification(self) -> float:
+        """Instructions SQL par vote accepté (1.0 = une écriture par vote)."""
+
+        accepted = self.stats["accepted"]
+        return self.stats["statements"] / accepted if accepted else 0.0
+
+
+class ChatCommandProcessor:
+    """Route les commandes du chat : votes vers l'agrégateur, ``!reco`` vers les liens."""
+
+    def __init__(
+        self,
+        votes: VoteAggregator | None = None,
+        submit_link: Callable[[str, str], bool] | None = None,
+    ) -> None:
+        self.votes = votes or VoteAggregator()
+        self.submit_link = submit_link
+        self.stats: Counter[str] = Counter()
+        self._started = time.monotonic()
+
+    def handle(self, user: str, text: str) -> bool:
+        """Traite ``text`` si c'est une commande connue ; retourne ``True`` dans ce cas."""
+
+        command = parse_command(text)
+        if command is None:
+            return False
+
+        if command.name in VOTE_COMMANDS:
+            song_id = parse_song_id(command.argument)
+            if song_id is None:
+                outcome = "invalid"
+            else:
+                outcome = "accepted" if self.votes.add(user, song_id) else "duplicate"
+            self._count("vote", outcome)
+            return True
+
+        if command.name in RECO_COMMANDS:
+            if self.submit_link is None or not command.argument:
+                self._count("reco", "invalid")
+            else:
+                accepted = self.submit_link(user, command.argument)
+                self._count("reco", "accepted" if accepted else "rejected")
+            return True
+
+        return False
+
+    def _count(self, command: str, outcome: str) -> None:
+        self.stats[command] += 1
+        self.stats[f"{command}_{outcome}"] += 1
+        CHAT_COMMANDS.inc((command, outcome))
+
+    def commands_per_second(self) -> float:
+        elapsed = time.monotonic() - self._started
+        handled = self.stats["vote"] + self.stats["reco"]
+        return handled / elapsed if elapsed > 0 else 0.0
+
+
+__all__ = [
+    "ChatCommand",
+    "ChatCommandProcessor",
+    "VoteAggregator",
+    "VoteBatch",
+    "parse_command",
+    "parse_song_id",
+]
@@ -0,0 +1,43 @@
+"""Client HTTP partagé pour les appels sortants (oEmbed, Google, Twitch).
+
+Un seul :class:`httpx.Client` garde les connexions TLS ouvertes entre deux
+requêtes au lieu d'en rouvrir une à chaque soumission. Il est créé au
+démarrage (ou au premier appel) et fermé à l'arrêt ; ``httpx.Client`` peut
+être utilisé depuis plusieurs threads.
+"""
+
+from __future__ import annotations
+
+import threading
+
+import httpx
+
+DEFAULT_TIMEOUT = 5.0
+LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=30.0)
+
+_client: httpx.Client | None = None
+_lock = threading.Lock()
+
+
+def get_http_client() -> httpx.Client:
+    global _client
+
+    client = _client
+    if client is not None and not client.is_closed:
+        return client
+    with _lock:
+        if _client is None or _client.is_closed:
+            _client = httpx.Client(timeout=DEFAULT_TIMEOUT, limits=LIMITS)
+        return _client
+
+
+def close_http_client() -> None:
+    global _client
+
+    with _lock:
+        client, _client = _client, None
+    if client is not None:
+        client.close()
+
+
+__all__ = ["close_http_client", "get_http_client"]
@@ -0,0 +1,200 @@
+"""Classement en mémoire des morceaux les plus votés (``GET /songs/top``).
+
+Chaque écriture de voix (vote web, soumission, lot du chat) signale au
+classement le nouveau total du morceau, appliqué au commit de la
+transaction. Les suppressions (bannissements, suppression admin) et les
+écritures des autres workers, reçues par le bus d'invalidation, marquent le
+classement comme périmé : il est rechargé à la lecture suivante par une seule
+requête ``ORDER BY votes DESC LIMIT capacity``.
+
+Chaque chaîne a son propre classement, servi par l'index
+``(channel_id, votes)`` : recharger celui d'une chaîne ne lit que ses lignes.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import defaultdict
+from typing import Iterable, NamedTuple
+from weakref import WeakKeyDictionary
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.models.channel import DEFAULT_CHANNEL_ID
+from app.models.song import Song
+from app.services import cache_bus
+from app.utils.metrics import record_cache_access
+from app.utils.topk import TopK
+
+# Plus grand ``k`` servi par /songs/top.
+MAX_K = 100
+# Marge au-delà de MAX_K : moins de rechargements si des morceaux du haut sont supprimés.
+CAPACITY = 2 * MAX_K
+
+_PENDING_INFO = "tchatrecosong_leaderboard_rows"
+_STALE_INFO = "tchatrecosong_leaderboard_stale"
+
+
+class LeaderboardEntry(NamedTuple):
+    """Mêmes champs que :class:`app.schemas.song.SongOut`."""
+
+    id: int
+    title: str
+    artist: str
+    link: str
+    thumbnail: str | None
+    comment: str | None
+    votes: int
+
+
+ENTRY_COLUMNS = (Song.id, Song.title, Song.artist, Song.link, Song.thumbnail, Song.comment, Song.votes)
+
+
+def entry_of(song: Song) -> LeaderboardEntry:
+    return LeaderboardEntry(
+        song.id, song.title, song.artist, song.link, song.thumbnail, song.comment, song.votes
+    )
+
+
+class Leaderboard:
+    def __init__(self, capacity: int = CAPACITY, channel_id: int = DEFAULT_CHANNEL_ID) -> None:
+        self.channel_id = channel_id
+        self._ranking: TopK[LeaderboardEntry] = TopK(capacity)
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._version = 0
+        self._loaded_version: int | None = None
+        # Écritures validées pendant un rechargement, rejouées ensuite.
+        self._replay: list[LeaderboardEntry] | None = None
+
+    @property
+    def is_stale(self) -> bool:
+        return self._loaded_version != self._version
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._version += 1
+
+    def apply(self, entries: Iterable[LeaderboardEntry]) -> None:
+        entries = list(entries)
+        with self._lock:
+            if self._replay is not None:
+                self._replay.extend(entries)
+            if self._loaded_version is None:
+                return
+            for entry in entries:
+                self._ranking.offer(entry.id, entry.votes, entry)
+
+    def top(self, db: Session, k: int) -> list[LeaderboardEntry]:
+        with self._lock:
+            if not self.is_stale:
+                record_cache_access("leaderboard", hit=True)
+                return self._ranking.top(k)
+        record_cache_access("leaderboard", hit=False)
+        self.reload(db)
+        with self._lock:
+            return self._ranking.top(k)
+
+    def reload(self, db: Session) -> None:
+        with self._reload_lock:
+            self._reload(db)
+
+    def _reload(self, db: Session) -> None:
+        with self._lock:
+            version = self._version
+            self._replay = []
+        try:
+            rows = db.execute(
+                select(*ENTRY_COLUMNS)
+                .where(Song.channel_id == self.channel_id)
+                .order_by(Song.votes.desc(), Song.id)
+                .limit(self._ranking.capacity)
+            ).all()
+        except Exception:
+            with self._lock:
+                self._replay = None
+            raise
+        with self._lock:
+            replay, self._replay = self._replay, None
+            self._ranking.load([(row.id, row.votes, LeaderboardEntry(*row)) for row in rows])
+            for entry in replay:
+                self._ranking.offer(entry.id, entry.votes, entry)
+            # Une suppression survenue pendant la lecture impose un nouveau rechargement.
+            self._loaded_version = version
+
+
+# Un classement par (moteur, chaîne).
+_boards: "WeakKeyDictionary[object, dict[int, Leaderboard]]" = WeakKeyDictionary()
+_boards_lock = threading.Lock()
+
+
+def get_leaderboard(db: Session, channel_id: int = DEFAULT_CHANNEL_ID) -> Leaderboard:
+    bind = db.get_bind()
+    engine = getattr(bind, "engine", bind)
+    with _boards_lock:
+        boards = _boards.get(engine)
+        if boards is None:
+            boards = _boards[engine] = {}
+        board = boards.get(channel_id)
+        if board is None:
+            board = boards[channel_id] = Leaderboard(channel_id=channel_id)
+        return board
+
+
+def track(db: Session, *entries: LeaderboardEntry, channel_id: int = DEFAULT_CHANNEL_ID) -> None:
+    """Nouveaux totaux de voix, appliqués au classement si la transaction est validée."""
+
+    db.info.setdefault(_PENDING_INFO, defaultdict(list))[channel_id].extend(entries)
+
+
+def mark_removed(db: Session, channel_id: int = DEFAULT_CHANNEL_ID) -> None:
+    """Des morceaux sont supprimés : le classement sera rechargé après le commit."""
+
+    db.info.setdefault(_STALE_INFO, set()).add(channel_id)
+
+
+def top_songs(db: Session, k: int, channel_id: int = DEFAULT_CHANNEL_ID) -> list[LeaderboardEntry]:
+    return get_leaderboard(db, channel_id).top(db, k)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_committed(session: Session) -> None:
+    pending = session.info.pop(_PENDING_INFO, None) or {}
+    stale = session.info.pop(_STALE_INFO, None) or set()
+    for channel_id, entries in pending.items():
+        get_leaderboard(session, channel_id).apply(entries)
+    for channel_id in stale:
+        get_leaderboard(session, channel_id).invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_uncommitted(session: Session) -> None:
+    session.info.pop(_PENDING_INFO, None)
+    session.info.pop(_STALE_INFO, None)
+
+
+def _invalidate_all(topic: str) -> None:
+    with _boards_lock:
+        boards = [board for per_channel in _boards.values() for board in per_channel.values()]
+    for board in boards:
+        board.invalidate()
+
+
+# Les écritures locales sont déjà suivies par `track` : seules celles des
+# autres workers rechargent le classement.
+cache_bus.subscribe(cache_bus.SONGS, _invalidate_all, remote_only=True)
+
+
+__all__ = [
+    "CAPACITY",
+    "ENTRY_COLUMNS",
+    "Leaderboard",
+    "LeaderboardEntry",
+    "MAX_K",
+    "entry_of",
+    "get_leaderboard",
+    "mark_removed",
+    "top_songs",
+    "track",
+]
@@ -0,0 +1,364 @@
+"""Rate limiting for public endpoints, with pluggable counter storage.
+
+Two storages are available:
+
+- :class:`MemoryRateLimitStorage` (GCRA) keeps one timestamp per client in the
+  process. It is the default and suits a single uvicorn worker.
+- :class:`SQLiteRateLimitStorage` shares sliding-window counters between the
+  workers of a host through a SQLite file in WAL mode. Increments are buffered
+  locally and flushed in batches, so most checks never touch the file.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Protocol
+
+from fastapi import HTTPException, Request, status
+
+from app.config import TRUSTED_PROXY_HOPS
+from app.utils.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_DETAIL = "Trop de requêtes. Réessaie dans quelques instants."
+
+RATE_LIMIT_DECISIONS = REGISTRY.counter(
+    "rate_limit_decisions_total",
+    "Décisions du limiteur de débit par limiteur et résultat.",
+    ("limiter", "result"),
+)
+
+_PERIODS = {
+    "second": 1.0,
+    "minute": 60.0,
+    "hour": 3600.0,
+    "day": 86400.0,
+}
+
+
+def parse_rate(rate: str) -> tuple[int, float]:
+    """Convertit ``"10/minute"`` (ou ``"5/30 seconds"``) en ``(limite, période en s)``."""
+
+    try:
+        raw_limit, raw_period = rate.split("/", 1)
+        limit = int(raw_limit.strip())
+        parts = raw_period.strip().lower().split()
+        multiplier = float(parts[0]) if len(parts) == 2 else 1.0
+        unit = parts[-1].rstrip("s")
+        period = _PERIODS[unit] * multiplier
+    except (ValueError, KeyError, IndexError) as exc:
+        raise ValueError(f"Limite de débit invalide : {rate!r}") from exc
+
+    if limit <= 0 or period <= 0:
+        raise ValueError(f"Limite de débit invalide : {rate!r}")
+    return limit, period
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    allowed: bool
+    remaining: int
+    retry_after: float = 0.0
+
+
+class RateLimitStorage(Protocol):
+    def hit(self, key: str, limit: int, period: float, now: float | None = None) -> RateLimitResult:
+        ...
+
+    def reset(self) -> None:
+        ...
+
+
+class MemoryRateLimitStorage:
+    """GCRA en mémoire : un seul horodatage (TAT) par clé, O(1) par vérification.
+
+    Autorise une rafale de ``limit`` requêtes, puis une requête toutes les
+    ``period / limit`` secondes.
+    """
+
+    def __init__(self, prune_threshold: int = 10_000) -> None:
+        self._tat: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._prune_threshold = prune_threshold
+
+    def hit(self, key: str, limit: int, period: float, now: float | None = None) -> RateLimitResult:
+        now = time.monotonic() if now is None else now
+        interval = period / limit
+
+        with self._lock:
+            tat = max(self._tat.get(key, now), now)
+            new_tat = tat + interval
+            allow_at = new_tat - period
+            if allow_at > now:
+                return RateLimitResult(False, 0, allow_at - now)
+
+            self._tat[key] = new_tat
+            if len(self._tat) > self._prune_threshold:
+                self._prune(now)
+
+        remaining = int((period - (new_tat - now)) / interval)
+        return RateLimitResult(True, max(0, remaining))
+
+    def _prune(self, now: float) -> None:
+        # Une clé dont le TAT est passé est équivalente à une clé absente.
+        expired = [key for key, tat in self._tat.items() if tat <= now]
+        for key in expired:
+            del self._tat[key]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._tat.clear()
+
+
+class SQLiteRateLimitStorage:
+    """Compteurs à fenêtre glissante partagés entre workers via un fichier SQLite.
+
+    Chaque worker garde ses incréments en attente et une copie des compteurs
+    partagés ; il les synchronise au plus toutes les ``flush_interval`` secondes
+    (ou dès ``batch_size`` incréments en attente) dans une seule transaction.
+    Le dépassement toléré est donc borné par ce que les autres workers ont
+    accepté depuis leur dernière synchronisation. ``flush_interval=0`` écrit
+    chaque incrément immédiatement.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        flush_interval: float = 0.25,
+        batch_size: int = 256,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.path = str(path)
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._pending: dict[tuple[str, int], int] = {}
+        self._expires: dict[tuple[str, int], float] = {}
+        self._pending_total = 0
+        self._shared: dict[str, dict[int, int]] = {}
+        self._last_sync = float("-inf")
+        self._connection = self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(
+            self.path, timeout=5.0, isolation_level=None, check_same_thread=False
+        )
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limit_counters ("
+            " key TEXT NOT NULL,"
+            " window INTEGER NOT NULL,"
+            " count INTEGER NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " PRIMARY KEY (key, window)"
+            ") WITHOUT ROWID"
+        )
+        return connection
+
+    def hit(self, key: str, limit: int, period: float, now: float | None = None) -> RateLimitResult:
+        now = self._clock() if now is None else now
+        window = int(now // period)
+        elapsed = now - window * period
+        weight = 1.0 - elapsed / period
+
+        with self._lock:
+            if (
+                now - self._last_sync >= self.flush_interval
+                or self._pending_total >= self.batch_size
+            ):
+                self._sync(now)
+
+            counts = self._shared.get(key)
+            if counts is None:
+                counts = self._load(key, window)
+
+            current = counts.get(window, 0) + self._pending.get((key, window), 0)
+            previous = counts.get(window - 1, 0) + self._pending.get((key, window - 1), 0)
+            estimate = previous * weight + current
+
+            if estimate + 1 > limit:
+                return RateLimitResult(
+                    False, 0, self._retry_after(limit, period, elapsed, current, previous)
+                )
+
+            slot = (key, window)
+            self._pending[slot] = self._pending.get(slot, 0) + 1
+            # La fenêtre sert encore de « fenêtre précédente » pendant une période.
+            self._expires[slot] = (window + 2) * period
+            self._pending_total += 1
+            if self.flush_interval <= 0:
+                self._sync(now)
+
+        return RateLimitResult(True, max(0, int(limit - estimate - 1)))
+
+    @staticmethod
+    def _retry_after(limit: int, period: float, elapsed: float, current: int, previous: int) -> float:
+        if current + 1 > limit or previous == 0:
+            return period - elapsed
+        # Instant où le poids de la fenêtre précédente laisse passer une requête.
+        needed = period * (1.0 - (limit - 1 - current) / previous)
+        return max(0.0, min(period - elapsed, needed - elapsed))
+
+    def _load(self, key: str, window: int) -> dict[int, int]:
+        rows = self._connection.execute(
+            "SELECT window, count FROM rate_limit_counters WHERE key = ? AND window >= ?",
+            (key, window - 1),
+        ).fetchall()
+        counts = dict(rows)
+        self._shared[key] = counts
+        return counts
+
+    def _sync(self, now: float) -> None:
+        if self._pending:
+            try:
+                self._connection.execute("BEGIN IMMEDIATE")
+                self._connection.executemany(
+                    "INSERT INTO rate_limit_counters (key, window, count, expires_at) "
+                    "VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (key, window) DO UPDATE SET count = count + excluded.count",
+                    [
+                        (key, window, count, self._expires[(key, window)])
+                        for (key, window), count in self._pending.items()
+                    ],
+                )
+                self._connection.execute(
+                    "DELETE FROM rate_limit_counters WHERE expires_at < ?", (now,)
+                )
+                self._connection.execute("COMMIT")
+            except sqlite3.Error:
+                if self._connection.in_transaction:
+                    self._connection.execute("ROLLBACK")
+                logger.exception("Échec d'écriture des compteurs de limitation (%s)", self.path)
+                # Les incréments restent en attente pour la prochaine tentative.
+                self._last_sync = now
+                return
+            self._pending.clear()
+            self._expires.clear()
+            self._pending_total = 0
+
+        self._shared.clear()
+        self._last_sync = now
+
+    def flush(self) -> None:
+        """Écrit immédiatement les incréments en attente (arrêt, tests)."""
+
+        with self._lock:
+            self._sync(self._clock())
+
+    def reset(self) -> None:
+        with self._lock:
+            self._pending.clear()
+            self._expires.clear()
+            self._pending_total = 0
+            self._shared.clear()
+            self._last_sync = float("-inf")
+            self._connection.execute("DELETE FROM rate_limit_counters")
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+def create_storage(spec: str | None, flush_interval: float = 0.25) -> RateLimitStorage:
+    """Construit le stockage désigné par ``RATE_LIMIT_STORAGE``.
+
+    ``memory`` (défaut) ou ``sqlite:///chemin/vers/fichier.db``.
+    """
+
+    cleaned = (spec or "memory").strip()
+    if cleaned.lower() == "memory":
+        return MemoryRateLimitStorage()
+    if cleaned.lower().startswith("sqlite:///"):
+        return SQLiteRateLimitStorage(cleaned[len("sqlite:///") :], flush_interval=flush_interval)
+    raise ValueError(f"Stockage de limitation inconnu : {spec!r}")
+
+
+def forwarded_address(peer: str, forwarded_for: list[str], trusted_hops: int) -> str:
+    """Adresse du client derrière ``trusted_hops`` proxys de confiance.
+
+    Chaque proxy ajoute à droite de ``X-Forwarded-For`` l'adresse de son
+    interlocuteur ; le dernier est ``peer``. Les ``trusted_hops`` adresses les
+    plus à droite de la chaîne sont donc celles des proxys, et la suivante est
+    la première qu'aucun d'eux n'a pu recevoir falsifiée. Les entrées plus à
+    gauche viennent du client et sont ignorées.
+    """
+
+    if trusted_hops <= 0:
+        return peer
+    chain = [
+        entry.strip()
+        for header in forwarded_for
+        for entry in header.split(",")
+        if entry.strip()
+    ]
+    chain.append(peer)
+    # Chaîne plus courte que prévu : la requête n'est pas passée par tous les
+    # proxys, l'entrée la plus à gauche a tout de même été ajoutée par l'un d'eux.
+    return chain[max(0, len(chain) - 1 - trusted_hops)]
+
+
+def client_address(request: Request) -> str:
+    peer = request.client.host if request.client else "127.0.0.1"
+    return forwarded_address(peer, request.headers.getlist("x-forwarded-for"), TRUSTED_PROXY_HOPS)
+
+
+class RateLimiter:
+    """Dépendance FastAPI qui répond 429 quand un client dépasse ``rate``."""
+
+    def __init__(
+        self,
+        rate: str,
+        storage: RateLimitStorage | None = None,
+        key_func: Callable[[Request], str] = client_address,
+        name: str = "default",
+    ) -> None:
+        self.rate = rate
+        self.limit, self.period = parse_rate(rate)
+        self.storage = storage or MemoryRateLimitStorage()
+        self.key_func = key_func
+        self.name = name
+        self.enabled = True
+
+    def check(self, key: str) -> RateLimitResult:
+        result = self.storage.hit(f"{self.name}:{key}", self.limit, self.period)
+        RATE_LIMIT_DECISIONS.inc((self.name, "allowed" if result.allowed else "limited"))
+        return result
+
+    def __call__(self, request: Request) -> None:
+        if not self.enabled:
+            return
+        result = self.check(self.key_func(request))
+        if not result.allowed:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=RATE_LIMIT_DETAIL,
+                headers={"Retry-After": str(max(1, math.ceil(result.retry_after)))},
+            )
+
+    def reset(self) -> None:
+        self.storage.reset()
+
+
+__all__ = [
+    "MemoryRateLimitStorage",
+    "RATE_LIMIT_DETAIL",
+    "RateLimitResult",
+    "RateLimitStorage",
+    "RateLimiter",
+    "SQLiteRateLimitStorage",
+    "client_address",
+    "create_storage",
+    "forwarded_address",
+    "parse_rate",
+]
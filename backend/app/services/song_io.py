@@ -0,0 +1,55 @@
+"""Sérialisation de la liste des chansons pour les exports en flux (NDJSON, CSV, gzip)."""
+
+from __future__ import annotations
+
+import zlib
+from typing import Iterable, Iterator
+
+from app.services.tabular_io import ROWS_PER_CHUNK, Row, iter_csv_rows, iter_ndjson_rows
+
+EXPORT_FIELDS = ("id", "title", "artist", "link", "thumbnail", "comment", "votes")
+CSV_MEDIA_TYPE = "text/csv"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+GZIP_MEDIA_TYPE = "application/gzip"
+
+# Sortie gzip accumulée avant d'être envoyée.
+GZIP_FLUSH_BYTES = 64 * 1024
+GZIP_LEVEL = 6
+
+
+def iter_ndjson(rows: Iterable[Row]) -> Iterator[bytes]:
+    return iter_ndjson_rows(EXPORT_FIELDS, rows, ROWS_PER_CHUNK)
+
+
+def iter_csv(rows: Iterable[Row]) -> Iterator[bytes]:
+    return iter_csv_rows(EXPORT_FIELDS, rows, ROWS_PER_CHUNK)
+
+
+def iter_gzip(chunks: Iterable[bytes], level: int = GZIP_LEVEL) -> Iterator[bytes]:
+    """Compresse un flux au format gzip sans jamais le garder en entier en mémoire."""
+
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    pending: list[bytes] = []
+    size = 0
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            pending.append(compressed)
+            size += len(compressed)
+        if size >= GZIP_FLUSH_BYTES:
+            yield b"".join(pending)
+            pending = []
+            size = 0
+    pending.append(compressor.flush())
+    yield b"".join(pending)
+
+
+__all__ = [
+    "CSV_MEDIA_TYPE",
+    "EXPORT_FIELDS",
+    "GZIP_MEDIA_TYPE",
+    "NDJSON_MEDIA_TYPE",
+    "iter_csv",
+    "iter_gzip",
+    "iter_ndjson",
+]
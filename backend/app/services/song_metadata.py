@@ -9,6 +9,8 @@ from typing import Dict, Iterable, Tuple
 import httpx
 
 from app.schemas.song import SongCreate
+from app.services.http_client import get_http_client
+from app.utils.metrics import track_outbound
 
 LOGGER = logging.getLogger(__name__)
 
@@ -77,8 +79,9 @@ def _enrich_spotify_metadata(
 
     for candidate in candidate_urls:
         try:
-            response = client.get(candidate)
-            response.raise_for_status()
+            with track_outbound("spotify_html"):
+                response = client.get(candidate)
+                response.raise_for_status()
         except httpx.HTTPError:  # pragma: no cover - depends on external network issues
             continue
 
@@ -119,28 +122,31 @@ def fetch_song_metadata(link: str) -> SongCreate:
     endpoint: str
     if "youtube" in link or "youtu.be" in link:
         endpoint = YOUTUBE_OEMBED
+        provider = "youtube_oembed"
     elif "spotify" in link:
         endpoint = SPOTIFY_OEMBED
+        provider = "spotify_oembed"
     else:  # pragma: no cover - validated earlier
         raise MetadataError("Lien non supporté")
 
-    with httpx.Client(timeout=5.0) as client:
-        try:
+    client = get_http_client()
+    try:
+        with track_outbound(provider):
             result = _fetch_oembed(client, endpoint, link)
-        except httpx.HTTPStatusError as exc:  # pragma: no cover - depends on external API
-            LOGGER.warning("Impossible de récupérer les métadonnées pour %s: %s", link, exc)
-            raise MetadataError("Impossible de récupérer les informations de la chanson") from exc
-        except httpx.HTTPError as exc:  # pragma: no cover - depends on network
-            LOGGER.warning("Erreur réseau pour %s: %s", link, exc)
-            raise MetadataError("Erreur réseau lors de la récupération des métadonnées") from exc
+    except httpx.HTTPStatusError as exc:  # pragma: no cover - depends on external API
+        LOGGER.warning("Impossible de récupérer les métadonnées pour %s: %s", link, exc)
+        raise MetadataError("Impossible de récupérer les informations de la chanson") from exc
+    except httpx.HTTPError as exc:  # pragma: no cover - depends on network
+        LOGGER.warning("Erreur réseau pour %s: %s", link, exc)
+        raise MetadataError("Erreur réseau lors de la récupération des métadonnées") from exc
 
 
-        if isinstance(result, dict):
-            if endpoint == SPOTIFY_OEMBED:
-                title, artist = _enrich_spotify_metadata(client, result, link)
-                return _build_song(result, link, title=title, artist=artist)
+    if isinstance(result, dict):
+        if endpoint == SPOTIFY_OEMBED:
+            title, artist = _enrich_spotify_metadata(client, result, link)
+            return _build_song(result, link, title=title, artist=artist)
 
-            return _build_song(result, link)
+        return _build_song(result, link)
 
 
     raise MetadataError("Réponse invalide du fournisseur")
@@ -0,0 +1,159 @@
+"""Suivi des phases de démarrage de l'application.
+
+Les phases bloquantes (connexion PostgreSQL, schéma, données par défaut,
+préchargement des caches) tournent dans des threads via
+:func:`asyncio.to_thread` pour ne pas geler la boucle d'événements, et les
+phases indépendantes s'exécutent en parallèle. :class:`StartupReport` garde
+le statut et la durée de chacune : ``/ready`` les expose et la jauge
+``app_startup_phase_seconds`` les publie dans ``/metrics``.
+:class:`DatabaseProbe` revérifie la base à chaque ``/ready`` (résultat gardé
+quelques secondes) : une base froide au démarrage ou tombée ensuite se voit.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from app.utils.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+PHASE_OK = "ok"
+PHASE_FAILED = "failed"
+PHASE_SKIPPED = "skipped"
+
+STARTUP_PHASE_DURATION = REGISTRY.gauge(
+    "app_startup_phase_seconds", "Durée des phases de démarrage.", ("phase",)
+)
+
+
+@dataclass
+class PhaseResult:
+    status: str
+    duration_ms: float
+    critical: bool
+    error: str | None = None
+
+
+class StartupReport:
+    def __init__(self) -> None:
+        self.phases: dict[str, PhaseResult] = {}
+        self._started = time.perf_counter()
+        self.total_ms: float | None = None
+
+    async def run(self, name: str, func: Callable[..., Any], *args: Any, critical: bool = True) -> Any:
+        """Exécute ``func`` hors de la boucle et enregistre sa durée.
+
+        L'exception éventuelle est enregistrée puis relancée : l'appelant
+        décide de sauter ou non les phases qui en dépendent.
+        """
+
+        started = time.perf_counter()
+        try:
+            result = await asyncio.to_thread(func, *args)
+        except Exception as exc:
+            self._record(name, PHASE_FAILED, started, critical, error=f"{type(exc).__name__}: {exc}")
+            raise
+        self._record(name, PHASE_OK, started, critical)
+        return result
+
+    def skip(self, name: str, *, critical: bool = True) -> None:
+        self.phases[name] = PhaseResult(PHASE_SKIPPED, 0.0, critical)
+
+    def _record(
+        self, name: str, status: str, started: float, critical: bool, error: str | None = None
+    ) -> None:
+        elapsed = time.perf_counter() - started
+        self.phases[name] = PhaseResult(status, round(elapsed * 1000, 1), critical, error)
+        STARTUP_PHASE_DURATION.set(elapsed, (name,))
+
+    def finish(self) -> None:
+        self.total_ms = round((time.perf_counter() - self._started) * 1000, 1)
+        logger.info(
+            "Démarrage terminé en %.0f ms (%s)",
+            self.total_ms,
+            ", ".join(
+                f"{name}={phase.duration_ms:.0f}ms/{phase.status}"
+                for name, phase in self.phases.items()
+            ),
+        )
+
+    @property
+    def finished(self) -> bool:
+        return self.total_ms is not None
+
+    @property
+    def ready(self) -> bool:
+        """Vrai quand le démarrage est terminé sans échec d'une phase critique."""
+
+        return self.finished and all(
+            phase.status == PHASE_OK for phase in self.phases.values() if phase.critical
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        if self.ready:
+            status = "ready"
+        else:
+            status = "degraded" if self.finished else "starting"
+        return {
+            "status": status,
+            "startup_ms": self.total_ms,
+            "phases": {
+                name: {
+                    "status": phase.status,
+                    "duration_ms": phase.duration_ms,
+                    **({"error": phase.error} if phase.error else {}),
+                }
+                for name, phase in self.phases.items()
+            },
+        }
+
+
+class DatabaseProbe:
+    def __init__(self, ping: Callable[[], Any], timeout: float = 2.0, ttl: float = 5.0) -> None:
+        self._ping = ping
+        self.timeout = timeout
+        self.ttl = ttl
+        self.ok = False
+        self.error: str | None = None
+        self._checked_at: float | None = None
+        self._lock = asyncio.Lock()
+
+    async def check(self) -> bool:
+        """Vrai si la base répond ; au plus une vérification par ``ttl`` secondes."""
+
+        async with self._lock:
+            checked_at = self._checked_at
+            if checked_at is not None and time.monotonic() - checked_at < self.ttl:
+                return self.ok
+            try:
+                await asyncio.wait_for(asyncio.to_thread(self._ping), self.timeout)
+            except Exception as exc:
+                if self.ok or checked_at is None:
+                    logger.warning("Base de données injoignable : %s", exc or type(exc).__name__)
+                self.ok = False
+                self.error = f"{type(exc).__name__}: {exc}" if str(exc) else type(exc).__name__
+            else:
+                if not self.ok and checked_at is not None:
+                    logger.info("Base de données de nouveau joignable")
+                self.ok = True
+                self.error = None
+            self._checked_at = time.monotonic()
+            return self.ok
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"status": "ok" if self.ok else "unreachable", **({"error": self.error} if self.error else {})}
+
+
+__all__ = [
+    "DatabaseProbe",
+    "PHASE_FAILED",
+    "PHASE_OK",
+    "PHASE_SKIPPED",
+    "PhaseResult",
+    "StartupReport",
+]
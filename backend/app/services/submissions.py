@@ -0,0 +1,245 @@
+"""Chaîne commune aux soumissions de liens (formulaire public, chat Twitch, lots).
+
+lien → forme canonique → règles de bannissement → métadonnées → ``add_or_increment_song``.
+"""
+
+from __future__ import annotations
+
+import re
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Mapping, Sequence
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session
+
+from app.crud import ban_rule as crud_ban
+from app.crud import song as crud_song
+from app.models.channel import DEFAULT_CHANNEL_ID
+from app.models.song import Song
+from app.schemas.song import SongCreate
+from app.services.song_metadata import MetadataError, fetch_song_metadata
+from app.utils.links import canonicalize_link
+
+ADDED = "added"
+BANNED = "banned"
+DUPLICATE = "duplicate"
+INVALID = "invalid"
+METADATA_ERROR = "metadata_error"
+
+MetadataFetcher = Callable[[str], SongCreate]
+
+# Appels oEmbed simultanés pour un lot de liens.
+METADATA_WORKERS = 8
+# Taille des `IN (...)` de recherche des liens connus.
+LOOKUP_CHUNK_SIZE = 500
+
+# Les entrées complètes (SongCreate) d'un lot peuvent viser d'autres sites,
+# comme ``POST /songs/`` ; les liens seuls doivent être YouTube ou Spotify.
+_HTTP_LINK_RE = re.compile(r"^https?://", re.IGNORECASE)
+
+
+@dataclass
+class SubmissionResult:
+    status: str
+    link: str | None = None
+    song: Song | None = None
+    detail: str | None = None
+
+
+def _existing_songs(db: Session, links: list[str], channel_id: int) -> dict[str, Song]:
+    return {
+        song.link: song
+        for song in db.query(Song).filter(Song.channel_id == channel_id, Song.link.in_(links))
+    }
+
+
+def submit_link(
+    db: Session,
+    raw_link: str,
+    *,
+    comment: str | None = None,
+    fetch_metadata: MetadataFetcher = fetch_song_metadata,
+    channel_id: int = DEFAULT_CHANNEL_ID,
+) -> SubmissionResult:
+    """Soumet un lien unique à la file de ``channel_id`` et valide la transaction."""
+
+    link = canonicalize_link(raw_link)
+    if link is None:
+        return SubmissionResult(INVALID)
+    # Un lien banni ne coûte pas d'appel oEmbed.
+    if crud_ban.get_ban_snapshot(db, channel_id).is_banned(None, None, link):
+        return SubmissionResult(BANNED, link)
+
+    # Lien déjà en file : une voix de plus, sans appel oEmbed. Une règle qui le
+    # viserait l'aurait supprimé de la table.
+    song = _existing_songs(db, [link], channel_id).get(link)
+    if song is not None:
+        crud_song.vote_loaded_songs(db, [(song, 1)], channel_id=channel_id)
+        db.commit()
+        db.refresh(song)
+        return SubmissionResult(ADDED, link, song)
+
+    try:
+        metadata = fetch_metadata(link)
+    except MetadataError as exc:
+        return SubmissionResult(METADATA_ERROR, link, detail=str(exc))
+
+    if comment:
+        metadata.comment = comment
+
+    song = crud_song.add_or_increment_song(db, metadata, channel_id=channel_id)
+    if song is None:
+        return SubmissionResult(BANNED, link)
+    return SubmissionResult(ADDED, link, song)
+
+
+def submit_links(
+    db: Session,
+    links: Mapping[str, int],
+    *,
+    fetch_metadata: MetadataFetcher = fetch_song_metadata,
+    channel_id: int = DEFAULT_CHANNEL_ID,
+    metadata: Mapping[str, SongCreate] | None = None,
+) -> dict[str, SubmissionResult]:
+    """Soumet un lot ``{lien canonique: nombre de demandes}`` en une transaction.
+
+    Les liens déjà présents reçoivent leurs voix sans appel oEmbed ; les
+    métadonnées des autres sont récupérées en parallèle, une fois par lien,
+    sauf celles déjà fournies dans ``metadata``.
+    """
+
+    metadata = metadata or {}
+    results: dict[str, SubmissionResult] = {}
+    snapshot = crud_ban.get_ban_snapshot(db, channel_id)
+    allowed = []
+    for link in links:
+        known = metadata.get(link)
+        title, artist = (known.title, known.artist) if known is not None else (None, None)
+        if snapshot.is_banned(title, artist, link):
+            results[link] = SubmissionResult(BANNED, link)
+        else:
+            allowed.append(link)
+
+    existing: dict[str, Song] = {}
+    for start in range(0, len(allowed), LOOKUP_CHUNK_SIZE):
+        existing.update(_existing_songs(db, allowed[start : start + LOOKUP_CHUNK_SIZE], channel_id))
+    pending = []
+    voted = []
+    for link in allowed:
+        song = existing.get(link)
+        if song is None:
+            pending.append(link)
+        else:
+            voted.append((song, links[link]))
+            results[link] = SubmissionResult(ADDED, link, song)
+    crud_song.vote_loaded_songs(db, voted, channel_id=channel_id)
+
+    def fetch(link: str) -> SongCreate | MetadataError:
+        known = metadata.get(link)
+        if known is not None:
+            return known
+        try:
+            return fetch_metadata(link)
+        except MetadataError as exc:
+            return exc
+
+    to_fetch = sum(1 for link in pending if link not in metadata)
+    if to_fetch > 1:
+        with ThreadPoolExecutor(max_workers=min(METADATA_WORKERS, to_fetch)) as pool:
+            fetched = list(pool.map(fetch, pending))
+    else:
+        fetched = [fetch(link) for link in pending]
+
+    for link, song_data in zip(pending, fetched):
+        if isinstance(song_data, MetadataError):
+            results[link] = SubmissionResult(METADATA_ERROR, link, detail=str(song_data))
+            continue
+        song = crud_song.add_or_increment_song(
+            db, song_data, votes=links[link], commit=False, channel_id=channel_id
+        )
+        results[link] = (
+            SubmissionResult(ADDED, link, song) if song is not None else SubmissionResult(BANNED, link)
+        )
+
+    db.commit()
+    return results
+
+
+def _batch_link(item: str | SongCreate) -> str | None:
+    if isinstance(item, str):
+        return canonicalize_link(item)
+    raw = item.link.strip()
+    if not _HTTP_LINK_RE.match(raw):
+        return None
+    return canonicalize_link(raw) or raw
+
+
+def submit_batch(
+    db: Session,
+    items: Sequence[str | SongCreate],
+    *,
+    fetch_metadata: MetadataFetcher = fetch_song_metadata,
+    channel_id: int = DEFAULT_CHANNEL_ID,
+) -> list[SubmissionResult]:
+    """Soumet un lot de liens ou de morceaux complets ; un résultat par élément.
+
+    Les éléments qui désignent le même morceau (même lien canonique) sont
+    regroupés : le premier porte le résultat, les suivants sont marqués
+    ``duplicate`` et lui ajoutent une voix. Tout le lot passe par
+    :func:`submit_links`, donc en une transaction.
+    """
+
+    results: list[SubmissionResult | None] = [None] * len(items)
+    first_of: dict[str, int] = {}
+    duplicates: list[tuple[int, str]] = []
+    counts: Counter[str] = Counter()
+    known: dict[str, SongCreate] = {}
+
+    for index, item in enumerate(items):
+        link = _batch_link(item)
+        if link is None:
+            results[index] = SubmissionResult(INVALID, detail="Lien non reconnu")
+            continue
+        if link in first_of:
+            duplicates.append((index, link))
+            counts[link] += 1
+            continue
+        first_of[link] = index
+        counts[link] += 1
+        if not isinstance(item, str):
+            known[link] = item.model_copy(update={"link": link})
+
+    submitted = {link: count for link, count in counts.items() if results[first_of[link]] is None}
+    outcome = submit_links(
+        db, submitted, fetch_metadata=fetch_metadata, channel_id=channel_id, metadata=known
+    )
+    for link, result in outcome.items():
+        results[first_of[link]] = result
+    for index, link in duplicates:
+        first = results[first_of[link]]
+        status = DUPLICATE if first.status == ADDED else first.status
+        results[index] = SubmissionResult(
+            status, link, first.song, detail=f"Regroupé avec l'élément {first_of[link]}"
+        )
+
+    # Après le commit, les morceaux sont rechargés en une requête plutôt qu'un
+    # SELECT par élément au moment de la sérialisation.
+    song_ids = {inspect(result.song).identity[0] for result in outcome.values() if result.song is not None}
+    if song_ids:
+        db.query(Song).filter(Song.id.in_(song_ids)).all()
+    return results
+
+
+__all__ = [
+    "ADDED",
+    "BANNED",
+    "DUPLICATE",
+    "INVALID",
+    "METADATA_ERROR",
+    "SubmissionResult",
+    "submit_batch",
+    "submit_link",
+    "submit_links",
+]
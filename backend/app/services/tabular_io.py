@@ -0,0 +1,71 @@
+"""Sérialisation en flux de lignes tabulaires (NDJSON, CSV) pour les exports.
+
+Les exports de chansons et de règles de bannissement partagent ces écritures.
+Dans le CSV, un texte commençant par ``=``, ``+``, ``-``, ``@``, une tabulation
+ou un retour chariot serait évalué comme une formule par un tableur : la
+cellule est alors préfixée d'une apostrophe.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+from typing import Iterable, Iterator, Sequence
+
+# Lignes sérialisées par morceau de réponse : assez pour amortir les écritures
+# réseau, assez peu pour garder une mémoire constante.
+ROWS_PER_CHUNK = 1000
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+Row = Sequence[object]
+
+
+def csv_cell(value: object) -> object:
+    """Valeur à écrire dans une cellule CSV, neutralisée si c'est une formule."""
+
+    if value is None:
+        return ""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def iter_ndjson_rows(
+    fields: Sequence[str], rows: Iterable[Row], rows_per_chunk: int = ROWS_PER_CHUNK
+) -> Iterator[bytes]:
+    dumps = json.JSONEncoder(ensure_ascii=False).encode
+    lines: list[str] = []
+    for row in rows:
+        lines.append(dumps(dict(zip(fields, row))))
+        if len(lines) >= rows_per_chunk:
+            lines.append("")
+            yield "\n".join(lines).encode("utf-8")
+            lines = []
+    if lines:
+        lines.append("")
+        yield "\n".join(lines).encode("utf-8")
+
+
+def iter_csv_rows(
+    fields: Sequence[str], rows: Iterable[Row], rows_per_chunk: int = ROWS_PER_CHUNK
+) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    for index, row in enumerate(rows, start=1):
+        writer.writerow([csv_cell(value) for value in row])
+        if index % rows_per_chunk == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+
+__all__ = [
+    "FORMULA_PREFIXES",
+    "ROWS_PER_CHUNK",
+    "csv_cell",
+    "iter_csv_rows",
+    "iter_ndjson_rows",
+]
@@ -0,0 +1,201 @@
+"""Classement « tendance » : score à décroissance exponentielle tenu à jour à chaque vote.
+
+Un vote de poids ``w`` au temps ``t`` pèse ``w · exp(-λ (now - t))``. Plutôt
+que de recalculer ce score pour tous les morceaux à chaque lecture, on stocke
+son logarithme ramené à une époque fixe ::
+
+    trend_score = ln( Σ w_i · exp(λ (t_i - TREND_EPOCH)) )
+
+L'ordre des morceaux selon cette valeur est le même qu'à tout instant
+``now`` (le facteur ``exp(-λ (now - TREND_EPOCH))`` est commun) : un simple
+index sur ``songs.trend_score`` sert le tri, et chaque vote ne coûte qu'une
+mise à jour O(1), faite en SQL pour rester atomique entre workers.
+``trend_updated_at`` garde l'instant du dernier vote ; le journal
+``vote_events`` permet de recalculer les scores quand la demi-vie change
+(:func:`sync_trend_half_life`, au démarrage). Il est purgé au-delà de
+``VOTE_EVENTS_RETENTION_HOURS`` : un vote plus ancien ne pèse plus rien.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import sqlite3
+import time
+from collections.abc import Iterable
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import case, delete, event, func, insert, select, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.config import TREND_HALF_LIFE_MINUTES
+from app.crud.app_setting import get_setting, set_setting
+from app.models.song import Song
+from app.models.vote_event import VoteEvent
+
+logger = logging.getLogger(__name__)
+
+# Origine des temps du score (2024-01-01T00:00:00Z).
+TREND_EPOCH = 1_704_067_200.0
+# En dessous de exp(-30), l'ancien score est négligeable face à un nouveau vote.
+_NEGLIGIBLE_EXPONENT = -30.0
+
+REBUILD_CHUNK_SIZE = 5000
+# Clé de app_settings : demi-vie avec laquelle les scores en base ont été calculés.
+HALF_LIFE_SETTING = "trend_half_life_minutes"
+
+
+def decay_rate(half_life_minutes: float = TREND_HALF_LIFE_MINUTES) -> float:
+    return math.log(2) / (half_life_minutes * 60.0)
+
+
+def _offset(now: float, rate: float) -> float:
+    return rate * (now - TREND_EPOCH)
+
+
+def initial_score(weight: int, now: float | None = None, rate: float | None = None) -> float:
+    """Valeur de ``trend_score`` d'un morceau qui reçoit ses premières voix."""
+
+    now = time.time() if now is None else now
+    rate = decay_rate() if rate is None else rate
+    return _offset(now, rate) + math.log(weight)
+
+
+def bumped_score(weight: int, now: float | None = None, rate: float | None = None):
+    """Expression SQL de ``trend_score`` après ``weight`` voix de plus à ``now``.
+
+    ``ln(exp(a) + w·exp(b)) = b + ln(exp(a - b) + w)`` : ``a - b`` reste
+    inférieur à ``ln(votes)``, donc sans dépassement ; très négatif, il est
+    ramené à zéro (PostgreSQL refuse le sous-dépassement de ``exp``).
+    """
+
+    now = time.time() if now is None else now
+    rate = decay_rate() if rate is None else rate
+    offset = _offset(now, rate)
+    gap = Song.trend_score - offset
+    return case(
+        (gap < _NEGLIGIBLE_EXPONENT, offset + math.log(weight)),
+        else_=offset + func.ln(func.exp(gap) + weight),
+    )
+
+
+def decayed_score(trend_score: float, now: float | None = None, rate: float | None = None) -> float:
+    """Score décroissant à l'instant ``now`` (nombre de voix « récentes »)."""
+
+    now = time.time() if now is None else now
+    rate = decay_rate() if rate is None else rate
+    exponent = trend_score - _offset(now, rate)
+    return math.exp(exponent) if exponent > -700 else 0.0
+
+
+def vote_timestamp(now: float | None = None) -> datetime:
+    return datetime.fromtimestamp(time.time() if now is None else now, tz=timezone.utc)
+
+
+def record_votes(db: Session, counts: Iterable[tuple[int, int]], now: float | None = None) -> None:
+    """Ajoute au journal un évènement par couple ``(song_id, voix)`` (une instruction)."""
+
+    created_at = vote_timestamp(now)
+    rows = [
+        {"song_id": song_id, "votes": votes, "created_at": created_at}
+        for song_id, votes in counts
+        if votes > 0
+    ]
+    if rows:
+        db.execute(insert(VoteEvent), rows)
+
+
+def rebuild_trend_scores(db: Session, half_life_minutes: float = TREND_HALF_LIFE_MINUTES) -> int:
+    """Recalcule ``trend_score`` de chaque morceau à partir du journal.
+
+    À lancer après un changement de ``TREND_HALF_LIFE_MINUTES``. Les morceaux
+    sans évènement (journal purgé) repartent de zéro plutôt que de garder un
+    score calculé avec l'ancienne demi-vie. Retourne le nombre de morceaux recalculés.
+    """
+
+    rate = decay_rate(half_life_minutes)
+    # Évènements lus par lots ; seul un score par morceau reste en mémoire.
+    scores: dict[int, tuple[float, datetime]] = {}
+    rows = db.execute(
+        select(VoteEvent.song_id, VoteEvent.votes, VoteEvent.created_at)
+        .order_by(VoteEvent.song_id, VoteEvent.created_at)
+        .execution_options(yield_per=REBUILD_CHUNK_SIZE)
+    )
+    for song_id, votes, created_at in rows:
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        term = _offset(created_at.timestamp(), rate) + math.log(votes)
+        previous = scores.get(song_id)
+        if previous is not None:
+            high, low = max(previous[0], term), min(previous[0], term)
+            term = high + math.log1p(math.exp(low - high))
+        scores[song_id] = (term, created_at)
+
+    db.execute(update(Song).where(Song.trend_score != 0).values(trend_score=0.0))
+    if scores:
+        db.execute(
+            update(Song),
+            [
+                {"id": song_id, "trend_score": score, "trend_updated_at": updated_at}
+                for song_id, (score, updated_at) in scores.items()
+            ],
+        )
+    db.commit()
+    return len(scores)
+
+
+def sync_trend_half_life(db: Session, half_life_minutes: float = TREND_HALF_LIFE_MINUTES) -> bool:
+    """Recalcule les scores si ``half_life_minutes`` diffère de celle enregistrée.
+
+    Retourne ``True`` si un recalcul a eu lieu. Au premier appel, la demi-vie
+    courante est seulement enregistrée.
+    """
+
+    stored = get_setting(db, HALF_LIFE_SETTING)
+    if stored is not None and math.isclose(float(stored), half_life_minutes):
+        return False
+    rebuilt = stored is not None
+    if rebuilt:
+        logger.warning(
+            "Demi-vie de la tendance passée de %s à %s minutes : recalcul des scores",
+            stored,
+            half_life_minutes,
+        )
+        songs = rebuild_trend_scores(db, half_life_minutes)
+        logger.info("Scores de tendance recalculés pour %d morceaux", songs)
+    set_setting(db, HALF_LIFE_SETTING, repr(half_life_minutes))
+    db.commit()
+    return rebuilt
+
+
+def prune_vote_events(db: Session, older_than: timedelta) -> int:
+    """Supprime les évènements plus anciens que ``older_than`` (déjà pris en
+    compte dans ``trend_score``)."""
+
+    cutoff = datetime.now(timezone.utc) - older_than
+    result = db.execute(delete(VoteEvent).where(VoteEvent.created_at < cutoff))
+    db.commit()
+    return result.rowcount
+
+
+@event.listens_for(Engine, "connect")
+def _register_sqlite_math(dbapi_connection, connection_record) -> None:  # noqa: ANN001
+    # Certaines builds de SQLite n'ont pas ln()/exp() (SQLITE_ENABLE_MATH_FUNCTIONS).
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        dbapi_connection.create_function("ln", 1, math.log, deterministic=True)
+        dbapi_connection.create_function("exp", 1, math.exp, deterministic=True)
+
+
+__all__ = [
+    "TREND_EPOCH",
+    "bumped_score",
+    "decay_rate",
+    "decayed_score",
+    "initial_score",
+    "prune_vote_events",
+    "rebuild_trend_scores",
+    "record_votes",
+    "sync_trend_half_life",
+    "vote_timestamp",
+]
@@ -0,0 +1,323 @@
+"""Ingestion du chat Twitch : les liens postés dans le chat deviennent des propositions.
+
+Le client IRC (asyncio) lit le flux par blocs, ne décode que les lignes
+``PRIVMSG`` et regroupe les liens trouvés en micro-lots traités hors de la
+boucle d'événements par :func:`app.services.submissions.submit_links`. Les
+commandes (``!vote``, ``!reco``) passent par
+:class:`app.services.chat_commands.ChatCommandProcessor` ; les votes sont
+écrits avec le même micro-lot.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import ssl
+import time
+from collections import Counter
+from typing import Callable, NamedTuple
+
+from sqlalchemy.orm import Session
+
+from app.models.channel import DEFAULT_CHANNEL_ID
+from app.services import submissions
+from app.services.chat_commands import ChatCommandProcessor, VoteAggregator, VoteBatch
+from app.services.rate_limit import MemoryRateLimitStorage, parse_rate
+from app.services.song_metadata import fetch_song_metadata
+from app.utils.links import extract_links
+from app.utils.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+TWITCH_IRC_HOST = "irc.chat.twitch.tv"
+TWITCH_IRC_TLS_PORT = 6697
+
+# Pseudonyme anonyme accepté par Twitch en lecture seule.
+ANONYMOUS_NICK = "justinfan20240"
+
+READ_CHUNK_SIZE = 64 * 1024
+
+TWITCH_CHAT_MESSAGES = REGISTRY.counter(
+    "twitch_chat_messages_total",
+    "Messages du chat Twitch lus, par résultat.",
+    ("outcome",),
+)
+TWITCH_CHAT_SUBMISSIONS = REGISTRY.counter(
+    "twitch_chat_submissions_total",
+    "Liens du chat soumis à la chaîne de traitement, par statut.",
+    ("status",),
+)
+TWITCH_CHAT_BATCH_DURATION = REGISTRY.histogram(
+    "twitch_chat_batch_duration_seconds",
+    "Durée de traitement d'un micro-lot de liens du chat.",
+)
+TWITCH_CHAT_RECONNECTS = REGISTRY.counter(
+    "twitch_chat_reconnects_total", "Reconnexions au serveur IRC de Twitch."
+)
+TWITCH_CHAT_CONNECTED = REGISTRY.gauge(
+    "twitch_chat_connected", "1 si le client IRC est connecté au salon."
+)
+
+
+class ChatMessage(NamedTuple):
+    user: str
+    channel: str
+    text: str
+
+
+def parse_privmsg(line: str) -> ChatMessage | None:
+    """Découpe ``[@tags] :nick!user@host PRIVMSG #salon :texte`` sans regex."""
+
+    if line.startswith("@"):
+        line = line.partition(" ")[2]
+    if not line.startswith(":"):
+        return None
+    prefix, _, rest = line.partition(" ")
+    if not rest.startswith("PRIVMSG "):
+        return None
+    channel, _, text = rest[8:].partition(" ")
+    if text.startswith(":"):
+        text = text[1:]
+    user = prefix[1:].partition("!")[0].lower()
+    return ChatMessage(user, channel, text)
+
+
+class TwitchChatIngestor:
+    """Client IRC qui alimente la file des morceaux à partir du chat."""
+
+    def __init__(
+        self,
+        channel: str,
+        session_factory: Callable[[], Session],
+        *,
+        host: str = TWITCH_IRC_HOST,
+        port: int = TWITCH_IRC_TLS_PORT,
+        use_tls: bool = True,
+        nick: str | None = None,
+        token: str | None = None,
+        user_rate: str = "3/30 seconds",
+        batch_size: int = 50,
+        batch_interval: float = 0.5,
+        max_pending: int = 5_000,
+        max_backoff: float = 60.0,
+        fetch_metadata: Callable = fetch_song_metadata,
+        channel_id: int = DEFAULT_CHANNEL_ID,
+    ) -> None:
+        self.channel = "#" + channel.lstrip("#").lower()
+        # File de morceaux alimentée par ce salon.
+        self.channel_id = channel_id
+        self.session_factory = session_factory
+        self.host = host
+        self.port = port
+        self.use_tls = use_tls
+        self.nick = (nick or ANONYMOUS_NICK).lower()
+        self.token = token
+        self.user_limit, self.user_period = parse_rate(user_rate)
+        self.flood = MemoryRateLimitStorage()
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.max_pending = max_pending
+        self.max_backoff = max_backoff
+        self.fetch_metadata = fetch_metadata
+
+        self.stats: Counter[str] = Counter()
+        self.commands = ChatCommandProcessor(
+            votes=VoteAggregator(channel_id=channel_id), submit_link=self._submit_text
+        )
+        self._pending: Counter[str] = Counter()
+        self._pending_keys: set[tuple[str, str]] = set()
+        self._batch_ready = asyncio.Event()
+        self._stopping = False
+        self._writer: asyncio.StreamWriter | None = None
+
+    # -- connexion -------------------------------------------------------
+
+    async def run(self) -> None:
+        """Se connecte et relit le salon jusqu'à :meth:`stop`, en se reconnectant au besoin."""
+
+        batcher = asyncio.create_task(self._batch_loop(), name="twitch-chat-batcher")
+        backoff = 1.0
+        try:
+            while not self._stopping:
+                started = time.monotonic()
+                try:
+                    await self._connect_and_read()
+                except asyncio.CancelledError:
+                    raise
+                except (OSError, asyncio.IncompleteReadError, ConnectionError) as exc:
+                    logger.warning("Connexion IRC Twitch interrompue : %s", exc)
+                finally:
+                    TWITCH_CHAT_CONNECTED.set(0)
+                if self._stopping:
+                    break
+                # Une session qui a tenu longtemps repart d'un délai court.
+                if time.monotonic() - started > 60:
+                    backoff = 1.0
+                delay = backoff * random.uniform(0.5, 1.0)
+                TWITCH_CHAT_RECONNECTS.inc()
+                self.stats["reconnects"] += 1
+                logger.info("Reconnexion au chat Twitch dans %.1fs", delay)
+                await asyncio.sleep(delay)
+                backoff = min(backoff * 2, self.max_backoff)
+        finally:
+            self._stopping = True
+            self._batch_ready.set()
+            await batcher
+
+    def stop(self) -> None:
+        self._stopping = True
+        self._batch_ready.set()
+        if self._writer is not None:
+            self._writer.close()
+
+    async def _connect_and_read(self) -> None:
+        ssl_context = ssl.create_default_context() if self.use_tls else None
+        reader, writer = await asyncio.open_connection(self.host, self.port, ssl=ssl_context)
+        self._writer = writer
+        try:
+            if self.token:
+                token = self.token if self.token.startswith("oauth:") else f"oauth:{self.token}"
+                writer.write(f"PASS {token}\r\n".encode())
+            writer.write(f"NICK {self.nick}\r\nJOIN {self.channel}\r\n".encode())
+            await writer.drain()
+            TWITCH_CHAT_CONNECTED.set(1)
+            logger.info("Connecté au chat Twitch %s", self.channel)
+            await self._read_loop(reader, writer)
+        finally:
+            self._writer = None
+            writer.close()
+
+    async def _read_loop(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        buffer = b""
+        while not self._stopping:
+            chunk = await reader.read(READ_CHUNK_SIZE)
+            if not chunk:
+                return
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\r\n")
+            for raw in lines:
+                if b" PRIVMSG " in raw:
+                    message = parse_privmsg(raw.decode("utf-8", "replace"))
+                    if message is not None:
+                        self.handle_message(message)
+                elif raw.startswith(b"PING"):
+                    writer.write(b"PONG" + raw[4:] + b"\r\n")
+                elif b" RECONNECT" in raw:
+                    # Twitch annonce une maintenance : on rouvre la connexion.
+                    return
+            if writer.transport.get_write_buffer_size():
+                await writer.drain()
+
+    # -- messages --------------------------------------------------------
+
+    def handle_message(self, message: ChatMessage) -> None:
+        self.stats["messages"] += 1
+        TWITCH_CHAT_MESSAGES.inc(("privmsg",))
+
+        if message.text.startswith("!") and self.commands.handle(message.user, message.text):
+            self.stats["commands"] += 1
+            if len(self.commands.votes) >= self.batch_size:
+                self._batch_ready.set()
+            return
+        self._submit_text(message.user, message.text)
+
+    def _submit_text(self, user: str, text: str) -> bool:
+        links = extract_links(text)
+        if not links:
+            return False
+        result = self.flood.hit(f"twitch:{user}", self.user_limit, self.user_period)
+        if not result.allowed:
+            self.stats["flood_limited"] += 1
+            TWITCH_CHAT_MESSAGES.inc(("flood_limited",))
+            return False
+        TWITCH_CHAT_MESSAGES.inc(("with_link",))
+        for link in links:
+            self._enqueue(user, link)
+        return True
+
+    def _enqueue(self, user: str, link: str) -> None:
+        key = (user, link)
+        if key in self._pending_keys:
+            # Un même spectateur qui répète son lien ne compte qu'une fois par lot.
+            self.stats["duplicates"] += 1
+            return
+        if link not in self._pending and len(self._pending) >= self.max_pending:
+            self.stats["dropped"] += 1
+            TWITCH_CHAT_SUBMISSIONS.inc(("dropped",))
+            return
+        self._pending_keys.add(key)
+        self._pending[link] += 1
+        self.stats["links"] += 1
+        if len(self._pending) >= self.batch_size:
+            self._batch_ready.set()
+
+    # -- micro-lots ------------------------------------------------------
+
+    async def _batch_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._batch_ready.wait(), timeout=self.batch_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._batch_ready.clear()
+            if self._pending or len(self.commands.votes):
+                batch, self._pending = self._pending, Counter()
+                self._pending_keys = set()
+                votes = self.commands.votes.take()
+                await asyncio.to_thread(self.process_batch, batch, votes)
+            elif self._stopping:
+                return
+
+    def process_batch(
+        self, batch: Counter[str], votes: VoteBatch | None = None
+    ) -> dict[str, submissions.SubmissionResult]:
+        started = time.perf_counter()
+        db = self.session_factory()
+        try:
+            results = self._submit_links(db, batch) if batch else {}
+            # Transaction distincte : un lien en échec ne fait pas perdre les votes.
+            if votes:
+                self._flush_votes(db, votes)
+        finally:
+            db.close()
+
+        TWITCH_CHAT_BATCH_DURATION.observe(time.perf_counter() - started)
+        self.stats["batches"] += 1
+        for result in results.values():
+            self.stats[result.status] += 1
+            TWITCH_CHAT_SUBMISSIONS.inc((result.status,))
+        return results
+
+    def _submit_links(
+        self, db: Session, batch: Counter[str]
+    ) -> dict[str, submissions.SubmissionResult]:
+        try:
+            return submissions.submit_links(
+                db, batch, fetch_metadata=self.fetch_metadata, channel_id=self.channel_id
+            )
+        except Exception:
+            logger.exception("Échec du traitement d'un lot du chat (%d liens)", len(batch))
+            db.rollback()
+            self.stats["failed_batches"] += 1
+            return {}
+
+    def _flush_votes(self, db: Session, votes: VoteBatch) -> None:
+        try:
+            self.commands.votes.flush(db, votes.counts)
+        except Exception:
+            db.rollback()
+            self.stats["failed_vote_flushes"] += 1
+            if self.commands.votes.restore(votes):
+                logger.exception(
+                    "Échec de l'écriture des votes du chat (%d morceaux), nouvel essai au prochain lot",
+                    len(votes.counts),
+                )
+            else:
+                logger.exception(
+                    "Votes du chat abandonnés après plusieurs échecs (%d morceaux)",
+                    len(votes.counts),
+                )
+
+
+__all__ = ["ChatMessage", "TwitchChatIngestor", "parse_privmsg"]
@@ -0,0 +1,241 @@
+"""Compression des réponses HTTP (gzip, brotli si installé).
+
+:class:`CompressionMiddleware` est un middleware ASGI pur : il choisit
+l'encodage d'après ``Accept-Encoding``, ne touche qu'aux types de contenu de
+la liste blanche et aux corps d'au moins ``minimum_size`` octets, et
+compresse aussi les réponses en flux, morceau par morceau. Les réponses déjà
+encodées (fichiers ``.br``/``.gz`` précompressés) et les réponses partielles
+(``206``, ``Content-Range``) passent telles quelles ; l'ETag fort d'une réponse
+compressée devient faible.
+"""
+
+from __future__ import annotations
+
+import zlib
+from typing import Iterable
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:  # pragma: no cover - dépend de l'environnement
+    import brotli
+except ImportError:  # pragma: no cover - dépend de l'environnement
+    brotli = None
+
+GZIP = "gzip"
+BROTLI = "br"
+
+# Types de contenu compressés (sans paramètres). Les formats déjà compressés
+# (images, polices woff2, archives .gz) n'y figurent pas.
+COMPRESSIBLE_TYPES = frozenset(
+    {
+        "application/javascript",
+        "application/json",
+        "application/manifest+json",
+        "application/x-ndjson",
+        "application/xml",
+        "image/svg+xml",
+        "text/css",
+        "text/csv",
+        "text/html",
+        "text/javascript",
+        "text/plain",
+    }
+)
+
+GZIP_LEVEL = 6
+# Qualité brotli des réponses dynamiques : bon ratio sans coût CPU de la qualité 11.
+BROTLI_QUALITY = 4
+
+
+def available_encodings() -> tuple[str, ...]:
+    """Encodages pris en charge, par ordre de préférence."""
+
+    return (BROTLI, GZIP) if brotli is not None else (GZIP,)
+
+
+def preferred_encoding(accept_encoding: str | None, encodings: Iterable[str]) -> str | None:
+    """Premier encodage de ``encodings`` accepté par le client (``q`` > 0)."""
+
+    if not accept_encoding:
+        return None
+    accepted: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    wildcard = accepted.get("*", 0.0)
+    for encoding in encodings:
+        if accepted.get(encoding, wildcard) > 0:
+            return encoding
+    return None
+
+
+def media_type_of(content_type: str | None) -> str:
+    return (content_type or "").partition(";")[0].strip().lower()
+
+
+def add_vary(headers: MutableHeaders, value: str = "Accept-Encoding") -> None:
+    vary = headers.get("vary")
+    if vary is None:
+        headers["Vary"] = value
+    elif value.lower() not in vary.lower():
+        headers["Vary"] = f"{vary}, {value}"
+
+
+class _Compressor:
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int) -> None:
+        self.encoding = encoding
+        if encoding == BROTLI:
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes, *, final: bool) -> bytes:
+        if self.encoding == BROTLI:
+            output = self._brotli.process(data)
+            return output + (self._brotli.finish() if final else self._brotli.flush())
+        output = self._zlib.compress(data)
+        return output + self._zlib.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        media_types: Iterable[str] = COMPRESSIBLE_TYPES,
+        gzip_level: int = GZIP_LEVEL,
+        brotli_quality: int = BROTLI_QUALITY,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.media_types = frozenset(media_types)
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.encodings = available_encodings()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = preferred_encoding(Headers(scope=scope).get("accept-encoding"), self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressingResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressingResponder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send) -> None:
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self._start: Message | None = None
+        self._compressor: _Compressor | None = None
+        self._buffer: list[bytes] | None = None
+        self._passthrough = False
+
+    async def send(self, message: Message) -> None:
+        if self._passthrough:
+            await self._send(message)
+            return
+        if message["type"] == "http.response.start":
+            # Les en-têtes attendent le premier morceau du corps.
+            self._start = message
+            return
+        if self._buffer is not None:
+            self._buffer.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                await self._send_whole(b"".join(self._buffer))
+            return
+        if self._compressor is not None:
+            await self._send_compressed(message)
+            return
+        if message["type"] != "http.response.body":
+            # Envoi de fichier sans copie (pathsend) : rien à compresser.
+            await self._flush_start(compress=False)
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if not self._should_compress(body, more_body):
+            await self._flush_start(compress=False)
+            await self._send(message)
+            return
+
+        self._compressor = _Compressor(
+            self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality
+        )
+        if not more_body:
+            await self._send_whole(body)
+        elif "content-length" in Headers(raw=self._start["headers"]):
+            # Taille connue (réponse relayée par un middleware en plusieurs
+            # morceaux) : on rassemble le corps pour garder un Content-Length.
+            self._buffer = [body]
+        else:
+            await self._flush_start(compress=True)
+            await self._send_compressed(message)
+
+    def _should_compress(self, body: bytes, more_body: bool) -> bool:
+        headers = Headers(raw=self._start["headers"])
+        if "content-encoding" in headers or self._start["status"] in (204, 206, 304):
+            return False
+        if "content-range" in headers:
+            # Une plage d'octets désigne la représentation non compressée.
+            return False
+        if media_type_of(headers.get("content-type")) not in self.middleware.media_types:
+            return False
+        if more_body:
+            declared = headers.get("content-length")
+            return declared is None or int(declared) >= self.middleware.minimum_size
+        return len(body) >= self.middleware.minimum_size
+
+    async def _flush_start(self, *, compress: bool, length: int | None = None) -> None:
+        start = self._start
+        headers = MutableHeaders(scope=start)
+        if compress:
+            headers["Content-Encoding"] = self.encoding
+            etag = headers.get("etag")
+            if etag is not None and not etag.startswith("W/"):
+                # Le corps compressé n'est pas identique octet pour octet à
+                # celui que désigne l'ETag fort de l'application.
+                headers["ETag"] = f"W/{etag}"
+            if length is None:
+                del headers["Content-Length"]
+            else:
+                headers["Content-Length"] = str(length)
+        if "content-encoding" not in headers or compress:
+            if media_type_of(headers.get("content-type")) in self.middleware.media_types:
+                add_vary(headers)
+        self._passthrough = not compress
+        await self._send(start)
+
+    async def _send_whole(self, body: bytes) -> None:
+        compressed = self._compressor.compress(body, final=True)
+        await self._flush_start(compress=True, length=len(compressed))
+        await self._send({"type": "http.response.body", "body": compressed})
+
+    async def _send_compressed(self, message: Message) -> None:
+        more_body = message.get("more_body", False)
+        data = self._compressor.compress(message.get("body", b""), final=not more_body)
+        await self._send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+
+__all__ = [
+    "BROTLI",
+    "COMPRESSIBLE_TYPES",
+    "CompressionMiddleware",
+    "GZIP",
+    "add_vary",
+    "available_encodings",
+    "preferred_encoding",
+]
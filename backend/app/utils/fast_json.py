@@ -0,0 +1,43 @@
+"""Sérialisation JSON rapide des listes renvoyées par l'API.
+
+Les routes de liste sélectionnent des tuples de colonnes et les encodent
+directement, sans objets ORM ni validation Pydantic. ``orjson`` est utilisé
+s'il est installé ; sinon la bibliothèque standard produit exactement les
+mêmes octets que la réponse par défaut de FastAPI (JSON compact, UTF-8).
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Iterable, Sequence
+
+from fastapi import Response
+
+try:  # pragma: no cover - dépend de l'environnement
+    import orjson
+except ImportError:  # pragma: no cover - dépend de l'environnement
+    orjson = None
+
+_encode = json.JSONEncoder(ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode
+
+
+def dumps(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return _encode(value).encode("utf-8")
+
+
+def rows_response(fields: Sequence[str], rows: Iterable[Sequence[Any]]) -> Response:
+    """Réponse JSON ``[{field: valeur, ...}, ...]`` construite depuis des tuples.
+
+    L'ordre de ``fields`` doit suivre celui du schéma de sortie déclaré par
+    la route, pour que le corps soit identique à la sérialisation Pydantic.
+    """
+
+    return Response(
+        content=dumps([dict(zip(fields, row)) for row in rows]),
+        media_type="application/json",
+    )
+
+
+__all__ = ["dumps", "rows_response"]
@@ -0,0 +1,100 @@
+"""Reconnaissance et forme canonique des liens YouTube et Spotify."""
+
+from __future__ import annotations
+
+import re
+from urllib.parse import parse_qs, urlsplit
+
+_ID = r"[A-Za-z0-9_-]+"
+
+_YOUTUBE_HOSTS = {
+    "youtube.com",
+    "www.youtube.com",
+    "m.youtube.com",
+    "music.youtube.com",
+    "youtu.be",
+    "www.youtu.be",
+}
+_SPOTIFY_HOSTS = {"open.spotify.com", "spotify.com", "www.spotify.com"}
+
+_YOUTUBE_PATH = re.compile(rf"^/(?:shorts|embed|live|v)/({_ID})")
+_SPOTIFY_PATH = re.compile(
+    rf"^/(?:intl-[a-z]{{2}}(?:-[a-z]{{2}})?/)?(track|album|playlist|episode)/({_ID})", re.IGNORECASE
+)
+
+# Repère les liens dans un message libre (chat). Le test `in` évite la regex
+# sur l'immense majorité des messages, qui ne contiennent aucun lien.
+_LINK_IN_TEXT = re.compile(
+    r"(?:https?://)?(?:[a-z]+\.)?(?:youtube\.com|youtu\.be|spotify\.com)/[^\s<>\"']+",
+    re.IGNORECASE,
+)
+
+
+def canonicalize_link(link: str) -> str | None:
+    """Retourne l'URL canonique d'un morceau, ou ``None`` si le lien n'est pas reconnu.
+
+    ``youtu.be/ID``, ``/shorts/ID`` ou ``watch?v=ID&t=42`` deviennent
+    ``https://www.youtube.com/watch?v=ID`` ; les liens Spotify perdent leur
+    préfixe de langue et leurs paramètres de suivi.
+    """
+
+    cleaned = link.strip()
+    if not cleaned:
+        return None
+    if "://" not in cleaned:
+        cleaned = f"https://{cleaned}"
+
+    try:
+        parts = urlsplit(cleaned)
+    except ValueError:
+        return None
+    if parts.scheme.lower() not in {"http", "https"}:
+        return None
+    host = (parts.hostname or "").lower()
+
+    if host in _YOUTUBE_HOSTS:
+        video_id = None
+        if host.endswith("youtu.be"):
+            video_id = parts.path.strip("/").split("/", 1)[0]
+        elif parts.path.rstrip("/") == "/watch":
+            video_id = parse_qs(parts.query).get("v", [""])[0]
+        else:
+            match = _YOUTUBE_PATH.match(parts.path)
+            video_id = match.group(1) if match else None
+        if video_id and re.fullmatch(_ID, video_id):
+            return f"https://www.youtube.com/watch?v={video_id}"
+        return None
+
+    if host in _SPOTIFY_HOSTS:
+        match = _SPOTIFY_PATH.match(parts.path)
+        if match:
+            return f"https://open.spotify.com/{match.group(1).lower()}/{match.group(2)}"
+        return None
+
+    return None
+
+
+def comparable_link(link: str) -> str | None:
+    """Forme sous laquelle un lien est stocké et comparé : canonique s'il est
+    reconnu, sinon débarrassé de ses espaces (``None`` s'il est vide)."""
+
+    return canonicalize_link(link) or link.strip() or None
+
+
+def extract_links(text: str) -> list[str]:
+    """Liens canoniques trouvés dans ``text``, sans doublon, dans l'ordre."""
+
+    if "youtu" not in text and "spotify" not in text:
+        lowered = text.lower()
+        if "youtu" not in lowered and "spotify" not in lowered:
+            return []
+
+    links: list[str] = []
+    for match in _LINK_IN_TEXT.finditer(text):
+        canonical = canonicalize_link(match.group(0).rstrip(".,;:!?)]}"))
+        if canonical and canonical not in links:
+            links.append(canonical)
+    return links
+
+
+__all__ = ["canonicalize_link", "comparable_link", "extract_links"]
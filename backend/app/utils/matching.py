@@ -0,0 +1,126 @@
+"""Multi-pattern substring matching used to evaluate many ban rules at once."""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from collections import deque
+from typing import Sequence
+
+# Séparateur absent des chaînes normalisées ([a-z0-9] uniquement).
+_SEPARATOR = "\x00"
+
+
+class AhoCorasick:
+    """Automate d'Aho–Corasick : trouve en une passe les motifs contenus dans un texte."""
+
+    def __init__(self, patterns: Sequence[str]) -> None:
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._output: list[tuple[int, ...]] = [()]
+
+        for index, pattern in enumerate(patterns):
+            if not pattern:
+                continue
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(())
+                state = next_state
+            self._output[state] += (index,)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state] += self._output[self._fail[next_state]]
+
+        # Transitions résolues (liens d'échec compris), complétées à la demande :
+        # l'automate devient un DFA sur les caractères réellement rencontrés.
+        self._delta: list[dict[str, int]] = [dict(edges) for edges in self._goto]
+
+    def _resolve(self, state: int, char: str) -> int:
+        origin = state
+        while state and char not in self._goto[state]:
+            state = self._fail[state]
+        target = self._goto[state].get(char, 0)
+        self._delta[origin][char] = target
+        return target
+
+    def find(self, text: str) -> set[int]:
+        """Indices des motifs présents dans ``text``."""
+
+        delta, output = self._delta, self._output
+        found: set[int] = set()
+        state = 0
+        for char in text:
+            next_state = delta[state].get(char)
+            if next_state is None:
+                next_state = self._resolve(state, char)
+            state = next_state
+            if output[state]:
+                found.update(output[state])
+        return found
+
+
+class OverlapIndex:
+    """Répond à « quelles aiguilles chevauchent cette valeur ? ».
+
+    Deux chaînes se chevauchent quand l'une contient l'autre, comme dans
+    ``_normalized_overlap``. Les aiguilles vides ne chevauchent rien.
+    """
+
+    def __init__(self, needles: Sequence[str]) -> None:
+        positions: dict[str, list[int]] = {}
+        for index, needle in enumerate(needles):
+            if needle:
+                positions.setdefault(needle, []).append(index)
+
+        self._patterns = list(positions)
+        self._needles_by_pattern = [tuple(positions[pattern]) for pattern in self._patterns]
+        self._automaton = AhoCorasick(self._patterns)
+
+        # Les motifs concaténés permettent de chercher « valeur dans motif » en C.
+        self._haystack = _SEPARATOR.join(self._patterns)
+        self._starts: list[int] = []
+        offset = 0
+        for pattern in self._patterns:
+            self._starts.append(offset)
+            offset += len(pattern) + 1
+        self._max_length = max(map(len, self._patterns), default=0)
+
+    def __bool__(self) -> bool:
+        return bool(self._patterns)
+
+    def overlaps(self, value: str) -> set[int]:
+        if not value or not self._patterns:
+            return set()
+
+        patterns = self._automaton.find(value)
+        if len(value) <= self._max_length:
+            haystack, starts = self._haystack, self._starts
+            position = haystack.find(value)
+            while position != -1:
+                pattern = bisect_right(starts, position) - 1
+                patterns.add(pattern)
+                # Reprend la recherche après le motif courant.
+                next_start = starts[pattern + 1] if pattern + 1 < len(starts) else len(haystack)
+                position = haystack.find(value, next_start)
+
+        needles: set[int] = set()
+        for pattern in patterns:
+            needles.update(self._needles_by_pattern[pattern])
+        return needles
+
+
+__all__ = ["AhoCorasick", "OverlapIndex"]
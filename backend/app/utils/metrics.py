@@ -0,0 +1,479 @@
+"""Métriques légères en mémoire, exportées au format texte de Prometheus."""
+
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterable, Iterator, Sequence
+
+DEFAULT_LATENCY_BUCKETS: tuple[float, ...] = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+SIZE_BUCKETS: tuple[float, ...] = (128, 512, 2_048, 8_192, 32_768, 131_072, 524_288, 2_097_152)
+COUNT_BUCKETS: tuple[float, ...] = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+UNMATCHED_ROUTE = "unmatched"
+
+# Un collecteur renvoie des familles (nom, type, aide, [(labels, valeur), ...]).
+Sample = tuple[dict[str, str], float]
+Family = tuple[str, str, str, list[Sample]]
+Collector = Callable[[], Iterable[Family]]
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    rendered = ",".join(f'{key}="{_escape_label_value(str(value))}"' for key, value in labels.items())
+    return "{" + rendered + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _labels(self, values: tuple[str, ...]) -> dict[str, str]:
+        return dict(zip(self.labelnames, values))
+
+    def render(self) -> list[str]:  # pragma: no cover - overridden
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, labels: tuple[str, ...] = (), amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, labels: tuple[str, ...] = ()) -> float:
+        return self._values.get(labels, 0.0)
+
+    def items(self) -> list[tuple[tuple[str, ...], float]]:
+        with self._lock:
+            return list(self._values.items())
+
+    def render(self) -> list[str]:
+        items = self.items()
+        return [
+            f"{self.name}{_format_labels(self._labels(labels))} {_format_value(value)}"
+            for labels, value in items
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, labels: tuple[str, ...] = (), amount: float = 1.0) -> None:
+        self.inc(labels, -amount)
+
+    def set(self, value: float, labels: tuple[str, ...] = ()) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [compteurs par seau (+Inf inclus), somme, total]
+        self._series: dict[tuple[str, ...], list] = {}
+
+    def observe(self, value: float, labels: tuple[str, ...] = ()) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = [[0] * (len(self.buckets) + 1), 0.0, 0]
+                self._series[labels] = series
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, labels: tuple[str, ...] = ()) -> int:
+        series = self._series.get(labels)
+        return series[2] if series else 0
+
+    def total(self, labels: tuple[str, ...] = ()) -> float:
+        series = self._series.get(labels)
+        return series[1] if series else 0.0
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = [(labels, list(series[0]), series[1], series[2]) for labels, series in self._series.items()]
+
+        lines: list[str] = []
+        for labels, bucket_counts, total, count in items:
+            base = self._labels(labels)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), bucket_counts):
+                cumulative += bucket_count
+                bucket_labels = {**base, "le": _format_value(bound)}
+                lines.append(f"{self.name}_bucket{_format_labels(bucket_labels)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(base)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(base)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Regroupe les métriques et les collecteurs calculés à la demande."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+        self._collectors: list[Collector] = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))  # type: ignore[return-value]
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))  # type: ignore[return-value]
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(  # type: ignore[return-value]
+            Histogram(name, documentation, labelnames, buckets)
+        )
+
+    def register_collector(self, collector: Collector) -> None:
+        with self._lock:
+            if collector not in self._collectors:
+                self._collectors.append(collector)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+
+        lines: list[str] = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+
+        for collector in collectors:
+            for name, kind, documentation, samples in collector():
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    suffix = labels.pop("__suffix__", None)
+                    if kind == "histogram":
+                        sample_name = f"{name}_{suffix}" if suffix else f"{name}_bucket"
+                    else:
+                        sample_name = name
+                    lines.append(f"{sample_name}{_format_labels(labels)} {_format_value(value)}")
+
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+DB_STATEMENT_DURATION = REGISTRY.histogram(
+    "db_statement_duration_seconds", "Durée des instructions SQL."
+)
+OUTBOUND_HTTP_DURATION = REGISTRY.histogram(
+    "outbound_http_duration_seconds",
+    "Durée des appels HTTP sortants par fournisseur.",
+    ("provider", "outcome"),
+)
+CACHE_REQUESTS = REGISTRY.counter(
+    "cache_requests_total", "Accès aux caches internes.", ("cache", "result")
+)
+
+
+class HttpRequestStats:
+    """Histogrammes HTTP regroupés par (méthode, route, statut).
+
+    Les quatre histogrammes d'une requête sont mis à jour en une seule recherche
+    de dictionnaire. Seul le middleware écrit, depuis la boucle d'événements :
+    aucun verrou n'est donc pris sur le chemin chaud.
+    """
+
+    _FAMILIES = (
+        ("http_request_duration_seconds", "Durée de traitement des requêtes HTTP.", DEFAULT_LATENCY_BUCKETS),
+        ("http_response_size_bytes", "Taille du corps des réponses HTTP.", SIZE_BUCKETS),
+        ("http_request_db_seconds", "Temps passé en base de données par requête HTTP.", DEFAULT_LATENCY_BUCKETS),
+        ("http_request_db_statements", "Instructions SQL exécutées par requête HTTP.", COUNT_BUCKETS),
+    )
+
+    def __init__(self) -> None:
+        self.in_flight = 0
+        # clé -> [total, (compteurs, somme) x 4]
+        self._series: dict[tuple[str, str, str], list] = {}
+
+    def record(
+        self, key: tuple[str, str, str], elapsed: float, size: int, db_time: float, db_statements: int
+    ) -> None:
+        series = self._series.get(key)
+        if series is None:
+            series = [0] + [[[0] * (len(buckets) + 1), 0.0] for _, _, buckets in self._FAMILIES]
+            self._series[key] = series
+        series[0] += 1
+        latency, response_size, db_duration, statements = series[1], series[2], series[3], series[4]
+        latency[0][bisect_left(DEFAULT_LATENCY_BUCKETS, elapsed)] += 1
+        latency[1] += elapsed
+        response_size[0][bisect_left(SIZE_BUCKETS, size)] += 1
+        response_size[1] += size
+        db_duration[0][bisect_left(DEFAULT_LATENCY_BUCKETS, db_time)] += 1
+        db_duration[1] += db_time
+        statements[0][bisect_left(COUNT_BUCKETS, db_statements)] += 1
+        statements[1] += db_statements
+
+    def count(self, key: tuple[str, str, str]) -> int:
+        series = self._series.get(key)
+        return series[0] if series else 0
+
+    def db_statements(self, key: tuple[str, str, str]) -> float:
+        series = self._series.get(key)
+        return series[4][1] if series else 0.0
+
+    def collect(self) -> list[Family]:
+        snapshot = [
+            (key, series[0], [(list(counts), total) for counts, total in series[1:]])
+            for key, series in list(self._series.items())
+        ]
+        families: list[Family] = [
+            (
+                "http_requests_in_flight",
+                "gauge",
+                "Requêtes HTTP en cours de traitement.",
+                [({}, self.in_flight)],
+            )
+        ]
+        for index, (name, documentation, buckets) in enumerate(self._FAMILIES):
+            samples: list[Sample] = []
+            for (method, route, status), count, histograms in snapshot:
+                counts, total = histograms[index]
+                base = {"method": method, "route": route, "status": status}
+                cumulative = 0
+                for bound, bucket_count in zip(buckets + (float("inf"),), counts):
+                    cumulative += bucket_count
+                    samples.append(({**base, "le": _format_value(bound)}, cumulative))
+                samples.append(({**base, "__suffix__": "sum"}, total))
+                samples.append(({**base, "__suffix__": "count"}, count))
+            families.append((name, "histogram", documentation, samples))
+        return families
+
+
+HTTP_STATS = HttpRequestStats()
+REGISTRY.register_collector(HTTP_STATS.collect)
+
+
+class RequestMetrics:
+    """Accumulateur propre à une requête HTTP (temps SQL, taille, statut)."""
+
+    __slots__ = ("db_time", "db_statements", "status", "size")
+
+    def __init__(self) -> None:
+        self.db_time = 0.0
+        self.db_statements = 0
+        self.status = 500
+        self.size = 0
+
+
+_current_request: ContextVar[RequestMetrics | None] = ContextVar(
+    "tchatrecosong_request_metrics", default=None
+)
+
+
+def current_request_metrics() -> RequestMetrics | None:
+    return _current_request.get()
+
+
+def route_label(scope) -> str:  # noqa: ANN001
+    """Gabarit de route borné (``/songs/{song_id}/vote``) pour étiqueter les métriques.
+
+    Lu sur la route résolue par le routeur, jamais reconstruit depuis l'URL :
+    une valeur de paramètre ne peut pas créer de nouvelle série.
+    """
+
+    # Les routeurs inclus de FastAPI laissent dans ``scope["route"]`` la route
+    # d'origine (chemin sans le préfixe) ; le gabarit complet est sur la route effective.
+    fastapi_scope = scope.get("fastapi")
+    effective = fastapi_scope.get("effective_route_context") if isinstance(fastapi_scope, dict) else None
+    route = scope.get("route")
+    for candidate in (effective, route):
+        template = getattr(candidate, "path_format", None) or getattr(candidate, "path", None)
+        if isinstance(template, str) and template:
+            return template
+    return UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """Middleware ASGI pur : latence, requêtes en vol, taille et temps SQL par route."""
+
+    def __init__(self, app, stats: HttpRequestStats = HTTP_STATS) -> None:  # noqa: ANN001
+        self.app = app
+        self.stats = stats
+
+    async def __call__(self, scope, receive, send) -> None:  # noqa: ANN001
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = self.stats
+        state = RequestMetrics()
+        token = _current_request.set(state)
+        stats.in_flight += 1
+        start = time.perf_counter()
+
+        async def send_wrapper(message) -> None:  # noqa: ANN001
+            if message["type"] == "http.response.start":
+                state.status = message["status"]
+            else:
+                state.size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            stats.in_flight -= 1
+            _current_request.reset(token)
+            stats.record(
+                (scope["method"], route_label(scope), str(state.status)),
+                elapsed,
+                state.size,
+                state.db_time,
+                state.db_statements,
+            )
+
+
+# Clé stockée dans `conn.info` pour dater le début des instructions SQL.
+_QUERY_START_KEY = "tchatrecosong_query_start"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):  # noqa: ANN001
+    conn.info.setdefault(_QUERY_START_KEY, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):  # noqa: ANN001
+    starts = conn.info.get(_QUERY_START_KEY)
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    DB_STATEMENT_DURATION.observe(elapsed)
+    state = _current_request.get()
+    if state is not None:
+        state.db_time += elapsed
+        state.db_statements += 1
+
+
+def instrument_engine(engine) -> None:  # noqa: ANN001
+    """Mesure la durée des instructions SQL exécutées par ce moteur."""
+
+    from sqlalchemy import event
+
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+@contextmanager
+def track_outbound(provider: str) -> Iterator[None]:
+    """Chronomètre un appel HTTP sortant vers ``provider``."""
+
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        OUTBOUND_HTTP_DURATION.observe(time.perf_counter() - start, (provider, outcome))
+
+
+def record_cache_access(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.inc((cache, "hit" if hit else "miss"))
+
+
+def _cache_hit_ratio_collector() -> Iterable[Family]:
+    totals: dict[str, list[float]] = {}
+    for labels, value in CACHE_REQUESTS.items():
+        cache, result = labels
+        entry = totals.setdefault(cache, [0.0, 0.0])
+        entry[0 if result == "hit" else 1] += value
+
+    samples = [
+        ({"cache": cache}, hits / (hits + misses))
+        for cache, (hits, misses) in totals.items()
+        if hits + misses
+    ]
+    return [("cache_hit_ratio", "gauge", "Ratio de succès des caches internes.", samples)]
+
+
+REGISTRY.register_collector(_cache_hit_ratio_collector)
+
+
+__all__ = [
+    "Counter",
+    "Gauge",
+    "HTTP_STATS",
+    "Histogram",
+    "HttpRequestStats",
+    "MetricsMiddleware",
+    "MetricsRegistry",
+    "REGISTRY",
+    "RequestMetrics",
+    "current_request_metrics",
+    "instrument_engine",
+    "record_cache_access",
+    "route_label",
+    "track_outbound",
+]
@@ -0,0 +1,196 @@
+"""Opt-in SQL profiler used to spot query fan-out in development and tests."""
+
+from __future__ import annotations
+
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Iterator
+
+logger = logging.getLogger(__name__)
+
+_STRING_LITERAL_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST_RE = re.compile(r"\bIN\s*\((?:\s*\?\s*,?)+\)", re.IGNORECASE)
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Au-delà de ce nombre d'exécutions d'une même empreinte, on suspecte un N+1.
+REPEAT_THRESHOLD = 3
+
+
+def fingerprint(statement: str) -> str:
+    """Réduit une requête SQL à sa forme, sans littéraux ni listes de paramètres."""
+
+    normalized = _STRING_LITERAL_RE.sub("?", statement)
+    normalized = _NUMBER_LITERAL_RE.sub("?", normalized)
+    normalized = normalized.replace("%s", "?")
+    normalized = _IN_LIST_RE.sub("IN (...)", normalized)
+    return _WHITESPACE_RE.sub(" ", normalized).strip()
+
+
+@dataclass
+class QueryRecord:
+    statement: str
+    fingerprint: str
+    parameters: Any
+    duration: float
+
+
+@dataclass
+class QueryProfile:
+    """Instructions SQL capturées pendant une requête ou un bloc de code."""
+
+    label: str = ""
+    records: list[QueryRecord] = field(default_factory=list)
+
+    @property
+    def count(self) -> int:
+        return len(self.records)
+
+    @property
+    def total_time(self) -> float:
+        return sum(record.duration for record in self.records)
+
+    def repeated_fingerprints(self, threshold: int = REPEAT_THRESHOLD) -> dict[str, int]:
+        counts = Counter(record.fingerprint for record in self.records)
+        return {fp: count for fp, count in counts.items() if count >= threshold}
+
+    def identical_statements(self) -> dict[str, int]:
+        """Instructions ré-exécutées avec exactement les mêmes paramètres."""
+
+        counts = Counter((record.statement, repr(record.parameters)) for record in self.records)
+        return {statement: count for (statement, _), count in counts.items() if count > 1}
+
+    def slow_statements(self, threshold: float) -> list[QueryRecord]:
+        return [record for record in self.records if record.duration >= threshold]
+
+    def summary(self) -> str:
+        lines = [
+            f"{self.label or 'profil'} : {self.count} requête(s) SQL, "
+            f"{self.total_time * 1000:.2f} ms"
+        ]
+        for fp, count in Counter(record.fingerprint for record in self.records).most_common():
+            lines.append(f"  {count}x {fp}")
+        return "\n".join(lines)
+
+
+_active_profile: ContextVar[QueryProfile | None] = ContextVar(
+    "tchatrecosong_query_profile", default=None
+)
+
+# Clé stockée dans `conn.info` pour dater le début des instructions SQL.
+_PROFILE_START_KEY = "tchatrecosong_profile_start"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):  # noqa: ANN001
+    if _active_profile.get() is not None:
+        conn.info.setdefault(_PROFILE_START_KEY, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):  # noqa: ANN001
+    profile = _active_profile.get()
+    starts = conn.info.get(_PROFILE_START_KEY)
+    if profile is None or not starts:
+        return
+    duration = time.perf_counter() - starts.pop()
+    profile.records.append(QueryRecord(statement, fingerprint(statement), parameters, duration))
+
+
+def install_query_profiler(engine) -> None:  # noqa: ANN001
+    """Branche le profileur sur ce moteur (sans effet hors d'un bloc profilé)."""
+
+    from sqlalchemy import event
+
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+@contextmanager
+def profile_queries(label: str = "") -> Iterator[QueryProfile]:
+    """Capture les instructions SQL exécutées dans le bloc (moteurs instrumentés)."""
+
+    profile = QueryProfile(label=label)
+    token = _active_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _active_profile.reset(token)
+
+
+def log_profile(profile: QueryProfile, slow_threshold: float) -> None:
+    repeated = profile.repeated_fingerprints()
+    identical = profile.identical_statements()
+    slow = profile.slow_statements(slow_threshold)
+
+    if repeated or identical or slow:
+        logger.warning(profile.summary())
+        for fp, count in repeated.items():
+            logger.warning("Requête répétée %d fois (N+1 probable) : %s", count, fp)
+        for statement, count in identical.items():
+            logger.warning("Requête identique exécutée %d fois : %s", count, fingerprint(statement))
+        for record in slow:
+            logger.warning(
+                "Requête lente (%.1f ms) : %s", record.duration * 1000, record.fingerprint
+            )
+    else:
+        logger.info(
+            "%s : %d requête(s) SQL, %.2f ms",
+            profile.label,
+            profile.count,
+            profile.total_time * 1000,
+        )
+
+
+class QueryProfilerMiddleware:
+    """Middleware ASGI qui journalise un résumé SQL par requête HTTP."""
+
+    def __init__(self, app, slow_threshold: float = 0.1) -> None:  # noqa: ANN001
+        self.app = app
+        self.slow_threshold = slow_threshold
+
+    async def __call__(self, scope, receive, send) -> None:  # noqa: ANN001
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with profile_queries(f"{scope['method']} {scope['path']}") as profile:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                log_profile(profile, self.slow_threshold)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a profiled block runs more SQL statements than allowed."""
+
+
+@contextmanager
+def assert_max_queries(max_queries: int, label: str = "") -> Iterator[QueryProfile]:
+    """Échoue si le bloc exécute plus de ``max_queries`` instructions SQL."""
+
+    with profile_queries(label) as profile:
+        yield profile
+
+    if profile.count > max_queries:
+        raise QueryBudgetExceeded(
+            f"{profile.count} requêtes SQL exécutées (maximum {max_queries}).\n"
+            + profile.summary()
+        )
+
+
+__all__ = [
+    "QueryBudgetExceeded",
+    "QueryProfile",
+    "QueryProfilerMiddleware",
+    "assert_max_queries",
+    "fingerprint",
+    "install_query_profiler",
+    "log_profile",
+    "profile_queries",
+]
@@ -0,0 +1,74 @@
+"""Jeton « lire ses propres écritures » échangé avec le navigateur.
+
+Quand une requête valide une écriture sur le primaire, la réponse porte
+``X-Read-After`` : une échéance signée (HMAC). Le navigateur le renvoie sur ses
+requêtes suivantes ; tant que l'échéance n'est pas passée, leurs lectures sont
+servies par le primaire plutôt que par un réplica en retard. Le jeton suit la
+session du navigateur, pas son adresse : derrière un proxy, l'écriture d'un
+viewer n'épingle pas tous les autres au primaire.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import math
+import time
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.database import connection
+
+READ_AFTER_HEADER = "X-Read-After"
+
+
+def issue_token(secret: str, lag_seconds: float, now: float | None = None) -> str:
+    expires_ms = math.ceil(((time.time() if now is None else now) + lag_seconds) * 1000)
+    return f"{expires_ms}.{_sign(secret, expires_ms)}"
+
+
+def token_is_valid(token: str | None, secret: str, now: float | None = None) -> bool:
+    """Vrai si ``token`` est signé avec ``secret`` et pas encore échu."""
+
+    if not token:
+        return False
+    raw_expiry, _, signature = token.partition(".")
+    try:
+        expires_ms = int(raw_expiry)
+    except ValueError:
+        return False
+    if not hmac.compare_digest(signature, _sign(secret, expires_ms)):
+        return False
+    return expires_ms > (time.time() if now is None else now) * 1000
+
+
+def _sign(secret: str, expires_ms: int) -> str:
+    digest = hmac.new(secret.encode(), str(expires_ms).encode(), hashlib.sha256)
+    return digest.hexdigest()[:32]
+
+
+class ReadYourWritesMiddleware:
+    def __init__(self, app: ASGIApp, secret: str) -> None:
+        self.app = app
+        self.secret = secret
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not connection.has_read_replica():
+            await self.app(scope, receive, send)
+            return
+
+        lag = connection.READ_REPLICA_MAX_LAG_SECONDS
+        pinned = token_is_valid(Headers(scope=scope).get(READ_AFTER_HEADER), self.secret)
+        with connection.read_your_writes_scope(pinned=pinned) as state:
+
+            async def send_with_token(message: Message) -> None:
+                if message["type"] == "http.response.start" and state.wrote and lag > 0:
+                    headers = MutableHeaders(scope=message)
+                    headers[READ_AFTER_HEADER] = issue_token(self.secret, lag)
+                await send(message)
+
+            await self.app(scope, receive, send_with_token)
+
+
+__all__ = ["READ_AFTER_HEADER", "ReadYourWritesMiddleware", "issue_token", "token_is_valid"]
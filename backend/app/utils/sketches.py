@@ -0,0 +1,200 @@
+"""Ensembles compacts d'empreintes de votants (exacts puis filtres de Bloom)."""
+
+from __future__ import annotations
+
+import math
+import struct
+from array import array
+from bisect import bisect_left
+
+# Au-delà de ce nombre de votants, l'ensemble exact (8 octets par votant)
+# est converti en filtre de Bloom.
+EXACT_LIMIT = 256
+# Taux de faux positifs visé par le filtre de Bloom (vote refusé à tort).
+BLOOM_FALSE_POSITIVE_RATE = 0.01
+# Capacité du premier étage ; chaque étage suivant double.
+BLOOM_INITIAL_CAPACITY = 1024
+
+_EXACT = b"E"
+_BLOOM = b"B"
+_STAGE_HEADER = struct.Struct("<IIII")  # bits, hachages, capacité, éléments
+_UINT64 = (1 << 64) - 1
+
+
+class ExactVoterSet:
+    """Empreintes 64 bits triées : pas de faux positif, 8 octets par votant."""
+
+    kind = "exact"
+
+    def __init__(self, fingerprints: array | None = None) -> None:
+        self._items = fingerprints if fingerprints is not None else array("Q")
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, fingerprint: int) -> bool:
+        index = bisect_left(self._items, fingerprint)
+        return index < len(self._items) and self._items[index] == fingerprint
+
+    def add(self, fingerprint: int) -> bool:
+        index = bisect_left(self._items, fingerprint)
+        if index < len(self._items) and self._items[index] == fingerprint:
+            return False
+        self._items.insert(index, fingerprint)
+        return True
+
+    def __iter__(self):  # noqa: ANN204
+        return iter(self._items)
+
+    def to_bytes(self) -> bytes:
+        return _EXACT + self._items.tobytes()
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._items) * self._items.itemsize
+
+
+class _BloomStage:
+    __slots__ = ("bits", "hashes", "capacity", "count", "data")
+
+    def __init__(
+        self,
+        capacity: int,
+        error_rate: float,
+        data: bytearray | None = None,
+        *,
+        bits: int | None = None,
+        hashes: int | None = None,
+        count: int = 0,
+    ) -> None:
+        self.capacity = capacity
+        if bits is None:
+            bits = max(64, math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+            bits = (bits + 7) // 8 * 8
+        if hashes is None:
+            hashes = max(1, round(bits / capacity * math.log(2)))
+        self.bits = bits
+        self.hashes = hashes
+        self.count = count
+        self.data = data if data is not None else bytearray(bits // 8)
+
+    def _positions(self, fingerprint: int):  # noqa: ANN202
+        # Double hachage (Kirsch–Mitzenmacher) sur les deux moitiés de l'empreinte.
+        h1 = fingerprint & 0xFFFFFFFF
+        h2 = (fingerprint >> 32) | 1
+        bits = self.bits
+        for index in range(self.hashes):
+            yield (h1 + index * h2) % bits
+
+    def __contains__(self, fingerprint: int) -> bool:
+        # Boucle explicite : un non-membre s'arrête en général au premier bit nul.
+        data = self.data
+        h1 = fingerprint & 0xFFFFFFFF
+        h2 = (fingerprint >> 32) | 1
+        bits = self.bits
+        for index in range(self.hashes):
+            pos = (h1 + index * h2) % bits
+            if not data[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+    def add(self, fingerprint: int) -> None:
+        data = self.data
+        for pos in self._positions(fingerprint):
+            data[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+
+class BloomVoterSet:
+    """Filtre de Bloom extensible : un nouvel étage (capacité doublée, taux
+    d'erreur divisé par deux) est ajouté quand le dernier est plein, si bien
+    que le taux global reste sous ``2 × error_rate``.
+    """
+
+    kind = "bloom"
+
+    def __init__(
+        self,
+        error_rate: float = BLOOM_FALSE_POSITIVE_RATE,
+        initial_capacity: int = BLOOM_INITIAL_CAPACITY,
+        stages: list[_BloomStage] | None = None,
+    ) -> None:
+        self.error_rate = error_rate
+        self.initial_capacity = initial_capacity
+        self._stages = stages or [_BloomStage(initial_capacity, error_rate / 2)]
+
+    def __len__(self) -> int:
+        return sum(stage.count for stage in self._stages)
+
+    def __contains__(self, fingerprint: int) -> bool:
+        return any(fingerprint in stage for stage in self._stages)
+
+    def add(self, fingerprint: int) -> bool:
+        if fingerprint in self:
+            return False
+        stage = self._stages[-1]
+        if stage.count >= stage.capacity:
+            rate = self.error_rate / 2 ** (len(self._stages) + 1)
+            stage = _BloomStage(stage.capacity * 2, rate)
+            self._stages.append(stage)
+        stage.add(fingerprint)
+        return True
+
+    def to_bytes(self) -> bytes:
+        parts = [_BLOOM]
+        for stage in self._stages:
+            parts.append(_STAGE_HEADER.pack(stage.bits, stage.hashes, stage.capacity, stage.count))
+            parts.append(bytes(stage.data))
+        return b"".join(parts)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(len(stage.data) for stage in self._stages)
+
+
+VoterSet = ExactVoterSet | BloomVoterSet
+
+
+def add_voter(voters: VoterSet, fingerprint: int, exact_limit: int = EXACT_LIMIT) -> tuple[VoterSet, bool]:
+    """Ajoute ``fingerprint`` ; retourne l'ensemble (éventuellement promu) et ``True`` s'il était absent."""
+
+    fingerprint &= _UINT64
+    if isinstance(voters, ExactVoterSet) and len(voters) >= exact_limit:
+        if fingerprint in voters:
+            return voters, False
+        bloom = BloomVoterSet(initial_capacity=max(BLOOM_INITIAL_CAPACITY, exact_limit * 4))
+        for existing in voters:
+            bloom.add(existing)
+        voters = bloom
+    return voters, voters.add(fingerprint)
+
+
+def load_voter_set(payload: bytes | None) -> VoterSet:
+    if not payload:
+        return ExactVoterSet()
+    kind, body = payload[:1], memoryview(payload)[1:]
+    if kind == _EXACT:
+        items = array("Q")
+        items.frombytes(body)
+        return ExactVoterSet(items)
+    if kind == _BLOOM:
+        stages = []
+        offset = 0
+        while offset < len(body):
+            bits, hashes, capacity, count = _STAGE_HEADER.unpack_from(body, offset)
+            offset += _STAGE_HEADER.size
+            data = bytearray(body[offset : offset + bits // 8])
+            offset += bits // 8
+            stages.append(_BloomStage(capacity, 0.0, data, bits=bits, hashes=hashes, count=count))
+        return BloomVoterSet(stages=stages)
+    raise ValueError("Format d'ensemble de votants inconnu")
+
+
+__all__ = [
+    "BloomVoterSet",
+    "EXACT_LIMIT",
+    "ExactVoterSet",
+    "VoterSet",
+    "add_voter",
+    "load_voter_set",
+]
@@ -0,0 +1,114 @@
+"""``index.html`` du frontend gardé en mémoire.
+
+Les routes de la SPA (``/``, ``/submit``, ``/admin``, ``/login``) renvoient
+toutes le même fichier. :class:`SpaIndex` le lit une fois, puis ne refait un
+``stat`` qu'au plus toutes les ``revalidate_seconds`` secondes pour détecter
+un nouveau build (mtime ou taille modifiés). Les réponses portent un ``ETag``
+calculé sur le contenu (identique d'un worker à l'autre) et ``Last-Modified`` ;
+les requêtes conditionnelles reçoivent un 304 sans corps.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+from dataclasses import dataclass
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+
+from starlette.datastructures import Headers
+from starlette.responses import Response
+
+INDEX_REVALIDATE_SECONDS = 1.0
+# Le navigateur garde l'index mais le revalide à chaque navigation : un
+# nouveau build (nouveaux noms d'assets hashés) est pris en compte aussitôt.
+INDEX_CACHE_CONTROL = "no-cache"
+
+
+@dataclass(frozen=True)
+class _Snapshot:
+    body: bytes
+    mtime_ns: int
+    size: int
+    etag: str
+    last_modified: str
+
+
+class SpaIndex:
+    def __init__(self, path: Path | str, revalidate_seconds: float = INDEX_REVALIDATE_SECONDS) -> None:
+        self.path = Path(path)
+        self.revalidate_seconds = revalidate_seconds
+        self._snapshot: _Snapshot | None = None
+        self._checked_at: float | None = None
+        self._lock = threading.Lock()
+
+    def snapshot(self) -> _Snapshot | None:
+        """Contenu courant, relu seulement si le fichier a changé sur disque."""
+
+        checked_at = self._checked_at
+        if checked_at is not None and time.monotonic() - checked_at < self.revalidate_seconds:
+            return self._snapshot
+        with self._lock:
+            self._snapshot = self._revalidate(self._snapshot)
+            self._checked_at = time.monotonic()
+            return self._snapshot
+
+    def _revalidate(self, current: _Snapshot | None) -> _Snapshot | None:
+        try:
+            stat_result = os.stat(self.path)
+        except OSError:
+            return None
+        if (
+            current is not None
+            and current.mtime_ns == stat_result.st_mtime_ns
+            and current.size == stat_result.st_size
+        ):
+            return current
+        try:
+            body = self.path.read_bytes()
+        except OSError:
+            return None
+        digest = hashlib.md5(body, usedforsecurity=False).hexdigest()
+        return _Snapshot(
+            body=body,
+            mtime_ns=stat_result.st_mtime_ns,
+            size=stat_result.st_size,
+            etag=f'"{digest}"',
+            last_modified=formatdate(stat_result.st_mtime, usegmt=True),
+        )
+
+    def response(self, request_headers: Headers) -> Response | None:
+        """Réponse 200 ou 304 pour l'index, ``None`` si le fichier est absent."""
+
+        snapshot = self.snapshot()
+        if snapshot is None:
+            return None
+        headers = {
+            "ETag": snapshot.etag,
+            "Last-Modified": snapshot.last_modified,
+            "Cache-Control": INDEX_CACHE_CONTROL,
+        }
+        if _is_not_modified(snapshot, request_headers):
+            return Response(status_code=304, headers=headers)
+        return Response(content=snapshot.body, media_type="text/html", headers=headers)
+
+
+def _is_not_modified(snapshot: _Snapshot, request_headers: Headers) -> bool:
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match prime sur If-Modified-Since (RFC 9110, 13.2.2).
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or snapshot.etag in tags
+    if_modified_since = request_headers.get("if-modified-since")
+    if if_modified_since is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since).timestamp()
+    except (TypeError, ValueError):
+        return False
+    return snapshot.mtime_ns // 1_000_000_000 <= since
+
+
+__all__ = ["INDEX_CACHE_CONTROL", "SpaIndex"]
@@ -0,0 +1,83 @@
+"""Fichiers statiques du frontend, avec variantes précompressées.
+
+Si le build contient ``app.js.br`` ou ``app.js.gz`` à côté de ``app.js``,
+la variante acceptée par le client est servie telle quelle (``FileResponse``,
+donc envoi sans recompression) avec ``Content-Encoding``. Les fichiers de
+``dist/assets`` portent un hash dans leur nom : ils peuvent être mis en cache
+indéfiniment.
+"""
+
+from __future__ import annotations
+
+import mimetypes
+import os
+import stat
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+from app.utils.compression import BROTLI, GZIP, add_vary, preferred_encoding
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+_SUFFIXES = {BROTLI: ".br", GZIP: ".gz"}
+
+
+def _sibling(full_path: str, suffix: str) -> os.stat_result | None:
+    try:
+        result = os.stat(full_path + suffix)
+    except OSError:
+        return None
+    return result if stat.S_ISREG(result.st_mode) else None
+
+
+def precompressed_variants(full_path: str) -> dict[str, os.stat_result]:
+    """Variantes ``{encodage: stat}`` présentes à côté de ``full_path``."""
+
+    variants = {}
+    for encoding, suffix in _SUFFIXES.items():
+        stat_result = _sibling(full_path, suffix)
+        if stat_result is not None:
+            variants[encoding] = stat_result
+    return variants
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    def __init__(self, *args, immutable: bool = False, **kwargs) -> None:  # noqa: ANN002, ANN003
+        super().__init__(*args, **kwargs)
+        self.immutable = immutable
+
+    def file_response(
+        self,
+        full_path,  # noqa: ANN001
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        full_path = str(full_path)
+        variants = precompressed_variants(full_path)
+        encoding = preferred_encoding(request_headers.get("accept-encoding"), variants)
+        if encoding is None:
+            response = FileResponse(full_path, status_code=status_code, stat_result=stat_result)
+        else:
+            # Le type de contenu est celui du fichier d'origine, pas de l'archive.
+            response = FileResponse(
+                full_path + _SUFFIXES[encoding],
+                status_code=status_code,
+                stat_result=variants[encoding],
+                media_type=mimetypes.guess_type(full_path)[0] or "text/plain",
+            )
+            response.headers["Content-Encoding"] = encoding
+        if variants:
+            add_vary(response.headers)
+        if self.immutable:
+            response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+__all__ = ["IMMUTABLE_CACHE_CONTROL", "PrecompressedStaticFiles", "precompressed_variants"]
@@ -1,13 +1,36 @@
-import re
+import string
 import unicodedata
+from functools import lru_cache
+from typing import Iterable
 
+# Passage en minuscules et suppression de tout ce qui n'est pas [A-Za-z0-9],
+# en une seule passe `bytes.translate` (la suppression a lieu avant la table).
+_LOWER_TABLE = bytes.maketrans(string.ascii_uppercase.encode(), string.ascii_lowercase.encode())
+_DROP_BYTES = bytes(
+    byte for byte in range(256) if not (byte < 128 and chr(byte).isalnum())
+)
 
-def normalize(text: str) -> str:
-    """Return a normalized representation of the given text for comparisons."""
+NORMALIZE_CACHE_SIZE = 8192
+
+
+def _normalize(text: str) -> str:
     if not text:
         return ""
 
-    decomposed = unicodedata.normalize("NFKD", text)
-    ascii_only = decomposed.encode("ASCII", "ignore").decode("utf-8")
-    lowered = ascii_only.lower()
-    return re.sub(r"[^a-z0-9]", "", lowered)
+    if text.isascii():
+        # NFKD ne modifie pas l'ASCII : on évite la décomposition.
+        raw = text.encode("ascii")
+    else:
+        raw = unicodedata.normalize("NFKD", text).encode("ascii", "ignore")
+    return raw.translate(_LOWER_TABLE, _DROP_BYTES).decode("ascii")
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def normalize(text: str) -> str:
+    """Return a normalized representation of the given text for comparisons."""
+    return _normalize(text)
+
+
+def normalize_many(values: Iterable[str | None]) -> list[str]:
+    """Normalize a batch of values without churning the :func:`normalize` cache."""
+    return [_normalize(value) if value else "" for value in values]
@@ -0,0 +1,77 @@
+"""Classement borné des ``capacity`` meilleurs éléments, trié en continu."""
+
+from __future__ import annotations
+
+from bisect import bisect_left, insort
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class TopK(Generic[T]):
+    """Garde les ``capacity`` éléments de plus haut score, ordonnés par
+    ``(score décroissant, identifiant croissant)``.
+
+    Les clés triées vivent dans une liste (recherche par dichotomie, décalage
+    en C de quelques centaines d'éléments au plus) et les charges utiles dans
+    un dict : lire les ``k`` premiers ne coûte qu'une tranche.
+
+    Un élément hors du classement n'y entre que par :meth:`offer` ; la
+    structure reste exacte tant que les scores ne font que croître et que
+    chaque changement lui est signalé. Une suppression la rend incomplète :
+    l'appelant doit alors la reconstruire.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        if capacity <= 0:
+            raise ValueError("capacity doit être positive")
+        self.capacity = capacity
+        self._keys: list[tuple[int, int]] = []
+        self._items: dict[int, tuple[int, T]] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, item_id: int) -> bool:
+        return item_id in self._items
+
+    def score_of(self, item_id: int) -> int | None:
+        entry = self._items.get(item_id)
+        return entry[0] if entry is not None else None
+
+    def offer(self, item_id: int, score: int, payload: T) -> bool:
+        """Propose ``item_id`` avec son score absolu ; retourne ``True`` s'il est classé.
+
+        Un score inférieur à celui déjà connu est ignoré : deux mises à jour
+        concurrentes peuvent arriver dans le désordre.
+        """
+
+        current = self._items.get(item_id)
+        if current is not None:
+            if score < current[0]:
+                return True
+            self._keys.pop(bisect_left(self._keys, (-current[0], item_id)))
+        elif len(self._keys) >= self.capacity:
+            lowest = self._keys[-1]
+            if (-score, item_id) >= lowest:
+                return False
+            self._keys.pop()
+            del self._items[lowest[1]]
+
+        insort(self._keys, (-score, item_id))
+        self._items[item_id] = (score, payload)
+        return True
+
+    def top(self, k: int) -> list[T]:
+        items = self._items
+        return [items[item_id][1] for _, item_id in self._keys[:k]]
+
+    def load(self, entries: list[tuple[int, int, T]]) -> None:
+        """Remplace le contenu par ``(id, score, charge)`` (ordre quelconque)."""
+
+        best = sorted(entries, key=lambda entry: (-entry[1], entry[0]))[: self.capacity]
+        self._keys = [(-score, item_id) for item_id, score, _ in best]
+        self._items = {item_id: (score, payload) for item_id, score, payload in best}
+
+
+__all__ = ["TopK"]
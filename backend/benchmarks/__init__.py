@@ -0,0 +1 @@
+"""Reproducible performance benchmarks (run from the ``backend`` directory)."""
@@ -0,0 +1,132 @@
+"""Mesure l'import en lot de règles de bannissement (``POST /ban/bulk``).
+
+Usage : ``python -m benchmarks.bench_ban_import [--rules N] [--songs N]``
+Compare ``import_ban_rules`` (parsing NDJSON compris) à des appels successifs
+à ``add_ban_rule`` mesurés sur un échantillon puis extrapolés. Le résultat est
+imprimé en JSON.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.crud import ban_rule as ban_crud
+from app.database.connection import Base
+from app.models.song import Song
+from app.services.ban_rule_io import BanRuleListParser, iter_lines
+
+_LETTERS = "abcdefghijklmnopqrstuvwxyz"
+
+
+def _word(rng: random.Random) -> str:
+    return "".join(rng.choice(_LETTERS) for _ in range(rng.randint(5, 9))).capitalize()
+
+
+def _ndjson_payload(rng: random.Random, rules: int) -> bytes:
+    lines = []
+    for index in range(rules):
+        kind = index % 3
+        if kind == 0:
+            rule = {"artist": f"{_word(rng)} {_word(rng)}"}
+        elif kind == 1:
+            rule = {"title": f"{_word(rng)} {_word(rng)}"}
+        else:
+            rule = {"link": f"https://youtu.be/{index:06d}"}
+        lines.append(json.dumps(rule))
+    # Quelques doublons, comme dans une liste partagée entre modérateurs.
+    lines.extend(lines[: rules // 20])
+    return "\n".join(lines).encode("utf-8")
+
+
+async def _parse(payload: bytes) -> BanRuleListParser:
+    async def chunks():
+        for start in range(0, len(payload), 64 * 1024):
+            yield payload[start : start + 64 * 1024]
+
+    parser = BanRuleListParser()
+    await parser.feed_ndjson(iter_lines(chunks()))
+    return parser
+
+
+def _session_factory(path: Path, songs: int, rng: random.Random):  # noqa: ANN202
+    engine = create_engine(f"sqlite:///{path}", future=True)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        connection.execute(
+            insert(Song),
+            [
+                {
+                    "title": f"{_word(rng)} {_word(rng)} {_word(rng)}",
+                    "artist": _word(rng),
+                    "link": f"https://youtu.be/{index:06d}",
+                    "votes": 1,
+                }
+                for index in range(songs)
+            ],
+        )
+    return sessionmaker(bind=engine, expire_on_commit=False)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rules", type=int, default=10_000)
+    parser.add_argument("--songs", type=int, default=20_000)
+    parser.add_argument("--sequential-sample", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    payload = _ndjson_payload(rng, args.rules)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        bulk_factory = _session_factory(Path(tmpdir) / "bulk.db", args.songs, random.Random(args.seed))
+        start = time.perf_counter()
+        parsed = asyncio.run(_parse(payload))
+        parse_s = time.perf_counter() - start
+        with bulk_factory() as db:
+            report = ban_crud.import_ban_rules(db, parsed.rules)
+        bulk_s = time.perf_counter() - start
+
+        sequential_factory = _session_factory(
+            Path(tmpdir) / "sequential.db", args.songs, random.Random(args.seed)
+        )
+        sample = parsed.rules[: args.sequential_sample]
+        start = time.perf_counter()
+        with sequential_factory() as db:
+            for rule in sample:
+                ban_crud.add_ban_rule(db, rule)
+        sequential_estimate_s = (time.perf_counter() - start) / len(sample) * len(parsed.rules)
+
+    print(
+        json.dumps(
+            {
+                "rules_in_payload": len(parsed.rules),
+                "songs": args.songs,
+                "created": report["created"],
+                "duplicates": report["duplicates"],
+                "deleted_songs": report["deleted_songs"],
+                "parse_s": round(parse_s, 3),
+                "import_s": round(bulk_s, 3),
+                "sequential_estimate_s": round(sequential_estimate_s, 1),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
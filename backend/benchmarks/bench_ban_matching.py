@@ -0,0 +1,105 @@
+"""Compare l'évaluation en lot des règles de bannissement à la double boucle.
+
+Usage : ``python -m benchmarks.bench_ban_matching [--songs N] [--rules N]``
+La double boucle est mesurée sur un échantillon puis extrapolée au volume
+complet. Le résultat est imprimé en JSON.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from app.crud.ban_rule import BanRuleMatcher, _matches_rule_values, match_many
+from app.models.ban_rule import BanRule
+
+_LETTERS = "abcdefghijklmnopqrstuvwxyz"
+
+
+def _vocabulary(rng: random.Random, size: int) -> list[str]:
+    return ["".join(rng.choice(_LETTERS) for _ in range(rng.randint(4, 9))).capitalize() for _ in range(size)]
+
+
+def _phrase(rng: random.Random, vocabulary: list[str], low: int, high: int) -> str:
+    return " ".join(rng.choice(vocabulary) for _ in range(rng.randint(low, high)))
+
+
+def _dataset(songs: int, rules: int, seed: int) -> tuple[list[tuple[int, str, str]], list[BanRule]]:
+    rng = random.Random(seed)
+    vocabulary = _vocabulary(rng, 20_000)
+    artists = [_phrase(rng, vocabulary, 1, 2) for _ in range(max(1, songs // 10))]
+    song_rows = [
+        (index, f"{_phrase(rng, vocabulary, 2, 5)} (Official Video)", rng.choice(artists))
+        for index in range(songs)
+    ]
+    rule_rows = []
+    for index in range(rules):
+        kind = rng.random()
+        if kind < 0.5:
+            rule_rows.append(BanRule(id=index, title=_phrase(rng, vocabulary, 2, 3)))
+        elif kind < 0.8:
+            rule_rows.append(BanRule(id=index, artist=rng.choice(artists)))
+        else:
+            rule_rows.append(
+                BanRule(id=index, title=_phrase(rng, vocabulary, 1, 2), artist=rng.choice(artists))
+            )
+    return song_rows, rule_rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--songs", type=int, default=100_000)
+    parser.add_argument("--rules", type=int, default=5_000)
+    parser.add_argument("--naive-sample", type=int, default=200, help="chansons évaluées par la double boucle")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    songs, rules = _dataset(args.songs, args.rules, args.seed)
+
+    start = time.perf_counter()
+    matcher = BanRuleMatcher(rules)
+    compile_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matched = match_many(songs, matcher)
+    batch_s = time.perf_counter() - start
+
+    sample = songs[: args.naive_sample]
+    start = time.perf_counter()
+    naive_matched = [
+        song_id
+        for song_id, title, artist in sample
+        if any(_matches_rule_values(title, artist, rule) for rule in rules)
+    ]
+    naive_sample_s = time.perf_counter() - start
+    naive_estimate_s = naive_sample_s / len(sample) * len(songs)
+
+    sample_ids = {song_id for song_id, _, _ in sample}
+    assert [song_id for song_id in matched if song_id in sample_ids] == naive_matched
+
+    print(
+        json.dumps(
+            {
+                "songs": args.songs,
+                "rules": args.rules,
+                "matched": len(matched),
+                "compile_s": round(compile_s, 4),
+                "match_many_s": round(batch_s, 4),
+                "nested_loop_estimate_s": round(naive_estimate_s, 2),
+                "speedup": round(naive_estimate_s / batch_s, 1),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""Vérifie qu'une chaîne calme ne ralentit pas pendant le raid d'une autre.
+
+Usage : ``python -m benchmarks.bench_channels [--channels 500] [--raid-songs N]``
+Les chansons et règles sont réparties sur ``--channels`` chaînes, la chaîne
+« raid » ayant une file beaucoup plus grosse. Pour une chaîne calme, on mesure
+la liste des chansons, le top 10 et la vérification de bannissement, d'abord au
+repos puis pendant que la chaîne « raid » reçoit des votes en continu et des
+modifications de règles (thread d'écriture). On compte aussi les rechargements
+de l'instantané des règles de la chaîne calme et les soumissions qu'elle
+accepte pendant que la chaîne « raid » est saturée. Résultat en JSON
+(microsecondes).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.api.routes import public_submissions
+from app.crud import ban_rule as crud_ban
+from app.crud import song as crud_song
+from app.database.connection import Base
+from app.models.ban_rule import BanRule
+from app.models.channel import Channel
+from app.models.song import Song
+from app.schemas.ban_rule import BanRuleCreate
+from app.services import leaderboard
+
+QUIET_ID = 2
+RAID_ID = 3
+
+
+def _percentiles(samples: list[float]) -> dict:
+    samples = sorted(samples)
+    return {
+        "p50_us": round(statistics.median(samples) * 1e6, 1),
+        "p95_us": round(samples[int(len(samples) * 0.95) - 1] * 1e6, 1),
+    }
+
+
+def _measure(session_factory, reads: int) -> dict:  # noqa: ANN001
+    timings: dict[str, list[float]] = {"list": [], "top10": [], "is_banned": []}
+    with session_factory() as db:
+        for index in range(reads):
+            started = time.perf_counter()
+            crud_song.get_all_songs(db, channel_id=QUIET_ID)
+            timings["list"].append(time.perf_counter() - started)
+            db.rollback()
+
+            started = time.perf_counter()
+            leaderboard.top_songs(db, 10, QUIET_ID)
+            timings["top10"].append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            crud_ban.is_banned(db, f"Song {index}", "Bench", None, channel_id=QUIET_ID)
+            timings["is_banned"].append(time.perf_counter() - started)
+            db.rollback()
+    return {name: _percentiles(samples) for name, samples in timings.items()}
+
+
+def _raid(session_factory, stop: threading.Event, stats: dict, rng: random.Random) -> None:  # noqa: ANN001
+    with session_factory() as db:
+        raid_ids = [song_id for (song_id,) in db.query(Song.id).filter(Song.channel_id == RAID_ID).limit(5_000)]
+        while not stop.is_set():
+            crud_song.add_votes(db, {rng.choice(raid_ids): rng.randint(1, 3) for _ in range(50)}, channel_id=RAID_ID)
+            stats["vote_batches"] += 1
+            if stats["vote_batches"] % 20 == 0:
+                crud_ban.add_ban_rule(
+                    db, BanRuleCreate(link=f"https://youtu.be/raid-ban-{stats['vote_batches']}"), channel_id=RAID_ID
+                )
+                stats["rule_changes"] += 1
+
+
+def _rate_limits(raid_submissions: int, quiet_submissions: int) -> dict:
+    public_submissions.limiter.reset()
+    raid_allowed = 0
+    for index in range(raid_submissions):
+        ip = f"10.0.{index % 250}.{index // 250 % 250}"
+        if (
+            public_submissions.limiter.check(f"raid:{ip}").allowed
+            and public_submissions.channel_limiter.check("raid").allowed
+        ):
+            raid_allowed += 1
+    quiet_allowed = sum(
+        public_submissions.limiter.check(f"calme:192.168.0.{index}").allowed
+        and public_submissions.channel_limiter.check("calme").allowed
+        for index in range(quiet_submissions)
+    )
+    public_submissions.limiter.reset()
+    return {
+        "raid_attempts": raid_submissions,
+        "raid_allowed": raid_allowed,
+        "quiet_attempts": quiet_submissions,
+        "quiet_allowed": quiet_allowed,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--channels", type=int, default=500)
+    parser.add_argument("--songs-per-channel", type=int, default=200)
+    parser.add_argument("--rules-per-channel", type=int, default=20)
+    parser.add_argument("--raid-songs", type=int, default=100_000)
+    parser.add_argument("--reads", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=9)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        engine = create_engine(
+            f"sqlite:///{Path(tmpdir) / 'channels.db'}",
+            future=True,
+            connect_args={"check_same_thread": False, "timeout": 30},
+        )
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as connection:
+            connection.exec_driver_sql("PRAGMA journal_mode=WAL")
+            connection.execute(
+                insert(Channel),
+                [{"id": 1, "login": "default"}, {"id": QUIET_ID, "login": "calme"}, {"id": RAID_ID, "login": "raid"}]
+                + [{"id": index, "login": f"chaine{index}"} for index in range(4, args.channels + 1)],
+            )
+            songs = [
+                {
+                    "channel_id": channel_id,
+                    "title": f"Song {index}",
+                    "artist": "Bench",
+                    "link": f"https://youtu.be/c{channel_id}-{index}",
+                    "votes": rng.randint(1, 500),
+                }
+                for channel_id in range(1, args.channels + 1)
+                for index in range(args.songs_per_channel)
+            ]
+            songs += [
+                {
+                    "channel_id": RAID_ID,
+                    "title": f"Raid {index}",
+                    "artist": "Raid",
+                    "link": f"https://youtu.be/raid-{index}",
+                    "votes": rng.randint(1, 5_000),
+                }
+                for index in range(args.raid_songs)
+            ]
+            for start in range(0, len(songs), 50_000):
+                connection.execute(insert(Song), songs[start : start + 50_000])
+            connection.execute(
+                insert(BanRule),
+                [
+                    {"channel_id": channel_id, "artist": f"Artiste banni {channel_id}-{index}"}
+                    for channel_id in range(1, args.channels + 1)
+                    for index in range(args.rules_per_channel)
+                ],
+            )
+
+        session_factory = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+        result: dict = {
+            "channels": args.channels,
+            "songs": len(songs),
+            "quiet_channel_songs": args.songs_per_channel,
+            "raid_channel_songs": args.songs_per_channel + args.raid_songs,
+        }
+        with session_factory() as db:
+            quiet_snapshot = crud_ban.get_ban_snapshot(db, QUIET_ID)
+        result["quiet_idle"] = _measure(session_factory, args.reads)
+
+        stop = threading.Event()
+        stats = {"vote_batches": 0, "rule_changes": 0}
+        raider = threading.Thread(target=_raid, args=(session_factory, stop, stats, rng))
+        raider.start()
+        try:
+            time.sleep(0.2)
+            result["quiet_during_raid"] = _measure(session_factory, args.reads)
+        finally:
+            stop.set()
+            raider.join()
+        result["raid"] = stats
+        with session_factory() as db:
+            result["quiet_snapshot_reloaded"] = crud_ban.get_ban_snapshot(db, QUIET_ID) is not quiet_snapshot
+        engine.dispose()
+
+    result["rate_limit"] = _rate_limits(raid_submissions=5_000, quiet_submissions=50)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
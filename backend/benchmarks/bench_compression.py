@@ -0,0 +1,146 @@
+"""Mesure les octets envoyés et le CPU par réponse selon l'encodage.
+
+Usage : ``python -m benchmarks.bench_compression [--sizes 10,1000,10000] [--repeat 50]``
+Pour chaque taille de liste de chansons (corps JSON de ``GET /songs/``),
+envoie ``--repeat`` requêtes à travers :class:`CompressionMiddleware` avec
+``Accept-Encoding: identity``, ``gzip`` puis ``br`` (si le paquet ``brotli``
+est installé) et relève la taille du corps envoyé et le temps CPU moyen par
+réponse (``time.process_time``). Une dernière section compare un fichier
+statique compressé à la volée et sa variante ``.gz`` précompressée servie
+par :class:`PrecompressedStaticFiles`. Résultat en JSON.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gzip
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from starlette.types import ASGIApp
+
+from app.utils import fast_json
+from app.utils.compression import BROTLI, GZIP, CompressionMiddleware, available_encodings
+from app.utils.static_files import PrecompressedStaticFiles
+
+
+def _songs_body(size: int) -> bytes:
+    return fast_json.dumps(
+        [
+            {
+                "id": index,
+                "title": f"Chanson n°{index}",
+                "artist": f"Artiste {index % 97}",
+                "link": f"https://youtu.be/{index:011d}",
+                "thumbnail": f"https://i.ytimg.com/vi/{index:011d}/hqdefault.jpg",
+                "comment": None,
+                "votes": 1 + index % 300,
+            }
+            for index in range(size)
+        ]
+    )
+
+
+def _json_app(body: bytes) -> ASGIApp:
+    async def app(scope, receive, send) -> None:  # noqa: ANN001
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+    return app
+
+
+async def _request(app: ASGIApp, path: str, encoding: str) -> int:
+    sent = 0
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message) -> None:  # noqa: ANN001
+        nonlocal sent
+        sent += len(message.get("body", b""))
+
+    scope = {
+        "type": "http",
+        # ASGI 2.4 : FileResponse envoie le fichier sans guetter la déconnexion.
+        "asgi": {"version": "3.0", "spec_version": "2.4"},
+        "method": "GET",
+        "path": path,
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"accept-encoding", encoding.encode())],
+    }
+    await app(scope, receive, send)
+    return sent
+
+
+def _measure(app: ASGIApp, path: str, encoding: str, repeat: int) -> dict:
+    async def run() -> int:
+        sent = 0
+        for _ in range(repeat):
+            sent = await _request(app, path, encoding)
+        return sent
+
+    started = time.process_time()
+    sent = asyncio.run(run())
+    cpu = time.process_time() - started
+    return {"bytes": sent, "cpu_us_per_response": round(cpu / repeat * 1e6, 1)}
+
+
+def _encodings() -> list[str]:
+    return ["identity", *sorted(available_encodings(), key=[GZIP, BROTLI].index)]
+
+
+def _static(repeat: int) -> dict:
+    source = b"".join(f"export function f{i}(a){{return a*{i}}}\n".encode() for i in range(5000))
+    with tempfile.TemporaryDirectory() as tmpdir:
+        plain = Path(tmpdir) / "plain"
+        precompressed = Path(tmpdir) / "precompressed"
+        for directory in (plain, precompressed):
+            directory.mkdir()
+            (directory / "app-1a2b.js").write_bytes(source)
+        (precompressed / "app-1a2b.js.gz").write_bytes(gzip.compress(source, compresslevel=9))
+
+        on_the_fly = CompressionMiddleware(PrecompressedStaticFiles(directory=plain))
+        served_as_is = CompressionMiddleware(PrecompressedStaticFiles(directory=precompressed))
+        return {
+            "source_bytes": len(source),
+            "gzip_on_the_fly": _measure(on_the_fly, "/app-1a2b.js", GZIP, repeat),
+            "gzip_precompressed": _measure(served_as_is, "/app-1a2b.js", GZIP, repeat),
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="10,1000,10000")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    result: dict = {"brotli_available": BROTLI in available_encodings(), "songs": {}}
+    for size in (int(value) for value in args.sizes.split(",") if value):
+        app = CompressionMiddleware(_json_app(_songs_body(size)))
+        result["songs"][str(size)] = {
+            encoding: _measure(app, "/songs/", encoding, args.repeat) for encoding in _encodings()
+        }
+    result["static_asset"] = _static(args.repeat)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
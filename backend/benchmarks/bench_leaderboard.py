@@ -0,0 +1,99 @@
+"""Compare le classement en mémoire au tri SQL pour servir le top 50.
+
+Usage : ``python -m benchmarks.bench_leaderboard [--songs N] [--reads N]``
+Mesure la lecture du top 50 depuis le classement (``top_songs``), par
+``ORDER BY votes DESC LIMIT 50`` et par la liste complète triée
+(``get_all_songs``), ainsi que le coût d'une mise à jour du classement
+par vote. Le résultat est imprimé en JSON (microsecondes).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import sessionmaker
+
+from app.crud import song as crud_song
+from app.database.connection import Base
+from app.models.song import Song
+from app.services import leaderboard
+
+
+def _per_call_us(func, repeat: int) -> float:  # noqa: ANN001
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return round((time.perf_counter() - started) / repeat * 1e6, 2)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--songs", type=int, default=20_000)
+    parser.add_argument("--reads", type=int, default=200)
+    parser.add_argument("--updates", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        engine = create_engine(f"sqlite:///{Path(tmpdir) / 'top.db'}", future=True)
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as connection:
+            connection.execute(
+                insert(Song),
+                [
+                    {
+                        "title": f"Song {index}",
+                        "artist": "Bench",
+                        "link": f"https://youtu.be/top{index}",
+                        "votes": rng.randint(1, 5_000),
+                    }
+                    for index in range(args.songs)
+                ],
+            )
+
+        with sessionmaker(bind=engine)() as db:
+            board = leaderboard.get_leaderboard(db)
+            reload_us = _per_call_us(lambda: board.reload(db), 5)
+            result = {
+                "songs": args.songs,
+                "reload_us": reload_us,
+                "top50_memory_us": _per_call_us(lambda: leaderboard.top_songs(db, 50), args.reads * 100),
+                "top50_sql_us": _per_call_us(
+                    lambda: db.execute(
+                        select(*leaderboard.ENTRY_COLUMNS).order_by(Song.votes.desc()).limit(50)
+                    ).all(),
+                    args.reads,
+                ),
+                "full_list_sql_us": _per_call_us(
+                    lambda: crud_song.get_all_songs(db), max(1, args.reads // 20)
+                ),
+            }
+
+            # Votes sur des morceaux tirés au hasard, la plupart hors du classement.
+            entries = [leaderboard.LeaderboardEntry(*row) for row in db.execute(select(*leaderboard.ENTRY_COLUMNS))]
+            votes = {entry.id: entry.votes for entry in entries}
+            targets = [rng.choice(entries) for _ in range(args.updates)]
+            started = time.perf_counter()
+            for entry in targets:
+                votes[entry.id] += 1
+                board.apply((entry._replace(votes=votes[entry.id]),))
+            result["update_us"] = round((time.perf_counter() - started) / args.updates * 1e6, 3)
+        engine.dispose()
+
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
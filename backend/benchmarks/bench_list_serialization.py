@@ -0,0 +1,137 @@
+"""Compare le coût de ``GET /songs/`` et ``GET /ban/`` selon le chemin de sérialisation.
+
+Usage : ``python -m benchmarks.bench_list_serialization [--sizes 100,10000,100000]``
+Pour chaque taille, mesure la lecture + l'encodage JSON de la liste :
+
+* ``pydantic`` : objets ORM validés par ``list[SongOut]`` puis encodés par
+  Pydantic, comme FastAPI le fait avec ``response_model`` ;
+* ``fast_orjson`` : tuples de colonnes encodés par ``orjson`` (route actuelle) ;
+* ``fast_stdlib`` : même chemin avec le repli sur la bibliothèque standard.
+
+Les corps produits sont comparés octet par octet. Résultat en JSON
+(millisecondes, médiane de ``--repeat`` passes).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.crud import ban_rule as crud_ban
+from app.crud import song as crud_song
+from app.database.connection import Base
+from app.models.ban_rule import BanRule
+from app.models.song import Song
+from app.schemas.ban_rule import BanRuleOut
+from app.schemas.song import SongOut
+from app.utils import fast_json
+
+SONG_FIELDS = tuple(SongOut.model_fields)
+RULE_FIELDS = tuple(BanRuleOut.model_fields)
+SONGS = TypeAdapter(list[SongOut])
+RULES = TypeAdapter(list[BanRuleOut])
+
+
+def _median_ms(func, repeat: int) -> tuple[float, bytes]:  # noqa: ANN001
+    timings = []
+    body = b""
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = func()
+        timings.append(time.perf_counter() - started)
+    return round(statistics.median(timings) * 1000, 3), body
+
+
+def _paths(session_factory) -> dict:  # noqa: ANN001
+    def pydantic_songs() -> bytes:
+        with session_factory() as db:
+            return SONGS.dump_json(SONGS.validate_python(crud_song.get_all_songs(db), from_attributes=True))
+
+    def pydantic_rules() -> bytes:
+        with session_factory() as db:
+            return RULES.dump_json(RULES.validate_python(crud_ban.list_ban_rules(db), from_attributes=True))
+
+    def fast_songs() -> bytes:
+        with session_factory() as db:
+            return fast_json.rows_response(SONG_FIELDS, crud_song.list_song_rows(db, SONG_FIELDS)).body
+
+    def fast_rules() -> bytes:
+        with session_factory() as db:
+            return fast_json.rows_response(RULE_FIELDS, crud_ban.list_ban_rule_rows(db, RULE_FIELDS)).body
+
+    return {
+        "songs": {"pydantic": pydantic_songs, "fast": fast_songs},
+        "ban_rules": {"pydantic": pydantic_rules, "fast": fast_rules},
+    }
+
+
+def _run(size: int, repeat: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        engine = create_engine(f"sqlite:///{Path(tmpdir) / 'lists.db'}", future=True)
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as connection:
+            connection.execute(
+                insert(Song),
+                [
+                    {
+                        "title": f"Chanson n°{index}",
+                        "artist": f"Artiste {index % 997}",
+                        "link": f"https://youtu.be/{index:011d}",
+                        "thumbnail": f"https://i.ytimg.com/vi/{index:011d}/hqdefault.jpg",
+                        "comment": "à écouter" if index % 5 == 0 else None,
+                        "votes": 1 + index % 300,
+                    }
+                    for index in range(size)
+                ],
+            )
+            connection.execute(
+                insert(BanRule),
+                [{"artist": f"Artiste banni {index}"} for index in range(size)],
+            )
+
+        session_factory = sessionmaker(bind=engine)
+        result: dict = {}
+        orjson = fast_json.orjson
+        for name, paths in _paths(session_factory).items():
+            pydantic_ms, expected = _median_ms(paths["pydantic"], repeat)
+            entry = {"pydantic_ms": pydantic_ms}
+            if orjson is not None:
+                entry["fast_orjson_ms"], body = _median_ms(paths["fast"], repeat)
+                entry["identical"] = body == expected
+            fast_json.orjson = None
+            try:
+                entry["fast_stdlib_ms"], body = _median_ms(paths["fast"], repeat)
+            finally:
+                fast_json.orjson = orjson
+            entry["identical_stdlib"] = body == expected
+            entry["kib"] = round(len(expected) / 1024, 1)
+            result[name] = entry
+        engine.dispose()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="100,10000,100000")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    sizes = [int(value) for value in args.sizes.split(",") if value]
+    print(json.dumps({str(size): _run(size, args.repeat) for size in sizes}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Mesure le surcoût par requête de :class:`MetricsMiddleware`.
+
+Usage : ``python -m benchmarks.bench_metrics_overhead [--requests N]``
+Le résultat est imprimé en JSON (microsecondes par requête).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from app.utils.metrics import MetricsMiddleware
+
+
+class _Route:
+    path = "/bench"
+
+
+async def _endpoint(scope, receive, send) -> None:  # noqa: ANN001
+    scope["route"] = _Route
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b'{"status":"ok"}'})
+
+
+async def _receive() -> dict:
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _send(message) -> None:  # noqa: ANN001
+    return None
+
+
+async def _drive(app, requests: int) -> float:
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app({"type": "http", "method": "GET", "path": "/bench"}, _receive, _send)
+    return time.perf_counter() - start
+
+
+def run(requests: int, rounds: int = 5) -> dict:
+    wrapped = MetricsMiddleware(_endpoint)
+    bare_times = []
+    wrapped_times = []
+    for _ in range(rounds):
+        bare_times.append(asyncio.run(_drive(_endpoint, requests)))
+        wrapped_times.append(asyncio.run(_drive(wrapped, requests)))
+
+    bare = min(bare_times) / requests * 1e6
+    instrumented = min(wrapped_times) / requests * 1e6
+    return {
+        "benchmark": "metrics_middleware_overhead",
+        "requests": requests,
+        "bare_us_per_request": round(bare, 3),
+        "instrumented_us_per_request": round(instrumented, 3),
+        "overhead_us_per_request": round(instrumented - bare, 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=100_000)
+    args = parser.parse_args()
+    print(json.dumps(run(args.requests), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Compare ``normalize`` à l'implémentation historique (NFKD + ``re.sub``).
+
+Usage : ``python -m benchmarks.bench_normalize [--iterations N]``
+Le résultat est imprimé en JSON (microsecondes par appel).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import sys
+import timeit
+import unicodedata
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from app.utils.text import _normalize, normalize, normalize_many
+
+INPUTS = {
+    "ascii": "Never Gonna Give You Up (Official Music Video) - Rick Astley",
+    "accented": "Beyoncé — Déjà Vu (feat. Jay-Z) · Édition spéciale",
+    "cjk": "坂本龍一 - 戦場のメリークリスマス (Merry Christmas Mr. Lawrence)",
+}
+
+
+def _legacy(text: str) -> str:
+    if not text:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", text)
+    ascii_only = decomposed.encode("ASCII", "ignore").decode("utf-8")
+    return re.sub(r"[^a-z0-9]", "", ascii_only.lower())
+
+
+def _per_call_us(func, value: str, iterations: int) -> float:  # noqa: ANN001
+    return timeit.timeit(lambda: func(value), number=iterations) / iterations * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=200_000)
+    args = parser.parse_args()
+
+    results: dict[str, dict[str, float]] = {}
+    for name, value in INPUTS.items():
+        results[name] = {
+            "legacy_us": round(_per_call_us(_legacy, value, args.iterations), 3),
+            "uncached_us": round(_per_call_us(_normalize, value, args.iterations), 3),
+            "cached_us": round(_per_call_us(normalize, value, args.iterations), 3),
+        }
+
+    batch = [f"{value} #{index}" for index in range(10_000) for value in INPUTS.values()]
+    loops = max(1, args.iterations // 100_000)
+    results["batch_30k"] = {
+        "legacy_ms": round(timeit.timeit(lambda: [_legacy(v) for v in batch], number=loops) / loops * 1000, 3),
+        "normalize_many_ms": round(timeit.timeit(lambda: normalize_many(batch), number=loops) / loops * 1000, 3),
+    }
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Mesure le coût par vérification des stockages de limitation de débit.
+
+Usage : ``python -m benchmarks.bench_rate_limit [--checks N] [--clients N]``
+Le résultat est imprimé en JSON (microsecondes par vérification).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from app.services.rate_limit import MemoryRateLimitStorage, SQLiteRateLimitStorage
+
+
+def _measure(storage, checks: int, clients: int) -> float:  # noqa: ANN001
+    keys = [f"10.0.{index // 256}.{index % 256}" for index in range(clients)]
+    start = time.perf_counter()
+    for index in range(checks):
+        storage.hit(keys[index % clients], 10, 60.0)
+    return (time.perf_counter() - start) / checks * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--checks", type=int, default=100_000)
+    parser.add_argument("--clients", type=int, default=2_000)
+    args = parser.parse_args()
+
+    results: dict[str, float] = {
+        "memory_gcra_us": _measure(MemoryRateLimitStorage(), args.checks, args.clients),
+    }
+    with tempfile.TemporaryDirectory() as tmpdir:
+        batched = SQLiteRateLimitStorage(Path(tmpdir) / "batched.db", flush_interval=0.25)
+        results["sqlite_batched_us"] = _measure(batched, args.checks, args.clients)
+        batched.close()
+
+        # L'écriture immédiate est bien plus lente : on réduit l'échantillon.
+        strict_checks = max(1, args.checks // 20)
+        strict = SQLiteRateLimitStorage(Path(tmpdir) / "strict.db", flush_interval=0)
+        results["sqlite_write_through_us"] = _measure(strict, strict_checks, args.clients)
+        strict.close()
+
+    print(
+        json.dumps(
+            {
+                "checks": args.checks,
+                "clients": args.clients,
+                **{name: round(value, 3) for name, value in results.items()},
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Mesure le coût par élément de ``POST /songs/batch`` face aux soumissions unitaires.
+
+Usage : ``python -m benchmarks.bench_song_batch [--items 100] [--existing 20] [--latency-ms 50]``
+Soumet ``--items`` liens YouTube (dont ``--existing`` déjà en file et quelques
+doublons) sur une base SQLite temporaire, avec un fournisseur oEmbed simulé
+qui répond en ``--latency-ms`` millisecondes. Imprime en JSON, pour chaque
+variante, le temps total, le temps par élément, le nombre de requêtes SQL et
+de commits :
+
+* ``single`` : un appel à ``submit_link`` par lien (chemin du formulaire) ;
+* ``batch`` : un seul appel à ``submit_batch`` (chemin de ``/songs/batch``).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.database.connection import Base
+from app.models.ban_rule import BanRule
+from app.models.song import Song
+from app.schemas.song import SongCreate
+from app.services import submissions
+
+
+def _links(items: int) -> list[str]:
+    links = [f"https://youtu.be/v{index:06d}" for index in range(items)]
+    # Un doublon tous les dix liens, sous une autre forme d'URL.
+    for index in range(9, items, 10):
+        links[index] = f"https://www.youtube.com/watch?v=v{index - 1:06d}&t=10"
+    return links
+
+
+def _prepare(path: Path, existing: int):  # noqa: ANN202
+    engine = create_engine(f"sqlite:///{path}", future=True, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        if existing:
+            connection.execute(
+                insert(Song),
+                [
+                    {
+                        "title": f"Titre {index}",
+                        "artist": f"Artiste {index}",
+                        "link": f"https://www.youtube.com/watch?v=v{index:06d}",
+                        "votes": 1,
+                    }
+                    for index in range(existing)
+                ],
+            )
+        connection.execute(insert(BanRule), [{"artist": f"Banni {index}"} for index in range(50)])
+    return engine
+
+
+def _fetcher(latency: float):  # noqa: ANN202
+    def fetch(link: str) -> SongCreate:
+        time.sleep(latency)
+        key = link.rsplit("=", 1)[-1]
+        return SongCreate(title=f"Titre {key}", artist=f"Artiste {key}", link=link)
+
+    return fetch
+
+
+def _measure(engine, run) -> dict:  # noqa: ANN001
+    statements = 0
+    commits = 0
+
+    def on_statement(*_args) -> None:  # noqa: ANN002
+        nonlocal statements
+        statements += 1
+
+    def on_commit(_connection) -> None:  # noqa: ANN001
+        nonlocal commits
+        commits += 1
+
+    event.listen(engine, "before_cursor_execute", on_statement)
+    event.listen(engine, "commit", on_commit)
+    factory = sessionmaker(bind=engine, autoflush=False)
+    try:
+        with factory() as db:
+            started = time.perf_counter()
+            items = run(db)
+            elapsed = time.perf_counter() - started
+    finally:
+        event.remove(engine, "before_cursor_execute", on_statement)
+        event.remove(engine, "commit", on_commit)
+    return {
+        "total_ms": round(elapsed * 1000, 1),
+        "per_item_ms": round(elapsed * 1000 / items, 3),
+        "sql_statements": statements,
+        "commits": commits,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--existing", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    links = _links(args.items)
+    fetch = _fetcher(args.latency_ms / 1000)
+
+    def single(db) -> int:  # noqa: ANN001
+        for link in links:
+            submissions.submit_link(db, link, fetch_metadata=fetch)
+        return len(links)
+
+    def batch(db) -> int:  # noqa: ANN001
+        submissions.submit_batch(db, links, fetch_metadata=fetch)
+        return len(links)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        result = {
+            "items": args.items,
+            "existing": args.existing,
+            "latency_ms": args.latency_ms,
+            "single": _measure(_prepare(Path(tmpdir) / "single.sqlite", args.existing), single),
+            "batch": _measure(_prepare(Path(tmpdir) / "batch.sqlite", args.existing), batch),
+        }
+    result["speedup"] = round(result["single"]["total_ms"] / result["batch"]["total_ms"], 1)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
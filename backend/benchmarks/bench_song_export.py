@@ -0,0 +1,130 @@
+"""Mesure l'export en flux de la file (``GET /songs/export``).
+
+Usage : ``python -m benchmarks.bench_song_export [--songs 1000000] [--list-songs N]``
+Remplit ``--songs`` chansons puis sérialise toute la file en NDJSON, CSV et
+NDJSON gzip comme le fait la route (``iter_song_rows`` + ``song_io``) :
+débit, taille produite et pic de mémoire Python (``tracemalloc``, passe
+séparée). Pour comparaison, la construction de la liste complète comme
+``GET /songs/`` (objets ORM → ``SongOut`` → un seul JSON) est mesurée sur
+``--list-songs`` chansons. Le résultat est imprimé en JSON.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.crud import song as crud_song
+from app.database.connection import Base
+from app.models.song import Song
+from app.schemas.song import SongOut
+from app.services import song_io
+
+_FORMATS = {
+    "ndjson": lambda rows: song_io.iter_ndjson(rows),
+    "csv": lambda rows: song_io.iter_csv(rows),
+    "ndjson_gzip": lambda rows: song_io.iter_gzip(song_io.iter_ndjson(rows)),
+}
+
+
+def _fill(engine, songs: int, rng: random.Random) -> None:  # noqa: ANN001
+    with engine.begin() as connection:
+        for start in range(0, songs, 50_000):
+            connection.execute(
+                insert(Song),
+                [
+                    {
+                        "title": f"Song {index}",
+                        "artist": f"Artist {index % 5_000}",
+                        "link": f"https://youtu.be/{index:011d}",
+                        "comment": "gg" if index % 7 == 0 else None,
+                        "votes": rng.randint(1, 10_000),
+                    }
+                    for index in range(start, min(songs, start + 50_000))
+                ],
+            )
+
+
+def _export(session_factory, name: str) -> tuple[int, float]:  # noqa: ANN001
+    with session_factory() as db:
+        started = time.perf_counter()
+        size = sum(len(chunk) for chunk in _FORMATS[name](crud_song.iter_song_rows(db)))
+        return size, time.perf_counter() - started
+
+
+def _peak_mib(func) -> float:  # noqa: ANN001
+    tracemalloc.start()
+    try:
+        func()
+        return round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+    finally:
+        tracemalloc.stop()
+
+
+def _full_list(session_factory) -> int:  # noqa: ANN001
+    with session_factory() as db:
+        songs = [SongOut.model_validate(song).model_dump() for song in crud_song.get_all_songs(db)]
+        return len(json.dumps(songs, ensure_ascii=False).encode("utf-8"))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--songs", type=int, default=1_000_000)
+    parser.add_argument("--list-songs", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=4)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    result: dict = {"songs": args.songs, "export": {}}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        engine = create_engine(f"sqlite:///{Path(tmpdir) / 'export.db'}", future=True)
+        Base.metadata.create_all(bind=engine)
+        _fill(engine, args.songs, rng)
+        session_factory = sessionmaker(bind=engine)
+
+        for name in _FORMATS:
+            size, elapsed = _export(session_factory, name)
+            result["export"][name] = {
+                "seconds": round(elapsed, 2),
+                "rows_per_second": round(args.songs / elapsed),
+                "mib": round(size / 2**20, 1),
+                "peak_python_mib": _peak_mib(lambda: _export(session_factory, name)),
+            }
+        engine.dispose()
+
+        small = create_engine(f"sqlite:///{Path(tmpdir) / 'list.db'}", future=True)
+        Base.metadata.create_all(bind=small)
+        _fill(small, args.list_songs, rng)
+        small_factory = sessionmaker(bind=small)
+        started = time.perf_counter()
+        size = _full_list(small_factory)
+        result["full_list"] = {
+            "songs": args.list_songs,
+            "seconds": round(time.perf_counter() - started, 2),
+            "mib": round(size / 2**20, 1),
+            "peak_python_mib": _peak_mib(lambda: _full_list(small_factory)),
+        }
+        result["streamed_same_size"] = {
+            "songs": args.list_songs,
+            "peak_python_mib": _peak_mib(lambda: _export(small_factory, "ndjson")),
+        }
+        small.dispose()
+
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Mesure le débit de ``GET /submit`` (index de la SPA).
+
+Usage : ``python -m benchmarks.bench_spa_index [--requests 5000]``
+Envoie ``--requests`` requêtes ASGI directement à l'application (sans
+serveur HTTP) et imprime en JSON le nombre de requêtes par seconde :
+
+* ``legacy_file`` : ancien chemin, ``Path.exists()`` puis ``FileResponse``
+  (``stat`` et lecture disque à chaque requête) ;
+* ``cached`` / ``cached_304`` : index en mémoire (:class:`SpaIndex`), avec et
+  sans ``If-None-Match`` correspondant ;
+* ``legacy_redirect`` / ``precomputed_redirect`` : index absent, cible de
+  redirection recalculée (``urlparse``) ou lue dans la table du démarrage ;
+* ``app_submit`` : ``/submit`` de l'application complète, middlewares compris.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from fastapi import FastAPI, Request
+from fastapi.responses import FileResponse, RedirectResponse
+from starlette.types import ASGIApp
+
+from app import main as app_main
+from app.utils.spa_index import SpaIndex
+
+SUBMIT_REDIRECT = "https://front.example/submit"
+
+_INDEX_HTML = (
+    '<!DOCTYPE html>\n<html lang="fr">\n<head>\n<meta charset="UTF-8">\n'
+    '<link rel="icon" href="/favicon.ico">\n'
+    '<meta name="viewport" content="width=device-width, initial-scale=1.0">\n'
+    "<title>TchatRecoSong</title>\n"
+    '<script type="module" crossorigin src="/assets/index-4f1c2a9b.js"></script>\n'
+    '<link rel="stylesheet" crossorigin href="/assets/index-8d3e7f01.css">\n'
+    "</head>\n<body>\n<div id=\"app\"></div>\n</body>\n</html>\n"
+)
+
+
+def _legacy_app(index_path: Path) -> FastAPI:
+    legacy = FastAPI()
+
+    @legacy.get("/submit")
+    def submit():  # noqa: ANN202
+        if index_path.exists():
+            return FileResponse(index_path)
+        return RedirectResponse(url=app_main._build_redirect_target("/submit"), status_code=307)
+
+    return legacy
+
+
+def _cached_app(index_path: Path) -> FastAPI:
+    cached = FastAPI()
+    index = SpaIndex(index_path)
+    redirects = {path: app_main._build_redirect_target(path) for path in app_main.FRONTEND_ROUTE_PATHS}
+
+    @cached.get("/submit")
+    def submit(request: Request):  # noqa: ANN202
+        response = index.response(request.headers)
+        if response is not None:
+            return response
+        return RedirectResponse(url=redirects["/submit"], status_code=307)
+
+    return cached
+
+
+async def _request(app: ASGIApp, headers: list[tuple[bytes, bytes]]) -> int:
+    status = 0
+    received = False
+
+    async def receive() -> dict:
+        nonlocal received
+        if received:
+            await asyncio.Event().wait()
+        received = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message) -> None:  # noqa: ANN001
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": "2.4"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "server": ("bench", 80),
+        "client": ("127.0.0.1", 5000),
+        "path": "/submit",
+        "raw_path": b"/submit",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench"), *headers],
+    }
+    await app(scope, receive, send)
+    return status
+
+
+def _rps(app: ASGIApp, requests: int, headers: list[tuple[bytes, bytes]] | None = None) -> dict:
+    async def run() -> int:
+        status = 0
+        for _ in range(requests):
+            status = await _request(app, headers or [])
+        return status
+
+    started = time.perf_counter()
+    status = asyncio.run(run())
+    elapsed = time.perf_counter() - started
+    return {"status": status, "requests_per_second": round(requests / elapsed)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        index_path = Path(tmpdir) / "index.html"
+        index_path.write_text(_INDEX_HTML, encoding="utf-8")
+        missing_path = Path(tmpdir) / "absent.html"
+
+        app_main.app.state.frontend_submit_redirect = SUBMIT_REDIRECT
+        app_main.app.state.frontend_cors_origins = []
+        etag = SpaIndex(index_path).snapshot().etag
+
+        result = {
+            "requests": args.requests,
+            "legacy_file": _rps(_legacy_app(index_path), args.requests),
+            "cached": _rps(_cached_app(index_path), args.requests),
+            "cached_304": _rps(
+                _cached_app(index_path), args.requests, [(b"if-none-match", etag.encode())]
+            ),
+            "legacy_redirect": _rps(_legacy_app(missing_path), args.requests),
+            "precomputed_redirect": _rps(_cached_app(missing_path), args.requests),
+        }
+
+        app_main.app.state.frontend_index_path = index_path
+        app_main._prepare_frontend()
+        result["app_submit"] = _rps(app_main.app, args.requests)
+
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
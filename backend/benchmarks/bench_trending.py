@@ -0,0 +1,110 @@
+"""Vérifie que le classement « tendance » reste O(1) par vote et sans tri à la lecture.
+
+Usage : ``python -m benchmarks.bench_trending [--sizes 1000,10000,100000] [--votes N]``
+Pour chaque taille de table, ``--votes`` votes sont comptés via
+``increment_vote`` (coût et instructions SQL par vote), puis le plan et la
+durée de lecture des 50 premiers morceaux sont comparés entre le tri par
+voix (sans index) et le tri « tendance » (index sur ``trend_score``).
+Le résultat est imprimé en JSON.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from sqlalchemy import create_engine, event, insert, text
+from sqlalchemy.orm import sessionmaker
+
+from app.crud import song as crud_song
+from app.database.connection import Base
+from app.models.song import Song
+from app.services import trending
+
+_LISTINGS = {
+    "votes": "SELECT * FROM songs WHERE channel_id = 1 ORDER BY votes DESC LIMIT 50",
+    "trending": "SELECT * FROM songs WHERE channel_id = 1 ORDER BY trend_score DESC LIMIT 50",
+}
+
+
+def _run(size: int, votes: int, rng: random.Random) -> dict:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        engine = create_engine(f"sqlite:///{Path(tmpdir) / 'trending.db'}", future=True)
+        Base.metadata.create_all(bind=engine)
+        now = time.time()
+        with engine.begin() as connection:
+            connection.execute(
+                insert(Song),
+                [
+                    {
+                        "title": f"Song {index}",
+                        "artist": "Bench",
+                        "link": f"https://youtu.be/t{index}",
+                        "votes": 1 + index % 97,
+                        "trend_score": trending.initial_score(1 + index % 97, now - rng.uniform(0, 86_400)),
+                    }
+                    for index in range(size)
+                ],
+            )
+
+        statements = 0
+
+        def count(*_args) -> None:  # noqa: ANN002
+            nonlocal statements
+            statements += 1
+
+        session_factory = sessionmaker(bind=engine, autoflush=False)
+        song_ids = [rng.randint(1, size) for _ in range(votes)]
+        with session_factory() as db:
+            event.listen(engine, "before_cursor_execute", count)
+            started = time.perf_counter()
+            for song_id in song_ids:
+                crud_song.increment_vote(db, song_id)
+            vote_us = (time.perf_counter() - started) / votes * 1e6
+            event.remove(engine, "before_cursor_execute", count)
+
+        listings = {}
+        with engine.connect() as connection:
+            for name, query in _LISTINGS.items():
+                plan = " | ".join(row[-1] for row in connection.execute(text(f"EXPLAIN QUERY PLAN {query}")))
+                started = time.perf_counter()
+                for _ in range(20):
+                    connection.execute(text(query)).all()
+                listings[name] = {
+                    "top50_ms": round((time.perf_counter() - started) / 20 * 1000, 3),
+                    "plan": plan,
+                    "sorts": "TEMP B-TREE" in plan,
+                }
+        engine.dispose()
+
+    return {
+        "vote_us": round(vote_us, 1),
+        "statements_per_vote": round(statements / votes, 2),
+        "listing": listings,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--votes", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    sizes = [int(value) for value in args.sizes.split(",") if value]
+    result = {str(size): _run(size, args.votes, rng) for size in sizes}
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Rejoue un chat Twitch enregistré contre l'ingestion IRC.
+
+Usage : ``python -m benchmarks.bench_twitch_chat [--messages N] [--rate N]``
+Un faux serveur IRC local envoie ``--messages`` lignes à ``--rate`` msg/s ;
+les métadonnées viennent du faux serveur oEmbed (``--provider-latency``).
+Avec ``--vote-ratio``, une part des messages sont des ``!vote <id>`` : le
+rapport donne alors les commandes traitées par seconde et l'amplification
+d'écriture (instructions SQL par vote accepté). Le résultat est imprimé en JSON.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.orm import sessionmaker
+
+from app.database.connection import Base
+from app.models.song import Song
+from app.services.twitch_chat import TwitchChatIngestor
+from benchmarks.fake_irc import FakeIrcServer, recorded_chat
+from benchmarks.stub_providers import stub_providers
+
+
+async def _replay(args: argparse.Namespace, session_factory) -> dict:  # noqa: ANN001
+    lines = recorded_chat(
+        args.messages,
+        link_ratio=args.link_ratio,
+        vote_ratio=args.vote_ratio,
+        vote_ids=args.vote_ids,
+    )
+    server = await FakeIrcServer(lines, rate=args.rate).start()
+    ingestor = TwitchChatIngestor(
+        "tchatrecosong",
+        session_factory,
+        host="127.0.0.1",
+        port=server.port,
+        use_tls=False,
+        batch_size=args.batch_size,
+        batch_interval=args.batch_interval,
+    )
+    task = asyncio.create_task(ingestor.run())
+    await server.done.wait()
+    replay_s = server.replay_seconds
+    started = time.perf_counter()
+    while ingestor.stats["messages"] < args.messages:
+        await asyncio.sleep(0.001)
+    read_lag_s = time.perf_counter() - started
+    ingestor.stop()
+    await task
+    drain_s = time.perf_counter() - started
+    await server.close()
+    votes = ingestor.commands.votes
+    return {
+        "commands_per_s": round(ingestor.stats["commands"] / (replay_s + read_lag_s), 1),
+        "votes_accepted": votes.stats["accepted"],
+        "vote_statements": votes.stats["statements"],
+        "write_amplification": round(votes.write_amplification, 4),
+        "replay_s": round(replay_s, 3),
+        "messages_per_s": round(args.messages / (replay_s + read_lag_s), 1),
+        "read_lag_ms": round(read_lag_s * 1000, 2),
+        "drain_after_replay_ms": round(drain_s * 1000, 2),
+        "pongs": server.pongs,
+        "stats": dict(ingestor.stats),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=50_000)
+    parser.add_argument("--rate", type=float, default=10_000)
+    parser.add_argument("--link-ratio", type=float, default=0.05)
+    parser.add_argument("--vote-ratio", type=float, default=0.3)
+    parser.add_argument("--vote-ids", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--batch-interval", type=float, default=0.5)
+    parser.add_argument("--provider-latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir, stub_providers(latency=args.provider_latency):
+        engine = create_engine(f"sqlite:///{Path(tmpdir) / 'chat.db'}", future=True)
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as connection:
+            # Morceaux visés par les !vote du chat rejoué.
+            connection.execute(
+                insert(Song),
+                [
+                    {"title": f"Vote {index}", "artist": "Chat", "link": f"https://youtu.be/v{index}"}
+                    for index in range(1, args.vote_ids + 1)
+                ],
+            )
+        session_factory = sessionmaker(bind=engine, autoflush=False)
+        result = asyncio.run(_replay(args, session_factory))
+        with engine.connect() as connection:
+            songs, votes = connection.execute(select(func.count(Song.id), func.sum(Song.votes))).one()
+        engine.dispose()
+
+    result.update({"messages": args.messages, "target_rate": args.rate, "songs": songs, "votes": votes})
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Mesure les ensembles de votants : mémoire par morceau, faux positifs, latence.
+
+Usage : ``python -m benchmarks.bench_voter_sketch [--probes N]``
+Pour plusieurs tailles d'audience, l'ensemble (exact puis filtre de Bloom)
+est rempli d'empreintes aléatoires puis interrogé avec ``--probes`` empreintes
+absentes. ``table_bytes`` estime le coût d'une table (song_id, votant) sur
+PostgreSQL (~44 octets par ligne avec l'index). La dernière section mesure
+:func:`record_voter` de bout en bout sur SQLite, cache chaud et cache froid.
+Le résultat est imprimé en JSON.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.crud import song_voter
+from app.database.connection import Base
+from app.models.song import Song
+from app.utils.sketches import ExactVoterSet, add_voter
+
+AUDIENCES = (10, 100, 256, 1_000, 10_000, 100_000)
+TABLE_ROW_BYTES = 44
+
+
+def _measure(voters: int, probes: int, rng: random.Random) -> dict:
+    members = [rng.getrandbits(64) for _ in range(voters)]
+    sketch = ExactVoterSet()
+    for fingerprint in members:
+        sketch, _ = add_voter(sketch, fingerprint)
+
+    outsiders = [rng.getrandbits(64) for _ in range(probes)]
+    started = time.perf_counter()
+    false_positives = sum(1 for fingerprint in outsiders if fingerprint in sketch)
+    check_ns = (time.perf_counter() - started) / probes * 1e9
+    assert all(fingerprint in sketch for fingerprint in members[:1000])
+
+    payload = sketch.to_bytes()
+    return {
+        "kind": sketch.kind,
+        "bytes_in_memory": sketch.nbytes,
+        "bytes_serialized": len(payload),
+        "bytes_per_voter": round(len(payload) / voters, 2),
+        "table_bytes": voters * TABLE_ROW_BYTES,
+        "false_positive_rate": round(false_positives / probes, 5),
+        "check_ns": round(check_ns, 1),
+    }
+
+
+def _record_latency(votes: int, rng: random.Random) -> dict:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        engine = create_engine(f"sqlite:///{Path(tmpdir) / 'voters.db'}", future=True)
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(bind=engine, autoflush=False)
+        with session_factory() as db:
+            db.add(Song(id=1, title="Bench", artist="Voters", link="https://youtu.be/bench"))
+            db.commit()
+
+        fingerprints = [rng.getrandbits(64) for _ in range(votes)]
+        with session_factory() as db:
+            started = time.perf_counter()
+            for fingerprint in fingerprints:
+                song_voter.record_voter(db, 1, fingerprint)
+                db.commit()
+            accepted_us = (time.perf_counter() - started) / votes * 1e6
+
+            started = time.perf_counter()
+            for fingerprint in fingerprints:
+                try:
+                    song_voter.record_voter(db, 1, fingerprint)
+                except song_voter.DuplicateVoteError:
+                    pass
+            duplicate_cached_us = (time.perf_counter() - started) / votes * 1e6
+
+            song_voter.forget_song(db, 1)
+            started = time.perf_counter()
+            try:
+                song_voter.record_voter(db, 1, fingerprints[0])
+            except song_voter.DuplicateVoteError:
+                pass
+            duplicate_cold_us = (time.perf_counter() - started) * 1e6
+        engine.dispose()
+
+    return {
+        "votes": votes,
+        "accepted_us": round(accepted_us, 1),
+        "duplicate_cached_us": round(duplicate_cached_us, 2),
+        "duplicate_cold_us": round(duplicate_cold_us, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--probes", type=int, default=100_000)
+    parser.add_argument("--record-votes", type=int, default=2_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    result = {
+        "audiences": {str(voters): _measure(voters, args.probes, rng) for voters in AUDIENCES},
+        "record_voter_sqlite": _record_latency(args.record_votes, rng),
+    }
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Serveur IRC local qui rejoue un chat Twitch enregistré à débit fixe."""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from typing import Iterable
+
+_WORDS = (
+    "gg", "pog", "lol", "trop bien", "encore", "hype", "salut", "bonne soirée",
+    "c'est quoi ce son", "kappa", "monte le son", "on veut du rock", "ptdr",
+)
+
+
+def recorded_chat(
+    messages: int,
+    *,
+    channel: str = "#tchatrecosong",
+    viewers: int = 2_000,
+    link_ratio: float = 0.05,
+    link_pool: int = 400,
+    vote_ratio: float = 0.0,
+    vote_ids: int = 50,
+    seed: int = 7,
+) -> list[bytes]:
+    """Lignes IRC réalistes : tags Twitch, majorité de messages sans lien, PING réguliers.
+
+    Avec ``vote_ratio``, une part des messages sont des commandes ``!vote <id>``
+    visant les morceaux ``1..vote_ids``.
+    """
+
+    rng = random.Random(seed)
+    lines: list[bytes] = []
+    for index in range(messages):
+        if index and index % 5_000 == 0:
+            lines.append(b"PING :tmi.twitch.tv")
+        user = f"viewer{rng.randrange(viewers)}"
+        text = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(1, 6)))
+        draw = rng.random()
+        if draw < vote_ratio:
+            text = f"!vote {rng.randint(1, vote_ids)}"
+        elif draw < vote_ratio + link_ratio:
+            video = rng.randrange(link_pool)
+            if video % 3 == 0:
+                link = f"https://open.spotify.com/intl-fr/track/trk{video:05d}?si=abc"
+            elif video % 3 == 1:
+                link = f"https://youtu.be/vid{video:05d}"
+            else:
+                link = f"https://www.youtube.com/watch?v=vid{video:05d}&t=42s"
+            text = f"{text} {link}"
+        lines.append(
+            (
+                f"@badge-info=;color=#1E90FF;display-name={user};tmi-sent-ts={index} "
+                f":{user}!{user}@{user}.tmi.twitch.tv PRIVMSG {channel} :{text}"
+            ).encode("utf-8")
+        )
+    return lines
+
+
+class FakeIrcServer:
+    """Accepte des clients, attend leur JOIN puis leur envoie ``lines`` à ``rate`` msg/s.
+
+    Après la relecture, la connexion reste ouverte (``close_after=False``) ou
+    est coupée pour tester la reconnexion.
+    """
+
+    def __init__(self, lines: Iterable[bytes], rate: float = 10_000, close_after: bool = False) -> None:
+        self.lines = list(lines)
+        self.rate = rate
+        self.close_after = close_after
+        self.connections = 0
+        self.pongs = 0
+        self.sent = 0
+        self.replay_seconds = 0.0
+        self.done = asyncio.Event()
+        self._server: asyncio.AbstractServer | None = None
+
+    @property
+    def port(self) -> int:
+        assert self._server is not None
+        return self._server.sockets[0].getsockname()[1]
+
+    async def start(self) -> "FakeIrcServer":
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        try:
+            while True:
+                line = await reader.readline()
+                if not line or line.startswith(b"JOIN"):
+                    break
+            pong_reader = asyncio.create_task(self._count_pongs(reader))
+            await self._replay(writer)
+            self.done.set()
+            if self.close_after:
+                return
+            await pong_reader
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+    async def _count_pongs(self, reader: asyncio.StreamReader) -> None:
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            if line.startswith(b"PONG"):
+                self.pongs += 1
+
+    async def _replay(self, writer: asyncio.StreamWriter) -> None:
+        # Envoi par tranches de 10 ms pour tenir le débit sans un sleep par ligne.
+        tick = 0.01
+        per_tick = max(1, int(self.rate * tick))
+        started = time.perf_counter()
+        for start in range(0, len(self.lines), per_tick):
+            chunk = self.lines[start : start + per_tick]
+            writer.write(b"\r\n".join(chunk) + b"\r\n")
+            await writer.drain()
+            self.sent += len(chunk)
+            target = started + (start + per_tick) / self.rate
+            delay = target - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        self.replay_seconds = time.perf_counter() - started
+
+
+__all__ = ["FakeIrcServer", "recorded_chat"]
@@ -0,0 +1,312 @@
+"""Banc de charge « soirée de stream » pour les soumissions, votes et bans.
+
+Démarre l'application (uvicorn, en processus) contre SQLite ou un Postgres local,
+avec un faux fournisseur oEmbed, puis rejoue plusieurs profils de trafic :
+
+- ``submission_burst`` : rafales de soumissions publiques, avec des liens en double ;
+- ``vote_storm`` : tempête de votes sur les chansons existantes ;
+- ``leaderboard_polling`` : viewers qui rafraîchissent le classement ;
+- ``stream_night`` : mélange réaliste des trois, plus des bans administrateur.
+
+Le rapport JSON (débit, p50/p95/p99, requêtes SQL par requête HTTP) permet de
+comparer les performances d'un commit à l'autre ::
+
+    python -m benchmarks.loadtest --requests 2000 --concurrency 16 --output bench.json
+    python -m benchmarks.loadtest --database-url postgresql://localhost/tchat_bench
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+SCENARIOS: dict[str, dict[str, float]] = {
+    "submission_burst": {"submit": 1.0},
+    "vote_storm": {"vote": 1.0},
+    "leaderboard_polling": {"list": 1.0},
+    "stream_night": {"list": 0.60, "vote": 0.25, "submit": 0.13, "ban": 0.02},
+}
+
+
+def _percentile(sorted_values: list[float], percentile: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(percentile / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _git_revision() -> str | None:
+    try:
+        return (
+            subprocess.check_output(
+                ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_ROOT, stderr=subprocess.DEVNULL
+            )
+            .decode()
+            .strip()
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class StatementCounter:
+    def __init__(self) -> None:
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, *args, **kwargs) -> None:  # noqa: ANN002, ANN003
+        with self._lock:
+            self.count += 1
+
+
+class TrafficDriver:
+    """Génère les requêtes d'un profil et collecte latences et statuts."""
+
+    def __init__(self, base_url: str, admin_token: str, seed: int, link_pool: int) -> None:
+        self.base_url = base_url
+        self.admin_headers = {"Authorization": f"Bearer {admin_token}"}
+        self.random = random.Random(seed)
+        self.link_pool = link_pool
+        self.song_ids: list[int] = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _client(self):  # noqa: ANN202
+        import httpx
+
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = httpx.Client(base_url=self.base_url, timeout=30.0)
+            self._local.client = client
+        return client
+
+    def _pick_link(self) -> str:
+        with self._lock:
+            index = self.random.randrange(self.link_pool)
+        if index % 3 == 0:
+            return f"https://open.spotify.com/track/trk{index:05d}"
+        return f"https://www.youtube.com/watch?v=vid{index:05d}"
+
+    def _pick_song_id(self) -> int:
+        with self._lock:
+            return self.random.choice(self.song_ids) if self.song_ids else 1
+
+    def submit(self):  # noqa: ANN201
+        return self._client().post("/public/submissions/", json={"link": self._pick_link()})
+
+    def _pick_viewer(self) -> str:
+        # Chaque vote vient d'un spectateur tiré au hasard (adresse relayée par
+        # le proxy) : la déduplication serveur refuse les rares doublons (409).
+        with self._lock:
+            viewer = self.random.randrange(1 << 24)
+        return f"10.{viewer >> 16}.{(viewer >> 8) & 0xFF}.{viewer & 0xFF}"
+
+    def vote(self):  # noqa: ANN201
+        return self._client().post(
+            f"/songs/{self._pick_song_id()}/vote",
+            headers={"X-Forwarded-For": self._pick_viewer()},
+        )
+
+    def list(self):  # noqa: ANN201, A003
+        return self._client().get("/songs/")
+
+    def ban(self):  # noqa: ANN201
+        return self._client().post(
+            "/ban/", json={"link": self._pick_link()}, headers=self.admin_headers
+        )
+
+    def refresh_song_ids(self) -> None:
+        response = self._client().get("/songs/")
+        response.raise_for_status()
+        with self._lock:
+            self.song_ids = [song["id"] for song in response.json()]
+
+    def run(self, mix: dict[str, float], requests: int, concurrency: int, statements: StatementCounter) -> dict:
+        operations: list[str] = self.random.choices(list(mix), weights=list(mix.values()), k=requests)
+        latencies: dict[str, list[float]] = {name: [] for name in mix}
+        statuses: Counter[str] = Counter()
+        errors = 0
+        record_lock = threading.Lock()
+
+        def execute(operation: str) -> None:
+            nonlocal errors
+            action: Callable = getattr(self, operation)
+            start = time.perf_counter()
+            try:
+                response = action()
+                status = str(response.status_code)
+            except Exception:  # pragma: no cover - dépend du réseau local
+                status = "exception"
+            elapsed = time.perf_counter() - start
+            with record_lock:
+                latencies[operation].append(elapsed)
+                statuses[f"{operation}:{status}"] += 1
+                if status == "exception" or status.startswith("5"):
+                    errors += 1
+
+        statements_before = statements.count
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(execute, operations))
+        duration = time.perf_counter() - start
+        executed = statements.count - statements_before
+
+        all_latencies = sorted(value for values in latencies.values() for value in values)
+        return {
+            "requests": requests,
+            "concurrency": concurrency,
+            "errors": errors,
+            "duration_s": round(duration, 4),
+            "throughput_rps": round(requests / duration, 2) if duration else None,
+            "latency_ms": _latency_summary(all_latencies),
+            "latency_ms_by_operation": {
+                name: _latency_summary(sorted(values)) for name, values in latencies.items() if values
+            },
+            "db_statements_per_request": round(executed / requests, 3) if requests else 0.0,
+            "status_counts": dict(sorted(statuses.items())),
+        }
+
+
+def _latency_summary(sorted_values: list[float]) -> dict[str, float]:
+    if not sorted_values:
+        return {}
+    return {
+        "p50": round(_percentile(sorted_values, 50) * 1000, 3),
+        "p95": round(_percentile(sorted_values, 95) * 1000, 3),
+        "p99": round(_percentile(sorted_values, 99) * 1000, 3),
+        "mean": round(sum(sorted_values) / len(sorted_values) * 1000, 3),
+        "max": round(sorted_values[-1] * 1000, 3),
+    }
+
+
+def run_benchmark(
+    database_url: str,
+    requests: int,
+    concurrency: int,
+    scenarios: list[str],
+    seed: int = 1234,
+    provider_latency: float = 0.0,
+) -> dict:
+    os.environ["DATABASE_URL"] = database_url
+    # Le banc joue le rôle du proxy de Render : une entrée X-Forwarded-For par vote.
+    os.environ["TRUSTED_PROXY_HOPS"] = "1"
+
+    import uvicorn
+    from sqlalchemy import event
+
+    from benchmarks.stub_providers import stub_providers
+    from app.api.routes import public_submissions
+    from app.database.connection import engine
+    from app.main import app
+    from app.services.auth import issue_admin_token
+
+    # Le banc mesure le serveur, pas la limite anti-abus par IP.
+    public_submissions.limiter.enabled = False
+
+    statements = StatementCounter()
+    event.listen(engine, "before_cursor_execute", statements)
+
+    port = _free_port()
+    server = uvicorn.Server(
+        uvicorn.Config(
+            app,
+            host="127.0.0.1",
+            port=port,
+            log_level="warning",
+            access_log=False,
+            proxy_headers=False,
+        )
+    )
+    report: dict = {
+        "meta": {
+            "revision": _git_revision(),
+            "database": engine.url.get_backend_name(),
+            "python": platform.python_version(),
+            "requests_per_scenario": requests,
+            "concurrency": concurrency,
+            "seed": seed,
+            "provider_latency_s": provider_latency,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        },
+        "scenarios": {},
+    }
+
+    with stub_providers(latency=provider_latency):
+        thread = threading.Thread(target=server.run, daemon=True)
+        thread.start()
+        while not server.started:
+            time.sleep(0.01)
+
+        try:
+            token = issue_admin_token(subject="bench", name="Bench", provider="password")
+            driver = TrafficDriver(
+                f"http://127.0.0.1:{port}", token, seed=seed, link_pool=max(50, requests // 2)
+            )
+            # Graine : un classement initial pour que les votes visent des chansons réelles.
+            driver.run({"submit": 1.0}, min(200, requests), concurrency, statements)
+            driver.refresh_song_ids()
+
+            for name in scenarios:
+                report["scenarios"][name] = driver.run(
+                    SCENARIOS[name], requests, concurrency, statements
+                )
+                driver.refresh_song_ids()
+        finally:
+            server.should_exit = True
+            thread.join(timeout=10)
+
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="URL SQLAlchemy (défaut : fichier SQLite temporaire)")
+    parser.add_argument("--requests", type=int, default=2000, help="requêtes par scénario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), dest="scenarios")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--provider-latency", type=float, default=0.0, help="latence oEmbed simulée (s)")
+    parser.add_argument("--output", type=Path, help="fichier JSON de sortie")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        database_url = args.database_url or f"sqlite:///{Path(tmpdir) / 'loadtest.sqlite'}"
+        report = run_benchmark(
+            database_url,
+            requests=args.requests,
+            concurrency=args.concurrency,
+            scenarios=args.scenarios or list(SCENARIOS),
+            seed=args.seed,
+            provider_latency=args.provider_latency,
+        )
+
+    rendered = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(rendered + "\n", encoding="utf-8")
+    print(rendered)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Serveur HTTP local imitant les endpoints oEmbed YouTube et Spotify."""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator
+from urllib.parse import parse_qs, urlparse
+
+
+class _OEmbedHandler(BaseHTTPRequestHandler):
+    server: "StubProviderServer"
+
+    def do_GET(self) -> None:  # noqa: N802 - API BaseHTTPRequestHandler
+        parsed = urlparse(self.path)
+        if parsed.path not in {"/youtube/oembed", "/spotify/oembed"}:
+            self.send_error(404)
+            return
+
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        target = parse_qs(parsed.query).get("url", [""])[0]
+        key = target.rstrip("/").rsplit("/", 1)[-1].replace("watch?v=", "")
+        provider = "YouTube" if parsed.path.startswith("/youtube") else "Spotify"
+        payload = {
+            "title": f"{provider} track {key}",
+            "author_name": f"Artist {sum(map(ord, key)) % 97}",
+            "thumbnail_url": f"https://img.example/{key}.jpg",
+        }
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args) -> None:  # noqa: A002 - silence access logs
+        return None
+
+
+class StubProviderServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, latency: float = 0.0) -> None:
+        super().__init__(("127.0.0.1", 0), _OEmbedHandler)
+        self.latency = latency
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+@contextmanager
+def stub_providers(latency: float = 0.0) -> Iterator[StubProviderServer]:
+    """Démarre le serveur et redirige ``song_metadata`` vers lui."""
+
+    from app.services import song_metadata
+
+    server = StubProviderServer(latency=latency)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    original = (song_metadata.YOUTUBE_OEMBED, song_metadata.SPOTIFY_OEMBED)
+    song_metadata.YOUTUBE_OEMBED = f"{server.base_url}/youtube/oembed"
+    song_metadata.SPOTIFY_OEMBED = f"{server.base_url}/spotify/oembed"
+    try:
+        yield server
+    finally:
+        song_metadata.YOUTUBE_OEMBED, song_metadata.SPOTIFY_OEMBED = original
+        server.shutdown()
+        server.server_close()
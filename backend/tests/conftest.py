@@ -0,0 +1,83 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.database.connection import Base, get_db, get_read_db
+from app.main import app
+from app.utils.query_profiler import assert_max_queries, install_query_profiler
+
+
+@pytest.fixture()
+def query_budget():
+    """Context manager factory: ``with query_budget(session, 3): ...``."""
+
+    def _budget(session, max_queries: int, label: str = ""):
+        install_query_profiler(session.get_bind())
+        return assert_max_queries(max_queries, label)
+
+    return _budget
+
+
+@pytest.fixture()
+def engine(tmp_path):
+    """Temporary SQLite database with every table, usable from several threads.
+
+    Modules seed their own rows by overriding ``engine`` or ``session_factory``
+    with a fixture of the same name that requests this one.
+    """
+
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'app.sqlite'}",
+        future=True,
+        connect_args={"check_same_thread": False, "timeout": 30},
+    )
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture()
+def session_factory(engine):
+    return sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+
+@pytest.fixture()
+def session(session_factory) -> Session:
+    db = session_factory()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture()
+def client(session_factory):
+    """``TestClient`` whose ``get_db`` and ``get_read_db`` open sessions on ``engine``."""
+
+    def override_db():  # noqa: ANN202
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_db
+    app.dependency_overrides[get_read_db] = override_db
+    try:
+        with TestClient(app) as test_client:
+            yield test_client
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+        app.dependency_overrides.pop(get_read_db, None)
@@ -0,0 +1,167 @@
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.api.routes import ban_rules as ban_routes
+from app.crud import ban_rule as ban_crud
+from app.main import app
+from app.models.ban_rule import BanRule
+from app.models.song import Song
+from app.schemas.ban_rule import BanRuleCreate
+from app.services import ban_rule_io
+from app.services.auth import issue_admin_token
+from app.services.ban_rule_io import BanRuleListParser, BulkImportTooLarge, iter_lines
+
+
+@pytest.fixture()
+def session(session) -> Session:
+    session.add_all(
+        [
+            Song(title="Around the World", artist="Daft Punk", link="https://www.youtube.com/watch?v=a"),
+            Song(title="One More Time", artist="Daft Punk", link="https://www.youtube.com/watch?v=b"),
+            Song(title="Zombie", artist="The Cranberries", link="https://www.youtube.com/watch?v=c"),
+            Song(title="Linger", artist="The Cranberries", link="https://www.youtube.com/watch?v=d"),
+            Song(title="Wonderwall", artist="Oasis", link="https://www.youtube.com/watch?v=e"),
+        ]
+    )
+    session.commit()
+    return session
+
+
+def _admin_headers() -> dict[str, str]:
+    token = issue_admin_token(subject="admin-1", name="Admin", provider="password")
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_import_dedupes_and_sweeps_once(session: Session) -> None:
+    session.add(BanRule(artist="Oasis"))
+    session.commit()
+
+    report = ban_crud.import_ban_rules(
+        session,
+        [
+            BanRuleCreate(artist="daft punk"),
+            BanRuleCreate(artist="Daft Punk!"),
+            BanRuleCreate(artist="OASIS"),
+            BanRuleCreate(link="https://youtu.be/c"),
+            BanRuleCreate(title="Linger", artist="Someone else"),
+        ],
+    )
+
+    assert report["received"] == 5
+    assert report["created"] == 3
+    assert report["duplicates"] == 2
+    assert report["deleted_songs"] == 3
+    assert session.query(BanRule).count() == 4
+    assert [song.title for song in session.query(Song).order_by(Song.id)] == ["Linger", "Wonderwall"]
+
+
+def test_bulk_endpoint_accepts_ndjson_and_reports_errors(client, session: Session) -> None:
+    body = "\n".join(
+        [
+            json.dumps({"artist": "Daft Punk"}),
+            "not json",
+            json.dumps({"title": "  "}),
+            "",
+            json.dumps({"title": "Zombie"}),
+        ]
+    )
+    response = client.post(
+        "/ban/bulk",
+        content=body.encode("utf-8"),
+        headers={**_admin_headers(), "Content-Type": "application/x-ndjson"},
+    )
+
+    assert response.status_code == 200
+    report = response.json()
+    assert report["created"] == 2
+    assert report["rejected"] == 2
+    assert [error["line"] for error in report["errors"]] == [2, 3]
+    assert report["deleted_songs"] == 3
+
+
+def test_bulk_endpoint_accepts_csv(client, session: Session) -> None:
+    body = "title,artist,link\n,The Cranberries,\n\"Wonder, wall\",,\n,,https://youtu.be/a\n"
+    response = client.post(
+        "/ban/bulk",
+        content=body.encode("utf-8"),
+        headers={**_admin_headers(), "Content-Type": "text/csv"},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["created"] == 3
+    assert session.query(BanRule).filter(BanRule.title == "Wonder, wall").count() == 1
+    assert [song.title for song in session.query(Song)] == ["One More Time"]
+
+
+async def _chunks(body: bytes, size: int):  # noqa: ANN202
+    for start in range(0, len(body), size):
+        yield body[start : start + size]
+
+
+def test_csv_quoted_field_may_span_lines_and_chunks() -> None:
+    body = b'title,artist,link\r\n"Bohemian\r\nRhapsody",Queen,\r\n,"Daft ""Punk""",\r\n'
+    parser = BanRuleListParser()
+
+    asyncio.run(parser.feed_csv(iter_lines(_chunks(body, 7), keepends=True)))
+
+    assert [(rule.title, rule.artist) for rule in parser.rules] == [
+        ("Bohemian\r\nRhapsody", "Queen"),
+        (None, 'Daft "Punk"'),
+    ]
+    assert parser.rejected == 0
+
+
+def test_csv_import_limit_stops_reading(monkeypatch) -> None:
+    monkeypatch.setattr(ban_rule_io, "MAX_BULK_RULES", 2)
+    read = []
+
+    async def lines():  # noqa: ANN202
+        yield "artist\n"
+        for index in range(1_000):
+            read.append(index)
+            yield f"Artist {index}\n"
+
+    with pytest.raises(BulkImportTooLarge):
+        asyncio.run(BanRuleListParser().feed_csv(lines()))
+    assert len(read) == 3
+
+
+def test_bulk_endpoint_requires_admin(client) -> None:
+    response = client.post("/ban/bulk", content=b"{}")
+
+    assert response.status_code == 401
+
+
+def test_export_streams_rules_in_both_formats(session_factory, session: Session, monkeypatch) -> None:
+    session.add_all([BanRule(artist="Daft Punk"), BanRule(title="Zombie", link="https://youtu.be/c")])
+    session.commit()
+    monkeypatch.setattr(ban_routes, "open_read_session", session_factory)
+
+    with TestClient(app) as client:
+        ndjson = client.get("/ban/export", headers=_admin_headers())
+        csv_response = client.get("/ban/export?format=csv", headers=_admin_headers())
+
+    assert ndjson.status_code == 200
+    assert ndjson.headers["content-type"].startswith("application/x-ndjson")
+    assert [json.loads(line) for line in ndjson.text.splitlines()] == [
+        {"title": None, "artist": "Daft Punk", "link": None},
+        {"title": "Zombie", "artist": None, "link": "https://youtu.be/c"},
+    ]
+    assert csv_response.text.splitlines() == [
+        "title,artist,link",
+        ",Daft Punk,",
+        "Zombie,,https://youtu.be/c",
+    ]
@@ -0,0 +1,71 @@
+import os
+import random
+import sys
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+from app.crud import ban_rule as ban_crud
+from app.models.ban_rule import BanRule
+from app.utils.matching import AhoCorasick, OverlapIndex
+
+
+def test_aho_corasick_finds_overlapping_patterns() -> None:
+    automaton = AhoCorasick(["he", "she", "his", "hers", ""])
+
+    assert automaton.find("ushers") == {0, 1, 3}
+    assert automaton.find("xyz") == set()
+
+
+def test_overlap_index_matches_both_directions() -> None:
+    index = OverlapIndex(["notimetodie", "die", "", "notimetodie"])
+
+    assert index.overlaps("billieeilishnotimetodieofficial") == {0, 1, 3}
+    assert index.overlaps("time") == {0, 3}
+    assert index.overlaps("ie") == {0, 1, 3}
+    assert index.overlaps("") == set()
+
+
+def _random_text(rng: random.Random) -> str | None:
+    words = ["Love", "Song", "Été", "No Time", "To Die", "Artiste inconnu", "Björk", "A", "x-1", "!!!"]
+    if rng.random() < 0.1:
+        return None
+    return " ".join(rng.choice(words) for _ in range(rng.randint(1, 3)))
+
+
+def test_match_many_agrees_with_single_rule_evaluation() -> None:
+    rng = random.Random(7)
+    rules = []
+    for index in range(60):
+        title = _random_text(rng) if rng.random() < 0.7 else None
+        artist = _random_text(rng) if rng.random() < 0.6 else None
+        link = f"https://youtu.be/{index}" if rng.random() < 0.2 else None
+        rules.append(BanRule(id=index, title=title, artist=artist, link=link))
+    title_rules = [rule for rule in rules if rule.title or rule.artist]
+
+    songs = [(song_id, _random_text(rng), _random_text(rng)) for song_id in range(500)]
+
+    expected = [
+        song_id
+        for song_id, title, artist in songs
+        if any(ban_crud._matches_rule_values(title, artist, rule) for rule in title_rules)
+    ]
+    assert ban_crud.match_many(songs, rules, chunk_size=64) == expected
+
+    for rule in title_rules:
+        single = [
+            song_id
+            for song_id, title, artist in songs
+            if ban_crud._matches_rule_values(title, artist, rule)
+        ]
+        assert ban_crud.match_many(songs, [rule]) == single
+
+
+def test_match_many_ignores_link_only_rules() -> None:
+    rules = [BanRule(link="https://youtu.be/x")]
+
+    assert ban_crud.match_many([(1, "Song", "Artist")], rules) == []
@@ -0,0 +1,99 @@
+import os
+import sys
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.crud import ban_rule as ban_crud
+from app.models.ban_rule import BanRule
+from app.models.song import Song
+from app.schemas.ban_rule import BanRuleCreate
+from app.services.auth import issue_admin_token
+
+
+@pytest.fixture()
+def session(session) -> Session:
+    for index in range(50):
+        artist = "Daft Punk" if index % 10 == 0 else f"Artist {index}"
+        link = f"https://www.youtube.com/watch?v={index}"
+        session.add(Song(title=f"Track {index}", artist=artist, link=link))
+    session.commit()
+    return session
+
+
+def test_preview_counts_matches_without_deleting(session: Session) -> None:
+    preview = ban_crud.preview_ban_rule(session, BanRuleCreate(artist="daft punk"), sample_size=3)
+
+    assert preview["matched"] == 5
+    assert preview["scanned"] == 50
+    assert preview["complete"] is True
+    assert [song.id for song in preview["sample"]] == [1, 11, 21]
+    assert session.query(Song).count() == 50
+    assert session.query(BanRule).count() == 0
+
+
+def test_preview_matches_add_ban_rule_semantics(session: Session) -> None:
+    rule = BanRuleCreate(title="Track 1")
+    preview = ban_crud.preview_ban_rule(session, rule, sample_size=100)
+
+    before = session.query(Song).count()
+    ban_crud.add_ban_rule(session, rule)
+
+    assert preview["matched"] == before - session.query(Song).count()
+
+
+def test_preview_uses_link_index(session: Session) -> None:
+    preview = ban_crud.preview_ban_rule(session, BanRuleCreate(link="https://youtu.be/7"))
+
+    assert preview["matched"] == 1
+    assert preview["sample"][0].link == "https://www.youtube.com/watch?v=7"
+
+
+def test_preview_stops_at_row_budget(session: Session, monkeypatch) -> None:
+    monkeypatch.setattr(ban_crud, "PREVIEW_CHUNK_SIZE", 8)
+
+    preview = ban_crud.preview_ban_rule(session, BanRuleCreate(artist="Artist"), max_rows=20)
+
+    assert preview["scanned"] == 20
+    assert preview["complete"] is False
+    assert preview["stopped_by"] == "rows"
+
+
+def test_preview_is_complete_when_budget_ends_with_the_rows(session: Session, monkeypatch) -> None:
+    monkeypatch.setattr(ban_crud, "PREVIEW_CHUNK_SIZE", 10)
+    preview = ban_crud.preview_ban_rule(session, BanRuleCreate(artist="Artist"), max_rows=50)
+
+    assert preview["scanned"] == 50
+    assert preview["complete"] is True
+    assert preview["stopped_by"] is None
+
+
+def test_preview_stops_at_time_budget(session: Session) -> None:
+    preview = ban_crud.preview_ban_rule(session, BanRuleCreate(artist="Artist"), max_seconds=0)
+
+    assert preview["scanned"] == 0
+    assert preview["stopped_by"] == "time"
+
+
+def test_preview_endpoint_requires_admin(session: Session, client) -> None:
+    token = issue_admin_token(subject="admin-1", name="Admin", provider="password")
+    anonymous = client.post("/ban/preview", json={"artist": "Daft Punk"})
+    response = client.post(
+        "/ban/preview?sample_size=2",
+        json={"artist": "Daft Punk"},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    assert anonymous.status_code == 401
+    assert response.status_code == 200
+    body = response.json()
+    assert body["matched"] == 5
+    assert len(body["sample"]) == 2
+    assert body["sample"][0]["artist"] == "Daft Punk"
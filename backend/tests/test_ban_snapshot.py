@@ -0,0 +1,72 @@
+import os
+import sys
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+from sqlalchemy.orm import Session
+
+from app.crud import ban_rule as ban_crud
+from app.models.ban_rule import BanRule
+from app.schemas.ban_rule import BanRuleCreate, BanRuleUpdate
+
+
+def test_snapshot_is_reused_until_rules_change(session: Session) -> None:
+    first = ban_crud.get_ban_snapshot(session)
+    assert ban_crud.get_ban_snapshot(session) is first
+
+    rule = ban_crud.add_ban_rule(session, BanRuleCreate(artist="Nickelback"))
+    second = ban_crud.get_ban_snapshot(session)
+    assert second is not first
+    assert ban_crud.is_banned(session, "Photograph", "Nickelback", None) is True
+
+    ban_crud.update_ban_rule(session, rule.id, BanRuleUpdate(artist="Creed"))
+    assert ban_crud.is_banned(session, "Photograph", "Nickelback", None) is False
+
+    ban_crud.delete_ban_rule(session, rule.id)
+    assert ban_crud.is_banned(session, "Higher", "Creed", None) is False
+
+
+def test_direct_orm_changes_invalidate_other_sessions(session_factory, session: Session) -> None:
+    assert ban_crud.is_banned(session, "Song", "Artist", "https://youtu.be/x") is False
+
+    other = session_factory()
+    other.add(BanRule(link="https://youtu.be/x"))
+    other.commit()
+    other.close()
+
+    assert ban_crud.is_banned(session, "Song", "Artist", " https://youtu.be/x ") is True
+
+
+def test_bulk_import_invalidates_snapshot(session: Session) -> None:
+    assert ban_crud.is_banned(session, "Zombie", "The Cranberries", None) is False
+
+    ban_crud.import_ban_rules(session, [BanRuleCreate(title="Zombie")])
+
+    assert ban_crud.is_banned(session, "Zombie", "The Cranberries", None) is True
+
+
+def test_uncommitted_rules_are_not_published(session_factory, session: Session) -> None:
+    ban_crud.is_banned(session, "Song", "Artist", None)
+    session.add(BanRule(title="Song"))
+    session.flush()
+
+    assert ban_crud.is_banned(session, "Song", "Artist", None) is True
+    session.rollback()
+
+    other = session_factory()
+    try:
+        assert ban_crud.is_banned(other, "Song", "Artist", None) is False
+    finally:
+        other.close()
+
+
+def test_snapshot_expires_after_ttl(session: Session, monkeypatch) -> None:
+    first = ban_crud.get_ban_snapshot(session)
+    monkeypatch.setattr(ban_crud, "BAN_SNAPSHOT_TTL_SECONDS", 0)
+
+    assert ban_crud.get_ban_snapshot(session) is not first
@@ -0,0 +1,184 @@
+import os
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+import pytest
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import sessionmaker
+
+from app.crud import ban_rule as ban_crud
+from app.models.cache_version import CacheVersion
+from app.models.song import Song
+from app.schemas.ban_rule import BanRuleCreate
+from app.services import cache_bus
+
+
+@pytest.fixture()
+def received(monkeypatch):
+    events: list[tuple[str, str]] = []
+    original = cache_bus.dispatch
+
+    def recording_dispatch(topics, source="local"):
+        topics = list(topics)
+        events.extend((topic, source) for topic in topics)
+        original(topics, source)
+
+    monkeypatch.setattr(cache_bus, "dispatch", recording_dispatch)
+    return events
+
+
+def test_commit_dispatches_changed_topics_once(engine, received) -> None:
+    db = sessionmaker(bind=engine)()
+    db.add(Song(title="Zombie", artist="The Cranberries", link="https://youtu.be/z"))
+    db.flush()
+    db.add(Song(title="Linger", artist="The Cranberries", link="https://youtu.be/l"))
+    db.commit()
+    db.close()
+
+    assert received == [("songs", "local")]
+
+
+def test_rollback_discards_pending_topics(engine, received) -> None:
+    db = sessionmaker(bind=engine)()
+    db.add(Song(title="Zombie", artist="The Cranberries", link="https://youtu.be/z"))
+    db.flush()
+    assert cache_bus.has_pending_changes(db, cache_bus.SONGS)
+    db.rollback()
+    db.commit()
+    db.close()
+
+    assert received == []
+
+
+def test_bulk_import_marks_core_statements(engine, received) -> None:
+    db = sessionmaker(bind=engine)()
+    db.add(Song(title="Zombie", artist="The Cranberries", link="https://youtu.be/z"))
+    db.commit()
+    received.clear()
+
+    ban_crud.import_ban_rules(db, [BanRuleCreate(artist="The Cranberries")])
+    db.close()
+
+    assert sorted(received) == [("ban_rules", "local"), ("songs", "local")]
+
+
+def test_publisher_bumps_versions_and_pollers_see_them(engine, received) -> None:
+    publisher = cache_bus.CacheBus(engine, use_listen=False)
+    reader = cache_bus.CacheBus(engine, use_listen=False)
+    assert reader.poll_once() == []
+
+    publisher.publish({"songs", "ban_rules"})
+    publisher.publish({"songs"})
+    publisher.flush()
+
+    with engine.connect() as connection:
+        versions = dict(connection.execute(select(CacheVersion.topic, CacheVersion.version)).all())
+    assert versions == {"ban_rules": 1, "songs": 1}
+
+    assert sorted(reader.poll_once()) == ["ban_rules", "songs"]
+    assert reader.poll_once() == []
+    # Le worker qui publie ne se renvoie pas ses propres événements.
+    assert publisher.poll_once() == []
+    assert ("songs", "remote") in received
+
+
+def test_publication_upserts_a_topic_created_by_another_worker(engine) -> None:
+    bus = cache_bus.CacheBus(engine, use_listen=False)
+    other_worker = create_engine(engine.url, future=True)
+
+    @event.listens_for(engine, "before_cursor_execute", once=True)
+    def create_topic_first(conn, cursor, statement, parameters, context, executemany):  # noqa: ANN001
+        # Un autre worker crée le sujet juste avant nous.
+        with other_worker.begin() as connection:
+            connection.execute(CacheVersion.__table__.insert().values(topic="songs", version=1))
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    bus.publish({"songs"})
+    bus.flush()
+    other_worker.dispose()
+
+    assert len(statements) == 1 and "ON CONFLICT" in statements[0]
+
+    with engine.connect() as connection:
+        versions = dict(connection.execute(select(CacheVersion.topic, CacheVersion.version)).all())
+    assert versions == {"songs": 2}
+
+
+def test_notifications_from_own_origin_are_ignored(engine, received) -> None:
+    bus = cache_bus.CacheBus(engine, use_listen=False)
+
+    bus._handle_notification(f"{bus.origin};ban_rules=3")
+    bus._handle_notification("other;ban_rules=3,songs=x")
+    bus._handle_notification("other;ban_rules=2")
+
+    assert received == [("ban_rules", "remote")]
+
+
+_WORKER_SCRIPT = textwrap.dedent(
+    """
+    import sys, time
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from app.crud import ban_rule as ban_crud
+    from app.services import cache_bus
+
+    engine = create_engine(sys.argv[1], future=True)
+    bus = cache_bus.start_cache_bus(engine, poll_interval=0.05, use_listen=False)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        print(ban_crud.is_banned(db, "Zombie", "The Cranberries", None), flush=True)
+    sys.stdin.readline()
+    deadline = time.monotonic() + 10
+    banned = False
+    while not banned and time.monotonic() < deadline:
+        with Session() as db:
+            banned = ban_crud.is_banned(db, "Zombie", "The Cranberries", None)
+        time.sleep(0.02)
+    print(banned, flush=True)
+    cache_bus.stop_cache_bus()
+    """
+)
+
+
+def test_ban_rule_reaches_another_worker_without_ttl(engine, tmp_path) -> None:
+    url = str(engine.url)
+    env = {
+        **os.environ,
+        "DATABASE_URL": url,
+        "BAN_SNAPSHOT_TTL_SECONDS": "3600",
+        "PYTHONPATH": str(BACKEND_ROOT),
+    }
+    worker = subprocess.Popen(
+        [sys.executable, "-c", _WORKER_SCRIPT, url],
+        cwd=BACKEND_ROOT,
+        env=env,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        assert worker.stdout.readline().strip() == "False"
+
+        bus = cache_bus.start_cache_bus(engine, use_listen=False)
+        try:
+            with sessionmaker(bind=engine)() as db:
+                ban_crud.add_ban_rule(db, BanRuleCreate(artist="The Cranberries"))
+            bus.flush()
+        finally:
+            cache_bus.stop_cache_bus()
+
+        worker.stdin.write("go\n")
+        worker.stdin.flush()
+        assert worker.stdout.readline().strip() == "True"
+    finally:
+        worker.stdin.close()
+        worker.wait(timeout=15)
@@ -0,0 +1,152 @@
+import os
+import sys
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+import pytest
+from sqlalchemy import text
+
+from app.api.routes import public_submissions
+from app.crud import ban_rule as crud_ban
+from app.crud import song as crud_song
+from app.models.channel import DEFAULT_CHANNEL_ID
+from app.schemas.ban_rule import BanRuleCreate
+from app.schemas.song import SongCreate
+from app.services import channels, leaderboard
+from app.services.auth import issue_admin_token
+
+
+@pytest.fixture()
+def session_factory(session_factory):
+    with session_factory() as db:
+        channels.ensure_default_channel(db)
+    return session_factory
+
+
+def _song(name: str, link: str | None = None) -> SongCreate:
+    return SongCreate(title=name, artist="Artiste", link=link or f"https://youtu.be/{name}")
+
+
+def _admin_headers() -> dict[str, str]:
+    token = issue_admin_token(subject="admin-1", name="Admin", provider="password")
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_same_link_is_queued_separately_per_channel(session_factory) -> None:
+    with session_factory() as db:
+        other = channels.get_or_create_channel(db, "#Zerator")
+        assert channels.resolve_channel(db, "zerator") == other
+
+        first = crud_song.add_or_increment_song(db, _song("tube"))
+        second = crud_song.add_or_increment_song(db, _song("tube"), channel_id=other)
+        again = crud_song.add_or_increment_song(db, _song("tube"), channel_id=other)
+
+        assert first.id != second.id and second.id == again.id
+        assert (first.votes, again.votes) == (1, 2)
+        assert [song.id for song in crud_song.get_all_songs(db)] == [first.id]
+        assert [song.id for song in crud_song.get_all_songs(db, channel_id=other)] == [second.id]
+
+        # Identifiant d'une autre chaîne : ignoré.
+        assert crud_song.add_votes(db, {first.id: 3}, channel_id=other) == 0
+        assert crud_song.increment_vote(db, first.id, channel_id=other) is None
+        assert crud_song.delete_song(db, first.id, channel_id=other) is False
+        assert [entry.id for entry in leaderboard.top_songs(db, 5, other)] == [second.id]
+
+
+def test_ban_rules_and_snapshots_are_per_channel(session_factory) -> None:
+    with session_factory() as db:
+        other = channels.get_or_create_channel(db, "raid")
+        crud_song.add_or_increment_song(db, _song("Zombie"))
+        crud_song.add_or_increment_song(db, _song("Zombie"), channel_id=other)
+        quiet = crud_ban.get_ban_snapshot(db)
+
+        crud_ban.add_ban_rule(db, BanRuleCreate(title="Zombie"), channel_id=other)
+
+        # La chaîne calme garde son instantané et sa chanson.
+        assert crud_ban.get_ban_snapshot(db) is quiet
+        assert not crud_ban.is_banned(db, "Zombie", "Artiste", None)
+        assert crud_ban.is_banned(db, "Zombie", "Artiste", None, channel_id=other)
+        assert [song.title for song in crud_song.get_all_songs(db)] == ["Zombie"]
+        assert crud_song.get_all_songs(db, channel_id=other) == []
+        assert crud_ban.list_ban_rules(db) == []
+
+        rule = crud_ban.list_ban_rules(db, channel_id=other)[0]
+        assert crud_ban.delete_ban_rule(db, rule.id) is False
+        assert crud_ban.delete_ban_rule(db, rule.id, channel_id=other) is True
+
+
+def test_channel_listing_uses_composite_index(session_factory) -> None:
+    with session_factory() as db:
+        plan = db.execute(
+            text("EXPLAIN QUERY PLAN SELECT * FROM songs WHERE channel_id = 7 ORDER BY votes DESC")
+        ).all()
+    details = " ".join(row[-1] for row in plan)
+    assert "ix_songs_channel_votes" in details
+    assert "TEMP B-TREE" not in details
+
+
+def test_channel_routes(session_factory, client) -> None:
+    created = client.post("/channels/", json={"login": "Zerator"}, headers=_admin_headers())
+    duplicate = client.post("/channels/", json={"login": "zerator"}, headers=_admin_headers())
+    assert created.status_code == 201 and created.json()["login"] == "zerator"
+    assert duplicate.status_code == 409
+    assert {channel["login"] for channel in client.get("/channels/").json()} == {"default", "zerator"}
+
+    with session_factory() as db:
+        crud_song.add_or_increment_song(db, _song("defaut"))
+        song = crud_song.add_or_increment_song(
+            db, _song("chaine"), channel_id=channels.resolve_channel(db, "zerator")
+        )
+
+    assert [row["title"] for row in client.get("/songs/").json()] == ["defaut"]
+    assert [row["title"] for row in client.get("/channels/zerator/songs/").json()] == ["chaine"]
+    assert client.get("/channels/inconnue/songs/").status_code == 404
+    assert client.post(f"/songs/{song.id}/vote").status_code == 404
+    assert client.post(f"/channels/zerator/songs/{song.id}/vote").status_code == 200
+    assert client.get("/channels/zerator/songs/top").json()[0]["votes"] == 2
+
+    banned = client.post(
+        "/channels/zerator/ban/", json={"title": "chaine"}, headers=_admin_headers()
+    )
+    assert banned.status_code == 200
+    assert client.get("/channels/zerator/songs/").json() == []
+    assert client.get("/ban/").json() == []
+
+
+def test_public_submission_limits_are_per_channel(session_factory, client, monkeypatch) -> None:
+    def fake_metadata(link: str) -> SongCreate:
+        return SongCreate(title=link.rsplit("/", 1)[-1], artist="Artiste", link=link)
+
+    monkeypatch.setattr(public_submissions, "fetch_song_metadata", fake_metadata)
+    with session_factory() as db:
+        channels.get_or_create_channel(db, "raid")
+        channels.get_or_create_channel(db, "calme")
+    public_submissions.limiter.reset()
+
+    try:
+        raid = [
+            client.post(
+                "/channels/raid/public/submissions/", json={"link": f"https://youtu.be/raid{index}"}
+            ).status_code
+            for index in range(11)
+        ]
+        quiet = client.post(
+            "/channels/calme/public/submissions/", json={"link": "https://youtu.be/calme"}
+        )
+        unknown = client.post(
+            "/channels/inconnue/public/submissions/", json={"link": "https://youtu.be/x"}
+        )
+    finally:
+        public_submissions.limiter.reset()
+
+    assert raid[:10] == [201] * 10 and raid[10] == 429
+    assert quiet.status_code == 201
+    assert unknown.status_code == 404
+    with session_factory() as db:
+        assert len(crud_song.get_all_songs(db, channel_id=channels.resolve_channel(db, "raid"))) == 10
+        assert crud_song.get_all_songs(db, channel_id=DEFAULT_CHANNEL_ID) == []
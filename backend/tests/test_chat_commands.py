@@ -0,0 +1,203 @@
+import asyncio
+import os
+import sys
+from collections import Counter
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from app.crud import song as crud_song
+from app.models.song import Song
+from app.schemas.song import SongCreate
+from app.services import submissions
+from app.services.chat_commands import (
+    MAX_FLUSH_ATTEMPTS,
+    ChatCommand,
+    ChatCommandProcessor,
+    VoteAggregator,
+    parse_command,
+    parse_song_id,
+)
+from app.services.twitch_chat import ChatMessage, TwitchChatIngestor
+from benchmarks.fake_irc import FakeIrcServer, recorded_chat
+
+
+@pytest.fixture()
+def engine(engine):
+    with sessionmaker(bind=engine)() as db:
+        db.add_all(
+            Song(title=f"Song {index}", artist="Chat", link=f"https://youtu.be/{index}")
+            for index in range(1, 51)
+        )
+        db.commit()
+    return engine
+
+
+def _votes(session_factory) -> dict[int, int]:  # noqa: ANN001
+    with session_factory() as db:
+        return {song.id: song.votes for song in db.query(Song).order_by(Song.id)}
+
+
+def test_parse_command_and_song_id() -> None:
+    assert parse_command("!Vote  12 merci") == ChatCommand("vote", "12 merci")
+    assert parse_command("salut !vote 3") is None
+    assert parse_command("!") is None
+    assert parse_song_id("#12") == 12
+    assert parse_song_id("douze") is None
+    assert parse_song_id("0") is None
+    assert parse_song_id("9" * 20) is None
+
+
+def test_votes_are_deduped_per_user_and_song() -> None:
+    processor = ChatCommandProcessor()
+
+    processor.handle("alice", "!vote 1")
+    processor.handle("alice", "!vote 1")
+    processor.handle("alice", "!v 2")
+    processor.handle("bob", "!vote #1")
+    processor.handle("bob", "!vote un")
+
+    assert processor.votes.drain() == Counter({1: 2, 2: 1})
+    assert processor.stats["vote_accepted"] == 3
+    assert processor.stats["vote_duplicate"] == 1
+    assert processor.stats["vote_invalid"] == 1
+    assert processor.handle("bob", "!inconnue") is False
+
+
+def test_dedupe_memory_is_bounded() -> None:
+    votes = VoteAggregator(max_remembered=2)
+
+    assert votes.add("a", 1)
+    assert votes.add("b", 1)
+    assert votes.add("c", 1)
+    # Le couple le plus ancien a été oublié.
+    assert votes.add("a", 1)
+    assert not votes.add("c", 1)
+
+
+def test_add_votes_groups_updates_by_delta(engine, session_factory) -> None:
+    statements: list[str] = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def record(conn, cursor, statement, parameters, context, executemany):  # noqa: ANN001
+        if statement.startswith("UPDATE"):
+            statements.append(statement)
+
+    counts = Counter({song_id: 1 for song_id in range(1, 41)})
+    counts.update({41: 3, 42: 3, 43: 7, 999: 1})
+    with session_factory() as db:
+        updated = crud_song.add_votes(db, counts)
+
+    assert updated == 43
+    assert len(statements) == 3
+    votes = _votes(session_factory)
+    assert votes[1] == 2 and votes[41] == 4 and votes[43] == 8 and votes[50] == 1
+
+
+def test_flush_reports_write_amplification(session_factory) -> None:
+    votes = VoteAggregator()
+    for user in range(200):
+        votes.add(f"viewer{user}", 1 + user % 5)
+
+    with session_factory() as db:
+        votes.flush(db)
+
+    assert votes.stats["statements"] == 1
+    assert votes.write_amplification == pytest.approx(1 / 200)
+    assert _votes(session_factory)[1] == 41
+
+
+def test_reco_command_goes_through_link_pipeline(session_factory) -> None:
+    def metadata(link: str) -> SongCreate:
+        return SongCreate(title="Reco", artist="Chat", link=link)
+
+    ingestor = TwitchChatIngestor("chan", session_factory, fetch_metadata=metadata)
+    ingestor.handle_message(ChatMessage("alice", "#chan", "!reco https://youtu.be/reco1"))
+    ingestor.handle_message(ChatMessage("alice", "#chan", "!reco pas de lien"))
+
+    assert ingestor.commands.stats["reco_accepted"] == 1
+    assert ingestor.commands.stats["reco_rejected"] == 1
+    assert ingestor._pending == Counter({"https://www.youtube.com/watch?v=reco1": 1})
+
+
+def test_failing_link_batch_does_not_lose_votes(session_factory, monkeypatch) -> None:
+    def broken_submit_links(*args, **kwargs):  # noqa: ANN002, ANN003, ANN202
+        raise RuntimeError("base indisponible")
+
+    monkeypatch.setattr(submissions, "submit_links", broken_submit_links)
+    ingestor = TwitchChatIngestor("chan", session_factory)
+    ingestor.handle_message(ChatMessage("alice", "#chan", "!vote 1"))
+    ingestor.handle_message(ChatMessage("bob", "#chan", "!vote 1"))
+
+    ingestor.process_batch(Counter({"https://youtu.be/new": 1}), ingestor.commands.votes.take())
+
+    assert ingestor.stats["failed_batches"] == 1
+    assert _votes(session_factory)[1] == 3
+
+
+def test_failed_vote_flush_is_requeued_then_forgotten(session_factory, monkeypatch) -> None:
+    def broken_add_votes(*args, **kwargs):  # noqa: ANN002, ANN003, ANN202
+        raise RuntimeError("base indisponible")
+
+    ingestor = TwitchChatIngestor("chan", session_factory)
+    votes = ingestor.commands.votes
+    votes.add("alice", 2)
+
+    with monkeypatch.context() as patch:
+        patch.setattr(crud_song, "add_votes", broken_add_votes)
+        ingestor.process_batch(Counter(), votes.take())
+    assert len(votes) == 1 and votes.stats["requeued"] == 1
+    # Le votant n'est pas oublié tant que sa voix est en attente.
+    assert not votes.add("alice", 2)
+
+    ingestor.process_batch(Counter(), votes.take())
+    assert _votes(session_factory)[2] == 2
+
+    votes.add("bob", 3)
+    with monkeypatch.context() as patch:
+        patch.setattr(crud_song, "add_votes", broken_add_votes)
+        for _ in range(MAX_FLUSH_ATTEMPTS):
+            ingestor.process_batch(Counter(), votes.take())
+    assert len(votes) == 0 and votes.stats["discarded"] == 1
+    assert ingestor.stats["failed_vote_flushes"] == 1 + MAX_FLUSH_ATTEMPTS
+    # Voix abandonnée : le spectateur peut revoter.
+    assert votes.add("bob", 3)
+
+
+def test_replayed_votes_are_written_in_few_statements(session_factory) -> None:
+    lines = recorded_chat(5_000, viewers=300, link_ratio=0.0, vote_ratio=0.5, vote_ids=50)
+
+    async def scenario():  # noqa: ANN202
+        server = await FakeIrcServer(lines, rate=10_000).start()
+        ingestor = TwitchChatIngestor(
+            "tchatrecosong",
+            session_factory,
+            host="127.0.0.1",
+            port=server.port,
+            use_tls=False,
+            batch_interval=0.05,
+        )
+        task = asyncio.create_task(ingestor.run())
+        async with asyncio.timeout(20):
+            while ingestor.stats["messages"] < 5_000:
+                await asyncio.sleep(0.01)
+        ingestor.stop()
+        await task
+        await server.close()
+        return ingestor
+
+    ingestor = asyncio.run(scenario())
+
+    votes = ingestor.commands.votes
+    assert votes.stats["accepted"] + votes.stats["duplicates"] == ingestor.stats["commands"]
+    assert votes.stats["duplicates"] > 0
+    assert sum(_votes(session_factory).values()) == 50 + votes.stats["accepted"]
+    assert votes.write_amplification < 0.2
@@ -0,0 +1,171 @@
+import gzip
+import os
+import sys
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.models.song import Song
+from app.utils.compression import CompressionMiddleware, preferred_encoding
+from app.utils.static_files import IMMUTABLE_CACHE_CONTROL, PrecompressedStaticFiles
+
+
+def _demo_app() -> FastAPI:
+    demo = FastAPI()
+    demo.add_middleware(CompressionMiddleware, minimum_size=100)
+
+    @demo.get("/small")
+    def small():  # noqa: ANN202
+        return PlainTextResponse("x" * 50)
+
+    @demo.get("/large")
+    def large():  # noqa: ANN202
+        return PlainTextResponse("x" * 5000)
+
+    @demo.get("/image")
+    def image():  # noqa: ANN202
+        return Response(b"\x89PNG" * 2000, media_type="image/png")
+
+    @demo.get("/tagged")
+    def tagged():  # noqa: ANN202
+        return PlainTextResponse("x" * 5000, headers={"ETag": '"v1"'})
+
+    @demo.get("/partial")
+    def partial():  # noqa: ANN202
+        return PlainTextResponse(
+            "x" * 5000, status_code=206, headers={"Content-Range": "bytes 0-4999/9000"}
+        )
+
+    @demo.get("/stream")
+    def stream():  # noqa: ANN202
+        return StreamingResponse((f"ligne {i}\n" for i in range(2000)), media_type="text/csv")
+
+    return demo
+
+
+def test_preferred_encoding_respects_quality_values():
+    assert preferred_encoding("gzip, br", ("br", "gzip")) == "br"
+    assert preferred_encoding("gzip, br;q=0", ("br", "gzip")) == "gzip"
+    assert preferred_encoding("identity", ("br", "gzip")) is None
+    assert preferred_encoding("*", ("gzip",)) == "gzip"
+    assert preferred_encoding(None, ("gzip",)) is None
+
+
+def test_middleware_applies_threshold_and_type_allowlist():
+    client = TestClient(_demo_app())
+    headers = {"Accept-Encoding": "gzip"}
+
+    large = client.get("/large", headers=headers)
+    assert large.headers["content-encoding"] == "gzip"
+    assert large.headers["vary"] == "Accept-Encoding"
+    assert int(large.headers["content-length"]) < 5000
+    assert large.text == "x" * 5000
+
+    assert "content-encoding" not in client.get("/small", headers=headers).headers
+    assert "content-encoding" not in client.get("/image", headers=headers).headers
+    assert "content-encoding" not in client.get("/large", headers={"Accept-Encoding": "identity"}).headers
+
+
+def test_middleware_weakens_etag_of_compressed_responses():
+    client = TestClient(_demo_app())
+
+    assert client.get("/tagged", headers={"Accept-Encoding": "gzip"}).headers["etag"] == 'W/"v1"'
+    assert client.get("/tagged", headers={"Accept-Encoding": "identity"}).headers["etag"] == '"v1"'
+
+
+def test_middleware_leaves_partial_responses_untouched():
+    response = TestClient(_demo_app()).get("/partial", headers={"Accept-Encoding": "gzip"})
+
+    assert response.status_code == 206
+    assert "content-encoding" not in response.headers
+    assert response.headers["content-length"] == "5000"
+
+
+def test_middleware_compresses_streaming_responses_incrementally():
+    client = TestClient(_demo_app())
+    with client.stream("GET", "/stream", headers={"Accept-Encoding": "gzip"}) as response:
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        raw = b"".join(response.iter_raw())
+    assert gzip.decompress(raw).decode() == "".join(f"ligne {i}\n" for i in range(2000))
+
+
+@pytest.fixture()
+def session_factory(session_factory):
+    with session_factory() as db:
+        db.add_all(
+            Song(title=f"Chanson {i}", artist="Artiste", link=f"https://youtu.be/{i}", votes=i)
+            for i in range(1, 101)
+        )
+        db.commit()
+    return session_factory
+
+
+def test_song_list_is_compressed_when_client_accepts_it(client):
+    plain = client.get("/songs/", headers={"Accept-Encoding": "identity"})
+    compressed = client.get("/songs/", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in plain.headers
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert int(compressed.headers["content-length"]) < int(plain.headers["content-length"])
+    assert compressed.json() == plain.json()
+
+
+@pytest.fixture()
+def assets_client(tmp_path):
+    assets = tmp_path / "assets"
+    assets.mkdir()
+    source = b"console.log('tchat');\n" * 200
+    (assets / "app-1a2b.js").write_bytes(source)
+    (assets / "app-1a2b.js.gz").write_bytes(gzip.compress(source))
+    (assets / "app-1a2b.js.br").write_bytes(b"brotli-precompresse")
+    (assets / "plain-3c4d.css").write_text("body{}")
+
+    demo = FastAPI()
+    demo.mount("/assets", PrecompressedStaticFiles(directory=assets, immutable=True))
+    return TestClient(demo), source
+
+
+def test_precompressed_sibling_is_served_as_is(assets_client):
+    client, source = assets_client
+
+    response = client.get("/assets/app-1a2b.js", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["content-type"].startswith("text/javascript")
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+    assert response.content == source
+
+    brotli = client.get("/assets/app-1a2b.js", headers={"Accept-Encoding": "br, gzip"})
+    assert brotli.headers["content-encoding"] == "br"
+    assert int(brotli.headers["content-length"]) == len(b"brotli-precompresse")
+
+    identity = client.get("/assets/app-1a2b.js", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in identity.headers
+    assert identity.content == source
+
+    css = client.get("/assets/plain-3c4d.css", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in css.headers
+    assert "vary" not in css.headers
+    assert css.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+
+
+def test_precompressed_assets_honour_conditional_requests(assets_client):
+    client, _ = assets_client
+    first = client.get("/assets/app-1a2b.js", headers={"Accept-Encoding": "gzip"})
+
+    revalidated = client.get(
+        "/assets/app-1a2b.js",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": first.headers["etag"]},
+    )
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
@@ -0,0 +1,140 @@
+import os
+import sys
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+from sqlalchemy import text
+
+from app.database import connection
+from app.database.connection import (
+    InstrumentedQueuePool,
+    PoolSettings,
+    PoolStats,
+    create_instrumented_engine,
+)
+
+
+def test_pool_settings_are_read_from_env(monkeypatch) -> None:
+    monkeypatch.setenv("DATABASE_POOL_SIZE", "2")
+    monkeypatch.setenv("DATABASE_MAX_OVERFLOW", "1")
+    monkeypatch.setenv("DATABASE_POOL_RECYCLE", "120")
+    monkeypatch.setenv("DATABASE_POOL_TIMEOUT", "3.5")
+    monkeypatch.setenv("DATABASE_PRE_PING", "always")
+    monkeypatch.setenv("DATABASE_PRE_PING_IDLE_SECONDS", "15")
+    monkeypatch.delenv("DATABASE_PGBOUNCER", raising=False)
+
+    settings = PoolSettings.from_env("postgresql://u:p@ep-x-pooler.neon.tech/db")
+
+    assert settings == PoolSettings(
+        pool_size=2,
+        max_overflow=1,
+        pool_recycle=120,
+        pool_timeout=3.5,
+        pre_ping="always",
+        pre_ping_idle_seconds=15.0,
+        pgbouncer=True,
+    )
+
+
+def test_pool_settings_fall_back_on_invalid_values(monkeypatch) -> None:
+    monkeypatch.setenv("DATABASE_POOL_SIZE", "beaucoup")
+    monkeypatch.setenv("DATABASE_PRE_PING", "sometimes")
+    monkeypatch.setenv("DATABASE_PGBOUNCER", "0")
+
+    settings = PoolSettings.from_env("postgresql://u:p@ep-x-pooler.neon.tech/db")
+
+    assert settings.pool_size == 5
+    assert settings.pre_ping == "idle"
+    assert settings.pgbouncer is False
+
+
+def test_engine_uses_configured_pool(tmp_path) -> None:
+    settings = PoolSettings(pool_size=3, max_overflow=2, pool_timeout=1.0)
+    engine = create_instrumented_engine(f"sqlite:///{tmp_path / 'pool.sqlite'}", settings)
+
+    try:
+        assert isinstance(engine.pool, InstrumentedQueuePool)
+        assert engine.pool.size() == 3
+        assert engine.pool._max_overflow == 2  # pylint: disable=protected-access
+    finally:
+        engine.dispose()
+
+
+def test_pool_events_track_occupancy_and_churn(tmp_path) -> None:
+    stats = PoolStats()
+    engine = create_instrumented_engine(
+        f"sqlite:///{tmp_path / 'pool.sqlite'}", PoolSettings(), stats
+    )
+
+    try:
+        with engine.connect() as first, engine.connect() as second:
+            first.execute(text("SELECT 1"))
+            second.execute(text("SELECT 1"))
+            assert stats.checked_out == 2
+
+        snapshot = stats.snapshot()
+        assert snapshot["connects"] == 2
+        assert snapshot["checkouts"] == 2
+        assert snapshot["checkins"] == 2
+        assert snapshot["checked_out"] == 0
+        assert snapshot["peak_checked_out"] == 2
+        assert snapshot["checkout_wait_count"] == 2
+        assert snapshot["checkout_wait_max_seconds"] >= 0.0
+    finally:
+        engine.dispose()
+
+
+def test_idle_connections_are_pinged_only_after_threshold(tmp_path) -> None:
+    stats = PoolStats()
+    settings = PoolSettings(pool_size=1, max_overflow=0, pre_ping_idle_seconds=60.0)
+    engine = create_instrumented_engine(f"sqlite:///{tmp_path / 'pool.sqlite'}", settings, stats)
+
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        assert stats.liveness_pings == 0
+
+        # Simule une connexion restée inactive plus longtemps que le seuil.
+        record = engine.pool._pool.queue[0]  # pylint: disable=protected-access
+        record.info[connection._LAST_CHECKIN_KEY] -= 120  # pylint: disable=protected-access
+
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        assert stats.liveness_pings == 1
+        assert stats.liveness_failures == 0
+    finally:
+        engine.dispose()
+
+
+def test_dead_idle_connection_is_replaced(tmp_path, monkeypatch) -> None:
+    stats = PoolStats()
+    settings = PoolSettings(pool_size=1, max_overflow=0, pre_ping_idle_seconds=0.0)
+    engine = create_instrumented_engine(f"sqlite:///{tmp_path / 'pool.sqlite'}", settings, stats)
+
+    calls = {"count": 0}
+
+    def flaky_ping(dbapi_connection):  # pylint: disable=unused-argument
+        calls["count"] += 1
+        if calls["count"] == 1:
+            raise RuntimeError("server closed the connection unexpectedly")
+
+    monkeypatch.setattr(connection, "_ping_dbapi_connection", flaky_ping)
+
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        with engine.connect() as conn:
+            assert conn.execute(text("SELECT 1")).scalar() == 1
+
+        assert stats.liveness_failures == 1
+        assert stats.invalidations == 1
+        assert stats.connects == 2
+    finally:
+        engine.dispose()
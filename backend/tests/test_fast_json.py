@@ -0,0 +1,81 @@
+import os
+import sys
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+import pytest
+from pydantic import TypeAdapter
+
+from app.crud import ban_rule as crud_ban
+from app.crud import song as crud_song
+from app.main import app
+from app.models.ban_rule import BanRule
+from app.models.song import Song
+from app.schemas.ban_rule import BanRuleOut
+from app.schemas.song import SongOut
+from app.utils import fast_json
+
+SONGS = TypeAdapter(list[SongOut])
+RULES = TypeAdapter(list[BanRuleOut])
+
+
+@pytest.fixture()
+def session_factory(session_factory):
+    with session_factory() as db:
+        db.add_all(
+            [
+                Song(title='Dit "bonjour" \\ à tous', artist="Ñandú 🎸", link="https://youtu.be/a", votes=4),
+                Song(
+                    title="Tab\tet\nretour",
+                    artist="\x01contrôle",
+                    link="https://youtu.be/b?x=1&y=</script>",
+                    thumbnail="https://i.ytimg.com/vi/b/0.jpg",
+                    comment="",
+                    votes=9,
+                ),
+                BanRule(artist="  Nickelback  "),
+                BanRule(title="", link="https://youtu.be/c"),
+            ]
+        )
+        db.commit()
+    return session_factory
+
+
+def _pydantic_bodies(session_factory) -> tuple[bytes, bytes]:  # noqa: ANN001
+    # Ce que FastAPI produit avec response_model pour les mêmes données.
+    with session_factory() as db:
+        songs = SONGS.validate_python(crud_song.get_all_songs(db), from_attributes=True)
+        rules = RULES.validate_python(crud_ban.list_ban_rules(db), from_attributes=True)
+        return SONGS.dump_json(songs), RULES.dump_json(rules)
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_list_bodies_match_pydantic_serialization(session_factory, client, monkeypatch, use_orjson) -> None:
+    if use_orjson:
+        if fast_json.orjson is None:
+            pytest.skip("orjson non installé")
+    else:
+        monkeypatch.setattr(fast_json, "orjson", None)
+    songs_body, rules_body = _pydantic_bodies(session_factory)
+
+    songs = client.get("/songs/")
+    rules = client.get("/ban/")
+
+    assert songs.headers["content-type"] == "application/json"
+    assert songs.content == songs_body
+    assert rules.content == rules_body
+    assert client.get("/songs/", params={"sort": "trending"}).status_code == 200
+
+
+def test_openapi_still_describes_response_models() -> None:
+    paths = app.openapi()["paths"]
+
+    songs = paths["/songs/"]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+    rules = paths["/ban/"]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+    assert songs["items"] == {"$ref": "#/components/schemas/SongOut"}
+    assert rules["items"] == {"$ref": "#/components/schemas/BanRuleOut"}
@@ -9,3 +9,82 @@ def test_health_endpoint_returns_ok():
 
     assert response.status_code == 200
     assert response.json() == {"status": "ok"}
+
+
+def test_ready_reports_startup_phases():
+    with TestClient(app) as client:
+        response = client.get("/ready")
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["status"] == "ready"
+    assert payload["startup_ms"] >= 0
+    for phase in ("database", "schema", "seed", "cache_warmup", "http_client", "frontend"):
+        assert payload["phases"][phase]["status"] == "ok"
+        assert payload["phases"][phase]["duration_ms"] >= 0
+
+
+def test_ready_is_unavailable_when_database_is_down(monkeypatch):
+    from sqlalchemy.exc import OperationalError
+
+    from app import main
+
+    def failing_connection():
+        raise OperationalError("SELECT 1", {}, Exception("connexion refusée"))
+
+    monkeypatch.setattr(main, "check_connection", failing_connection)
+    with TestClient(app) as client:
+        health = client.get("/health")
+        ready = client.get("/ready")
+
+    assert health.status_code == 200
+    assert ready.status_code == 503
+    payload = ready.json()
+    assert payload["status"] == "degraded"
+    assert payload["phases"]["database"]["status"] == "failed"
+    assert payload["phases"]["seed"]["status"] == "skipped"
+    assert payload["phases"]["http_client"]["status"] == "ok"
+
+
+def test_ready_replays_database_phases_once_database_is_back(monkeypatch):
+    from sqlalchemy.exc import OperationalError
+
+    from app import main
+
+    def failing_connection():
+        raise OperationalError("SELECT 1", {}, Exception("base en veille"))
+
+    working_connection = main.check_connection
+    monkeypatch.setattr(main, "READY_DATABASE_CACHE_SECONDS", 0)
+    monkeypatch.setattr(main, "check_connection", failing_connection)
+    with TestClient(app) as client:
+        cold = client.get("/ready")
+        monkeypatch.setattr(main, "check_connection", working_connection)
+        warm = client.get("/ready")
+
+    assert cold.status_code == 503
+    assert warm.status_code == 200
+    payload = warm.json()
+    assert payload["status"] == "ready"
+    assert payload["database"] == {"status": "ok"}
+    for phase in ("database", "schema", "seed", "cache_warmup"):
+        assert payload["phases"][phase]["status"] == "ok"
+
+
+def test_ready_reports_database_lost_after_startup(monkeypatch, tmp_path):
+    from sqlalchemy import create_engine
+
+    from app import main
+
+    monkeypatch.setattr(main, "READY_DATABASE_CACHE_SECONDS", 0)
+    with TestClient(app) as client:
+        before = client.get("/ready")
+        monkeypatch.setattr(main, "engine", create_engine(f"sqlite:///{tmp_path / 'absent' / 'db.sqlite'}"))
+        lost = client.get("/ready")
+
+    assert before.status_code == 200
+    assert lost.status_code == 503
+    payload = lost.json()
+    assert payload["status"] == "degraded"
+    assert payload["database"]["status"] == "unreachable"
+    assert payload["phases"]["database"]["status"] == "ok"
@@ -0,0 +1,172 @@
+import os
+import random
+import sys
+import threading
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+import pytest
+from sqlalchemy import update
+
+from app.crud import ban_rule as crud_ban
+from app.crud import song as crud_song
+from app.models.song import Song
+from app.schemas.ban_rule import BanRuleCreate
+from app.schemas.song import SongCreate
+from app.services import cache_bus, leaderboard
+from app.utils.topk import TopK
+
+
+@pytest.fixture()
+def session_factory(session_factory):
+    with session_factory() as db:
+        db.add_all(
+            Song(title=f"Song {index}", artist=f"Artist {index}", link=f"https://youtu.be/{index}", votes=1)
+            for index in range(1, 31)
+        )
+        db.commit()
+    return session_factory
+
+
+def _db_top(db, k: int) -> list[tuple[int, int]]:  # noqa: ANN001
+    return [
+        (song.id, song.votes)
+        for song in db.query(Song).order_by(Song.votes.desc(), Song.id).limit(k)
+    ]
+
+
+def _board_top(db, k: int) -> list[tuple[int, int]]:  # noqa: ANN001
+    return [(entry.id, entry.votes) for entry in leaderboard.top_songs(db, k)]
+
+
+def test_topk_keeps_best_entries_in_order() -> None:
+    ranking: TopK[str] = TopK(3)
+    for item_id, score in [(1, 5), (2, 9), (3, 5), (4, 1)]:
+        ranking.offer(item_id, score, f"s{item_id}")
+
+    assert ranking.top(10) == ["s2", "s1", "s3"]
+    assert 4 not in ranking
+    # Égalité de score : le plus petit identifiant passe devant.
+    assert not ranking.offer(5, 5, "s5")
+    assert ranking.offer(4, 6, "s4")
+    assert ranking.top(3) == ["s2", "s4", "s1"]
+    # Une mise à jour plus ancienne arrivée en retard est ignorée.
+    ranking.offer(2, 3, "stale")
+    assert ranking.score_of(2) == 9
+
+
+def test_votes_keep_board_in_sync_with_database(session_factory, query_budget) -> None:
+    rng = random.Random(11)
+    with session_factory() as db:
+        assert _board_top(db, 10) == _db_top(db, 10)
+        for _ in range(200):
+            song_id = rng.randint(1, 30)
+            draw = rng.random()
+            if draw < 0.5:
+                crud_song.increment_vote(db, song_id)
+            elif draw < 0.8:
+                crud_song.add_votes(db, {song_id: rng.randint(1, 4), rng.randint(1, 30): 1})
+            else:
+                song = db.get(Song, song_id)
+                crud_song.add_or_increment_song(
+                    db, SongCreate(title=song.title, artist=song.artist, link=song.link)
+                )
+        crud_song.add_or_increment_song(
+            db, SongCreate(title="Nouveau", artist="Tube", link="https://youtu.be/new"), votes=500
+        )
+
+        with query_budget(db, 0, "classement en mémoire"):
+            top = _board_top(db, 10)
+        assert top == _db_top(db, 10)
+        assert top[0][1] == 500
+
+
+def test_rollback_is_not_applied(session_factory) -> None:
+    with session_factory() as db:
+        _board_top(db, 5)
+        song = db.get(Song, 30)
+        song.votes = 1_000
+        leaderboard.track(db, leaderboard.entry_of(song))
+        db.rollback()
+
+        assert _board_top(db, 5) == _db_top(db, 5)
+
+
+def test_ban_rule_deletion_drops_song_from_board(session_factory) -> None:
+    with session_factory() as db:
+        crud_song.add_votes(db, {7: 50, 8: 20})
+        assert _board_top(db, 1) == [(7, 51)]
+
+        crud_ban.add_ban_rule(db, BanRuleCreate(title="Song 7"))
+        crud_song.delete_song(db, 8)
+
+        top = _board_top(db, 3)
+        assert 7 not in dict(top) and 8 not in dict(top)
+        assert top == _db_top(db, 3)
+
+
+def test_remote_change_forces_reload(session_factory) -> None:
+    with session_factory() as db:
+        _board_top(db, 3)
+        # Écriture d'un autre worker, invisible pour ce processus.
+        db.execute(update(Song).where(Song.id == 12).values(votes=99))
+        db.commit()
+        assert (12, 99) not in _board_top(db, 3)
+
+        cache_bus.dispatch([cache_bus.SONGS], source="remote")
+        assert _board_top(db, 1) == [(12, 99)]
+
+
+def test_concurrent_votes_and_reads(session_factory) -> None:
+    errors: list[BaseException] = []
+
+    def voter(seed: int) -> None:
+        rng = random.Random(seed)
+        try:
+            with session_factory() as db:
+                for _ in range(40):
+                    crud_song.add_votes(db, {rng.randint(1, 30): rng.randint(1, 3)})
+        except BaseException as exc:  # pragma: no cover - remonté par l'assertion
+            errors.append(exc)
+
+    def reader() -> None:
+        try:
+            with session_factory() as db:
+                for index in range(100):
+                    top = leaderboard.top_songs(db, 10)
+                    assert [entry.votes for entry in top] == sorted(
+                        (entry.votes for entry in top), reverse=True
+                    )
+                    if index % 25 == 0:
+                        leaderboard.get_leaderboard(db).invalidate()
+        except BaseException as exc:  # pragma: no cover - remonté par l'assertion
+            errors.append(exc)
+
+    threads = [threading.Thread(target=voter, args=(seed,)) for seed in range(4)]
+    threads += [threading.Thread(target=reader) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    with session_factory() as db:
+        assert _board_top(db, 10) == _db_top(db, 10)
+
+
+def test_top_endpoint(session_factory, client) -> None:
+    with session_factory() as db:
+        crud_song.add_votes(db, {3: 10, 4: 5})
+
+    response = client.get("/songs/top", params={"k": 2})
+    too_many = client.get("/songs/top", params={"k": leaderboard.MAX_K + 1})
+
+    assert response.status_code == 200
+    assert [(song["id"], song["votes"]) for song in response.json()] == [(3, 11), (4, 6)]
+    assert set(response.json()[0]) == {"id", "title", "artist", "link", "thumbnail", "comment", "votes"}
+    assert too_many.status_code == 422
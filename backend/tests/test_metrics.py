@@ -0,0 +1,127 @@
+import os
+import sys
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.routing import Mount, Route
+
+from app.main import app
+from app.services.auth import issue_admin_token
+from app.utils import metrics
+from app.utils.metrics import MetricsRegistry
+
+
+def _admin_headers() -> dict[str, str]:
+    token = issue_admin_token(subject="admin-1", name="Admin", provider="password")
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_registry_renders_prometheus_text() -> None:
+    registry = MetricsRegistry()
+    counter = registry.counter("jobs_total", "Jobs.", ("kind",))
+    histogram = registry.histogram("job_seconds", "Job duration.", buckets=(0.1, 1.0))
+
+    counter.inc(("import",))
+    counter.inc(("import",), 2)
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+    histogram.observe(3.0)
+
+    rendered = registry.render()
+
+    assert "# TYPE jobs_total counter" in rendered
+    assert 'jobs_total{kind="import"} 3' in rendered
+    assert "# TYPE job_seconds histogram" in rendered
+    assert 'job_seconds_bucket{le="0.1"} 1' in rendered
+    assert 'job_seconds_bucket{le="1"} 2' in rendered
+    assert 'job_seconds_bucket{le="+Inf"} 3' in rendered
+    assert "job_seconds_count 3" in rendered
+
+
+def test_label_values_are_escaped() -> None:
+    registry = MetricsRegistry()
+    registry.counter("odd_total", "Odd labels.", ("path",)).inc(('a"b\\c',))
+
+    assert 'odd_total{path="a\\"b\\\\c"} 1' in registry.render()
+
+
+def test_metrics_endpoint_requires_admin() -> None:
+    with TestClient(app) as client:
+        response = client.get("/metrics")
+
+    assert response.status_code == 401
+
+
+def test_metrics_endpoint_reports_route_latency_and_db_time() -> None:
+    with TestClient(app) as client:
+        client.get("/health")
+        client.get("/songs/")
+        response = client.get("/metrics", headers=_admin_headers())
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'http_request_duration_seconds_count{method="GET",route="/health",status="200"}' in body
+    assert "http_requests_in_flight 0" in body or "http_requests_in_flight 1" in body
+    assert 'http_response_size_bytes_count{method="GET",route="/songs/",status="200"}' in body
+    assert 'db_pool_checkouts_total{pool="primary"}' in body
+    assert metrics.HTTP_STATS.db_statements(("GET", "/songs/", "200")) >= 1
+
+
+def test_route_label_uses_templates_for_path_parameters() -> None:
+    route = Route("/songs/{song_id:int}/vote", endpoint=lambda request: None)
+    scope = {"route": route, "path": "/songs/42/vote", "path_params": {"song_id": 42}}
+    assert metrics.route_label(scope) == "/songs/{song_id}/vote"
+
+    # La valeur du paramètre apparaît ailleurs dans l'URL : le gabarit ne change pas.
+    scope = {"route": route, "path": "/songs/1/vote", "path_params": {"song_id": 1}}
+    assert metrics.route_label(scope) == "/songs/{song_id}/vote"
+
+    mounted = {"route": Mount("/assets", app=lambda scope, receive, send: None), "path": "/assets/js/app.js"}
+    assert metrics.route_label(mounted) == "/assets/{path}"
+
+    assert metrics.route_label({"path": "/nope"}) == "unmatched"
+    assert metrics.route_label({"route": object(), "path": "/nope"}) == "unmatched"
+
+
+def test_requests_are_labelled_by_route_template() -> None:
+    with TestClient(app) as client:
+        client.get("/channels/alice/songs/")
+        client.get("/channels/bob/songs/")
+        client.get("/nope/123")
+        client.get("/nope/456")
+        body = client.get("/metrics", headers=_admin_headers()).text
+
+    assert 'route="/channels/{channel}/songs/"' in body
+    assert 'route="unmatched",status="404"' in body
+    assert "alice" not in body and "/nope/" not in body
+
+
+def test_track_outbound_records_outcome() -> None:
+    before_ok = metrics.OUTBOUND_HTTP_DURATION.count(("test_provider", "ok"))
+    before_error = metrics.OUTBOUND_HTTP_DURATION.count(("test_provider", "error"))
+
+    with metrics.track_outbound("test_provider"):
+        pass
+    with pytest.raises(RuntimeError):
+        with metrics.track_outbound("test_provider"):
+            raise RuntimeError("boom")
+
+    assert metrics.OUTBOUND_HTTP_DURATION.count(("test_provider", "ok")) == before_ok + 1
+    assert metrics.OUTBOUND_HTTP_DURATION.count(("test_provider", "error")) == before_error + 1
+
+
+def test_cache_hit_ratio_is_exported() -> None:
+    metrics.record_cache_access("test_cache", hit=True)
+    metrics.record_cache_access("test_cache", hit=True)
+    metrics.record_cache_access("test_cache", hit=True)
+    metrics.record_cache_access("test_cache", hit=False)
+
+    assert 'cache_hit_ratio{cache="test_cache"} 0.75' in metrics.REGISTRY.render()
@@ -0,0 +1,136 @@
+import os
+import sys
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+import pytest
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.orm import sessionmaker
+
+from app.database import migrations
+from app.database.migrations import LATEST_VERSION, MIGRATIONS, create_index_sql, ensure_schema
+from app.models.song import Song
+
+# Schéma tel que créé par les premières versions de neon_schema.sql.
+LEGACY_SCHEMA = (
+    "CREATE TABLE songs (id INTEGER PRIMARY KEY, title TEXT, artist TEXT, link TEXT UNIQUE, "
+    "thumbnail TEXT, votes INTEGER DEFAULT 1)",
+    "CREATE INDEX idx_songs_link ON songs (link)",
+    "CREATE TABLE ban_rules (id INTEGER PRIMARY KEY, title TEXT, artist TEXT, link TEXT)",
+    "INSERT INTO songs (title, artist, link, votes) VALUES ('Zombie', 'The Cranberries', 'https://youtu.be/z', 4)",
+    "INSERT INTO ban_rules (artist) VALUES ('Nickelback')",
+    "INSERT INTO ban_rules (link) VALUES (' https://youtu.be/abc?t=3 ')",
+    "INSERT INTO ban_rules (link) VALUES ('https://example.com/song ')",
+)
+
+
+@pytest.fixture()
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrations.sqlite'}", future=True)
+    yield engine
+    engine.dispose()
+
+
+def _statements(engine):
+    executed = []
+    event.listen(engine, "before_cursor_execute", lambda *args: executed.append(args[2]))
+    return executed
+
+
+def _index_columns(engine, table):
+    return {tuple(index["column_names"]) for index in inspect(engine).get_indexes(table)}
+
+
+def test_fresh_database_is_created_then_boot_skips_reflection(engine):
+    result = ensure_schema(engine)
+
+    assert result.from_version == 0
+    assert result.to_version == LATEST_VERSION
+    assert result.applied == [migration.name for migration in MIGRATIONS]
+    assert {"songs", "ban_rules", "channels", "vote_events", "schema_version"} <= set(
+        inspect(engine).get_table_names()
+    )
+
+    executed = _statements(engine)
+    again = ensure_schema(engine)
+
+    assert again.applied == []
+    assert again.to_version == LATEST_VERSION
+    assert executed == ["SELECT MAX(version) FROM schema_version"]
+
+
+def test_legacy_database_is_upgraded_in_place(engine):
+    with engine.begin() as connection:
+        for statement in LEGACY_SCHEMA:
+            connection.execute(text(statement))
+
+    result = ensure_schema(engine)
+    assert result.to_version == LATEST_VERSION
+
+    columns = {column["name"] for column in inspect(engine).get_columns("songs")}
+    assert {"comment", "trend_score", "trend_updated_at", "channel_id"} <= columns
+    assert ("channel_id", "votes") in _index_columns(engine, "songs")
+    assert ("channel_id",) in _index_columns(engine, "ban_rules")
+
+    session = sessionmaker(bind=engine)()
+    try:
+        song = session.query(Song).one()
+        assert (song.title, song.votes, song.channel_id, song.comment) == ("Zombie", 4, 1, None)
+        session.add(Song(title="Linger", artist="The Cranberries", link="https://youtu.be/l", comment="gg"))
+        session.commit()
+    finally:
+        session.close()
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT channel_id FROM ban_rules")).scalar() == 1
+        assert connection.execute(text("SELECT login FROM channels WHERE id = 1")).scalar() == "default"
+        links = connection.execute(text("SELECT link FROM ban_rules WHERE link IS NOT NULL ORDER BY id"))
+        assert links.scalars().all() == [
+            "https://www.youtube.com/watch?v=abc",
+            "https://example.com/song",
+        ]
+
+
+def test_only_pending_migrations_are_applied(engine):
+    ensure_schema(engine, MIGRATIONS[:3])
+    with engine.connect() as connection:
+        assert migrations.current_version(connection) == 3
+
+    result = ensure_schema(engine)
+
+    assert result.from_version == 3
+    assert result.applied == [migration.name for migration in MIGRATIONS[3:]]
+
+
+def test_index_migration_runs_online_on_postgresql():
+    index_migration = next(m for m in MIGRATIONS if m.name == "channel_indexes")
+
+    assert not index_migration.transactional
+    assert create_index_sql("postgresql", "ix_songs_channel_votes", "songs", ("channel_id", "votes")) == (
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_songs_channel_votes ON songs (channel_id, votes)"
+    )
+    assert create_index_sql("sqlite", "uq", "songs", ("channel_id", "link"), unique=True) == (
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq ON songs (channel_id, link)"
+    )
+
+
+def test_postgresql_lock_is_scoped_to_a_transaction(engine, monkeypatch):
+    # Verrou de session impossible à travers PgBouncer : il doit tenir dans une transaction.
+    calls = []
+
+    @event.listens_for(engine, "connect")
+    def register(dbapi_connection, record):  # noqa: ANN001
+        dbapi_connection.create_function("pg_advisory_xact_lock", 1, lambda key: calls.append("lock"))
+
+    event.listen(engine, "begin", lambda connection: calls.append("begin"))
+    event.listen(engine, "commit", lambda connection: calls.append("commit"))
+    monkeypatch.setattr(engine.dialect, "name", "postgresql")
+
+    with migrations._migration_lock(engine):
+        calls.append("migrate")
+
+    assert calls == ["begin", "lock", "migrate", "commit"]
@@ -0,0 +1,105 @@
+import os
+import sys
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.crud import ban_rule as ban_crud
+from app.crud import song as song_crud
+from app.schemas.ban_rule import BanRuleCreate
+from app.schemas.song import SongCreate
+from app.utils.query_profiler import (
+    QueryBudgetExceeded,
+    fingerprint,
+    install_query_profiler,
+    profile_queries,
+)
+
+
+def _song(suffix: str, title: str = "Song") -> SongCreate:
+    return SongCreate(title=title, artist="Artist", link=f"https://example.com/{suffix}")
+
+
+def test_fingerprint_strips_literals_and_in_lists() -> None:
+    assert fingerprint("SELECT * FROM songs WHERE id IN (?, ?, ?)  AND title = 'x'") == (
+        "SELECT * FROM songs WHERE id IN (...) AND title = ?"
+    )
+    assert fingerprint("SELECT 1 LIMIT 10") == "SELECT ? LIMIT ?"
+
+
+def test_profile_flags_repeated_statements(session: Session) -> None:
+    install_query_profiler(session.get_bind())
+
+    with profile_queries("boucle") as profile:
+        for song_id in range(4):
+            session.execute(text("SELECT votes FROM songs WHERE id = :id"), {"id": song_id})
+        session.execute(text("SELECT votes FROM songs WHERE id = :id"), {"id": 1})
+
+    assert profile.count == 5
+    assert profile.repeated_fingerprints() == {"SELECT votes FROM songs WHERE id = ?": 5}
+    assert profile.identical_statements() == {"SELECT votes FROM songs WHERE id = ?": 2}
+
+
+def test_statements_outside_profile_are_ignored(session: Session) -> None:
+    install_query_profiler(session.get_bind())
+    session.execute(text("SELECT 1"))
+
+    with profile_queries() as profile:
+        pass
+
+    assert profile.count == 0
+
+
+def test_query_budget_fails_when_exceeded(session: Session, query_budget) -> None:
+    with pytest.raises(QueryBudgetExceeded):
+        with query_budget(session, 1):
+            session.execute(text("SELECT 1"))
+            session.execute(text("SELECT 2"))
+
+
+# Chaque voix ajoute une ligne au journal vote_events (classement « tendance »).
+def test_add_or_increment_song_query_budget(session: Session, query_budget) -> None:
+    with query_budget(session, 6, "nouvelle chanson"):
+        song_crud.add_or_increment_song(session, _song("new"))
+
+    with query_budget(session, 4, "doublon par lien"):
+        song_crud.add_or_increment_song(session, _song("new"))
+
+    with query_budget(session, 5, "doublon par titre"):
+        song_crud.add_or_increment_song(session, _song("other-link"))
+
+
+def test_increment_vote_query_budget(session: Session, query_budget) -> None:
+    created = song_crud.add_or_increment_song(session, _song("vote"))
+
+    with query_budget(session, 4, "vote"):
+        song_crud.increment_vote(session, created.id)
+
+
+def test_add_ban_rule_query_budget(session: Session, query_budget) -> None:
+    for index in range(20):
+        song_crud.add_or_increment_song(session, _song(str(index), title=f"Song {index}"))
+
+    with query_budget(session, 4, "règle titre") as profile:
+        ban_crud.add_ban_rule(session, BanRuleCreate(title="Song 1"))
+    assert not profile.repeated_fingerprints()
+
+    with query_budget(session, 3, "règle lien"):
+        ban_crud.add_ban_rule(session, BanRuleCreate(link="https://example.com/2"))
+
+
+def test_is_banned_uses_snapshot_without_queries(session: Session, query_budget) -> None:
+    ban_crud.add_ban_rule(session, BanRuleCreate(link="https://example.com/banned"))
+    ban_crud.is_banned(session, "Warm", "Up", None)
+
+    with query_budget(session, 0, "vérification de bannissement"):
+        assert ban_crud.is_banned(session, "Song", "Artist", "https://example.com/ok") is False
+        assert ban_crud.is_banned(session, "Song", "Artist", "https://example.com/banned") is True
@@ -0,0 +1,128 @@
+import os
+import sys
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.routes import public_submissions
+from app.main import app
+from app.schemas.song import SongCreate
+from app.services.rate_limit import (
+    RATE_LIMIT_DETAIL,
+    MemoryRateLimitStorage,
+    SQLiteRateLimitStorage,
+    create_storage,
+    forwarded_address,
+    parse_rate,
+)
+
+
+def test_parse_rate() -> None:
+    assert parse_rate("10/minute") == (10, 60.0)
+    assert parse_rate("5/30 seconds") == (5, 30.0)
+    with pytest.raises(ValueError):
+        parse_rate("dix par minute")
+
+
+def test_forwarded_address_skips_trusted_proxies() -> None:
+    assert forwarded_address("10.0.0.9", ["1.1.1.1"], 0) == "10.0.0.9"
+    assert forwarded_address("10.0.0.9", ["6.6.6.6, 1.1.1.1"], 1) == "1.1.1.1"
+    assert forwarded_address("10.0.0.9", ["6.6.6.6", "1.1.1.1, 10.0.0.8"], 2) == "1.1.1.1"
+    # Sans en-tête (accès direct malgré la configuration) : l'interlocuteur.
+    assert forwarded_address("10.0.0.9", [], 1) == "10.0.0.9"
+
+
+def test_gcra_allows_burst_then_one_request_per_interval() -> None:
+    storage = MemoryRateLimitStorage()
+
+    results = [storage.hit("ip", 10, 60.0, now=0.0) for _ in range(11)]
+    assert all(result.allowed for result in results[:10])
+    assert results[9].remaining == 0
+    assert not results[10].allowed
+    assert results[10].retry_after == pytest.approx(6.0)
+
+    assert not storage.hit("ip", 10, 60.0, now=5.9).allowed
+    assert storage.hit("ip", 10, 60.0, now=6.0).allowed
+    assert storage.hit("other", 10, 60.0, now=6.0).remaining == 9
+
+
+def test_sqlite_storage_is_shared_between_workers(tmp_path) -> None:
+    path = tmp_path / "limits.db"
+    worker_a = SQLiteRateLimitStorage(path, flush_interval=0)
+    worker_b = SQLiteRateLimitStorage(path, flush_interval=0)
+
+    for _ in range(3):
+        assert worker_a.hit("ip", 5, 60.0, now=0.0).allowed
+    assert worker_b.hit("ip", 5, 60.0, now=1.0).allowed
+    assert worker_b.hit("ip", 5, 60.0, now=1.0).allowed
+    assert not worker_a.hit("ip", 5, 60.0, now=2.0).allowed
+
+
+def test_sqlite_storage_batches_writes(tmp_path) -> None:
+    path = tmp_path / "limits.db"
+    worker_a = SQLiteRateLimitStorage(path, flush_interval=10.0)
+    worker_b = SQLiteRateLimitStorage(path, flush_interval=0)
+
+    worker_a.hit("ip", 5, 60.0, now=0.0)
+    for _ in range(3):
+        assert worker_a.hit("ip", 5, 60.0, now=1.0).allowed
+    # Les incréments de A sont encore en attente : B ne les voit pas.
+    assert worker_b.hit("ip", 5, 60.0, now=1.0).remaining == 4
+
+    # Après synchronisation, chacun voit les 5 requêtes acceptées au total.
+    assert not worker_a.hit("ip", 5, 60.0, now=11.0).allowed
+    assert not worker_b.hit("ip", 5, 60.0, now=11.0).allowed
+
+
+def test_sqlite_storage_slides_previous_window(tmp_path) -> None:
+    storage = SQLiteRateLimitStorage(tmp_path / "limits.db", flush_interval=0)
+
+    for _ in range(10):
+        assert storage.hit("ip", 10, 60.0, now=50.0).allowed
+    # Début de la fenêtre suivante : la précédente pèse encore presque entièrement.
+    blocked = storage.hit("ip", 10, 60.0, now=61.0)
+    assert not blocked.allowed
+    assert 0 < blocked.retry_after <= 59.0
+    assert storage.hit("ip", 10, 60.0, now=61.0 + blocked.retry_after + 0.01).allowed
+
+
+def test_create_storage_rejects_unknown_backend(tmp_path) -> None:
+    assert isinstance(create_storage("memory"), MemoryRateLimitStorage)
+    assert isinstance(create_storage(f"sqlite:///{tmp_path / 'x.db'}"), SQLiteRateLimitStorage)
+    with pytest.raises(ValueError):
+        create_storage("redis://localhost")
+
+
+def test_public_submission_returns_429_after_limit(monkeypatch) -> None:
+    def fake_metadata(link: str) -> SongCreate:
+        return SongCreate(title="Limite", artist="Artiste", link=link)
+
+    monkeypatch.setattr(public_submissions, "fetch_song_metadata", fake_metadata)
+    public_submissions.limiter.reset()
+
+    try:
+        with TestClient(app) as client:
+            statuses = [
+                client.post(
+                    "/public/submissions/",
+                    json={"link": f"https://youtu.be/rate-limit-{index}"},
+                ).status_code
+                for index in range(10)
+            ]
+            blocked = client.post(
+                "/public/submissions/", json={"link": "https://youtu.be/rate-limit-x"}
+            )
+    finally:
+        public_submissions.limiter.reset()
+
+    assert 429 not in statuses
+    assert blocked.status_code == 429
+    assert blocked.json() == {"detail": RATE_LIMIT_DETAIL}
+    assert int(blocked.headers["retry-after"]) >= 1
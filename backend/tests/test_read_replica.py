@@ -0,0 +1,105 @@
+import os
+import sys
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import connection
+from app.database.connection import Base
+from app.main import app
+from app.models.song import Song
+from app.services.auth import issue_admin_token
+from app.utils.read_your_writes import READ_AFTER_HEADER, issue_token, token_is_valid
+
+
+@pytest.fixture()
+def replicated(tmp_path, monkeypatch):
+    primary_engine = create_engine(f"sqlite:///{tmp_path / 'primary.sqlite'}", future=True)
+    replica_engine = create_engine(f"sqlite:///{tmp_path / 'replica.sqlite'}", future=True)
+    for bound in (primary_engine, replica_engine):
+        Base.metadata.create_all(bind=bound)
+
+    primary = sessionmaker(autocommit=False, autoflush=False, bind=primary_engine)
+    replica = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+
+    # Le réplica « en retard » contient une chanson absente du primaire.
+    with replica() as db:
+        db.add(Song(title="Replica", artist="Lag", link="https://example.com/replica"))
+        db.commit()
+
+    monkeypatch.setattr(connection, "SessionLocal", primary)
+    monkeypatch.setattr(connection, "ReadSessionLocal", replica)
+    try:
+        yield primary, replica
+    finally:
+        primary_engine.dispose()
+        replica_engine.dispose()
+
+
+def _admin_headers() -> dict[str, str]:
+    token = issue_admin_token(subject="admin-1", name="Admin", provider="password")
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _list_links(client: TestClient, token: str | None = None) -> set[str]:
+    response = client.get("/songs/", headers={READ_AFTER_HEADER: token} if token else {})
+    assert response.status_code == 200
+    return {song["link"] for song in response.json()}
+
+
+def test_reads_use_replica_when_client_did_not_write(replicated) -> None:
+    with TestClient(app) as client:
+        assert _list_links(client) == {"https://example.com/replica"}
+
+
+def test_client_reads_its_own_writes_from_primary(replicated) -> None:
+    with TestClient(app) as client:
+        response = client.post(
+            "/songs/",
+            json={"title": "Fresh", "artist": "Writer", "link": "https://example.com/fresh"},
+            headers=_admin_headers(),
+        )
+        assert response.status_code == 200
+        token = response.headers[READ_AFTER_HEADER]
+
+        assert _list_links(client, token) == {"https://example.com/fresh"}
+        # Un autre viewer derrière le même proxy, sans jeton : réplica.
+        assert _list_links(client) == {"https://example.com/replica"}
+
+
+def test_pin_expires_after_lag_tolerance(replicated, monkeypatch) -> None:
+    monkeypatch.setattr(connection, "READ_REPLICA_MAX_LAG_SECONDS", 0.0)
+
+    with TestClient(app) as client:
+        response = client.post(
+            "/songs/",
+            json={"title": "Fresh", "artist": "Writer", "link": "https://example.com/fresh"},
+            headers=_admin_headers(),
+        )
+        assert response.status_code == 200
+
+        assert READ_AFTER_HEADER not in response.headers
+        assert _list_links(client) == {"https://example.com/replica"}
+
+
+def test_read_after_token_is_signed_and_expires(replicated) -> None:
+    token = issue_token("secret", 2.0, now=1000.0)
+    expiry, _, signature = token.partition(".")
+
+    assert token_is_valid(token, "secret", now=1001.0) is True
+    assert token_is_valid(token, "secret", now=1002.5) is False
+    assert token_is_valid(token, "other", now=1001.0) is False
+    assert token_is_valid(f"{int(expiry) + 60_000}.{signature}", "secret", now=1001.0) is False
+    assert token_is_valid("garbage", "secret") is False
+
+    with TestClient(app) as client:
+        assert _list_links(client, "99999999999999.forged") == {"https://example.com/replica"}
@@ -0,0 +1,129 @@
+import os
+import sys
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from app.api.routes import songs as song_routes
+from app.models.ban_rule import BanRule
+from app.models.song import Song
+from app.schemas.song import SONG_BATCH_MAX_ITEMS, SongCreate
+from app.services.auth import issue_admin_token
+from app.services.song_metadata import MetadataError
+
+
+@pytest.fixture()
+def engine(engine):
+    with sessionmaker(bind=engine)() as db:
+        db.add_all(
+            [
+                Song(title="Déjà là", artist="Quelqu'un", link="https://www.youtube.com/watch?v=old", votes=2),
+                BanRule(link="https://www.youtube.com/watch?v=banned"),
+                BanRule(artist="Nickelback"),
+            ]
+        )
+        db.commit()
+    return engine
+
+
+@pytest.fixture(autouse=True)
+def fetched(monkeypatch):
+    calls: list[str] = []
+
+    def metadata(link: str) -> SongCreate:
+        calls.append(link)
+        if link.endswith("broken"):
+            raise MetadataError("indisponible")
+        key = link.rsplit("=", 1)[-1]
+        return SongCreate(title=f"Titre {key}", artist=f"Artiste {key}", link=link)
+
+    monkeypatch.setattr(song_routes, "fetch_song_metadata", metadata)
+    return calls
+
+
+def _admin_headers() -> dict[str, str]:
+    token = issue_admin_token(subject="admin-1", name="Admin", provider="password")
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_batch_returns_one_result_per_item(client, engine, fetched):
+    commits = []
+    event.listen(engine, "commit", lambda connection: commits.append(connection))
+
+    response = client.post(
+        "/songs/batch",
+        headers=_admin_headers(),
+        json={
+            "items": [
+                "https://youtu.be/new",
+                "https://www.youtube.com/watch?v=new&t=42",
+                "https://youtu.be/old",
+                "https://youtu.be/banned",
+                "https://example.com/pas-un-morceau",
+                "https://youtu.be/broken",
+                {"title": "Live", "artist": "Groupe", "link": "https://vimeo.com/123", "comment": "gg"},
+                {"title": "Photograph", "artist": "Nickelback", "link": "https://youtu.be/nb"},
+            ]
+        },
+    )
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert [(item["index"], item["status"]) for item in payload["results"]] == [
+        (0, "added"),
+        (1, "duplicate"),
+        (2, "added"),
+        (3, "banned"),
+        (4, "invalid"),
+        (5, "metadata_error"),
+        (6, "added"),
+        (7, "banned"),
+    ]
+    assert payload["counts"] == {
+        "added": 3,
+        "duplicate": 1,
+        "banned": 2,
+        "invalid": 1,
+        "metadata_error": 1,
+    }
+    results = payload["results"]
+    assert results[0]["song"]["votes"] == 2
+    assert results[1]["song"]["id"] == results[0]["song"]["id"]
+    assert results[2]["song"]["votes"] == 3
+    assert results[6]["song"]["comment"] == "gg"
+    assert results[6]["link"] == "https://vimeo.com/123"
+    # Un appel oEmbed par lien nouveau, jamais pour les entrées complètes.
+    assert sorted(fetched) == [
+        "https://www.youtube.com/watch?v=broken",
+        "https://www.youtube.com/watch?v=new",
+    ]
+    assert len(commits) == 1
+
+    with sessionmaker(bind=engine)() as check:
+        votes = {song.link: song.votes for song in check.query(Song)}
+    assert votes == {
+        "https://www.youtube.com/watch?v=old": 3,
+        "https://www.youtube.com/watch?v=new": 2,
+        "https://vimeo.com/123": 1,
+    }
+
+
+def test_batch_requires_admin(client):
+    response = client.post("/songs/batch", json={"items": ["https://youtu.be/new"]})
+
+    assert response.status_code in (401, 403)
+
+
+def test_batch_size_is_bounded(client):
+    too_many = [f"https://youtu.be/v{index}" for index in range(SONG_BATCH_MAX_ITEMS + 1)]
+
+    assert client.post("/songs/batch", headers=_admin_headers(), json={"items": too_many}).status_code == 422
+    assert client.post("/songs/batch", headers=_admin_headers(), json={"items": []}).status_code == 422
@@ -0,0 +1,137 @@
+import csv
+import gzip
+import io
+import json
+import os
+import sys
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.routes import songs as song_routes
+from app.crud import song as crud_song
+from app.main import app
+from app.models.song import Song
+from app.services import song_io
+from app.services.auth import issue_admin_token
+
+
+@pytest.fixture()
+def session_factory(session_factory):
+    with session_factory() as db:
+        db.add_all(
+            [
+                Song(title="Zombie", artist="The Cranberries", link="https://youtu.be/z", votes=3),
+                Song(
+                    title='Dit "bonjour", à tous',
+                    artist="Aya",
+                    link="https://youtu.be/a",
+                    comment="ligne 1\nligne 2",
+                    votes=7,
+                ),
+                Song(title="Autre chaîne", artist="X", link="https://youtu.be/z", channel_id=2, votes=9),
+            ]
+        )
+        db.commit()
+    return session_factory
+
+
+@pytest.fixture()
+def client(session_factory, monkeypatch):
+    monkeypatch.setattr(song_routes, "open_read_session", session_factory)
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def _admin_headers() -> dict[str, str]:
+    token = issue_admin_token(subject="admin-1", name="Admin", provider="password")
+    return {"Authorization": f"Bearer {token}"}
+
+
+EXPECTED = [
+    {
+        "id": 2,
+        "title": 'Dit "bonjour", à tous',
+        "artist": "Aya",
+        "link": "https://youtu.be/a",
+        "thumbnail": None,
+        "comment": "ligne 1\nligne 2",
+        "votes": 7,
+    },
+    {
+        "id": 1,
+        "title": "Zombie",
+        "artist": "The Cranberries",
+        "link": "https://youtu.be/z",
+        "thumbnail": None,
+        "comment": None,
+        "votes": 3,
+    },
+]
+
+
+def test_export_streams_ndjson_by_votes(client) -> None:
+    response = client.get("/songs/export", headers=_admin_headers())
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert 'filename="songs.ndjson"' in response.headers["content-disposition"]
+    assert [json.loads(line) for line in response.text.splitlines()] == EXPECTED
+
+
+def test_export_csv_quotes_special_characters(client) -> None:
+    response = client.get("/songs/export", params={"format": "csv"}, headers=_admin_headers())
+
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["title"] for row in rows] == [song["title"] for song in EXPECTED]
+    assert rows[0]["comment"] == "ligne 1\nligne 2"
+    assert rows[1]["comment"] == "" and rows[1]["votes"] == "3"
+
+
+def test_export_csv_neutralizes_formulas() -> None:
+    rows = [(1, "=HYPERLINK(\"x\")", "@Aya", "https://youtu.be/f", None, "\tnote", -2)]
+
+    exported = b"".join(song_io.iter_csv(rows)).decode("utf-8")
+
+    row = next(csv.DictReader(io.StringIO(exported)))
+    assert row["title"] == "'=HYPERLINK(\"x\")"
+    assert row["artist"] == "'@Aya"
+    assert row["comment"] == "'\tnote"
+    assert row["link"] == "https://youtu.be/f" and row["votes"] == "-2"
+
+
+def test_export_gzip_matches_plain_output(client) -> None:
+    plain = client.get("/songs/export", headers=_admin_headers())
+    compressed = client.get("/songs/export", params={"gzip": "true"}, headers=_admin_headers())
+
+    assert compressed.headers["content-type"] == "application/gzip"
+    assert 'filename="songs.ndjson.gz"' in compressed.headers["content-disposition"]
+    assert gzip.decompress(compressed.content) == plain.content
+
+
+def test_export_requires_admin(client) -> None:
+    assert client.get("/songs/export").status_code == 401
+
+
+def test_export_chunks_large_lists(session_factory, monkeypatch) -> None:
+    monkeypatch.setattr(song_io, "ROWS_PER_CHUNK", 2)
+    monkeypatch.setattr(song_io, "GZIP_FLUSH_BYTES", 1)
+    with session_factory() as db:
+        db.add_all(Song(title=f"S{index}", artist="A", link=f"https://youtu.be/{index}") for index in range(7))
+        db.commit()
+        rows = crud_song.iter_song_rows(db, chunk_size=3)
+        chunks = list(song_io.iter_ndjson(rows))
+
+    assert len(chunks) == 5
+    assert sum(chunk.count(b"\n") for chunk in chunks) == 9
+    compressed = list(song_io.iter_gzip(iter(chunks)))
+    assert len(compressed) > 1
+    assert gzip.decompress(b"".join(compressed)) == b"".join(chunks)
@@ -72,31 +72,26 @@ def test_build_song_prefers_overrides():
 
 
 
-def test_fetch_song_metadata_spotify_uses_open_client(monkeypatch):
+def test_fetch_song_metadata_spotify_uses_shared_client(monkeypatch):
     class DummyClient:
-        last_instance = None
-
-        def __init__(self, *args, **kwargs):  # pylint: disable=unused-argument
+        def __init__(self):
             self.closed = False
-            DummyClient.last_instance = self
-
-        def __enter__(self):
-            return self
 
-        def __exit__(self, exc_type, exc, tb):  # pragma: no cover - nothing special to do
-            del exc_type, exc, tb
+        def close(self):  # pragma: no cover - le client partagé n'est pas fermé ici
             self.closed = True
 
+    shared = DummyClient()
+
     def fake_fetch(client, endpoint, url):  # pylint: disable=unused-argument
-        assert isinstance(client, DummyClient)
+        assert client is shared
         return {"title": "Fallback", "thumbnail_url": None}
 
     def fake_enrich(client, result, link):  # pylint: disable=unused-argument
-        assert isinstance(client, DummyClient)
+        assert client is shared
         assert not client.closed, "Client should still be open when enriching"
         return "Parsed Title", "Parsed Artist"
 
-    monkeypatch.setattr(song_metadata.httpx, "Client", DummyClient)
+    monkeypatch.setattr(song_metadata, "get_http_client", lambda: shared)
     monkeypatch.setattr(song_metadata, "_fetch_oembed", fake_fetch)
     monkeypatch.setattr(song_metadata, "_enrich_spotify_metadata", fake_enrich)
 
@@ -104,6 +99,5 @@ def test_fetch_song_metadata_spotify_uses_open_client(monkeypatch):
 
     assert created.title == "Parsed Title"
     assert created.artist == "Parsed Artist"
-    assert DummyClient.last_instance is not None
-    assert DummyClient.last_instance.closed
+    assert not shared.closed, "Shared client must stay open for the next requests"
 
@@ -217,3 +217,41 @@ def test_root_redirect_uses_cors_origin_when_no_submit_redirect():
         app.state.frontend_submit_redirect = original_redirect
         app.state.frontend_cors_origins = original_cors
 
+
+
+def test_index_supports_conditional_requests(tmp_path):
+    with configured_frontend(tmp_path):
+        with TestClient(app) as client:
+            first = client.get("/submit")
+            by_etag = client.get("/admin", headers={"If-None-Match": first.headers["etag"]})
+            by_date = client.get(
+                "/login", headers={"If-Modified-Since": first.headers["last-modified"]}
+            )
+            stale = client.get("/submit", headers={"If-None-Match": '"autre-build"'})
+
+    assert first.headers["cache-control"] == "no-cache"
+    assert by_etag.status_code == 304
+    assert by_etag.content == b""
+    assert by_etag.headers["etag"] == first.headers["etag"]
+    assert by_date.status_code == 304
+    assert stale.status_code == 200
+    assert "SPA ok" in stale.text
+
+
+def test_index_is_reloaded_when_build_changes(tmp_path):
+    with configured_frontend(tmp_path, content="<html><body>Build 1</body></html>"):
+        with TestClient(app) as client:
+            app.state.frontend_index.revalidate_seconds = 0
+            first = client.get("/submit")
+
+            index_file = tmp_path / "index.html"
+            index_file.write_text("<html><body>Build 2, plus long</body></html>", encoding="utf-8")
+            second = client.get("/submit")
+
+            index_file.unlink()
+            third = client.get("/submit", follow_redirects=False)
+
+    assert "Build 1" in first.text
+    assert "Build 2" in second.text
+    assert second.headers["etag"] != first.headers["etag"]
+    assert third.status_code == 503
@@ -0,0 +1,60 @@
+import random
+import re
+import sys
+import unicodedata
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from app.utils.text import normalize, normalize_many
+
+
+def _reference_normalize(text: str) -> str:
+    if not text:
+        return ""
+
+    decomposed = unicodedata.normalize("NFKD", text)
+    ascii_only = decomposed.encode("ASCII", "ignore").decode("utf-8")
+    lowered = ascii_only.lower()
+    return re.sub(r"[^a-z0-9]", "", lowered)
+
+
+SAMPLES = [
+    "",
+    "Never Gonna Give You Up (Official Video)",
+    "Beyoncé — Déjà Vu",
+    "ＡＢＣ１２３ fullwidth",
+    "ﬁnal ﬂight ligatures",
+    "Ⅻ ① ² ½",
+    "Straße Œuvre Æon Ø",
+    "İstanbul ĳ",
+    "坂本龍一 - 戦場のメリークリスマス",
+    "Мумий Тролль",
+    "\t tabs\nnewlines\r\x00 control ",
+    "émoji 🎵🔥 mix",
+    "Artiste inconnu",
+]
+
+
+def test_normalize_matches_reference_on_samples() -> None:
+    for sample in SAMPLES:
+        assert normalize(sample) == _reference_normalize(sample), sample
+
+
+def test_normalize_matches_reference_on_random_strings() -> None:
+    rng = random.Random(2024)
+    ranges = [(0x20, 0x7F), (0xA0, 0x250), (0x300, 0x370), (0x2000, 0x2200), (0x3040, 0x30FF), (0xFF00, 0xFFEF)]
+    for _ in range(2000):
+        chars = []
+        for _ in range(rng.randint(0, 24)):
+            start, end = rng.choice(ranges)
+            chars.append(chr(rng.randrange(start, end)))
+        value = "".join(chars)
+        assert normalize(value) == _reference_normalize(value), repr(value)
+
+
+def test_normalize_many_matches_normalize() -> None:
+    values = SAMPLES + [None]
+    assert normalize_many(values) == [normalize(value or "") for value in values]
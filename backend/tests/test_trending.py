@@ -0,0 +1,172 @@
+import math
+import os
+import sys
+import time
+from datetime import timedelta
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+import pytest
+from sqlalchemy import func, select, text, update
+
+from app.crud import song as crud_song
+from app.models.song import Song
+from app.models.vote_event import VoteEvent
+from app.schemas.song import SongCreate
+from app.services import leaderboard, submissions, trending
+
+HOUR = 3600.0
+
+
+def _song(name: str) -> SongCreate:
+    return SongCreate(title=name, artist="Trend", link=f"https://youtu.be/{name}")
+
+
+def test_incremental_score_matches_direct_sum(session_factory) -> None:
+    rate = trending.decay_rate(60)
+    start = time.time() - 10 * HOUR
+    votes = [(start, 3), (start + 1.5 * HOUR, 1), (start + 4 * HOUR, 2), (start + 9 * HOUR, 1)]
+
+    with session_factory() as db:
+        db.add(Song(id=1, title="a", artist="b", link="x", trend_score=0.0))
+        db.commit()
+        first_at, first_weight = votes[0]
+        db.execute(update(Song).values(trend_score=trending.initial_score(first_weight, first_at, rate)))
+        for at, weight in votes[1:]:
+            db.execute(update(Song).values(trend_score=trending.bumped_score(weight, at, rate)))
+        db.commit()
+        stored = db.scalar(select(Song.trend_score))
+
+    now = start + 10 * HOUR
+    expected = sum(weight * math.exp(-rate * (now - at)) for at, weight in votes)
+    assert trending.decayed_score(stored, now, rate) == pytest.approx(expected, rel=1e-9)
+
+
+def test_old_score_underflow_is_clamped(session_factory) -> None:
+    with session_factory() as db:
+        # trend_score = 0 : une seule voix en janvier 2024, négligeable aujourd'hui.
+        db.add(Song(id=1, title="a", artist="b", link="x", trend_score=0.0))
+        db.commit()
+        now = time.time()
+        db.execute(update(Song).values(trend_score=trending.bumped_score(2, now)))
+        db.commit()
+        assert db.scalar(select(Song.trend_score)) == pytest.approx(trending.initial_score(2, now))
+
+
+def test_recent_votes_outrank_old_popular_song(session_factory) -> None:
+    with session_factory() as db:
+        old = crud_song.add_or_increment_song(db, _song("old"), votes=10)
+        # Les 10 voix datent de trois heures (trois demi-vies).
+        db.execute(
+            update(Song)
+            .where(Song.id == old.id)
+            .values(trend_score=trending.initial_score(10, time.time() - 3 * HOUR))
+        )
+        db.commit()
+        fresh = crud_song.add_or_increment_song(db, _song("fresh"))
+        crud_song.increment_vote(db, fresh.id)
+        crud_song.add_votes(db, {fresh.id: 1})
+
+        assert [song.title for song in crud_song.get_all_songs(db)] == ["old", "fresh"]
+        assert [song.title for song in crud_song.get_all_songs(db, sort="trending")] == ["fresh", "old"]
+        events = db.execute(
+            select(VoteEvent.song_id, func.sum(VoteEvent.votes)).group_by(VoteEvent.song_id)
+        ).all()
+        assert dict(events) == {old.id: 10, fresh.id: 3}
+
+
+def test_rebuild_recomputes_scores_from_event_log(session_factory) -> None:
+    with session_factory() as db:
+        song = crud_song.add_or_increment_song(db, _song("rebuild"))
+        crud_song.add_votes(db, {song.id: 4})
+        before = db.scalar(select(Song.trend_score))
+        db.execute(update(Song).values(trend_score=0.0))
+        db.commit()
+
+        assert trending.rebuild_trend_scores(db) == 1
+        assert db.scalar(select(Song.trend_score)) == pytest.approx(before, abs=1e-6)
+
+        # Demi-vie deux fois plus longue : le score « ramené à l'époque » change.
+        trending.rebuild_trend_scores(db, half_life_minutes=120)
+        assert db.scalar(select(Song.trend_score)) < before
+
+
+def test_half_life_change_is_detected_and_rebuilds_scores(session_factory) -> None:
+    with session_factory() as db:
+        kept = crud_song.add_or_increment_song(db, _song("kept"))
+        pruned = crud_song.add_or_increment_song(db, _song("pruned"))
+        db.execute(VoteEvent.__table__.delete().where(VoteEvent.song_id == pruned.id))
+        db.commit()
+        before = db.scalar(select(Song.trend_score).where(Song.id == kept.id))
+
+        # Premier démarrage : la demi-vie est enregistrée, rien n'est recalculé.
+        assert not trending.sync_trend_half_life(db, 60)
+        assert not trending.sync_trend_half_life(db, 60.0)
+        assert trending.sync_trend_half_life(db, 120)
+        assert not trending.sync_trend_half_life(db, 120)
+
+        scores = dict(db.execute(select(Song.id, Song.trend_score)).all())
+    assert scores[kept.id] == pytest.approx(before / 2, rel=1e-3)
+    # Plus d'évènement : l'ancien score ne se mélange pas à la nouvelle demi-vie.
+    assert scores[pruned.id] == 0.0
+
+
+def test_prune_vote_events_keeps_recent_events(session_factory) -> None:
+    now = time.time()
+    with session_factory() as db:
+        song = crud_song.add_or_increment_song(db, _song("prune"))
+        trending.record_votes(db, [(song.id, 3)], now=now - 10 * 24 * HOUR)
+        trending.record_votes(db, [(song.id, 2)], now=now - 3 * 24 * HOUR)
+        db.commit()
+
+        assert trending.prune_vote_events(db, timedelta(days=7)) == 1
+        assert trending.prune_vote_events(db, timedelta(days=7)) == 0
+        assert sorted(db.scalars(select(VoteEvent.votes))) == [1, 2]
+
+
+def test_repeat_submission_counts_like_a_vote(session_factory) -> None:
+    def metadata(link: str) -> SongCreate:
+        return SongCreate(title="Repeat", artist="Trend", link=link)
+
+    with session_factory() as db:
+        first = submissions.submit_link(db, "https://youtu.be/repeat", fetch_metadata=metadata)
+        score = db.scalar(select(Song.trend_score))
+        again = submissions.submit_link(
+            db, "https://www.youtube.com/watch?v=repeat", fetch_metadata=metadata
+        )
+
+        assert again.song.id == first.song.id
+        assert again.song.votes == 2
+        assert db.scalar(select(Song.trend_score)) > score
+        assert db.scalar(select(func.sum(VoteEvent.votes))) == 2
+        assert [(entry.id, entry.votes) for entry in leaderboard.top_songs(db, 5)] == [(first.song.id, 2)]
+
+
+def test_trending_listing_uses_score_index(session_factory) -> None:
+    with session_factory() as db:
+        plan = db.execute(
+            text(
+                "EXPLAIN QUERY PLAN SELECT * FROM songs "
+                "WHERE channel_id = 1 ORDER BY trend_score DESC"
+            )
+        ).all()
+    details = " ".join(row[-1] for row in plan)
+    assert "ix_songs_channel_trend_score" in details
+    assert "TEMP B-TREE" not in details
+
+
+def test_list_endpoint_accepts_sort_parameter(session_factory, client) -> None:
+    with session_factory() as db:
+        crud_song.add_or_increment_song(db, _song("api"))
+
+    trending_songs = client.get("/songs/", params={"sort": "trending"})
+    invalid = client.get("/songs/", params={"sort": "hasard"})
+
+    assert trending_songs.status_code == 200
+    assert [song["title"] for song in trending_songs.json()] == ["api"]
+    assert invalid.status_code == 422
@@ -0,0 +1,195 @@
+import asyncio
+import os
+import sys
+from collections import Counter
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+import pytest
+
+from app.crud import ban_rule as ban_crud
+from app.models.ban_rule import BanRule
+from app.schemas.ban_rule import BanRuleCreate
+from app.models.song import Song
+from app.schemas.song import SongCreate
+from app.services import submissions
+from app.services.song_metadata import MetadataError
+from app.services.twitch_chat import ChatMessage, TwitchChatIngestor, parse_privmsg
+from app.utils.links import canonicalize_link, extract_links
+from benchmarks.fake_irc import FakeIrcServer, recorded_chat
+
+
+def fake_metadata(link: str) -> SongCreate:
+    key = link.rsplit("/", 1)[-1].replace("watch?v=", "")
+    return SongCreate(title=f"Titre {key}", artist=f"Artiste {key}", link=link)
+
+
+@pytest.mark.parametrize(
+    ("raw", "expected"),
+    [
+        ("https://youtu.be/dQw4w9WgXcQ?t=3", "https://www.youtube.com/watch?v=dQw4w9WgXcQ"),
+        ("youtube.com/watch?v=dQw4w9WgXcQ&list=x", "https://www.youtube.com/watch?v=dQw4w9WgXcQ"),
+        ("https://m.youtube.com/shorts/abc_DEF-123", "https://www.youtube.com/watch?v=abc_DEF-123"),
+        ("https://music.youtube.com/watch?v=xyz", "https://www.youtube.com/watch?v=xyz"),
+        (
+            "https://open.spotify.com/intl-fr/track/4uLU6hMCjMI75M1A2tKUQC?si=1",
+            "https://open.spotify.com/track/4uLU6hMCjMI75M1A2tKUQC",
+        ),
+        ("https://www.youtube.com/", None),
+        ("https://example.com/watch?v=abc", None),
+        ("ftp://youtu.be/abc", None),
+    ],
+)
+def test_canonicalize_link(raw: str, expected: str | None) -> None:
+    assert canonicalize_link(raw) == expected
+
+
+def test_extract_links_from_chat_text() -> None:
+    text = "écoute ça https://youtu.be/abc, et (youtube.com/watch?v=abc) puis open.spotify.com/track/T1!"
+
+    assert extract_links(text) == [
+        "https://www.youtube.com/watch?v=abc",
+        "https://open.spotify.com/track/T1",
+    ]
+    assert extract_links("gg wp kappa") == []
+
+
+def test_parse_privmsg_handles_tags_and_other_commands() -> None:
+    line = "@color=#fff;display-name=Bob :bob!bob@bob.tmi.twitch.tv PRIVMSG #chan :salut : ça va"
+
+    assert parse_privmsg(line) == ChatMessage("bob", "#chan", "salut : ça va")
+    assert parse_privmsg(":tmi.twitch.tv 001 justinfan :Welcome") is None
+    assert parse_privmsg("PING :tmi.twitch.tv") is None
+
+
+def test_submit_links_batches_votes_and_skips_known_links(session_factory) -> None:
+    db = session_factory()
+    db.add(Song(title="Déjà là", artist="Quelqu'un", link="https://www.youtube.com/watch?v=old", votes=2))
+    db.add(BanRule(link="https://www.youtube.com/watch?v=banned"))
+    db.commit()
+
+    fetched: list[str] = []
+
+    def metadata(link: str) -> SongCreate:
+        fetched.append(link)
+        if link.endswith("broken"):
+            raise MetadataError("indisponible")
+        return fake_metadata(link)
+
+    results = submissions.submit_links(
+        db,
+        Counter(
+            {
+                "https://www.youtube.com/watch?v=old": 3,
+                "https://www.youtube.com/watch?v=new": 2,
+                "https://www.youtube.com/watch?v=banned": 1,
+                "https://www.youtube.com/watch?v=broken": 1,
+            }
+        ),
+        fetch_metadata=metadata,
+    )
+    db.close()
+
+    assert {link.rsplit("=", 1)[-1]: result.status for link, result in results.items()} == {
+        "old": "added",
+        "new": "added",
+        "banned": "banned",
+        "broken": "metadata_error",
+    }
+    assert sorted(fetched) == [
+        "https://www.youtube.com/watch?v=broken",
+        "https://www.youtube.com/watch?v=new",
+    ]
+    with session_factory() as check:
+        votes = {song.link.rsplit("=", 1)[-1]: song.votes for song in check.query(Song)}
+    assert votes == {"old": 5, "new": 2}
+
+
+def test_rule_link_is_compared_in_canonical_form(session_factory) -> None:
+    with session_factory() as db:
+        submissions.submit_link(db, "https://www.youtube.com/watch?v=abc", fetch_metadata=fake_metadata)
+        rule = ban_crud.add_ban_rule(db, BanRuleCreate(link="https://youtu.be/abc"))
+
+        assert rule.link == "https://www.youtube.com/watch?v=abc"
+        assert db.query(Song).count() == 0
+        for raw in ("https://youtu.be/abc", "https://www.youtube.com/watch?v=abc&t=3"):
+            assert submissions.submit_link(db, raw, fetch_metadata=fake_metadata).status == "banned"
+        results = submissions.submit_links(
+            db, {canonicalize_link("https://youtu.be/abc"): 1}, fetch_metadata=fake_metadata
+        )
+        assert [result.status for result in results.values()] == ["banned"]
+
+
+def test_flood_limit_and_per_batch_dedupe(session_factory) -> None:
+    ingestor = TwitchChatIngestor(
+        "chan", session_factory, user_rate="2/minute", fetch_metadata=fake_metadata
+    )
+    for _ in range(4):
+        ingestor.handle_message(ChatMessage("spammer", "#chan", "https://youtu.be/aaa"))
+    ingestor.handle_message(ChatMessage("viewer", "#chan", "https://youtu.be/aaa https://youtu.be/bbb"))
+
+    assert ingestor.stats["flood_limited"] == 2
+    assert ingestor.stats["duplicates"] == 1
+    assert ingestor._pending == Counter(
+        {"https://www.youtube.com/watch?v=aaa": 2, "https://www.youtube.com/watch?v=bbb": 1}
+    )
+
+
+def _run_replay(session_factory, lines, *, rate=10_000, close_after=False):  # noqa: ANN001, ANN202
+    async def scenario():  # noqa: ANN202
+        server = await FakeIrcServer(lines, rate=rate, close_after=close_after).start()
+        ingestor = TwitchChatIngestor(
+            "tchatrecosong",
+            session_factory,
+            host="127.0.0.1",
+            port=server.port,
+            use_tls=False,
+            batch_interval=0.05,
+            max_backoff=0.1,
+            fetch_metadata=fake_metadata,
+        )
+        task = asyncio.create_task(ingestor.run())
+        expected = sum(1 for line in lines if b" PRIVMSG " in line)
+        async with asyncio.timeout(20):
+            while ingestor.stats["messages"] < expected or (close_after and server.connections < 2):
+                await asyncio.sleep(0.01)
+        ingestor.stop()
+        await task
+        await server.close()
+        return server, ingestor
+
+    return asyncio.run(scenario())
+
+
+def test_replays_recorded_chat_at_10k_messages_per_second(session_factory) -> None:
+    lines = recorded_chat(10_000, viewers=5_000, link_ratio=0.05, link_pool=200)
+
+    server, ingestor = _run_replay(session_factory, lines)
+
+    assert ingestor.stats["messages"] == 10_000
+    assert server.replay_seconds < 2.5
+    assert server.pongs == 1
+    queued = ingestor.stats["links"]
+    assert queued > 400
+    with session_factory() as db:
+        songs = db.query(Song).all()
+    assert sum(song.votes for song in songs) == queued
+    assert all(
+        song.link.startswith(("https://www.youtube.com/watch?v=", "https://open.spotify.com/track/"))
+        for song in songs
+    )
+    assert ingestor.stats["batches"] < queued
+
+
+def test_reconnects_after_server_closes(session_factory) -> None:
+    lines = recorded_chat(200, link_ratio=0.0)
+
+    server, ingestor = _run_replay(session_factory, lines, close_after=True)
+
+    assert server.connections >= 2
+    assert ingestor.stats["reconnects"] >= 1
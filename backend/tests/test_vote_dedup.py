@@ -0,0 +1,133 @@
+import os
+import random
+import sys
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.crud import song as crud_song
+from app.crud import song_voter
+from app.models.song import Song
+from app.models.song_voter import SongVoters
+from app.services import rate_limit
+from app.utils.sketches import BloomVoterSet, ExactVoterSet, add_voter, load_voter_set
+
+
+@pytest.fixture()
+def engine(engine):
+    with sessionmaker(bind=engine)() as db:
+        db.add(Song(id=1, title="Vote", artist="Unique", link="https://youtu.be/unique"))
+        db.commit()
+    return engine
+
+
+def test_exact_set_is_promoted_to_bloom_and_round_trips() -> None:
+    rng = random.Random(3)
+    members = [rng.getrandbits(64) for _ in range(2_000)]
+    voters = ExactVoterSet()
+    added_count = 0
+    for fingerprint in members:
+        voters, added = add_voter(voters, fingerprint, exact_limit=64)
+        added_count += added
+    # Un faux positif du filtre fait passer un nouveau votant pour un doublon.
+    assert added_count > 0.98 * len(members)
+
+    assert isinstance(voters, BloomVoterSet)
+    restored = load_voter_set(voters.to_bytes())
+    assert all(fingerprint in restored for fingerprint in members)
+    assert restored.to_bytes() == voters.to_bytes()
+    # Bien moins que 8 octets par votant une fois en filtre de Bloom.
+    assert len(voters.to_bytes()) < 4 * len(members)
+
+    outsiders = [rng.getrandbits(64) for _ in range(20_000)]
+    false_positives = sum(fingerprint in restored for fingerprint in outsiders)
+    assert false_positives / len(outsiders) < 0.02
+
+
+def test_fingerprint_is_keyed_by_secret() -> None:
+    fingerprint = song_voter.voter_fingerprint("203.0.113.7", "Firefox", secret="a")
+    assert fingerprint == song_voter.voter_fingerprint("203.0.113.7", "Firefox", secret="a")
+    assert fingerprint != song_voter.voter_fingerprint("203.0.113.7", "Firefox", secret="b")
+    assert 0 <= fingerprint < 2**64
+
+
+def test_repeated_vote_is_rejected_from_memory(session_factory, query_budget) -> None:
+    with session_factory() as db:
+        assert crud_song.increment_vote(db, 1, voter=42).votes == 2
+        assert crud_song.increment_vote(db, 1, voter=43).votes == 3
+
+        with query_budget(db, 1, "vote en double"):
+            with pytest.raises(song_voter.DuplicateVoteError):
+                crud_song.increment_vote(db, 1, voter=42)
+        db.rollback()
+
+        assert db.get(Song, 1).votes == 3
+        assert load_voter_set(db.get(SongVoters, 1).voters).kind == "exact"
+
+
+def test_other_worker_votes_are_seen_through_version_check(engine, session_factory) -> None:
+    # Deux moteurs sur la même base : deux caches, comme deux workers.
+    other_engine = create_engine(engine.url, future=True)
+    other_factory = sessionmaker(bind=other_engine, autoflush=False)
+    try:
+        with session_factory() as db:
+            crud_song.increment_vote(db, 1, voter=1)
+        with other_factory() as db:
+            crud_song.increment_vote(db, 1, voter=2)
+        with session_factory() as db:
+            # Le cache local ignore le votant 2 ; l'écriture conditionnelle échoue,
+            # l'ensemble est relu et le doublon détecté.
+            with pytest.raises(song_voter.DuplicateVoteError):
+                crud_song.increment_vote(db, 1, voter=2)
+            db.rollback()
+            crud_song.increment_vote(db, 1, voter=3)
+            row = db.get(SongVoters, 1)
+            assert row.version == 3
+            assert {1, 2, 3} == set(load_voter_set(row.voters))
+    finally:
+        other_engine.dispose()
+
+
+def test_rollback_forgets_uncommitted_voter(session_factory) -> None:
+    with session_factory() as db:
+        song_voter.record_voter(db, 1, 7)
+        db.rollback()
+        song_voter.record_voter(db, 1, 7)
+        db.commit()
+
+
+def test_vote_endpoint_returns_409_for_same_voter(client) -> None:
+    first = client.post("/songs/1/vote", headers={"User-Agent": "viewer-a"})
+    again = client.post("/songs/1/vote", headers={"User-Agent": "viewer-a"})
+    other = client.post("/songs/1/vote", headers={"User-Agent": "viewer-b"})
+
+    assert first.status_code == 200
+    assert again.status_code == 409
+    assert again.json() == {"detail": "Tu as déjà voté pour cette chanson."}
+    assert other.json()["votes"] == 3
+
+
+def test_forwarded_clients_are_told_apart_and_spoofing_is_ignored(client, monkeypatch) -> None:
+    # Un proxy de confiance (Render) : il ajoute l'adresse réelle en fin de chaîne.
+    monkeypatch.setattr(rate_limit, "TRUSTED_PROXY_HOPS", 1)
+    browser = {"User-Agent": "Firefox/130.0"}
+
+    first = client.post("/songs/1/vote", headers={**browser, "X-Forwarded-For": "203.0.113.1"})
+    second = client.post("/songs/1/vote", headers={**browser, "X-Forwarded-For": "203.0.113.2"})
+    # Le premier viewer invente une adresse ; le proxy ajoute la vraie à droite.
+    spoofed = client.post(
+        "/songs/1/vote", headers={**browser, "X-Forwarded-For": "198.51.100.7, 203.0.113.1"}
+    )
+
+    assert first.status_code == 200
+    assert second.status_code == 200
+    assert second.json()["votes"] == 3
+    assert spoofed.status_code == 409
@@ -25,3 +25,20 @@ export function getApiUrl(): string {
     throw new Error('Impossible de déduire automatiquement VITE_API_URL. Définissez VITE_API_URL pour votre déploiement.');
   }
 }
+
+// Après une écriture, le backend renvoie un jeton signé de courte durée. Le
+// renvoyer sur les lectures suivantes les fait servir par la base primaire
+// plutôt que par un réplica encore en retard (lecture de ses propres écritures).
+const READ_AFTER_HEADER = 'X-Read-After';
+let readAfterToken: string | null = null;
+
+export function rememberReadAfter(response: Response): void {
+  const token = response.headers.get(READ_AFTER_HEADER);
+  if (token) {
+    readAfterToken = token;
+  }
+}
+
+export function readAfterHeaders(): Record<string, string> {
+  return readAfterToken ? { [READ_AFTER_HEADER]: readAfterToken } : {};
+}
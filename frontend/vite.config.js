@@ -1,8 +1,43 @@
 import { defineConfig } from 'vite'
 import vue from '@vitejs/plugin-vue'
+import { readdir, readFile, writeFile } from 'fs/promises'
+import { join } from 'path'
+import { brotliCompressSync, constants, gzipSync } from 'zlib'
+
+const PRECOMPRESS_EXTENSIONS = /\.(js|css|html|svg|json)$/
+const PRECOMPRESS_MIN_BYTES = 1024
+
+// Écrit les variantes .br/.gz des fichiers de dist/assets : le backend les
+// sert telles quelles au lieu de compresser à chaque requête.
+function precompressAssets() {
+  let outDir = 'dist'
+  return {
+    name: 'precompress-assets',
+    apply: 'build',
+    configResolved(config) {
+      outDir = config.build.outDir
+    },
+    async closeBundle() {
+      const assetsDir = join(outDir, 'assets')
+      for (const name of await readdir(assetsDir)) {
+        if (!PRECOMPRESS_EXTENSIONS.test(name)) continue
+        const filePath = join(assetsDir, name)
+        const content = await readFile(filePath)
+        if (content.length < PRECOMPRESS_MIN_BYTES) continue
+        await writeFile(`${filePath}.gz`, gzipSync(content, { level: 9 }))
+        await writeFile(
+          `${filePath}.br`,
+          brotliCompressSync(content, {
+            params: { [constants.BROTLI_PARAM_QUALITY]: constants.BROTLI_MAX_QUALITY },
+          }),
+        )
+      }
+    },
+  }
+}
 
 export default defineConfig({
-  plugins: [vue()],
+  plugins: [vue(), precompressAssets()],
   server: {
     port: 5173,
   },